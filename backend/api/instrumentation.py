@@ -0,0 +1,249 @@
+"""
+Instrumentação de requisições da API.
+
+- ``RequestMetricsMiddleware``: middleware ASGI que mede a latência de cada
+  requisição e quantos comandos SQL (e quanto tempo de banco) ela gerou,
+  agregando por rota (template, ex: ``/api/agents``).
+- Eventos de engine do SQLAlchemy contam os comandos da requisição corrente
+  via ``contextvars`` (propagado para o threadpool dos endpoints síncronos).
+- ``ApiMetrics.render_prometheus`` gera o texto exposto em ``/metrics/internal``.
+- Cada resposta recebe o cabeçalho ``Server-Timing`` (``app`` e ``db``).
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Limites (segundos) dos buckets do histograma de latência
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+@dataclass
+class RequestStats:
+    """Contadores da requisição corrente."""
+    sql_count: int = 0
+    sql_seconds: float = 0.0
+
+
+_current_request: ContextVar[Optional[RequestStats]] = ContextVar(
+    'ferritine_request_stats', default=None
+)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """Estatísticas da requisição corrente (None fora de uma requisição)."""
+    return _current_request.get()
+
+
+# ==================== EVENTOS DE ENGINE ====================
+
+_sql_instrumented = False
+_START_KEY = '_ferritine_query_start'
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_request.get() is not None:
+        conn.info.setdefault(_START_KEY, {})[id(cursor)] = time.perf_counter()
+
+
+def _finish_statement(conn, cursor) -> None:
+    """Contabiliza o comando iniciado em ``cursor`` (se foi medido)."""
+    starts = conn.info.get(_START_KEY)
+    if not starts:
+        return
+    started = starts.pop(id(cursor), None)
+    stats = _current_request.get()
+    if started is None or stats is None:
+        return
+    stats.sql_count += 1
+    stats.sql_seconds += time.perf_counter() - started
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _finish_statement(conn, cursor)
+
+
+def _handle_error(exception_context):
+    # Comando que falhou não dispara after_cursor_execute; sem isto o
+    # início dele ficaria para sempre em conn.info
+    context = exception_context.execution_context
+    if exception_context.connection is not None and context is not None:
+        _finish_statement(exception_context.connection, context.cursor)
+
+
+def install_sql_instrumentation() -> None:
+    """Registra os eventos em todas as engines (idempotente)."""
+    global _sql_instrumented
+    if _sql_instrumented:
+        return
+    event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(Engine, 'handle_error', _handle_error)
+    _sql_instrumented = True
+
+
+# ==================== AGREGAÇÃO ====================
+
+@dataclass
+class RouteMetrics:
+    """Agregado por (método, rota)."""
+    bucket_counts: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    latency_sum: float = 0.0
+    count: int = 0
+    sql_count: int = 0
+    sql_seconds: float = 0.0
+    status_counts: Dict[int, int] = field(default_factory=dict)
+
+
+class ApiMetrics:
+    """Registro thread-safe das métricas por rota."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: Dict[Tuple[str, str], RouteMetrics] = {}
+
+    def observe(self, method: str, route: str, status: int,
+                seconds: float, stats: RequestStats) -> None:
+        """Registra uma requisição concluída."""
+        with self._lock:
+            metrics = self._routes.get((method, route))
+            if metrics is None:
+                metrics = self._routes[(method, route)] = RouteMetrics()
+            metrics.bucket_counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            metrics.latency_sum += seconds
+            metrics.count += 1
+            metrics.sql_count += stats.sql_count
+            metrics.sql_seconds += stats.sql_seconds
+            metrics.status_counts[status] = metrics.status_counts.get(status, 0) + 1
+
+    def snapshot(self) -> Dict[Tuple[str, str], RouteMetrics]:
+        """Cópia dos agregados atuais."""
+        with self._lock:
+            return {
+                key: RouteMetrics(
+                    bucket_counts=list(m.bucket_counts),
+                    latency_sum=m.latency_sum,
+                    count=m.count,
+                    sql_count=m.sql_count,
+                    sql_seconds=m.sql_seconds,
+                    status_counts=dict(m.status_counts),
+                )
+                for key, m in self._routes.items()
+            }
+
+    def reset(self) -> None:
+        """Descarta todos os agregados."""
+        with self._lock:
+            self._routes.clear()
+
+    def render_prometheus(self) -> str:
+        """Métricas no formato de texto do Prometheus (versão 0.0.4)."""
+        lines = [
+            '# HELP ferritine_http_request_duration_seconds Latência das requisições.',
+            '# TYPE ferritine_http_request_duration_seconds histogram',
+        ]
+        routes = sorted(self.snapshot().items())
+        for (method, route), m in routes:
+            labels = f'method="{method}",route="{route}"'
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, m.bucket_counts):
+                cumulative += count
+                lines.append(
+                    f'ferritine_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}'
+                )
+            lines.append(f'ferritine_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {m.count}')
+            lines.append(f'ferritine_http_request_duration_seconds_sum{{{labels}}} {m.latency_sum:.6f}')
+            lines.append(f'ferritine_http_request_duration_seconds_count{{{labels}}} {m.count}')
+
+        lines += [
+            '# HELP ferritine_http_requests_total Requisições por status.',
+            '# TYPE ferritine_http_requests_total counter',
+        ]
+        for (method, route), m in routes:
+            for status, count in sorted(m.status_counts.items()):
+                lines.append(
+                    f'ferritine_http_requests_total{{method="{method}",route="{route}",status="{status}"}} {count}'
+                )
+
+        lines += [
+            '# HELP ferritine_http_sql_statements_total Comandos SQL emitidos pelas requisições.',
+            '# TYPE ferritine_http_sql_statements_total counter',
+        ]
+        for (method, route), m in routes:
+            lines.append(
+                f'ferritine_http_sql_statements_total{{method="{method}",route="{route}"}} {m.sql_count}'
+            )
+
+        lines += [
+            '# HELP ferritine_http_sql_duration_seconds_total Tempo total em banco das requisições.',
+            '# TYPE ferritine_http_sql_duration_seconds_total counter',
+        ]
+        for (method, route), m in routes:
+            lines.append(
+                f'ferritine_http_sql_duration_seconds_total{{method="{method}",route="{route}"}} {m.sql_seconds:.6f}'
+            )
+        return '\n'.join(lines) + '\n'
+
+
+# Registro global usado pela API
+api_metrics = ApiMetrics()
+
+
+# ==================== MIDDLEWARE ====================
+
+class RequestMetricsMiddleware:
+    """
+    Middleware ASGI de latência e contagem de SQL por rota.
+
+    Rotas sem correspondência são agregadas como ``unmatched`` para não
+    criar uma série por URL arbitrária.
+    """
+
+    def __init__(self, app, metrics: ApiMetrics = None, server_timing: bool = True):
+        self.app = app
+        self.metrics = metrics or api_metrics
+        self.server_timing = server_timing
+        install_sql_instrumentation()
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_request.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+                if self.server_timing:
+                    elapsed_ms = (time.perf_counter() - started) * 1000.0
+                    header = (
+                        f'app;dur={elapsed_ms:.2f}, '
+                        f'db;dur={stats.sql_seconds * 1000.0:.2f};desc="{stats.sql_count} queries"'
+                    )
+                    message.setdefault('headers', [])
+                    message['headers'] = list(message['headers']) + [
+                        (b'server-timing', header.encode('latin-1'))
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get('route')
+            route_path = getattr(route, 'path', None) or 'unmatched'
+            self.metrics.observe(
+                scope.get('method', 'GET'), route_path, status_code,
+                time.perf_counter() - started, stats
+            )
+            _current_request.reset(token)
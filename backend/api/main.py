@@ -5,10 +5,12 @@ Fornece endpoints REST para consumo do estado da simulação.
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from decimal import Decimal
+import threading
 import uvicorn
 
 # Importações do banco de dados
@@ -17,6 +19,14 @@ from backend.database.models import (
     Agent, Vehicle, Station, Route, TransportOperator,
     Ticket, Schedule, AgentStatus, VehicleStatus, StationType
 )
+from backend.database.queries import EconomicStatQueries, SensorEventQueries, TransportOperatorQueries
+from backend.api.instrumentation import RequestMetricsMiddleware, api_metrics
+from backend.utils.telemetry import read_dump as read_telemetry_dump, summarize as summarize_ticks, telemetry
+from backend.simulation.event_log import EventLogReplayer
+from backend.simulation.world_snapshot import SnapshotBusyError, WorldSnapshotReader, attach_from_config
+from backend.utils.config_loader import get_config
+from backend.database.slow_query import slow_query_log
+from backend.utils.logger import render_log_metrics
 from sqlalchemy import func
 
 # Inicializar FastAPI
@@ -35,6 +45,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Latência, contagem de SQL por rota e cabeçalho Server-Timing
+app.add_middleware(RequestMetricsMiddleware)
+
 # ==================== MODELOS PYDANTIC (DTOs) ====================
 
 class AgentDTO(BaseModel):
@@ -145,10 +158,153 @@ def root():
             "stations": "/api/stations",
             "routes": "/api/routes",
             "operators": "/api/operators",
-            "metrics": "/api/metrics"
+            "metrics": "/api/metrics",
+            "telemetry": "/api/telemetry/ticks"
         }
     }
 
+@app.get("/metrics/internal", include_in_schema=False)
+def internal_metrics():
+    """Métricas internas da API no formato Prometheus."""
+    return PlainTextResponse(
+        api_metrics.render_prometheus() + render_log_metrics(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+@app.get("/internal/slow-queries", include_in_schema=False)
+def internal_slow_queries(limit: int = 50, grouped: bool = False):
+    """
+    Consultas que passaram do limite DB_SLOW_QUERY_MS neste processo.
+
+    ``grouped=true`` agrupa por comando SQL (mais custoso primeiro), com os
+    chamadores e o plano de execução de cada um.
+    """
+    if grouped:
+        return {
+            "threshold_ms": slow_query_log.threshold_ms,
+            "queries": slow_query_log.summary()[:limit],
+        }
+    return {
+        "threshold_ms": slow_query_log.threshold_ms,
+        "queries": slow_query_log.recent(limit),
+    }
+
+@app.get("/api/telemetry/ticks")
+def get_tick_telemetry(limit: int = 60):
+    """
+    Telemetria por fase dos últimos ticks da simulação.
+
+    A simulação roda em outro processo e grava o buffer circular em
+    ``simulation.telemetry_dump_path`` a cada ``telemetry_dump_every``
+    ticks; a rota lê esse arquivo. Se a simulação roda neste processo
+    (buffer local com ticks), usa o buffer diretamente.
+
+    Retorna os registros mais recentes, o resumo por fase (média, p95,
+    máximo) e, para o buffer local, os totais acumulados.
+    """
+    limit = max(0, limit)
+    if telemetry.recent(1):
+        return {
+            "source": "process",
+            "summary": telemetry.summary(),
+            "totals": telemetry.totals(),
+            "ticks": telemetry.recent(min(limit, telemetry.capacity)),
+        }
+
+    path = get_config().simulation.telemetry_dump_path
+    records = read_telemetry_dump(path) if path else []
+    return {
+        "source": "dump",
+        "path": path or None,
+        "summary": summarize_ticks(records),
+        "totals": None,
+        "ticks": records[-limit:] if limit else [],
+    }
+
+@app.post("/api/telemetry/dump")
+def dump_tick_telemetry():
+    """Grava o buffer circular de ticks no arquivo configurado."""
+    path = telemetry.dump()
+    if path is None:
+        raise HTTPException(status_code=409, detail="telemetry_dump_path não configurado")
+    return {"path": str(path), "ticks": len(telemetry.recent())}
+
+@app.get("/api/timeseries/economic/{metric}")
+def get_economic_series(metric: str, start: int, end: int, max_points: int = 500,
+                        resolution: Optional[str] = None):
+    """
+    Série de uma métrica de EconomicStat entre duas horas da simulação.
+
+    Usa os agregados por hora/dia/semana: a resolução é a mais detalhada
+    que cabe em ``max_points``, a menos que ``resolution`` seja informada.
+    """
+    session = get_session()
+    try:
+        return EconomicStatQueries(session).get_series(metric, start, end, max(1, max_points), resolution)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        session.close()
+
+@app.get("/api/timeseries/sensors/{sensor_id}")
+def get_sensor_series(sensor_id: str, start: datetime, end: datetime, reading_type: str = "state",
+                      max_points: int = 500, resolution: Optional[str] = None):
+    """Série agregada das leituras numéricas de um sensor (min/max/média)."""
+    session = get_session()
+    try:
+        return SensorEventQueries(session).get_series(
+            sensor_id, reading_type, start, end, max(1, max_points), resolution
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        session.close()
+
+_replayer: Optional[EventLogReplayer] = None
+
+def _get_replayer() -> EventLogReplayer:
+    """Replayer do log configurado, reaproveitado entre requisições."""
+    global _replayer
+    path = get_config().simulation.event_log_path
+    if not path:
+        raise HTTPException(status_code=409, detail="event_log_path não configurado")
+    try:
+        if _replayer is None or str(_replayer.reader.path) != path:
+            _replayer = EventLogReplayer(path)
+        else:
+            _replayer.refresh()  # acompanha um log ainda em gravação
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Log de eventos não encontrado: {path}")
+    except ValueError as e:
+        # Arquivo vazio (gravação começando) ou recriado por outra execução:
+        # descarta o índice e tenta de novo na próxima requisição
+        _replayer = None
+        raise HTTPException(status_code=409, detail=f"Log de eventos ilegível: {e}")
+    return _replayer
+
+@app.get("/api/replay/state")
+def get_replay_state(tick: int):
+    """
+    Estado dos agentes da simulação ao fim de ``tick``, reconstruído a
+    partir do log de eventos (scrubbing da linha do tempo no Unity).
+    """
+    replayer = _get_replayer()
+    if tick < 0 or tick > replayer.last_tick:
+        raise HTTPException(status_code=400, detail=f"tick fora do log (0..{replayer.last_tick})")
+    state = replayer.state_at(tick)
+    return {
+        "tick": state.tick,
+        "hora": state.hora,
+        "first_tick": replayer.first_tick,
+        "last_tick": replayer.last_tick,
+        "agents": [{"nome": a.nome, "local": a.local} for a in state.agentes],
+    }
+
+@app.get("/api/replay/events")
+def get_replay_events(start: int = 0, end: Optional[int] = None, kind: Optional[str] = None):
+    """Eventos gravados no log entre dois ticks (inclusive)."""
+    return {"events": _get_replayer().events(start, end, kind)}
+
 @app.get("/health")
 def health_check():
     """Health check para monitoramento."""
@@ -162,12 +318,125 @@ def health_check():
     finally:
         session.close()
 
+# Um leitor por thread do pool: o leitor só é fechado/substituído pelo
+# próprio thread, nunca no meio da leitura de outro
+_world_readers = threading.local()
+
+def _get_world_reader() -> Optional[WorldSnapshotReader]:
+    """Leitor do estado publicado pela simulação (None se nenhuma está rodando)."""
+    reader = getattr(_world_readers, 'reader', None)
+    name = get_config().simulation.world_snapshot_name
+    if reader is not None and reader.name == name and reader.live:
+        return reader
+    if reader is not None:
+        reader.close()
+    reader = _world_readers.reader = attach_from_config(get_config().simulation)
+    if reader is not None and not reader.live:
+        return None
+    return reader
+
+def _read_world(fn):
+    """Aplica ``fn`` ao estado em memória compartilhada; None para usar o banco."""
+    reader = _get_world_reader()
+    if reader is None:
+        return None
+    try:
+        return reader.read(fn)
+    except SnapshotBusyError:
+        return None
+
+def _simulation_time(clock: Dict[str, Any]) -> Optional[str]:
+    if clock.get('simulation_time') is not None:
+        return str(clock['simulation_time'])
+    if clock.get('hora') is not None:
+        return f"{int(clock['hora']):02d}:00"
+    return None
+
+def _metrics_from_snapshot(snapshot) -> Optional[MetricsDTO]:
+    if not snapshot.metadata.get('world'):
+        return None
+    return MetricsDTO(**snapshot.metadata['metrics'])
+
+def _world_state_from_snapshot(snapshot) -> Optional[WorldStateDTO]:
+    """Monta o estado do mundo direto das colunas publicadas pela simulação."""
+    if not snapshot.metadata.get('world'):
+        return None
+
+    def columns(table, *names, stop=None):
+        return zip(*(snapshot.values(table, name, stop=stop) for name in names))
+
+    agents_dto = [
+        AgentDTO(
+            id=to_str(id_), name=name, status=status or "idle",
+            location_type=location_type, location_id=to_str(location_id),
+            energy_level=energy or 100, wallet=to_float(wallet)
+        )
+        for id_, name, status, location_type, location_id, energy, wallet in columns(
+            'agents', 'id', 'name', 'current_status', 'current_location_type',
+            'current_location_id', 'energy_level', 'wallet', stop=100)
+    ]
+    vehicles_dto = [
+        VehicleDTO(
+            id=to_str(id_), name=name, vehicle_type=vehicle_type,
+            passengers=passengers or 0, capacity=capacity or 0, status=status or "idle",
+            current_station_id=to_str(station_id), current_route_id=to_str(route_id),
+            fuel_level=float(fuel) if fuel else 0.0
+        )
+        for id_, name, vehicle_type, passengers, capacity, status, station_id, route_id, fuel in columns(
+            'vehicles', 'id', 'name', 'vehicle_type', 'current_passengers', 'passenger_capacity',
+            'status', 'current_station_id', 'current_route_id', 'current_fuel')
+    ]
+    stations_dto = [
+        StationDTO(
+            id=to_str(id_), name=name, station_type=station_type or "TRAIN_STEAM", x=x, y=y,
+            queue_length=queue or 0, max_queue=max_queue or 50,
+            is_operational=operational if operational is not None else True
+        )
+        for id_, name, station_type, x, y, queue, max_queue, operational in columns(
+            'stations', 'id', 'name', 'station_type', 'x', 'y', 'current_queue_length',
+            'max_queue_length', 'is_operational')
+    ]
+    routes_dto = [
+        RouteDTO(
+            id=to_str(id_), name=name, code=code, route_type=route_type or "TRAIN_STEAM",
+            fare=to_float(fare), frequency=frequency or 10,
+            is_active=active if active is not None else True
+        )
+        for id_, name, code, route_type, fare, frequency, active in columns(
+            'routes', 'id', 'name', 'code', 'route_type', 'fare_base', 'frequency_minutes', 'is_active')
+    ]
+    operators_dto = [
+        OperatorDTO(
+            id=to_str(id_), name=name, operator_type=operator_type or "TRAIN_STEAM",
+            revenue=to_float(revenue), costs=to_float(costs), profit=profit
+        )
+        for id_, name, operator_type, revenue, costs, profit in columns(
+            'operators', 'id', 'name', 'operator_type', 'revenue', 'operational_costs', 'profit')
+    ]
+    return WorldStateDTO(
+        timestamp=datetime.utcnow().isoformat(),
+        simulation_time=_simulation_time(snapshot.clock),
+        agents=agents_dto,
+        vehicles=vehicles_dto,
+        stations=stations_dto,
+        routes=routes_dto,
+        operators=operators_dto,
+        metrics=_metrics_from_snapshot(snapshot)
+    )
+
 @app.get("/api/world/state", response_model=WorldStateDTO)
 def get_world_state():
     """
     Retorna estado completo do mundo da simulação.
     Endpoint principal para Unity consumir.
+
+    Com a simulação rodando, lê o estado do último tick da memória
+    compartilhada; senão consulta o banco.
     """
+    world = _read_world(_world_state_from_snapshot)
+    if world is not None:
+        return world
+
     session = get_session()
     
     try:
@@ -176,7 +445,9 @@ def get_world_state():
         vehicles = session.query(Vehicle).all()
         stations = session.query(Station).all()
         routes = session.query(Route).filter(Route.is_active == True).all()
-        operators = session.query(TransportOperator).all()
+        operators = TransportOperatorQueries(session).get_profit_ranking(
+            include_inactive=True
+        )
         
         # Converter para DTOs
         agents_dto = [
@@ -241,9 +512,9 @@ def get_world_state():
                 operator_type=o.operator_type.value if o.operator_type else "TRAIN_STEAM",
                 revenue=to_float(o.revenue),
                 costs=to_float(o.operational_costs),
-                profit=o.get_profit_margin()
+                profit=profit
             )
-            for o in operators
+            for o, profit in operators
         ]
         
         # Calcular métricas
@@ -265,7 +536,7 @@ def get_world_state():
         # Montar resposta
         return WorldStateDTO(
             timestamp=datetime.utcnow().isoformat(),
-            simulation_time=None,  # TODO: Pegar do motor de simulação
+            simulation_time=_read_world(lambda snapshot: _simulation_time(snapshot.clock)),
             agents=agents_dto,
             vehicles=vehicles_dto,
             stations=stations_dto,
@@ -371,7 +642,9 @@ def get_operators():
     """Retorna lista de operadoras."""
     session = get_session()
     try:
-        operators = session.query(TransportOperator).all()
+        operators = TransportOperatorQueries(session).get_profit_ranking(
+            include_inactive=True
+        )
         return [
             OperatorDTO(
                 id=to_str(o.id),
@@ -379,16 +652,20 @@ def get_operators():
                 operator_type=o.operator_type.value if o.operator_type else "TRAIN_STEAM",
                 revenue=to_float(o.revenue),
                 costs=to_float(o.operational_costs),
-                profit=o.get_profit_margin()
+                profit=profit
             )
-            for o in operators
+            for o, profit in operators
         ]
     finally:
         session.close()
 
 @app.get("/api/metrics", response_model=MetricsDTO)
 def get_metrics():
-    """Retorna métricas agregadas."""
+    """Retorna métricas agregadas (do último tick publicado, se houver simulação)."""
+    metrics = _read_world(_metrics_from_snapshot)
+    if metrics is not None:
+        return metrics
+
     session = get_session()
     try:
         total_queue = session.query(func.sum(Station.current_queue_length)).scalar() or 0
@@ -17,6 +17,9 @@ from backend.database.models import (
     AgentStatus,
     Gender,
     TransportOperator,
+    FinancialRollup,
+    SensorEvent,
+    TimeSeriesRollup,
     StationType,
 )
 
@@ -35,11 +38,15 @@ from backend.database.queries import (
     AgentQueries,
     BuildingQueries,
     VehicleQueries,
+    RouteQueries,
     EventQueries,
     EconomicStatQueries,
     ProfessionQueries,
     NamePoolQueries,
     TransportOperatorQueries,
+    FinancialRollupQueries,
+    SensorEventQueries,
+    TimeSeriesRollupQueries,
 )
 
 __all__ = [
@@ -54,6 +61,9 @@ __all__ = [
     'Routine',
     'NamePool',
     'TransportOperator',
+    'FinancialRollup',
+    'SensorEvent',
+    'TimeSeriesRollup',
     # Enums
     'CreatedBy',
     'HealthStatus',
@@ -73,11 +83,15 @@ __all__ = [
     'AgentQueries',
     'BuildingQueries',
     'VehicleQueries',
+    'RouteQueries',
     'EventQueries',
     'EconomicStatQueries',
     'ProfessionQueries',
     'NamePoolQueries',
     'TransportOperatorQueries',
+    'FinancialRollupQueries',
+    'SensorEventQueries',
+    'TimeSeriesRollupQueries',
 ]
 
 
@@ -0,0 +1,84 @@
+"""
+Inserção em lote sem passar pela sessão do ORM.
+
+- PostgreSQL: ``COPY ... FROM STDIN`` (psycopg2 ``copy_expert``)
+- demais bancos (SQLite): ``executemany`` via ``table.insert()``
+
+Usada pelas queries de ingestão (``SensorEventQueries``) e pelo gerador
+de cidades sintéticas.
+"""
+
+import csv
+import io
+import json
+from typing import Any, Dict, List
+
+from sqlalchemy import Table
+from sqlalchemy.engine import Connection
+
+
+def _column_default(column) -> Any:
+    default = column.default
+    if default is None or not default.is_scalar and not default.is_callable:
+        return None
+    if default.is_callable:
+        return default.arg(None)
+    return default.arg
+
+
+def _copy_value(value: Any) -> Any:
+    if value is None:
+        return r'\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def _copy_rows(connection: Connection, table: Table, rows: List[Dict[str, Any]]) -> None:
+    """Grava linhas com COPY (PostgreSQL), aplicando defaults e conversões de tipo."""
+    dialect = connection.dialect
+    keys = set(rows[0])
+    columns = [c for c in table.columns if c.name in keys or c.default is not None]
+    processors = [c.type.dialect_impl(dialect).bind_processor(dialect) for c in columns]
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        record = []
+        for column, processor in zip(columns, processors):
+            value = row[column.name] if column.name in row else _column_default(column)
+            if processor is not None and value is not None:
+                value = processor(value)
+            record.append(_copy_value(value))
+        writer.writerow(record)
+    buffer.seek(0)
+
+    preparer = dialect.identifier_preparer
+    names = ', '.join(preparer.quote(c.name) for c in columns)
+    sql = f'COPY {preparer.format_table(table)} ({names}) FROM STDIN WITH (FORMAT csv, NULL \'\\N\')'
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(sql, buffer)
+    finally:
+        cursor.close()
+
+
+def bulk_insert(connection: Connection, table: Table, rows: List[Dict[str, Any]]) -> int:
+    """
+    Insere linhas em lote na tabela.
+
+    Todas as linhas devem ter as mesmas chaves; colunas ausentes recebem o
+    default da coluna.
+
+    Returns:
+        Número de linhas inseridas
+    """
+    if not rows:
+        return 0
+    if connection.dialect.name == 'postgresql':
+        _copy_rows(connection, table, rows)
+    else:
+        connection.execute(table.insert(), rows)
+    return len(rows)
@@ -3,6 +3,7 @@ Gerenciamento de conexão com banco de dados PostgreSQL.
 """
 
 import os
+import pathlib
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, scoped_session
 from sqlalchemy.pool import QueuePool
@@ -11,6 +12,7 @@ from typing import Generator
 import logging
 
 from backend.database.models import Base
+from backend.database.slow_query import slow_query_log
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +27,10 @@ class DatabaseConfig:
         self.user = os.getenv('DB_USER', 'ferritine_user')
         self.password = os.getenv('DB_PASSWORD', 'ferritine_pass')
         self.echo = os.getenv('DB_ECHO', 'False').lower() == 'true'
+        # Registro de consultas lentas (0 desativa)
+        self.slow_query_ms = float(os.getenv('DB_SLOW_QUERY_MS', '250'))
+        self.slow_query_log = os.getenv('DB_SLOW_QUERY_LOG', 'data/logs/slow_queries.log')
+        self.slow_query_explain = os.getenv('DB_SLOW_QUERY_EXPLAIN', 'True').lower() == 'true'
         
     @property
     def url(self) -> str:
@@ -96,8 +102,24 @@ class DatabaseManager:
             else:
                 raise
 
+        # Fora do try acima: falha no log não pode virar fallback para SQLite
+        try:
+            self._install_slow_query_log()
+        except Exception as e:
+            logger.warning(f"Registro de consultas lentas desativado: {e}")
+
         return self.engine
     
+    def _install_slow_query_log(self):
+        """Liga o registro de consultas lentas na engine, se configurado."""
+        if self.config.slow_query_ms <= 0:
+            return
+        slow_query_log.threshold_ms = self.config.slow_query_ms
+        slow_query_log.explain = self.config.slow_query_explain
+        if str(slow_query_log.log_path or '') != str(pathlib.Path(self.config.slow_query_log)):
+            slow_query_log.set_log_path(self.config.slow_query_log)
+        slow_query_log.install(self.engine)
+
     def create_session_factory(self):
         """Cria factory de sessões."""
         if not self.engine:
@@ -115,11 +137,16 @@ class DatabaseManager:
         
         # Criar diretório se usando SQLite
         if self.use_sqlite:
-            import pathlib
             db_path = self.config.sqlite_url.replace('sqlite:///', '')
             pathlib.Path(db_path).parent.mkdir(parents=True, exist_ok=True)
         
         Base.metadata.create_all(self.engine)
+
+        # Partições nativas (PostgreSQL) do período corrente e seguintes
+        if not self.use_sqlite:
+            from backend.database.partitioning import PartitionManager
+            PartitionManager(self.engine).ensure_upcoming()
+
         logger.info("Banco de dados inicializado")
     
     def drop_all(self):
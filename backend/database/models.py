@@ -5,16 +5,19 @@ Implementa persistência usando PostgreSQL e SQLAlchemy.
 
 from sqlalchemy import (
     create_engine, Column, Integer, String, Float, Boolean,
-    DateTime, ForeignKey, Text, DECIMAL, CHAR, Enum as SQLEnum,
-    JSON, CheckConstraint, Index, TypeDecorator, Time
+    DateTime, Date, ForeignKey, Text, DECIMAL, CHAR, Enum as SQLEnum,
+    JSON, CheckConstraint, Index, UniqueConstraint, TypeDecorator, Time,
+    func, select
 )
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship, sessionmaker, validates
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import relationship, sessionmaker, validates, deferred
 from datetime import datetime, timedelta, time
 from typing import List, Optional
 import uuid
 import enum
+import warnings
 
 Base = declarative_base()
 
@@ -317,11 +320,44 @@ class RouteStatus(str, enum.Enum):
     DEACTIVATED = "deactivated"  # Desativada permanentemente
 
 
+# Grupo de colunas "frias" do Agent (JSON grande, raramente alterado).
+# Carregadas sob demanda para que leituras/escritas por tick só toquem o
+# estado "quente" (localização, status, energia, carteira).
+AGENT_PROFILE_GROUP = 'agent_profile'
+
+# Colunas "quentes" que podem ser atualizadas em lote por tick
+AGENT_STATE_COLUMNS = (
+    'current_location_type',
+    'current_location_id',
+    'current_status',
+    'energy_level',
+    'wallet',
+    'waiting_at_station_id',
+    'destination_type',
+    'destination_id',
+    'last_seen_at',
+)
+
+# Colunas de veículo atualizadas em lote pela ponte de sensores da maquete
+VEHICLE_STATE_COLUMNS = (
+    'is_docked',
+    'current_station_id',
+    'is_moving',
+    'speed',
+    'current_x',
+    'current_y',
+)
+
+
 # Modelo principal: Agent (Agente)
 class Agent(Base):
     """
     Modelo de banco de dados para Agentes.
     Representa cidadãos da simulação com atributos complexos.
+
+    As colunas JSON de perfil (genetics, history, personality, goals,
+    mood_data, inventory) pertencem ao grupo deferido ``AGENT_PROFILE_GROUP``
+    e só são carregadas quando acessadas ou via ``undefer_group``.
     """
     __tablename__ = 'agents'
 
@@ -384,11 +420,11 @@ class Agent(Base):
     )
 
     # Humor/Emoção/Sentimento (polimórfico, complexo como The Sims 4)
-    mood_data = Column(
+    mood_data = deferred(Column(
         JSON,
         default=lambda: {},
         comment="Sistema complexo de humor que afeta comportamento"
-    )
+    ), group=AGENT_PROFILE_GROUP)
 
     # Carteira (11 dígitos antes, 2 depois, pode ser negativo até -100k)
     wallet = Column(
@@ -398,7 +434,10 @@ class Agent(Base):
     )
 
     # Inventário
-    inventory = Column(JSON, default=lambda: [], comment="Itens que o agente possui")
+    inventory = deferred(
+        Column(JSON, default=lambda: [], comment="Itens que o agente possui"),
+        group=AGENT_PROFILE_GROUP
+    )
 
     # Status atual
     current_status = Column(SQLEnum(AgentStatus), default=AgentStatus.IDLE)
@@ -408,18 +447,18 @@ class Agent(Base):
     destination_id = Column(GUID(), nullable=True)
 
     # Objetivos (curto/médio/longo prazo, sonhos)
-    goals = Column(
+    goals = deferred(Column(
         JSON,
         default=lambda: {},
         comment="Objetivos: curto prazo, médio prazo, longo prazo, sonhos"
-    )
+    ), group=AGENT_PROFILE_GROUP)
 
     # Personalidade (adaptativa)
-    personality = Column(
+    personality = deferred(Column(
         JSON,
         default=lambda: {},
         comment="Aleatória para IA, adaptativa por genética e traumas"
-    )
+    ), group=AGENT_PROFILE_GROUP)
 
     # Versão do programa
     version = Column(String(20), nullable=False, comment="Versão do programa quando criado/nasceu")
@@ -442,18 +481,18 @@ class Agent(Base):
     is_deleted = Column(Boolean, default=False, index=True)
 
     # Histórico (eventos importantes, família, traumas, etc)
-    history = Column(
+    history = deferred(Column(
         JSON,
         default=lambda: [],
         comment="Eventos importantes, origem familiar, interesses para biografia"
-    )
+    ), group=AGENT_PROFILE_GROUP)
 
     # Genética complexa
-    genetics = Column(
+    genetics = deferred(Column(
         JSON,
         default=lambda: {},
         comment="Sistema de genética complexa herdada dos pais"
-    )
+    ), group=AGENT_PROFILE_GROUP)
 
     # Relacionamentos
     routine = relationship("Routine", back_populates="agents", foreign_keys=[routine_id])
@@ -904,11 +943,18 @@ class BuildingZoning(str, enum.Enum):
     PROTECTED = "protected"                                  # Preservação ambiental
     SPECIAL_USE = "special_use"                              # Uso especial (hospital, escola)
 
+# Grupo deferido com o histórico (JSON) e notas do Building
+BUILDING_DETAILS_GROUP = 'building_details'
+
+
 # MODELO: BUILDING (EDIFÍCIO COMPLETO)
 class Building(Base):
     """
     Edifícios da cidade com sistema detalhado.
     Suporta todos os tipos de construções com atributos complexos.
+
+    Histórico (major_events, ownership_history, renovations) e notas ficam no
+    grupo deferido ``BUILDING_DETAILS_GROUP``.
     """
     __tablename__ = 'buildings'
 
@@ -997,9 +1043,18 @@ class Building(Base):
     inauguration_date = Column(DateTime, nullable=True)
     last_renovation = Column(DateTime, nullable=True)
     last_inspection = Column(DateTime, nullable=True)
-    major_events = Column(JSON, default=lambda: [], comment="Eventos importantes (incêndios, reformas, etc)")
-    ownership_history = Column(JSON, default=lambda: [], comment="Mudanças de proprietário")
-    renovations = Column(JSON, default=lambda: [], comment="Histórico de reformas")
+    major_events = deferred(
+        Column(JSON, default=lambda: [], comment="Eventos importantes (incêndios, reformas, etc)"),
+        group=BUILDING_DETAILS_GROUP
+    )
+    ownership_history = deferred(
+        Column(JSON, default=lambda: [], comment="Mudanças de proprietário"),
+        group=BUILDING_DETAILS_GROUP
+    )
+    renovations = deferred(
+        Column(JSON, default=lambda: [], comment="Histórico de reformas"),
+        group=BUILDING_DETAILS_GROUP
+    )
 
     # MEIO AMBIENTE
     energy_consumption_kwh_month = Column(Float, default=0.0)
@@ -1056,7 +1111,7 @@ class Building(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     demolished_at = Column(DateTime, nullable=True, comment="Soft delete")
     tags = Column(JSON, default=lambda: [], comment="Ex: ['historic', 'landmark']")
-    notes = Column(Text, default="", comment="Notas do jogador")
+    notes = deferred(Column(Text, default="", comment="Notas do jogador"), group=BUILDING_DETAILS_GROUP)
 
     # RELACIONAMENTOS
     # Proprietário (agente que é dono)
@@ -1839,10 +1894,15 @@ class Event(Base):
     # Dados adicionais
     event_data = Column(JSON, default=lambda: {})
 
-    # Timestamp
-    occurred_at = Column(DateTime, default=datetime.utcnow, index=True)
+    # Timestamp (parte da chave: partição por tempo no PostgreSQL)
+    occurred_at = Column(DateTime, primary_key=True, default=datetime.utcnow, index=True)
     simulation_time = Column(Integer, comment="Hora da simulação (0-23)")
 
+    __table_args__ = (
+        # Particionamento nativo por mês; ver backend.database.partitioning
+        {'postgresql_partition_by': 'RANGE (occurred_at)'},
+    )
+
     def __repr__(self):
         return f"<Event(id={self.id}, type='{self.event_type}', time={self.simulation_time})>"
 
@@ -1927,11 +1987,18 @@ class Company(Base):
 # Nota: Profession já definido anteriormente na linha ~416
 
 
+# Grupo deferido com os dados JSON históricos/estatísticos da Route
+ROUTE_DETAILS_GROUP = 'route_details'
+
+
 # Modelo: Route / Line
 class Route(Base):
     """
     Rotas de transporte público com sistema complexo de simulação.
     Suporta múltiplas eras, padrões dinâmicos e economia realista.
+
+    special_schedules, fare_history, incidents, weekly_stats e
+    alternative_routes ficam no grupo deferido ``ROUTE_DETAILS_GROUP``.
     """
     __tablename__ = 'routes'
 
@@ -2035,39 +2102,39 @@ class Route(Base):
 
     # ==================== DADOS COMPLEXOS (JSON) ====================
     # Horários especiais (feriados, eventos)
-    special_schedules = Column(
+    special_schedules = deferred(Column(
         JSON,
         default=lambda: [],
         comment="[{date, frequency, reason}]"
-    )
+    ), group=ROUTE_DETAILS_GROUP)
 
     # Histórico de mudanças de tarifa
-    fare_history = Column(
+    fare_history = deferred(Column(
         JSON,
         default=lambda: [],
         comment="[{date, old_fare, new_fare, reason}]"
-    )
+    ), group=ROUTE_DETAILS_GROUP)
 
     # Incidentes
-    incidents = Column(
+    incidents = deferred(Column(
         JSON,
         default=lambda: [],
         comment="[{date, type, description, impact}]"
-    )
+    ), group=ROUTE_DETAILS_GROUP)
 
     # Estatísticas por dia da semana
-    weekly_stats = Column(
+    weekly_stats = deferred(Column(
         JSON,
         default=lambda: {},
         comment="{monday: {passengers, revenue}, ...}"
-    )
+    ), group=ROUTE_DETAILS_GROUP)
 
     # Rotas alternativas (em caso de interrupção)
-    alternative_routes = Column(
+    alternative_routes = deferred(Column(
         JSON,
         default=lambda: [],
         comment="[route_id1, route_id2] rotas alternativas"
-    )
+    ), group=ROUTE_DETAILS_GROUP)
 
     # ==================== TIMESTAMPS ====================
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -2249,17 +2316,63 @@ class TransportOperator(Base):
         """Verifica se a operadora é lucrativa."""
         return self.get_profit_margin() > 0
 
+    @hybrid_property
+    def profit(self) -> float:
+        """
+        Lucro da operadora: receita - (custos operacionais + custos mensais
+        de operação e manutenção de todas as rotas).
+
+        Na instância equivale a ``get_profit_margin()``; em consultas vira uma
+        expressão SQL (subconsulta correlacionada sobre ``routes.operator_id``,
+        que é indexada), permitindo ordenar, filtrar e limitar no banco.
+        """
+        return self.get_profit_margin()
+
+    @profit.expression
+    def profit(cls):
+        route_costs = (
+            select(func.coalesce(func.sum(
+                func.coalesce(Route.monthly_operational_cost, 0) +
+                func.coalesce(Route.monthly_maintenance_cost, 0)
+            ), 0))
+            .where(Route.operator_id == cls.id)
+            .correlate_except(Route)
+            .scalar_subquery()
+        )
+        return (
+            func.coalesce(cls.revenue, 0) -
+            func.coalesce(cls.operational_costs, 0) -
+            route_costs
+        )
+
     # ==================== MÉTODOS DE NEGÓCIO ====================
 
     def calculate_daily_revenue(self, date: datetime) -> float:
         """
-        Calcula receita diária baseada nas rotas da operadora.
+        Obsoleto: devolve a estimativa ``estimate_daily_revenue``, não a
+        receita do dia. Use
+        ``TransportOperatorQueries.calculate_daily_revenue`` (agregados
+        diários de ``FinancialRollup``).
+        """
+        warnings.warn(
+            "TransportOperator.calculate_daily_revenue é uma estimativa; use "
+            "TransportOperatorQueries.calculate_daily_revenue",
+            DeprecationWarning, stacklevel=2
+        )
+        return self.estimate_daily_revenue(date)
+
+    def estimate_daily_revenue(self, date: datetime) -> float:
+        """
+        Estima a receita diária pelas rotas ativas (``monthly_revenue / 30``).
+
+        Não reflete vendas reais; a receita do dia está nos agregados de
+        ``FinancialRollup``.
 
         Args:
             date: Data para calcular a receita
 
         Returns:
-            Receita total do dia
+            Receita estimada do dia
         """
         if not self.routes:
             return 0.0
@@ -2304,10 +2417,17 @@ class TransportOperator(Base):
         return f"<TransportOperator(id={self.id}, name='{self.name}', type='{self.operator_type.value}')>"
 
 
+# Grupo deferido com demanda e histórico de problemas da RouteStation
+ROUTE_STATION_DETAILS_GROUP = 'route_station_details'
+
+
 class RouteStation(Base):
     """
     Associação entre rotas e estações com dados complexos de operação.
     Suporta múltiplos veículos, horários dinâmicos e estatísticas detalhadas.
+
+    hourly_demand, weekly_demand e issues_history ficam no grupo deferido
+    ``ROUTE_STATION_DETAILS_GROUP``.
     """
     __tablename__ = 'route_stations'
 
@@ -2384,18 +2504,18 @@ class RouteStation(Base):
 
     # ==================== ESTATÍSTICAS ====================
     # Passageiros por hora do dia
-    hourly_demand = Column(
+    hourly_demand = deferred(Column(
         JSON,
         default=lambda: {},
         comment="{0: count, 1: count, ..., 23: count}"
-    )
+    ), group=ROUTE_STATION_DETAILS_GROUP)
 
     # Passageiros por dia da semana
-    weekly_demand = Column(
+    weekly_demand = deferred(Column(
         JSON,
         default=lambda: {},
         comment="{monday: count, tuesday: count, ...}"
-    )
+    ), group=ROUTE_STATION_DETAILS_GROUP)
 
     # ==================== PROBLEMAS E MANUTENÇÃO ====================
     last_maintenance = Column(DateTime, nullable=True)
@@ -2403,11 +2523,11 @@ class RouteStation(Base):
     reported_issues = Column(Integer, default=0)
 
     # Histórico de problemas
-    issues_history = Column(
+    issues_history = deferred(Column(
         JSON,
         default=lambda: [],
         comment="[{date, type, description, resolved}]"
-    )
+    ), group=ROUTE_STATION_DETAILS_GROUP)
 
     # ==================== SATISFAÇÃO ====================
     passenger_satisfaction = Column(Float, default=0.75, comment="0.0-1.0")
@@ -2601,6 +2721,87 @@ class MaintenanceRecord(Base):
         return f"<MaintenanceRecord(id={self.id}, type='{self.maintenance_type}', cost={self.cost})>"
 
 
+# Modelo: FinancialRollup (agregados financeiros diários)
+class FinancialRollup(Base):
+    """
+    Agregado financeiro diário por rota ou operadora.
+
+    Mantido incrementalmente pelas escritas de bilhetes e manutenções
+    (ver ``FinancialRollupQueries``), de forma que painéis leiam números
+    prontos com uma única busca pela chave (scope, scope_id, day).
+    """
+    __tablename__ = 'financial_rollups'
+
+    id = Column(GUID(), primary_key=True, default=uuid.uuid4)
+
+    # Chave do agregado
+    scope = Column(String(20), nullable=False, comment="route, operator")
+    scope_id = Column(GUID(), nullable=False)
+    day = Column(Date, nullable=False)
+
+    # Valores acumulados no dia
+    revenue = Column(DECIMAL(15, 2), default=0.00, nullable=False)
+    maintenance_costs = Column(DECIMAL(15, 2), default=0.00, nullable=False)
+    tickets_sold = Column(Integer, default=0, nullable=False)
+    passengers = Column(Integer, default=0, nullable=False, comment="Validações de bilhetes")
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint('scope', 'scope_id', 'day', name='uq_financial_rollup_key'),
+        Index('idx_financial_rollup_day', 'day'),
+    )
+
+    @property
+    def profit(self) -> float:
+        """Receita menos custos de manutenção do dia."""
+        return float(self.revenue or 0) - float(self.maintenance_costs or 0)
+
+    def __repr__(self):
+        return f"<FinancialRollup(scope='{self.scope}', scope_id={self.scope_id}, day={self.day}, revenue={self.revenue})>"
+
+
+# Modelo: TimeSeriesRollup (séries temporais em várias resoluções)
+class TimeSeriesRollup(Base):
+    """
+    Agregado min/max/soma/contagem de uma série temporal em um intervalo
+    (hora, dia ou semana).
+
+    O eixo de tempo é em horas inteiras: hora da simulação para as séries
+    ``economic:*`` e horas desde uma segunda-feira de referência para as
+    séries ``sensor:*`` (ver ``TimeSeriesRollupQueries``). Mantido
+    incrementalmente pelas escritas de ``EconomicStat`` e ``SensorEvent``.
+    """
+    __tablename__ = 'timeseries_rollups'
+
+    id = Column(GUID(), primary_key=True, default=uuid.uuid4)
+
+    # Chave do agregado
+    series = Column(String(150), nullable=False, comment="economic:<campo>, sensor:<sensor_id>:<reading_type>")
+    resolution = Column(String(10), nullable=False, comment="hour, day, week")
+    bucket_start = Column(Integer, nullable=False, comment="Início do intervalo em horas")
+
+    # Valores acumulados no intervalo
+    count = Column(Integer, default=0, nullable=False)
+    sum = Column(Float, default=0.0, nullable=False)
+    min = Column(Float, nullable=True)
+    max = Column(Float, nullable=True)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint('series', 'resolution', 'bucket_start', name='uq_timeseries_rollup_key'),
+    )
+
+    @property
+    def avg(self) -> Optional[float]:
+        """Média das amostras do intervalo."""
+        return self.sum / self.count if self.count else None
+
+    def __repr__(self):
+        return f"<TimeSeriesRollup(series='{self.series}', resolution='{self.resolution}', bucket={self.bucket_start}, count={self.count})>"
+
+
 # Modelo: Schedule / Timetable (Issue 4.9)
 class Schedule(Base):
     """
@@ -2772,8 +2973,15 @@ class SensorEvent(Base):
     # Contexto
     context = Column(JSON, default=lambda: {}, comment="Dados adicionais sobre a leitura")
 
-    # Timestamps
-    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
+    # Timestamps (parte da chave: partição por tempo no PostgreSQL)
+    timestamp = Column(DateTime, primary_key=True, default=datetime.utcnow, index=True)
+
+    __table_args__ = (
+        # Fila de processamento: WHERE processed = false ORDER BY timestamp
+        Index('idx_sensor_event_pending', 'processed', 'timestamp'),
+        # Particionamento nativo por dia; ver backend.database.partitioning
+        {'postgresql_partition_by': 'RANGE (timestamp)'},
+    )
 
     def __repr__(self):
         return f"<SensorEvent(sensor_id='{self.sensor_id}', type='{self.sensor_type}', value='{self.value}')>"
@@ -2805,8 +3013,13 @@ class LogEntry(Base):
     # Relacionamentos opcionais
     actor_id = Column(GUID(), ForeignKey('agents.id'), nullable=True)
 
-    # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    # Timestamps (parte da chave: partição por tempo no PostgreSQL)
+    created_at = Column(DateTime, primary_key=True, default=datetime.utcnow, index=True)
+
+    __table_args__ = (
+        # Particionamento nativo por mês; ver backend.database.partitioning
+        {'postgresql_partition_by': 'RANGE (created_at)'},
+    )
 
     def __repr__(self):
         return f"<LogEntry(level='{self.level.value}', message='{self.message[:50]}...')>"
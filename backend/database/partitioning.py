@@ -0,0 +1,414 @@
+"""
+Particionamento por tempo e retenção das tabelas append-only.
+
+``sensor_events`` (por dia), ``events`` e ``log_entries`` (por mês) crescem
+sem limite. Este módulo mantém partições por período, arquiva e remove as
+que passaram da retenção e consulta intervalos lendo apenas as partições
+que se sobrepõem ao intervalo.
+
+Dois modos, escolhidos por tabela:
+
+- **Nativo** (PostgreSQL, tabela criada com ``PARTITION BY RANGE``, ver
+  ``__table_args__`` dos modelos): partições ``<tabela>_pAAAAMM[DD]`` são
+  criadas com antecedência (mais uma ``_default``) e o planner faz o
+  pruning sozinho.
+- **Emulado** (SQLite ou tabela PostgreSQL legada, não particionada): a
+  tabela principal guarda só o período corrente; ``roll()`` move linhas de
+  períodos anteriores para tabelas ``<tabela>_pAAAAMM[DD]`` com as mesmas
+  colunas, e ``query_range`` faz UNION ALL só das tabelas do intervalo.
+  Linhas ainda não processadas (``processed_column`` falso, ex:
+  ``sensor_events.processed``) ficam na tabela principal até serem
+  processadas, pois a fila de processamento só lê a principal.
+
+Partições fora da retenção são exportadas para
+``<archive_dir>/<tabela>/<partição>.jsonl.gz`` e removidas.
+
+Uso (ex: cron diário)::
+
+    python scripts/maintain_partitions.py
+"""
+
+import gzip
+import json
+import re
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Column, MetaData, Table, inspect, select, text, union_all
+
+from backend.database.models import Base
+from backend.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+PERIODS = ('day', 'week', 'month')
+_SUFFIX = re.compile(r'^p(\d{4})(\d{2})(\d{2})?$')
+
+
+def period_start(value: datetime, period: str) -> datetime:
+    """Início do período que contém ``value``."""
+    day = value.date() if isinstance(value, datetime) else value
+    if period == 'day':
+        start = day
+    elif period == 'week':
+        start = day - timedelta(days=day.weekday())
+    elif period == 'month':
+        start = day.replace(day=1)
+    else:
+        raise ValueError(f"Período inválido: {period!r} (use {', '.join(PERIODS)})")
+    return datetime.combine(start, datetime.min.time())
+
+
+def next_period(start: datetime, period: str) -> datetime:
+    """Início do período seguinte."""
+    if period == 'day':
+        return start + timedelta(days=1)
+    if period == 'week':
+        return start + timedelta(days=7)
+    if start.month == 12:
+        return start.replace(year=start.year + 1, month=1)
+    return start.replace(month=start.month + 1)
+
+
+@dataclass(frozen=True)
+class PartitionSpec:
+    """Como uma tabela é particionada."""
+    table_name: str
+    column: str
+    period: str = 'month'
+    retention_days: Optional[int] = None  # None = manter para sempre
+    processed_column: Optional[str] = None  # linhas com False não saem da principal (emulado)
+
+    def bounds(self, value: datetime) -> Tuple[datetime, datetime]:
+        start = period_start(value, self.period)
+        return start, next_period(start, self.period)
+
+    def partition_name(self, start: datetime) -> str:
+        if self.period == 'month':
+            return f"{self.table_name}_p{start:%Y%m}"
+        return f"{self.table_name}_p{start:%Y%m%d}"
+
+    def parse_partition(self, name: str) -> Optional[Tuple[datetime, datetime]]:
+        """Intervalo [início, fim) de uma partição a partir do nome."""
+        prefix = self.table_name + '_'
+        if not name.startswith(prefix):
+            return None
+        match = _SUFFIX.match(name[len(prefix):])
+        if not match:
+            return None
+        year, month, day = int(match.group(1)), int(match.group(2)), match.group(3)
+        if (self.period == 'month') != (day is None):
+            return None
+        start = datetime(year, month, int(day) if day else 1)
+        return start, next_period(start, self.period)
+
+
+DEFAULT_SPECS: Dict[str, PartitionSpec] = {
+    'sensor_events': PartitionSpec('sensor_events', 'timestamp', 'day', retention_days=30,
+                                   processed_column='processed'),
+    'events': PartitionSpec('events', 'occurred_at', 'month', retention_days=365),
+    'log_entries': PartitionSpec('log_entries', 'created_at', 'month', retention_days=90),
+}
+
+
+def specs_from_config(database_config) -> Dict[str, PartitionSpec]:
+    """Aplica ``database.retention_days`` do config.yaml aos specs padrão."""
+    overrides = getattr(database_config, 'retention_days', None) or {}
+    specs = dict(DEFAULT_SPECS)
+    for name, days in overrides.items():
+        if name in specs:
+            specs[name] = replace(specs[name], retention_days=days)
+    return specs
+
+
+@dataclass
+class PartitionInfo:
+    """Uma partição existente."""
+    name: str
+    start: datetime
+    end: datetime
+
+
+class PartitionManager:
+    """
+    Cria, move, arquiva e consulta partições por tempo.
+
+    Args:
+        engine: Engine do banco
+        specs: Tabelas particionadas (padrão: ``DEFAULT_SPECS``)
+        archive_dir: Diretório dos arquivos .jsonl.gz de partições expiradas
+    """
+
+    def __init__(self, engine, specs: Optional[Dict[str, PartitionSpec]] = None,
+                 archive_dir: str = 'data/archive'):
+        self.engine = engine
+        self.specs = specs or DEFAULT_SPECS
+        self.archive_dir = Path(archive_dir)
+        self._period_tables: Dict[str, Table] = {}
+        self._native: Dict[str, bool] = {}
+
+    # ---------- Metadados ----------
+    def spec(self, name: str) -> PartitionSpec:
+        try:
+            return self.specs[name]
+        except KeyError:
+            raise ValueError(f"Tabela não particionada: {name!r}") from None
+
+    def parent(self, name: str) -> Table:
+        return Base.metadata.tables[name]
+
+    def is_native(self, name: str) -> bool:
+        """True se a tabela é particionada nativamente (PostgreSQL)."""
+        if name not in self._native:
+            native = False
+            if self.engine.dialect.name == 'postgresql':
+                with self.engine.connect() as conn:
+                    native = conn.execute(text(
+                        "SELECT 1 FROM pg_partitioned_table pt "
+                        "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = :name"
+                    ), {'name': name}).first() is not None
+            self._native[name] = native
+        return self._native[name]
+
+    def _period_table(self, name: str, partition: str) -> Table:
+        """Tabela de período com as mesmas colunas da principal (modo emulado)."""
+        table = self._period_tables.get(partition)
+        if table is None:
+            columns = [
+                Column(c.name, c.type, primary_key=c.primary_key, nullable=c.nullable)
+                for c in self.parent(name).columns
+            ]
+            table = Table(partition, MetaData(), *columns)
+            self._period_tables[partition] = table
+        return table
+
+    def partitions(self, name: str, connection=None) -> List[PartitionInfo]:
+        """Partições existentes, em ordem cronológica."""
+        spec = self.spec(name)
+        if self.is_native(name):
+            with self.engine.connect() as conn:
+                names = [row[0] for row in conn.execute(text(
+                    "SELECT c.relname FROM pg_inherits i "
+                    "JOIN pg_class c ON c.oid = i.inhrelid "
+                    "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = :name"
+                ), {'name': name})]
+        else:
+            names = inspect(connection if connection is not None else self.engine).get_table_names()
+
+        found = []
+        for partition in names:
+            bounds = spec.parse_partition(partition)
+            if bounds:
+                found.append(PartitionInfo(partition, *bounds))
+        return sorted(found, key=lambda p: p.start)
+
+    # ---------- Criação ----------
+    def ensure_partitions(self, name: str, start: datetime, end: datetime) -> List[str]:
+        """
+        Garante partições cobrindo [start, end).
+
+        Returns:
+            Nomes das partições criadas
+        """
+        spec = self.spec(name)
+        existing = {p.name for p in self.partitions(name)}
+        created = []
+        current = period_start(start, spec.period)
+        with self.engine.begin() as conn:
+            while current < end:
+                upper = next_period(current, spec.period)
+                partition = spec.partition_name(current)
+                if partition not in existing:
+                    if self.is_native(name):
+                        conn.execute(text(
+                            f'CREATE TABLE IF NOT EXISTS "{partition}" PARTITION OF "{name}" '
+                            f"FOR VALUES FROM ('{current.isoformat()}') TO ('{upper.isoformat()}')"
+                        ))
+                    else:
+                        self._period_table(name, partition).create(conn, checkfirst=True)
+                    created.append(partition)
+                current = upper
+            if self.is_native(name):
+                conn.execute(text(
+                    f'CREATE TABLE IF NOT EXISTS "{name}_default" PARTITION OF "{name}" DEFAULT'
+                ))
+        return created
+
+    def ensure_upcoming(self, now: Optional[datetime] = None, ahead: int = 2) -> Dict[str, List[str]]:
+        """
+        Modo nativo: cria a partição corrente e as ``ahead`` seguintes de
+        cada tabela (tabelas emuladas são ignoradas).
+
+        Returns:
+            {tabela: partições criadas}
+        """
+        now = now or datetime.utcnow()
+        created = {}
+        for name, spec in self.specs.items():
+            if not self.is_native(name):
+                continue
+            end = period_start(now, spec.period)
+            for _ in range(ahead + 1):
+                end = next_period(end, spec.period)
+            created[name] = self.ensure_partitions(name, now, end)
+        return created
+
+    def roll(self, name: str, now: Optional[datetime] = None) -> int:
+        """
+        Modo emulado: move linhas de períodos anteriores ao corrente para as
+        tabelas de período. Linhas não processadas (``processed_column``)
+        ficam na principal e são movidas num ``roll`` posterior. No modo
+        nativo não faz nada.
+
+        Returns:
+            Número de linhas movidas
+        """
+        if self.is_native(name):
+            return 0
+        spec = self.spec(name)
+        parent = self.parent(name)
+        column = parent.c[spec.column]
+        cutoff = period_start(now or datetime.utcnow(), spec.period)
+        movable = column < cutoff
+        if spec.processed_column:
+            movable = movable & (parent.c[spec.processed_column] == True)  # noqa: E712
+
+        def _oldest(after: Optional[datetime]):
+            condition = movable
+            if after is not None:
+                condition = condition & (column >= after)
+            with self.engine.connect() as conn:
+                return conn.execute(select(column).where(condition).order_by(column).limit(1)).scalar()
+
+        moved = 0
+        names = [c.name for c in parent.columns]
+        oldest = _oldest(None)
+        # Salta períodos sem linhas: só cria tabelas que recebem dados
+        while oldest is not None:
+            current = period_start(oldest, spec.period)
+            upper = next_period(current, spec.period)
+            partition = spec.partition_name(current)
+            window = movable & (column >= current) & (column < upper)
+            with self.engine.begin() as conn:
+                table = self._period_table(name, partition)
+                table.create(conn, checkfirst=True)
+                result = conn.execute(table.insert().from_select(
+                    names, select(*[parent.c[n] for n in names]).where(window)
+                ))
+                conn.execute(parent.delete().where(window))
+                moved += max(result.rowcount or 0, 0)
+            oldest = _oldest(upper)
+        if moved:
+            logger.info("%d linhas de %s movidas para tabelas de período", moved, name)
+        return moved
+
+    # ---------- Retenção ----------
+    def archive_partition(self, name: str, partition: str) -> Path:
+        """Exporta a partição para ``<archive_dir>/<tabela>/<partição>.jsonl.gz``."""
+        target = self.archive_dir / name / f"{partition}.jsonl.gz"
+        target.parent.mkdir(parents=True, exist_ok=True)
+        table = self._period_table(name, partition)
+        with self.engine.connect() as conn, gzip.open(target, 'wt', encoding='utf-8') as f:
+            result = conn.execution_options(stream_results=True).execute(select(table))
+            for row in result.mappings():
+                f.write(json.dumps(dict(row), default=str) + '\n')
+        return target
+
+    def apply_retention(self, name: str, now: Optional[datetime] = None) -> List[Path]:
+        """
+        Arquiva e remove partições inteiramente anteriores à retenção.
+
+        Returns:
+            Arquivos gerados
+        """
+        spec = self.spec(name)
+        if spec.retention_days is None:
+            return []
+        now = now or datetime.utcnow()
+        cutoff = now - timedelta(days=spec.retention_days)
+        self.roll(name, now)
+
+        archived = []
+        for partition in self.partitions(name):
+            if partition.end > cutoff:
+                continue
+            archived.append(self.archive_partition(name, partition.name))
+            with self.engine.begin() as conn:
+                if self.is_native(name):
+                    conn.execute(text(f'ALTER TABLE "{name}" DETACH PARTITION "{partition.name}"'))
+                conn.execute(text(f'DROP TABLE "{partition.name}"'))
+            self._period_tables.pop(partition.name, None)
+            logger.info("Partição %s arquivada e removida", partition.name)
+        return archived
+
+    def maintain(self, now: Optional[datetime] = None, ahead: int = 2) -> Dict[str, Dict[str, Any]]:
+        """
+        Manutenção periódica de todas as tabelas: cria as próximas partições
+        (nativo), move linhas antigas (emulado) e aplica a retenção.
+        """
+        now = now or datetime.utcnow()
+        created = self.ensure_upcoming(now, ahead)
+        report = {}
+        for name in self.specs:
+            moved = self.roll(name, now)
+            archived = self.apply_retention(name, now)
+            report[name] = {
+                'native': self.is_native(name),
+                'created': created.get(name, []),
+                'moved': moved,
+                'archived': [str(p) for p in archived],
+            }
+        return report
+
+    # ---------- Consulta ----------
+    def query_range(self, name: str, start: datetime, end: datetime,
+                    limit: Optional[int] = None, newest_first: bool = True,
+                    where=None, include_parent: bool = True,
+                    connection=None) -> List[Dict[str, Any]]:
+        """
+        Linhas com ``start <= coluna de tempo < end``.
+
+        No modo emulado só lê a tabela principal e as tabelas de período que
+        se sobrepõem ao intervalo.
+
+        Args:
+            where: Callable opcional ``where(table) -> condição`` aplicado a
+                cada partição (ex: ``lambda t: t.c.sensor_id == 'reed_01'``)
+            include_parent: False lê só as tabelas de período (modo
+                emulado), para quem já consultou a principal pelo ORM
+            connection: Conexão a usar (ex: ``session.connection()``, para
+                enxergar linhas ainda não confirmadas); padrão: nova conexão
+        """
+        spec = self.spec(name)
+        parent = self.parent(name)
+        sources = [parent] if include_parent or self.is_native(name) else []
+        if not self.is_native(name):
+            sources += [
+                self._period_table(name, p.name)
+                for p in self.partitions(name, connection)
+                if p.start < end and p.end > start
+            ]
+        if not sources:
+            return []
+
+        def _select(table):
+            column = table.c[spec.column]
+            query = select(*table.columns).where(column >= start, column < end)
+            if where is not None:
+                query = query.where(where(table))
+            return query
+
+        if len(sources) == 1:
+            query = _select(sources[0]).subquery()
+        else:
+            query = union_all(*[_select(t) for t in sources]).subquery()
+        column = query.c[spec.column]
+        stmt = select(query).order_by(column.desc() if newest_first else column)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        if connection is not None:
+            return [dict(row) for row in connection.execute(stmt).mappings()]
+        with self.engine.connect() as conn:
+            return [dict(row) for row in conn.execute(stmt).mappings()]
@@ -2,18 +2,74 @@
 Queries e operações comuns do banco de dados.
 """
 
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_, desc
-from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
+from sqlalchemy.orm import Session, undefer_group, selectinload, joinedload
+from sqlalchemy import func, and_, or_, desc, update, insert, event, case, bindparam, select
+from sqlalchemy.exc import IntegrityError
+from typing import List, Optional, Dict, Any, Iterable, Tuple, Union
+from datetime import datetime, timedelta, date
+from decimal import Decimal
+import math
+import random
 import uuid
+import weakref
 
 from backend.database.models import (
     Agent, Building, Vehicle, Event, EconomicStat, 
     Profession, Routine, NamePool, Station,
     CreatedBy, HealthStatus, AgentStatus, Gender, StationType, StationStatus,
-    Ticket, TicketStatus, TicketType, Route, Schedule
+    Ticket, TicketStatus, TicketType, Route, RouteStation, Schedule,
+    TransportOperator, MaintenanceRecord, FinancialRollup, SensorEvent, TimeSeriesRollup, AGENT_PROFILE_GROUP, AGENT_STATE_COLUMNS, VEHICLE_STATE_COLUMNS, BUILDING_DETAILS_GROUP,
+    ROUTE_DETAILS_GROUP, ROUTE_STATION_DETAILS_GROUP
 )
+from backend.database.bulk import bulk_insert
+from backend.utils.sampling import AliasSampler
+from backend.utils.rng import rng_streams
+from backend.utils.telemetry import telemetry
+
+
+# ==================== LOADER OPTIONS ====================
+# Os relacionamentos dos modelos usam lazy='select' (padrão). Consultas que
+# percorrem relacionamentos de muitos objetos devem pedir carregamento
+# antecipado explicitamente com as opções abaixo, evitando N+1:
+# - coleções (one-to-many): selectinload -> 1 SELECT ... WHERE fk IN (...)
+# - many-to-one: joinedload -> LEFT OUTER JOIN na mesma consulta
+
+def operator_financial_options() -> list:
+    """Opções para cálculos financeiros de operadoras (percorrem routes)."""
+    return [selectinload(TransportOperator.routes)]
+
+
+def operator_full_options() -> list:
+    """Opções para estatísticas completas de operadoras."""
+    return [
+        selectinload(TransportOperator.routes),
+        selectinload(TransportOperator.vehicles),
+        selectinload(TransportOperator.employees).joinedload(Agent.profession),
+    ]
+
+
+def route_stations_options() -> list:
+    """Opções para rotas com paradas ordenadas e seus edifícios."""
+    return [selectinload(Route.stations).joinedload(RouteStation.station)]
+
+
+def route_operator_options() -> list:
+    """Opções para rotas com operadora e veículos em operação."""
+    return [joinedload(Route.operator), selectinload(Route.vehicles)]
+
+
+def station_vehicles_options() -> list:
+    """Opções para estações com veículos acoplados."""
+    return [selectinload(Station.docked_vehicles)]
+
+
+def vehicle_relations_options() -> list:
+    """Opções para veículos com rota, estação e operadora atuais."""
+    return [
+        joinedload(Vehicle.current_route),
+        joinedload(Vehicle.current_station),
+        joinedload(Vehicle.operator),
+    ]
 
 
 class AgentQueries:
@@ -22,9 +78,19 @@ class AgentQueries:
     def __init__(self, session: Session):
         self.session = session
     
-    def get_by_id(self, agent_id: uuid.UUID) -> Optional[Agent]:
-        """Busca agente por ID."""
-        return self.session.query(Agent).filter(Agent.id == agent_id).first()
+    def get_by_id(self, agent_id: uuid.UUID, with_details: bool = False) -> Optional[Agent]:
+        """Busca agente por ID.
+
+        Args:
+            agent_id: UUID do agente
+            with_details: Se True, carrega também as colunas JSON de perfil
+                (genetics, history, personality, goals, mood_data, inventory)
+                na mesma consulta
+        """
+        query = self.session.query(Agent)
+        if with_details:
+            query = query.options(undefer_group(AGENT_PROFILE_GROUP))
+        return query.filter(Agent.id == agent_id).first()
     
     def get_all(self, include_deleted: bool = False) -> List[Agent]:
         """Retorna todos os agentes."""
@@ -114,6 +180,62 @@ class AgentQueries:
             self.session.flush()
         return agent
     
+    def update_states(self, states: List[Dict[str, Any]]) -> int:
+        """Atualiza em lote o estado "quente" de vários agentes.
+
+        Emite um único UPDATE (executemany) por chave primária contendo apenas
+        as colunas de estado, sem carregar os agentes nem tocar nas colunas
+        JSON de perfil. Pensado para persistência por tick da simulação.
+
+        Objetos Agent já carregados na sessão não são sincronizados; use
+        ``session.refresh``/``expire`` se precisar deles atualizados.
+
+        Args:
+            states: Lista de dicionários com 'id' e qualquer subconjunto de
+                AGENT_STATE_COLUMNS
+
+        Returns:
+            Número de agentes atualizados
+
+        Raises:
+            ValueError: Se algum dicionário não tiver 'id' ou tiver colunas
+                fora de AGENT_STATE_COLUMNS
+        """
+        if not states:
+            return 0
+
+        allowed = set(AGENT_STATE_COLUMNS)
+        now = datetime.utcnow()
+        mappings = []
+        for state in states:
+            if 'id' not in state:
+                raise ValueError("Cada estado precisa de 'id'")
+            invalid = set(state) - allowed - {'id'}
+            if invalid:
+                raise ValueError(f"Colunas não permitidas em update_states: {sorted(invalid)}")
+            mapping = dict(state)
+            mapping.setdefault('last_seen_at', now)
+            mappings.append(mapping)
+
+        with telemetry.phase('persistence', len(mappings)):
+            self.session.execute(update(Agent), mappings)
+        return len(mappings)
+
+    def get_states(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Retorna apenas as colunas de estado dos agentes ativos.
+
+        Args:
+            limit: Número máximo de agentes (opcional)
+
+        Returns:
+            Lista de dicionários com 'id' e AGENT_STATE_COLUMNS
+        """
+        columns = [Agent.id] + [getattr(Agent, name) for name in AGENT_STATE_COLUMNS]
+        query = self.session.query(*columns).filter(Agent.is_deleted == False)
+        if limit:
+            query = query.limit(limit)
+        return [dict(row._mapping) for row in query.all()]
+
     def soft_delete(self, agent_id: uuid.UUID) -> bool:
         """Faz soft delete de um agente."""
         agent = self.get_by_id(agent_id)
@@ -191,15 +313,22 @@ class BuildingQueries:
     def __init__(self, session: Session):
         self.session = session
     
-    def get_by_id(self, building_id: uuid.UUID) -> Optional[Building]:
+    def _query(self, with_details: bool = False):
+        """Query base; with_details carrega histórico JSON e notas."""
+        query = self.session.query(Building)
+        if with_details:
+            query = query.options(undefer_group(BUILDING_DETAILS_GROUP))
+        return query
+
+    def get_by_id(self, building_id: uuid.UUID, with_details: bool = False) -> Optional[Building]:
         """Busca edifício por ID."""
-        return self.session.query(Building).filter(
+        return self._query(with_details).filter(
             Building.id == building_id
         ).first()
     
-    def get_all(self, active_only: bool = True) -> List[Building]:
+    def get_all(self, active_only: bool = True, with_details: bool = False) -> List[Building]:
         """Retorna todos os edifícios."""
-        query = self.session.query(Building)
+        query = self._query(with_details)
         if active_only:
             query = query.filter(Building.is_active == True)
         return query.all()
@@ -245,6 +374,98 @@ class BuildingQueries:
         return building
 
 
+class RouteQueries:
+    """Queries relacionadas a rotas (Issue 4.6).
+
+    Por padrão as colunas JSON de ROUTE_DETAILS_GROUP e
+    ROUTE_STATION_DETAILS_GROUP não são carregadas; use ``with_details=True``
+    quando precisar de histórico, incidentes ou demanda.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def _query(self, with_details: bool = False, with_stations: bool = False,
+               with_operator: bool = False):
+        query = self.session.query(Route)
+        if with_details:
+            query = query.options(undefer_group(ROUTE_DETAILS_GROUP))
+        if with_stations:
+            query = query.options(*route_stations_options())
+        if with_operator:
+            query = query.options(*route_operator_options())
+        return query
+
+    def get_by_id(self, route_id: uuid.UUID, with_details: bool = False,
+                  with_stations: bool = False) -> Optional[Route]:
+        """Busca rota por ID.
+
+        Args:
+            route_id: UUID da rota
+            with_details: Se True, carrega special_schedules, fare_history,
+                incidents, weekly_stats e alternative_routes
+            with_stations: Se True, carrega paradas e edifícios da rota
+
+        Returns:
+            Route ou None
+        """
+        return self._query(with_details, with_stations).filter(Route.id == route_id).first()
+
+    def get_by_code(self, code: str, with_details: bool = False) -> Optional[Route]:
+        """Busca rota pelo código (ex: L1)."""
+        return self._query(with_details).filter(Route.code == code).first()
+
+    def get_all(self, active_only: bool = True, with_details: bool = False,
+                with_operator: bool = False) -> List[Route]:
+        """Retorna todas as rotas.
+
+        Args:
+            active_only: Se True, retorna apenas rotas ativas
+            with_details: Se True, carrega as colunas JSON deferidas
+            with_operator: Se True, carrega operadora e veículos de cada rota
+
+        Returns:
+            Lista de rotas
+        """
+        query = self._query(with_details, with_operator=with_operator)
+        if active_only:
+            query = query.filter(Route.is_active == True)
+        return query.order_by(Route.name).all()
+
+    def get_by_operator(self, operator_id: uuid.UUID,
+                        with_details: bool = False) -> List[Route]:
+        """Retorna rotas de uma operadora."""
+        return self._query(with_details).filter(
+            Route.operator_id == operator_id
+        ).order_by(Route.name).all()
+
+    def get_route_stations(self, route_id: uuid.UUID,
+                           with_details: bool = False) -> List[RouteStation]:
+        """Retorna as paradas de uma rota em ordem de sequência.
+
+        Args:
+            route_id: UUID da rota
+            with_details: Se True, carrega hourly_demand, weekly_demand e
+                issues_history
+
+        Returns:
+            Lista de RouteStation ordenada por sequence_order
+        """
+        query = self.session.query(RouteStation)
+        if with_details:
+            query = query.options(undefer_group(ROUTE_STATION_DETAILS_GROUP))
+        return query.filter(
+            RouteStation.route_id == route_id
+        ).order_by(RouteStation.sequence_order).all()
+
+    def create(self, **kwargs) -> Route:
+        """Cria uma nova rota."""
+        route = Route(**kwargs)
+        self.session.add(route)
+        self.session.flush()
+        return route
+
+
 class VehicleQueries:
     """Queries relacionadas a veículos."""
     
@@ -257,9 +478,17 @@ class VehicleQueries:
             Vehicle.id == vehicle_id
         ).first()
     
-    def get_all(self) -> List[Vehicle]:
-        """Retorna todos os veículos."""
-        return self.session.query(Vehicle).all()
+    def get_all(self, with_relations: bool = False) -> List[Vehicle]:
+        """Retorna todos os veículos.
+
+        Args:
+            with_relations: Se True, carrega rota, estação e operadora atuais
+                na mesma consulta (evita N+1 ao percorrer a lista)
+        """
+        query = self.session.query(Vehicle)
+        if with_relations:
+            query = query.options(*vehicle_relations_options())
+        return query.all()
     
     def get_by_type(self, vehicle_type: str) -> List[Vehicle]:
         """Retorna veículos por tipo."""
@@ -281,6 +510,92 @@ class VehicleQueries:
         self.session.flush()
         return vehicle
 
+    def record_maintenance(self, vehicle_id: uuid.UUID, cost: float,
+                           maintenance_type: str = 'preventive',
+                           description: Optional[str] = None) -> Optional[MaintenanceRecord]:
+        """Registra manutenção de um veículo.
+
+        Cria o MaintenanceRecord, aplica ``Vehicle.perform_maintenance`` e
+        lança o custo nos agregados financeiros da rota e da operadora.
+        Não realiza commit; responsabilidade do chamador.
+
+        Args:
+            vehicle_id: UUID do veículo
+            cost: Custo da manutenção
+            maintenance_type: preventive, corrective ou emergency
+            description: Descrição opcional
+
+        Returns:
+            MaintenanceRecord criado ou None se o veículo não existir
+        """
+        vehicle = self.get_by_id(vehicle_id)
+        if not vehicle:
+            return None
+
+        now = datetime.utcnow()
+        cost = Decimal(str(cost))
+        record = MaintenanceRecord(
+            target_type='vehicle',
+            target_id=vehicle.id,
+            maintenance_type=maintenance_type,
+            description=description,
+            cost=cost,
+            started_at=now,
+            completed_at=now,
+        )
+        self.session.add(record)
+        vehicle.perform_maintenance(cost)
+
+        FinancialRollupQueries(self.session).record_maintenance(
+            cost,
+            route_id=vehicle.assigned_route_id or vehicle.current_route_id,
+            operator_id=vehicle.operator_id,
+            when=now,
+        )
+        self.session.flush()
+        return record
+
+    def update_states(self, states: List[Dict[str, Any]]) -> int:
+        """Atualiza em lote o estado operacional de vários veículos.
+
+        Um único UPDATE (executemany) por chave primária com as colunas de
+        VEHICLE_STATE_COLUMNS, como ``AgentQueries.update_states``. Objetos
+        Vehicle já carregados na sessão não são sincronizados.
+
+        Estados de veículos que não existem mais (removidos enquanto o
+        estado estava em memória) são ignorados: o UPDATE em lote por chave
+        primária levantaria StaleDataError para eles.
+
+        Args:
+            states: Lista de dicionários com 'id' e qualquer subconjunto de
+                VEHICLE_STATE_COLUMNS
+
+        Returns:
+            Número de veículos atualizados (sem os ignorados)
+
+        Raises:
+            ValueError: Se algum dicionário não tiver 'id' ou tiver colunas
+                fora de VEHICLE_STATE_COLUMNS
+        """
+        if not states:
+            return 0
+
+        allowed = set(VEHICLE_STATE_COLUMNS)
+        for state in states:
+            if 'id' not in state:
+                raise ValueError("Cada estado precisa de 'id'")
+            invalid = set(state) - allowed - {'id'}
+            if invalid:
+                raise ValueError(f"Colunas não permitidas em update_states: {sorted(invalid)}")
+
+        existing = set(self.session.execute(
+            select(Vehicle.id).where(Vehicle.id.in_({state['id'] for state in states}))
+        ).scalars())
+        mappings = [dict(state) for state in states if state['id'] in existing]
+        if mappings:
+            self.session.execute(update(Vehicle), mappings)
+        return len(mappings)
+
     def get_docked_at_station(self, station_id: uuid.UUID) -> List[Vehicle]:
         """Retorna veículos acoplados em uma estação.
 
@@ -354,33 +669,100 @@ class VehicleQueries:
         ).all()
 
 
+# PartitionManager por engine, para EventQueries ler as tabelas de período
+# do modo emulado (ver backend.database.partitioning)
+_partition_managers: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
 class EventQueries:
-    """Queries relacionadas a eventos."""
+    """Queries relacionadas a eventos.
+
+    No particionamento emulado (SQLite), ``PartitionManager.roll`` move os
+    eventos de meses anteriores para tabelas ``events_pAAAAMM``; as consultas
+    abaixo leem a tabela principal pelo ORM e completam com essas tabelas
+    via ``query_range``. No PostgreSQL particionado a principal já enxerga
+    tudo.
+    """
     
     def __init__(self, session: Session):
         self.session = session
+
+    def _partitions(self):
+        """PartitionManager do engine da sessão, ou None no modo nativo."""
+        from backend.database.partitioning import PartitionManager
+
+        bind = self.session.get_bind()
+        engine = getattr(bind, 'engine', bind)
+        manager = _partition_managers.get(engine)
+        if manager is None:
+            manager = _partition_managers[engine] = PartitionManager(engine)
+        return None if manager.is_native('events') else manager
+
+    def _with_archived(self, events: List[Event], limit: Optional[int] = None,
+                       start: datetime = datetime.min, end: datetime = datetime.max,
+                       where=None) -> List[Event]:
+        """Junta aos eventos da principal os das tabelas de período (mais recentes primeiro)."""
+        manager = self._partitions()
+        if manager is None:
+            return events
+        rows = manager.query_range('events', start, end, limit=limit, where=where,
+                                   include_parent=False, connection=self.session.connection())
+        if not rows:
+            return events
+        merged = events + [Event(**row) for row in rows]
+        merged.sort(key=lambda e: e.occurred_at, reverse=True)
+        return merged[:limit] if limit is not None else merged
     
     def get_by_id(self, event_id: uuid.UUID) -> Optional[Event]:
         """Busca evento por ID."""
-        return self.session.query(Event).filter(Event.id == event_id).first()
+        found = self.session.query(Event).filter(Event.id == event_id).first()
+        if found is None:
+            archived = self._with_archived([], limit=1, where=lambda t: t.c.id == event_id)
+            found = archived[0] if archived else None
+        return found
     
-    def get_recent(self, limit: int = 100) -> List[Event]:
-        """Retorna eventos recentes."""
-        return self.session.query(Event).order_by(
-            Event.occurred_at.desc()
-        ).limit(limit).all()
+    def get_recent(self, limit: int = 100, since: Optional[datetime] = None) -> List[Event]:
+        """Retorna eventos recentes.
+
+        Args:
+            limit: Número máximo de eventos
+            since: Limite inferior de occurred_at; restringe a leitura às
+                partições do intervalo
+        """
+        query = self.session.query(Event)
+        if since is not None:
+            query = query.filter(Event.occurred_at >= since)
+        events = query.order_by(Event.occurred_at.desc()).limit(limit).all()
+        return self._with_archived(events, limit, start=since or datetime.min)
+
+    def get_in_range(self, start: datetime, end: datetime,
+                     event_type: Optional[str] = None, limit: Optional[int] = None) -> List[Event]:
+        """Eventos com start <= occurred_at < end (mais recentes primeiro)."""
+        query = self.session.query(Event).filter(
+            Event.occurred_at >= start,
+            Event.occurred_at < end
+        )
+        if event_type:
+            query = query.filter(Event.event_type == event_type)
+        query = query.order_by(Event.occurred_at.desc())
+        if limit is not None:
+            query = query.limit(limit)
+        where = (lambda t: t.c.event_type == event_type) if event_type else None
+        return self._with_archived(query.all(), limit, start, end, where)
     
     def get_by_type(self, event_type: str, limit: int = 100) -> List[Event]:
         """Retorna eventos por tipo."""
-        return self.session.query(Event).filter(
+        events = self.session.query(Event).filter(
             Event.event_type == event_type
         ).order_by(Event.occurred_at.desc()).limit(limit).all()
+        return self._with_archived(events, limit, where=lambda t: t.c.event_type == event_type)
     
     def get_by_agent(self, agent_id: uuid.UUID, limit: int = 100) -> List[Event]:
         """Retorna eventos de um agente."""
-        return self.session.query(Event).filter(
+        events = self.session.query(Event).filter(
             Event.agent_id == agent_id
         ).order_by(Event.occurred_at.desc()).limit(limit).all()
+        return self._with_archived(events, limit, where=lambda t: t.c.agent_id == agent_id)
     
     def create(self, **kwargs) -> Event:
         """Cria um novo evento."""
@@ -390,6 +772,286 @@ class EventQueries:
         return event
 
 
+# ==================== TIME SERIES ROLLUPS ====================
+# Resoluções dos agregados (tamanho do intervalo em horas), da mais
+# detalhada para a mais grossa
+ROLLUP_RESOLUTIONS: Dict[str, int] = {'hour': 1, 'day': 24, 'week': 168}
+
+# Hora zero do eixo das séries de sensores: uma segunda-feira à meia-noite,
+# para que dias e semanas fiquem alinhados ao calendário
+SENSOR_EPOCH = datetime(1970, 1, 5)
+
+RollupSample = Tuple[str, int, float]
+
+
+class TimeSeriesRollupQueries:
+    """Agregados min/max/média de séries temporais por hora, dia e semana.
+
+    Cada amostra ``(série, hora, valor)`` é acumulada nas três resoluções
+    com um UPDATE ``count = count + n, sum = sum + s, min/max`` por
+    intervalo afetado (ou INSERT se o intervalo ainda não existe), no mesmo
+    padrão de ``FinancialRollupQueries``. Amostras de um lote que caem no
+    mesmo intervalo são combinadas antes de ir ao banco.
+
+    Séries:
+        - ``economic:<campo>``: campos de ``EconomicStat`` por hora da simulação
+        - ``sensor:<sensor_id>:<reading_type>``: leituras numéricas de
+          ``SensorEvent`` por horas desde ``SENSOR_EPOCH``
+    """
+
+    ECONOMIC_FIELDS = (
+        'total_money_in_circulation', 'average_agent_money', 'total_transactions',
+        'residential_income', 'commercial_income', 'industrial_income', 'public_spending',
+    )
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    # ---------- Eixo de tempo e séries ----------
+    @staticmethod
+    def bucket(hour: int, resolution: str) -> int:
+        """Início do intervalo da resolução que contém ``hour``."""
+        return hour - hour % ROLLUP_RESOLUTIONS[resolution]
+
+    @staticmethod
+    def hours_since_epoch(when: datetime) -> int:
+        """Hora do eixo das séries de sensores."""
+        return int((when - SENSOR_EPOCH).total_seconds() // 3600)
+
+    @staticmethod
+    def datetime_at(hour: int) -> datetime:
+        """Inverso de ``hours_since_epoch``."""
+        return SENSOR_EPOCH + timedelta(hours=hour)
+
+    @staticmethod
+    def economic_series(field: str) -> str:
+        return f"economic:{field}"
+
+    @staticmethod
+    def sensor_series(sensor_id: str, reading_type: str) -> str:
+        return f"sensor:{sensor_id}:{reading_type}"
+
+    @classmethod
+    def economic_samples(cls, stat: EconomicStat) -> List[RollupSample]:
+        """Amostras de uma linha de ``EconomicStat``."""
+        return [
+            (cls.economic_series(name), stat.simulation_time, float(getattr(stat, name)))
+            for name in cls.ECONOMIC_FIELDS
+            if getattr(stat, name) is not None
+        ]
+
+    @classmethod
+    def sensor_sample(cls, sensor_id: str, reading_type: str, value: Any,
+                      timestamp: datetime) -> Optional[RollupSample]:
+        """Amostra de uma leitura, ou None se o valor não for numérico."""
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            return None
+        if not math.isfinite(number):
+            return None
+        return cls.sensor_series(sensor_id, reading_type), cls.hours_since_epoch(timestamp), number
+
+    # ---------- Escrita incremental ----------
+    @staticmethod
+    def _accumulate(samples: Iterable[RollupSample]) -> Dict[Tuple[str, str, int], List[float]]:
+        """Combina amostras por (série, resolução, intervalo) -> [n, soma, min, max]."""
+        totals: Dict[Tuple[str, str, int], List[float]] = {}
+        for series, hour, value in samples:
+            for resolution, size in ROLLUP_RESOLUTIONS.items():
+                key = (series, resolution, hour - hour % size)
+                acc = totals.get(key)
+                if acc is None:
+                    totals[key] = [1, value, value, value]
+                else:
+                    acc[0] += 1
+                    acc[1] += value
+                    if value < acc[2]:
+                        acc[2] = value
+                    if value > acc[3]:
+                        acc[3] = value
+        return totals
+
+    def record_many(self, samples: Iterable[RollupSample]) -> int:
+        """Acumula amostras em todas as resoluções.
+
+        Um SELECT descobre quais intervalos já existem; esses recebem um
+        UPDATE em executemany e os novos um INSERT em lote num SAVEPOINT.
+        Se outra transação criar algum desses intervalos entre o SELECT e o
+        INSERT, a violação de uq_timeseries_rollup_key desfaz só o SAVEPOINT
+        e os novos são refeitos um a um, virando UPDATE os que já existem
+        (mesmo padrão de ``FinancialRollupQueries._increment``).
+
+        Returns:
+            Número de intervalos atualizados
+        """
+        totals = self._accumulate(samples)
+        if not totals:
+            return 0
+
+        table = TimeSeriesRollup.__table__
+        existing = {
+            tuple(row) for row in self.session.execute(
+                select(table.c.series, table.c.resolution, table.c.bucket_start).where(
+                    table.c.series.in_({key[0] for key in totals}),
+                    table.c.bucket_start.in_({key[2] for key in totals})
+                )
+            )
+        }
+
+        now = datetime.utcnow()
+        updates, inserts = [], []
+        for (series, resolution, bucket), (count, total, low, high) in totals.items():
+            if (series, resolution, bucket) in existing:
+                updates.append({
+                    'k_series': series, 'k_resolution': resolution, 'k_bucket': bucket,
+                    'd_count': count, 'd_sum': total, 'd_min': low, 'd_max': high, 'd_now': now,
+                })
+            else:
+                inserts.append({
+                    'series': series, 'resolution': resolution, 'bucket_start': bucket,
+                    'count': count, 'sum': total, 'min': low, 'max': high,
+                })
+
+        if updates:
+            self.session.execute(self._update_stmt(), updates)
+        if inserts:
+            try:
+                with self.session.begin_nested():
+                    self.session.execute(table.insert(), inserts)
+            except IntegrityError:
+                for row in inserts:
+                    self._insert_or_update(row, now)
+        return len(totals)
+
+    def _insert_or_update(self, row: Dict[str, Any], now: datetime) -> None:
+        """INSERT de um intervalo novo; UPDATE se outra transação já o criou."""
+        try:
+            with self.session.begin_nested():
+                self.session.execute(TimeSeriesRollup.__table__.insert(), [row])
+        except IntegrityError:
+            result = self.session.execute(self._update_stmt(), {
+                'k_series': row['series'], 'k_resolution': row['resolution'],
+                'k_bucket': row['bucket_start'], 'd_count': row['count'], 'd_sum': row['sum'],
+                'd_min': row['min'], 'd_max': row['max'], 'd_now': now,
+            })
+            if not result.rowcount:
+                raise
+
+    @staticmethod
+    def _update_stmt():
+        table = TimeSeriesRollup.__table__
+        low, high = bindparam('d_min'), bindparam('d_max')
+        return table.update().where(
+            table.c.series == bindparam('k_series'),
+            table.c.resolution == bindparam('k_resolution'),
+            table.c.bucket_start == bindparam('k_bucket')
+        ).values(
+            count=table.c.count + bindparam('d_count'),
+            sum=table.c.sum + bindparam('d_sum'),
+            min=case((table.c.min > low, low), else_=table.c.min),
+            max=case((table.c.max < high, high), else_=table.c.max),
+            updated_at=bindparam('d_now'),
+        )
+
+    def record(self, series: str, hour: int, value: float) -> int:
+        """Acumula uma amostra em todas as resoluções."""
+        return self.record_many([(series, hour, value)])
+
+    # ---------- Leitura ----------
+    @classmethod
+    def choose_resolution(cls, start: int, end: int, max_points: int) -> str:
+        """Resolução mais detalhada cujo número de intervalos em [start, end]
+        cabe em ``max_points``; a mais grossa se nenhuma couber."""
+        for resolution, size in ROLLUP_RESOLUTIONS.items():
+            points = (cls.bucket(end, resolution) - cls.bucket(start, resolution)) // size + 1
+            if points <= max_points:
+                return resolution
+        return resolution
+
+    def get_series(self, series: str, start: int, end: int, max_points: int = 500,
+                   resolution: Optional[str] = None) -> Tuple[str, List[TimeSeriesRollup]]:
+        """Intervalos da série que se sobrepõem a [start, end] (em horas).
+
+        Args:
+            max_points: Orçamento de pontos usado para escolher a resolução
+            resolution: Força uma resolução ('hour', 'day', 'week')
+
+        Returns:
+            (resolução usada, agregados em ordem cronológica)
+        """
+        if resolution is None:
+            resolution = self.choose_resolution(start, end, max_points)
+        elif resolution not in ROLLUP_RESOLUTIONS:
+            raise ValueError(f"Resolução inválida: {resolution!r} (use {', '.join(ROLLUP_RESOLUTIONS)})")
+        rows = self.session.query(TimeSeriesRollup).filter(
+            TimeSeriesRollup.series == series,
+            TimeSeriesRollup.resolution == resolution,
+            TimeSeriesRollup.bucket_start >= self.bucket(start, resolution),
+            TimeSeriesRollup.bucket_start <= end
+        ).order_by(TimeSeriesRollup.bucket_start).populate_existing().all()
+        return resolution, rows
+
+    @staticmethod
+    def to_points(rows: List[TimeSeriesRollup], time_of=None) -> List[Dict[str, Any]]:
+        """Converte agregados em pontos ``{'start', 'count', 'min', 'max', 'avg'}``."""
+        return [
+            {
+                'start': time_of(row.bucket_start) if time_of else row.bucket_start,
+                'count': row.count,
+                'min': row.min,
+                'max': row.max,
+                'avg': row.avg,
+            }
+            for row in rows
+        ]
+
+    # ---------- Reconstrução ----------
+    def rebuild(self, sources: Iterable[str] = ('economic', 'sensor')) -> int:
+        """Recalcula os agregados a partir de economic_stats e/ou sensor_events.
+
+        Útil após importações que não passam pelas queries de escrita. Só
+        lê a tabela principal: leituras já movidas para tabelas de período
+        ou arquivadas (``backend.database.partitioning``) ficam de fora, por
+        isso ``sources`` permite reconstruir só as séries econômicas. Não
+        realiza commit; responsabilidade do chamador.
+
+        Args:
+            sources: 'economic' e/ou 'sensor'
+
+        Returns:
+            Número de linhas de agregado geradas
+        """
+        sources = set(sources)
+        for source in sources:
+            self.session.query(TimeSeriesRollup).filter(
+                TimeSeriesRollup.series.like(f"{source}:%")
+            ).delete(synchronize_session=False)
+
+        def samples():
+            if 'economic' in sources:
+                for stat in self.session.query(EconomicStat).yield_per(1000):
+                    yield from self.economic_samples(stat)
+            if 'sensor' in sources:
+                readings = self.session.query(
+                    SensorEvent.sensor_id, SensorEvent.reading_type,
+                    SensorEvent.value, SensorEvent.timestamp
+                ).yield_per(5000)
+                for reading in readings:
+                    sample = self.sensor_sample(*reading)
+                    if sample is not None:
+                        yield sample
+
+        totals = self._accumulate(samples())
+        self.session.add_all([
+            TimeSeriesRollup(series=series, resolution=resolution, bucket_start=bucket,
+                             count=count, sum=total, min=low, max=high)
+            for (series, resolution, bucket), (count, total, low, high) in totals.items()
+        ])
+        self.session.flush()
+        return len(totals)
+
+
 class EconomicStatQueries:
     """Queries relacionadas a estatísticas econômicas."""
     
@@ -409,14 +1071,121 @@ class EconomicStatQueries:
             EconomicStat.simulation_time <= end_time
         ).order_by(EconomicStat.simulation_time).all()
     
+    def get_series(self, metric: str, start_time: int, end_time: int,
+                   max_points: int = 500, resolution: Optional[str] = None) -> Dict[str, Any]:
+        """Série agregada de um campo no período (horas da simulação).
+
+        Lê os agregados por hora/dia/semana em vez das linhas brutas,
+        escolhendo a resolução que cabe em ``max_points``.
+
+        Returns:
+            ``{'metric', 'resolution', 'points': [{'start', 'count', 'min', 'max', 'avg'}]}``
+        """
+        if metric not in TimeSeriesRollupQueries.ECONOMIC_FIELDS:
+            raise ValueError(f"Métrica econômica desconhecida: {metric!r}")
+        rollups = TimeSeriesRollupQueries(self.session)
+        resolution, rows = rollups.get_series(
+            rollups.economic_series(metric), start_time, end_time, max_points, resolution
+        )
+        return {'metric': metric, 'resolution': resolution, 'points': rollups.to_points(rows)}
+
     def create(self, **kwargs) -> EconomicStat:
-        """Cria nova estatística."""
+        """Cria nova estatística (e atualiza os agregados da série)."""
         stat = EconomicStat(**kwargs)
         self.session.add(stat)
         self.session.flush()
+        TimeSeriesRollupQueries(self.session).record_many(
+            TimeSeriesRollupQueries.economic_samples(stat)
+        )
         return stat
 
 
+class SensorEventQueries:
+    """Queries de leituras de sensores (ingestão em lote e fila de processamento)."""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def insert_batch(self, rows: List[Dict[str, Any]], rollup: bool = True) -> int:
+        """Insere leituras em lote (COPY no PostgreSQL, executemany nos demais).
+
+        Args:
+            rows: Dicionários com as colunas de SensorEvent; todos com as
+                mesmas chaves
+            rollup: Acumula as leituras numéricas nos agregados por
+                hora/dia/semana na mesma transação
+
+        Returns:
+            Número de leituras inseridas
+        """
+        inserted = bulk_insert(self.session.connection(), SensorEvent.__table__, rows)
+        if rollup:
+            samples = (
+                TimeSeriesRollupQueries.sensor_sample(
+                    row['sensor_id'], row['reading_type'], row['value'], row['timestamp']
+                )
+                for row in rows
+            )
+            TimeSeriesRollupQueries(self.session).record_many(s for s in samples if s is not None)
+        return inserted
+
+    def get_pending(self, limit: int = 500, sensor_type: Optional[str] = None) -> List[SensorEvent]:
+        """Leituras ainda não processadas, mais antigas primeiro.
+
+        No PostgreSQL as linhas ficam travadas (SKIP LOCKED) até o fim da
+        transação, permitindo vários processadores em paralelo.
+        """
+        query = self.session.query(SensorEvent).filter(SensorEvent.processed == False)  # noqa: E712
+        if sensor_type:
+            query = query.filter(SensorEvent.sensor_type == sensor_type)
+        return query.order_by(SensorEvent.timestamp).limit(limit).with_for_update(skip_locked=True).all()
+
+    def count_pending(self) -> int:
+        """Quantidade de leituras aguardando processamento."""
+        return self.session.query(func.count(SensorEvent.id)).filter(
+            SensorEvent.processed == False  # noqa: E712
+        ).scalar()
+
+    def mark_processed(self, event_ids: List[uuid.UUID], processed_at: Optional[datetime] = None) -> int:
+        """Marca leituras como processadas com um único UPDATE."""
+        if not event_ids:
+            return 0
+        return self.session.query(SensorEvent).filter(
+            SensorEvent.id.in_(event_ids)
+        ).update(
+            {'processed': True, 'processed_at': processed_at or datetime.utcnow()},
+            synchronize_session=False
+        )
+
+    def get_recent(self, sensor_id: Optional[str] = None, limit: int = 100) -> List[SensorEvent]:
+        """Leituras mais recentes (opcionalmente de um sensor)."""
+        query = self.session.query(SensorEvent)
+        if sensor_id:
+            query = query.filter(SensorEvent.sensor_id == sensor_id)
+        return query.order_by(SensorEvent.timestamp.desc()).limit(limit).all()
+
+    def get_series(self, sensor_id: str, reading_type: str, start: datetime, end: datetime,
+                   max_points: int = 500, resolution: Optional[str] = None) -> Dict[str, Any]:
+        """Série agregada das leituras numéricas de um sensor no período.
+
+        Returns:
+            ``{'sensor_id', 'reading_type', 'resolution', 'points': [...]}``
+            com ``start`` de cada ponto em datetime
+        """
+        rollups = TimeSeriesRollupQueries(self.session)
+        resolution, rows = rollups.get_series(
+            rollups.sensor_series(sensor_id, reading_type),
+            rollups.hours_since_epoch(start), rollups.hours_since_epoch(end),
+            max_points, resolution
+        )
+        return {
+            'sensor_id': sensor_id,
+            'reading_type': reading_type,
+            'resolution': resolution,
+            'points': rollups.to_points(rows, rollups.datetime_at),
+        }
+
+
 class ProfessionQueries:
     """Queries relacionadas a profissões."""
     
@@ -453,24 +1222,99 @@ class ProfessionQueries:
         return profession
 
 
+# Tabelas de alias do pool de nomes, por engine e (name_type, gender).
+# Escritas ORM em NamePool incrementam a versão e invalidam o cache;
+# escritas fora do ORM devem chamar invalidate_name_samplers().
+_name_samplers: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_name_pool_version = 0
+
+
+def invalidate_name_samplers() -> None:
+    """Descarta as tabelas de alias de nomes (reconstruídas sob demanda)."""
+    global _name_pool_version
+    _name_pool_version += 1
+
+
+@event.listens_for(NamePool, 'after_insert')
+@event.listens_for(NamePool, 'after_update')
+@event.listens_for(NamePool, 'after_delete')
+def _on_name_pool_change(mapper, connection, target):
+    invalidate_name_samplers()
+
+
 class NamePoolQueries:
-    """Queries para pool de nomes."""
+    """Queries para pool de nomes.
+
+    O sorteio usa uma tabela de alias por (name_type, gender) construída a
+    partir de ``NamePool.rarity`` (peso; 1.0 = muito comum), mantida em
+    memória enquanto o pool não muda.
+    """
     
     def __init__(self, session: Session):
         self.session = session
-    
-    def get_random_name(self, name_type: str, gender: Gender = None) -> Optional[NamePool]:
-        """Retorna nome aleatório considerando raridade."""
-        query = self.session.query(NamePool).filter(
-            NamePool.name_type == name_type
-        )
-        if gender:
-            query = query.filter(
-                or_(NamePool.gender == gender, NamePool.gender == None)
+
+    def _sampler(self, name_type: str, gender: Gender = None) -> Optional[AliasSampler]:
+        bind = self.session.get_bind()
+        cache = _name_samplers.get(bind)
+        if cache is None or cache['version'] != _name_pool_version:
+            cache = {'version': _name_pool_version, 'samplers': {}}
+            _name_samplers[bind] = cache
+
+        key = (name_type, gender)
+        if key not in cache['samplers']:
+            query = self.session.query(NamePool.id, NamePool.name, NamePool.rarity).filter(
+                NamePool.name_type == name_type
             )
-        
-        # TODO: Implementar seleção ponderada por raridade
-        return query.order_by(func.random()).first()
+            if gender:
+                query = query.filter(
+                    or_(NamePool.gender == gender, NamePool.gender == None)
+                )
+            rows = query.order_by(NamePool.name, NamePool.id).all()
+            cache['samplers'][key] = AliasSampler(
+                [(row.id, row.name) for row in rows],
+                [1.0 if row.rarity is None else row.rarity for row in rows]
+            ) if rows else None
+        return cache['samplers'][key]
+
+    def get_random_name(self, name_type: str, gender: Gender = None,
+                        rng: Optional[random.Random] = None) -> Optional[NamePool]:
+        """Retorna nome aleatório ponderado pela raridade.
+
+        Sem ``rng``, usa o fluxo 'names' de ``rng_streams`` (reprodutível
+        pela semente da simulação).
+        """
+        sampler = self._sampler(name_type, gender)
+        if sampler is None:
+            return None
+        name_id, _ = sampler.sample(rng or rng_streams.stream('names', name_type, gender))
+        return self.session.get(NamePool, name_id)
+
+    def sample_names(self, n: int, name_type: str, gender: Gender = None,
+                     rng: Optional[random.Random] = None) -> List[str]:
+        """
+        Sorteia ``n`` nomes (com reposição) ponderados pela raridade.
+
+        Não acessa o banco após a primeira chamada para o mesmo
+        (name_type, gender) enquanto o pool não muda.
+
+        Args:
+            n: Quantidade de nomes
+            name_type: first, middle, last
+            gender: Se informado, inclui nomes desse gênero e neutros
+            rng: Gerador do sorteio (padrão: fluxo 'names' de ``rng_streams``)
+
+        Returns:
+            Lista de nomes (vazia se o pool não tiver nomes do tipo)
+        """
+        sampler = self._sampler(name_type, gender)
+        if sampler is None:
+            return []
+        rng = rng or rng_streams.stream('names', name_type, gender)
+        return [name for _, name in sampler.sample_many(n, rng)]
+
+    def refresh(self) -> None:
+        """Força a reconstrução das tabelas de alias na próxima consulta."""
+        invalidate_name_samplers()
     
     def create(self, **kwargs) -> NamePool:
         """Adiciona nome ao pool."""
@@ -499,16 +1343,20 @@ class StationQueries:
             Station.id == station_id
         ).first()
 
-    def get_all(self, active_only: bool = True) -> List[Station]:
+    def get_all(self, active_only: bool = True,
+                with_vehicles: bool = False) -> List[Station]:
         """Retorna todas as estações.
 
         Args:
             active_only: Se True, retorna apenas estações ativas
+            with_vehicles: Se True, carrega os veículos acoplados
 
         Returns:
             Lista de estações
         """
         query = self.session.query(Station)
+        if with_vehicles:
+            query = query.options(*station_vehicles_options())
         if active_only:
             query = query.filter(
                 Station.status == StationStatus.ACTIVE,
@@ -782,6 +1630,226 @@ class StationQueries:
         }
 
 
+# ==================== FINANCIAL ROLLUP QUERIES ====================
+class FinancialRollupQueries:
+    """Agregados financeiros diários por rota e por operadora.
+
+    As escritas (venda/cancelamento/validação de bilhetes e manutenções)
+    incrementam a linha do dia com um UPDATE ``col = col + delta``; se a
+    linha ainda não existe, ela é criada. Leituras são uma busca pela
+    chave única (scope, scope_id, day).
+
+    Regras (iguais no incremental e em ``rebuild``):
+
+    - venda: receita e bilhete no dia da compra; o cancelamento estorna
+      os dois no mesmo dia, então bilhetes cancelados não contam;
+    - embarques: todas as validações do bilhete no dia do primeiro uso
+      (``used_at``), inclusive de bilhetes cancelados depois de usados.
+    """
+
+    ROUTE = 'route'
+    OPERATOR = 'operator'
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    # ---------- Escrita incremental ----------
+    def _increment(self, scope: str, scope_id: uuid.UUID, day: date, **deltas) -> None:
+        deltas = {k: v for k, v in deltas.items() if v}
+        if not deltas:
+            return
+
+        values = {
+            getattr(FinancialRollup, name): getattr(FinancialRollup, name) + delta
+            for name, delta in deltas.items()
+        }
+        values[FinancialRollup.updated_at] = datetime.utcnow()
+
+        def apply_update() -> int:
+            return self.session.query(FinancialRollup).filter(
+                FinancialRollup.scope == scope,
+                FinancialRollup.scope_id == scope_id,
+                FinancialRollup.day == day
+            ).update(values, synchronize_session='evaluate')
+
+        if apply_update():
+            return
+
+        # Linha nova. Se outra transação criar a mesma chave entre o UPDATE e
+        # o INSERT, a violação de uq_financial_rollup_key desfaz só o
+        # SAVEPOINT e o incremento vai para a linha dela
+        row = {
+            'revenue': Decimal('0.00'), 'maintenance_costs': Decimal('0.00'),
+            'tickets_sold': 0, 'passengers': 0, **deltas
+        }
+        try:
+            with self.session.begin_nested():
+                self.session.execute(insert(FinancialRollup).values(
+                    scope=scope, scope_id=scope_id, day=day, **row
+                ))
+        except IntegrityError:
+            if not apply_update():
+                raise
+
+    def _apply(self, day: date, route_id: Optional[uuid.UUID],
+               operator_id: Optional[uuid.UUID] = None, **deltas) -> None:
+        if route_id is not None:
+            self._increment(self.ROUTE, route_id, day, **deltas)
+            if operator_id is None:
+                operator_id = self.session.query(Route.operator_id).filter(
+                    Route.id == route_id
+                ).scalar()
+        if operator_id is not None:
+            self._increment(self.OPERATOR, operator_id, day, **deltas)
+
+    @staticmethod
+    def _day(when: Optional[Union[datetime, date]]) -> date:
+        if when is None:
+            return datetime.utcnow().date()
+        return when.date() if isinstance(when, datetime) else when
+
+    def record_ticket_sale(self, route_id: uuid.UUID, amount: float,
+                           when: Optional[datetime] = None) -> None:
+        """Lança a venda de um bilhete na rota e na operadora."""
+        self._apply(self._day(when), route_id,
+                    revenue=Decimal(str(amount or 0)), tickets_sold=1)
+
+    def record_ticket_refund(self, route_id: uuid.UUID, amount: float,
+                             when: Optional[datetime] = None) -> None:
+        """Estorna a venda de um bilhete cancelado (no dia da compra)."""
+        self._apply(self._day(when), route_id,
+                    revenue=-Decimal(str(amount or 0)), tickets_sold=-1)
+
+    def record_passengers(self, route_id: uuid.UUID, count: int = 1,
+                          when: Optional[datetime] = None) -> None:
+        """Lança embarques (validações de bilhete) na rota e na operadora.
+
+        ``when`` deve ser o primeiro uso do bilhete (``Ticket.used_at``).
+        """
+        self._apply(self._day(when), route_id, passengers=count)
+
+    def record_maintenance(self, cost: float, route_id: Optional[uuid.UUID] = None,
+                           operator_id: Optional[uuid.UUID] = None,
+                           when: Optional[datetime] = None) -> None:
+        """Lança custo de manutenção na rota e/ou operadora."""
+        self._apply(self._day(when), route_id, operator_id,
+                    maintenance_costs=Decimal(str(cost or 0)))
+
+    # ---------- Leitura ----------
+    def get(self, scope: str, scope_id: uuid.UUID,
+            day: Union[datetime, date]) -> Optional[FinancialRollup]:
+        """Retorna o agregado de um dia ou None."""
+        return self.session.query(FinancialRollup).filter(
+            FinancialRollup.scope == scope,
+            FinancialRollup.scope_id == scope_id,
+            FinancialRollup.day == self._day(day)
+        ).first()
+
+    def get_route_day(self, route_id: uuid.UUID,
+                      day: Union[datetime, date]) -> Optional[FinancialRollup]:
+        """Agregado diário de uma rota."""
+        return self.get(self.ROUTE, route_id, day)
+
+    def get_operator_day(self, operator_id: uuid.UUID,
+                         day: Union[datetime, date]) -> Optional[FinancialRollup]:
+        """Agregado diário de uma operadora."""
+        return self.get(self.OPERATOR, operator_id, day)
+
+    def get_range(self, scope: str, scope_id: uuid.UUID,
+                  start: Union[datetime, date],
+                  end: Union[datetime, date]) -> List[FinancialRollup]:
+        """Agregados de um intervalo de dias (inclusivo), ordenados por dia."""
+        return self.session.query(FinancialRollup).filter(
+            FinancialRollup.scope == scope,
+            FinancialRollup.scope_id == scope_id,
+            FinancialRollup.day >= self._day(start),
+            FinancialRollup.day <= self._day(end)
+        ).order_by(FinancialRollup.day).all()
+
+    def totals(self, scope: str, scope_id: uuid.UUID,
+               start: Union[datetime, date], end: Union[datetime, date]) -> Dict[str, Any]:
+        """Soma dos agregados de um intervalo de dias (inclusivo), numa consulta."""
+        revenue, maintenance, tickets, passengers, days = self.session.query(
+            func.coalesce(func.sum(FinancialRollup.revenue), 0),
+            func.coalesce(func.sum(FinancialRollup.maintenance_costs), 0),
+            func.coalesce(func.sum(FinancialRollup.tickets_sold), 0),
+            func.coalesce(func.sum(FinancialRollup.passengers), 0),
+            func.count(FinancialRollup.id)
+        ).filter(
+            FinancialRollup.scope == scope,
+            FinancialRollup.scope_id == scope_id,
+            FinancialRollup.day >= self._day(start),
+            FinancialRollup.day <= self._day(end)
+        ).one()
+        return {
+            'revenue': float(revenue),
+            'maintenance_costs': float(maintenance),
+            'profit': float(revenue) - float(maintenance),
+            'tickets_sold': int(tickets),
+            'passengers': int(passengers),
+            'days_with_activity': int(days),
+        }
+
+    # ---------- Reconstrução ----------
+    def rebuild(self) -> int:
+        """Recalcula todos os agregados a partir de bilhetes e manutenções.
+
+        Útil após importações em massa que não passam pelas queries de escrita.
+        Não realiza commit; responsabilidade do chamador.
+
+        Returns:
+            Número de linhas de agregado geradas
+        """
+        self.session.query(FinancialRollup).delete(synchronize_session=False)
+
+        totals: Dict[Tuple[str, uuid.UUID, date], Dict[str, Any]] = {}
+
+        def add(scope, scope_id, day, field, value):
+            if scope_id is None or not value:
+                return
+            row = totals.setdefault((scope, scope_id, day), {
+                'revenue': Decimal('0.00'), 'maintenance_costs': Decimal('0.00'),
+                'tickets_sold': 0, 'passengers': 0
+            })
+            row[field] += value
+
+        route_operator = dict(self.session.query(Route.id, Route.operator_id).all())
+
+        tickets = self.session.query(
+            Ticket.route_id, Ticket.price, Ticket.purchased_at,
+            Ticket.used_at, Ticket.validation_count, Ticket.status
+        ).filter(Ticket.route_id.isnot(None))
+        for route_id, price, purchased_at, used_at, validations, status in tickets:
+            operator_id = route_operator.get(route_id)
+            for scope, scope_id in ((self.ROUTE, route_id), (self.OPERATOR, operator_id)):
+                if status != TicketStatus.CANCELLED:
+                    add(scope, scope_id, purchased_at.date(), 'revenue', Decimal(str(price or 0)))
+                    add(scope, scope_id, purchased_at.date(), 'tickets_sold', 1)
+                if used_at:
+                    add(scope, scope_id, used_at.date(), 'passengers', validations or 0)
+
+        maintenance = self.session.query(
+            MaintenanceRecord.cost,
+            func.coalesce(MaintenanceRecord.completed_at, MaintenanceRecord.created_at),
+            Vehicle.assigned_route_id, Vehicle.current_route_id, Vehicle.operator_id
+        ).join(Vehicle, and_(
+            MaintenanceRecord.target_type == 'vehicle',
+            MaintenanceRecord.target_id == Vehicle.id
+        ))
+        for cost, when, assigned_route_id, current_route_id, operator_id in maintenance:
+            day = when.date()
+            cost = Decimal(str(cost or 0))
+            add(self.ROUTE, assigned_route_id or current_route_id, day, 'maintenance_costs', cost)
+            add(self.OPERATOR, operator_id, day, 'maintenance_costs', cost)
+
+        self.session.add_all([
+            FinancialRollup(scope=scope, scope_id=scope_id, day=day, **values)
+            for (scope, scope_id, day), values in totals.items()
+        ])
+        self.session.flush()
+        return len(totals)
+
+
 # ==================== TICKET QUERIES (Issue 4.8) ====================
 class TicketQueries:
     """Queries relacionadas a bilhetes de transporte (Issue 4.8)."""
@@ -851,6 +1919,11 @@ class TicketQueries:
 
         self.session.add(ticket)
         self.session.flush()  # Obter ID
+
+        if route_id:
+            FinancialRollupQueries(self.session).record_ticket_sale(
+                route_id, ticket.price, ticket.purchased_at
+            )
         return ticket
 
     # ---------- Operações ----------
@@ -859,7 +1932,24 @@ class TicketQueries:
         ticket = self.get_by_id(ticket_id)
         if not ticket:
             return False
-        return ticket.validate()
+        validated = ticket.validate()
+        if validated and ticket.route_id:
+            FinancialRollupQueries(self.session).record_passengers(
+                ticket.route_id, 1, ticket.used_at
+            )
+        return validated
+
+    def cancel_ticket(self, ticket_id: uuid.UUID) -> bool:
+        """Cancela um bilhete e estorna a receita nos agregados."""
+        ticket = self.get_by_id(ticket_id)
+        if not ticket or ticket.status == TicketStatus.CANCELLED:
+            return False
+        ticket.cancel()
+        if ticket.route_id:
+            FinancialRollupQueries(self.session).record_ticket_refund(
+                ticket.route_id, ticket.price, ticket.purchased_at
+            )
+        return True
 
     # ---------- Listagens ----------
     def get_active_tickets(self, agent_id: uuid.UUID = None) -> List[Ticket]:
@@ -1156,33 +2246,44 @@ class TransportOperatorQueries:
 
     # ---------- CRUD Básico ----------
 
-    def get_by_id(self, operator_id: uuid.UUID) -> Optional['TransportOperator']:
+    def get_by_id(self, operator_id: uuid.UUID,
+                  with_relations: bool = False) -> Optional['TransportOperator']:
         """
         Retorna operadora pelo ID.
 
         Args:
             operator_id: UUID da operadora
+            with_relations: Se True, carrega rotas, veículos e funcionários
+                (com profissão) em consultas antecipadas
 
         Returns:
             TransportOperator ou None
         """
         from backend.database.models import TransportOperator
-        return self.session.query(TransportOperator).filter(
+        query = self.session.query(TransportOperator)
+        if with_relations:
+            query = query.options(*operator_full_options())
+        return query.filter(
             TransportOperator.id == operator_id
         ).first()
 
-    def get_all(self, include_inactive: bool = False) -> List['TransportOperator']:
+    def get_all(self, include_inactive: bool = False,
+                with_routes: bool = False) -> List['TransportOperator']:
         """
         Retorna todas as operadoras.
 
         Args:
             include_inactive: Se True, inclui operadoras inativas
+            with_routes: Se True, carrega as rotas de todas as operadoras em
+                uma única consulta adicional
 
         Returns:
             Lista de TransportOperator
         """
         from backend.database.models import TransportOperator
         query = self.session.query(TransportOperator)
+        if with_routes:
+            query = query.options(*operator_financial_options())
         if not include_inactive:
             query = query.filter(TransportOperator.is_active == True)
         return query.order_by(TransportOperator.name).all()
@@ -1266,47 +2367,82 @@ class TransportOperatorQueries:
 
     # ---------- Operações de Negócio ----------
 
-    def get_most_profitable(self, limit: int = 10) -> List['TransportOperator']:
+    def get_most_profitable(self, limit: int = 10,
+                            min_profit: Optional[float] = None) -> List['TransportOperator']:
         """
         Retorna as operadoras mais lucrativas.
 
+        Ordenação, filtro e limite são feitos no banco através da expressão
+        híbrida ``TransportOperator.profit``.
+
         Args:
             limit: Número máximo de resultados
+            min_profit: Se informado, retorna apenas operadoras com lucro >= valor
 
         Returns:
             Lista de operadoras ordenadas por lucro (receita - custos)
         """
-        from backend.database.models import TransportOperator
-
-        # Ordenar por (revenue - operational_costs) DESC
-        operators = self.session.query(TransportOperator).filter(
-            TransportOperator.is_active == True
-        ).all()
+        return [op for op, _ in self.get_profit_ranking(
+            limit=limit, min_profit=min_profit
+        )]
 
-        # Calcular lucro e ordenar em Python (já que é uma propriedade)
-        operators_with_profit = [
-            (op, op.get_profit_margin()) for op in operators
-        ]
-        operators_with_profit.sort(key=lambda x: x[1], reverse=True)
+    def get_profit_ranking(self, include_inactive: bool = False,
+                           limit: Optional[int] = None,
+                           min_profit: Optional[float] = None) -> List[Tuple['TransportOperator', float]]:
+        """
+        Retorna operadoras com o lucro calculado em SQL, ordenadas por lucro.
 
-        return [op for op, _ in operators_with_profit[:limit]]
+        Args:
+            include_inactive: Se True, inclui operadoras inativas
+            limit: Número máximo de resultados
+            min_profit: Se informado, retorna apenas operadoras com lucro >= valor
 
-    def calculate_daily_revenue(self, operator_id: uuid.UUID, date: datetime) -> float:
+        Returns:
+            Lista de tuplas (operadora, lucro)
+        """
+        profit = TransportOperator.profit.label('profit')
+        query = self.session.query(TransportOperator, profit)
+        if not include_inactive:
+            query = query.filter(TransportOperator.is_active == True)
+        if min_profit is not None:
+            query = query.filter(TransportOperator.profit >= min_profit)
+        query = query.order_by(desc(profit), TransportOperator.name)
+        if limit is not None:
+            query = query.limit(limit)
+        return [(op, float(value or 0)) for op, value in query.all()]
+
+    def calculate_daily_revenue(self, operator_id: uuid.UUID, date: datetime,
+                                estimate: bool = False) -> float:
         """
         Calcula receita diária de uma operadora.
 
+        Lê o agregado diário (``FinancialRollup``); um dia sem agregado é um
+        dia sem vendas (0.0).
+
         Args:
             operator_id: UUID da operadora
             date: Data para calcular a receita
+            estimate: Sem agregado no dia, devolve a estimativa
+                ``monthly_revenue / 30`` das rotas em vez de 0.0 (bases sem
+                bilhetes registrados)
 
         Returns:
             Receita do dia (float)
         """
-        operator = self.get_by_id(operator_id)
+        rollup = FinancialRollupQueries(self.session).get_operator_day(operator_id, date)
+        if rollup is not None:
+            return float(rollup.revenue)
+        if not estimate:
+            return 0.0
+
+        from backend.database.models import TransportOperator
+        operator = self.session.query(TransportOperator).options(
+            *operator_financial_options()
+        ).filter(TransportOperator.id == operator_id).first()
         if not operator:
             return 0.0
 
-        return operator.calculate_daily_revenue(date)
+        return operator.estimate_daily_revenue(date)
 
     def get_employees(self, operator_id: uuid.UUID) -> List[Agent]:
         """
@@ -1360,13 +2496,17 @@ class TransportOperatorQueries:
         Returns:
             Dicionário com estatísticas
         """
-        operator = self.get_by_id(operator_id)
+        operator = self.get_by_id(operator_id, with_relations=True)
         if not operator:
             return {}
 
         routes = [r for r in operator.routes if r.is_active]
         vehicles = operator.vehicles
         employees = operator.employees
+        today = datetime.utcnow().date()
+        last_30_days = FinancialRollupQueries(self.session).totals(
+            FinancialRollupQueries.OPERATOR, operator.id, today - timedelta(days=29), today
+        )
 
         return {
             'operator_id': str(operator.id),
@@ -1381,6 +2521,7 @@ class TransportOperatorQueries:
             'active_routes': len(routes),
             'total_vehicles': operator.total_vehicles,
             'total_employees': operator.total_employees,
+            'last_30_days': last_30_days,
             'employees': [
                 {
                     'id': str(emp.id),
@@ -1398,9 +2539,12 @@ class DatabaseQueries:
         self.session = session
         self.agents = AgentQueries(session)
         self.buildings = BuildingQueries(session)
+        # Issue 4.6
+        self.routes = RouteQueries(session)
         self.vehicles = VehicleQueries(session)
         self.events = EventQueries(session)
         self.economic_stats = EconomicStatQueries(session)
+        self.sensor_events = SensorEventQueries(session)
         self.professions = ProfessionQueries(session)
         self.names = NamePoolQueries(session)
         self.stations = StationQueries(session)
@@ -1410,6 +2554,8 @@ class DatabaseQueries:
         self.schedules = ScheduleQueries(session)
         # Issue 4.10 e 4.11
         self.transport_operators = TransportOperatorQueries(session)
+        self.financial_rollups = FinancialRollupQueries(session)
+        self.timeseries_rollups = TimeSeriesRollupQueries(session)
 
     def commit(self):
         """Commit das alterações."""
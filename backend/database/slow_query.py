@@ -0,0 +1,292 @@
+"""
+Registro de consultas lentas.
+
+Alternativa ao ``DB_ECHO`` (tudo ou nada): eventos de engine medem cada
+comando e só os que passam de ``threshold_ms`` são registrados, com
+parâmetros, chamador (ex: ``AgentQueries.get_by_location``) e o plano de
+execução (``EXPLAIN`` no PostgreSQL, ``EXPLAIN QUERY PLAN`` no SQLite).
+
+Os registros vão para um arquivo rotativo (JSON por linha) e para um buffer
+em memória exposto em ``/internal/slow-queries``.
+
+Configuração por variáveis de ambiente (ver ``DatabaseConfig``):
+    DB_SLOW_QUERY_MS=250        # 0 desativa
+    DB_SLOW_QUERY_LOG=data/logs/slow_queries.log
+    DB_SLOW_QUERY_EXPLAIN=True
+"""
+
+import json
+import logging
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Comandos em que EXPLAIN não executa a consulta
+_EXPLAINABLE = ('select', 'with', 'update', 'delete')
+_MAX_PARAMS_CHARS = 1000
+_PLAN_CACHE_SIZE = 256
+
+
+@dataclass
+class SlowQuery:
+    """Um comando que passou do limite."""
+    timestamp: str
+    duration_ms: float
+    statement: str
+    parameters: str
+    caller: Optional[str]
+    dialect: str
+    executemany: bool = False
+    plan: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def find_caller(skip_modules=('sqlalchemy', __name__)) -> Optional[str]:
+    """
+    Identifica quem disparou a consulta.
+
+    Prefere métodos das classes de ``backend.database.queries``
+    (``Classe.método``); senão, o primeiro frame fora do SQLAlchemy
+    (``módulo:função:linha``).
+    """
+    frame = sys._getframe(1)
+    fallback = None
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '')
+        if not module.startswith(skip_modules):
+            if module == 'backend.database.queries':
+                owner = frame.f_locals.get('self')
+                if owner is not None:
+                    return f"{type(owner).__name__}.{frame.f_code.co_name}"
+                return frame.f_code.co_name
+            if fallback is None:
+                fallback = f"{module}:{frame.f_code.co_name}:{frame.f_lineno}"
+        frame = frame.f_back
+    return fallback
+
+
+class SlowQueryLog:
+    """
+    Gravador de consultas lentas para uma ou mais engines.
+
+    Args:
+        threshold_ms: Limite em milissegundos (0 desativa)
+        log_path: Arquivo rotativo (None = só memória)
+        explain: Captura o plano de execução dos comandos lentos
+        capacity: Registros mantidos em memória
+        max_bytes: Tamanho máximo do arquivo antes de rotacionar
+        backup_count: Arquivos rotacionados mantidos
+    """
+
+    def __init__(self, threshold_ms: float = 250.0, log_path: Optional[str] = None,
+                 explain: bool = True, capacity: int = 200,
+                 max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5):
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._lock = threading.Lock()
+        self._records: Deque[SlowQuery] = deque(maxlen=capacity)
+        self._plans: 'OrderedDict[str, List[str]]' = OrderedDict()
+        self._engines = weakref.WeakSet()
+        self._handler: Optional[RotatingFileHandler] = None
+        self.log_path = None
+        self.set_log_path(log_path)
+
+    # ---------- Configuração ----------
+    def set_log_path(self, log_path: Optional[str]) -> None:
+        """Troca o arquivo rotativo (abertura adiada até o primeiro registro)."""
+        with self._lock:
+            if self._handler is not None:
+                self._handler.close()
+                self._handler = None
+            self.log_path = Path(log_path) if log_path else None
+            if self.log_path is not None:
+                self.log_path.parent.mkdir(parents=True, exist_ok=True)
+                self._handler = RotatingFileHandler(
+                    filename=str(self.log_path),
+                    maxBytes=self.max_bytes,
+                    backupCount=self.backup_count,
+                    encoding="utf-8",
+                    delay=True,
+                )
+                self._handler.setFormatter(logging.Formatter("%(message)s"))
+
+    def install(self, engine) -> None:
+        """Registra os eventos na engine (idempotente)."""
+        if engine in self._engines:
+            return
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+        self._engines.add(engine)
+
+    def uninstall(self, engine) -> None:
+        """Remove os eventos da engine."""
+        if engine not in self._engines:
+            return
+        event.remove(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.remove(engine, 'after_cursor_execute', self._after_cursor_execute)
+        self._engines.discard(engine)
+
+    # ---------- Eventos ----------
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('_ferritine_slow_query_start', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get('_ferritine_slow_query_start')
+        if not starts:
+            return
+        elapsed_ms = (time.perf_counter() - starts.pop()) * 1000.0
+        if not self.threshold_ms or elapsed_ms < self.threshold_ms:
+            return
+
+        try:
+            plan = self._plan(conn, statement, parameters, executemany) if self.explain else []
+            self.record(SlowQuery(
+                timestamp=datetime.utcnow().isoformat(timespec='milliseconds'),
+                duration_ms=round(elapsed_ms, 3),
+                statement=statement,
+                parameters=_format_parameters(parameters, executemany),
+                caller=find_caller(),
+                dialect=conn.dialect.name,
+                executemany=executemany,
+                plan=plan,
+            ))
+        except Exception as e:  # nunca interfere na consulta original
+            logger.warning("Falha ao registrar consulta lenta: %s", e)
+
+    def _plan(self, conn, statement: str, parameters, executemany: bool) -> List[str]:
+        """Plano de execução do comando (em cache por texto SQL)."""
+        with self._lock:
+            cached = self._plans.get(statement)
+            if cached is not None:
+                self._plans.move_to_end(statement)
+                return cached
+
+        if statement.lstrip().split(None, 1)[0].lower() not in _EXPLAINABLE:
+            return []
+
+        dialect = conn.dialect.name
+        if dialect == 'sqlite':
+            prefix = 'EXPLAIN QUERY PLAN '
+        elif dialect in ('postgresql', 'mysql', 'mariadb'):
+            prefix = 'EXPLAIN '
+        else:
+            return []
+
+        if executemany and parameters:
+            parameters = parameters[0]
+
+        # Cursor DBAPI cru: não passa pelos eventos da engine. Roda na
+        # transação do chamador; fora do SQLite fica num SAVEPOINT para que
+        # um EXPLAIN com erro não aborte a transação (PostgreSQL)
+        dbapi_connection = conn.connection.dbapi_connection
+        savepoint = dialect != 'sqlite' and not getattr(dbapi_connection, 'autocommit', False)
+        cursor = dbapi_connection.cursor()
+        try:
+            if savepoint:
+                cursor.execute('SAVEPOINT ferritine_explain')
+            try:
+                cursor.execute(prefix + statement, parameters or ())
+                rows = cursor.fetchall()
+            except Exception as e:
+                if savepoint:
+                    cursor.execute('ROLLBACK TO SAVEPOINT ferritine_explain')
+                    cursor.execute('RELEASE SAVEPOINT ferritine_explain')
+                return [f"EXPLAIN falhou: {e}"]
+            if savepoint:
+                cursor.execute('RELEASE SAVEPOINT ferritine_explain')
+        except Exception as e:
+            return [f"EXPLAIN falhou: {e}"]
+        finally:
+            cursor.close()
+
+        if dialect == 'sqlite':
+            # (id, parent, notused, detail)
+            plan = [str(row[-1]) for row in rows]
+        else:
+            plan = [" | ".join(str(col) for col in row) for row in rows]
+
+        with self._lock:
+            self._plans[statement] = plan
+            if len(self._plans) > _PLAN_CACHE_SIZE:
+                self._plans.popitem(last=False)
+        return plan
+
+    # ---------- Registro e consulta ----------
+    def record(self, query: SlowQuery) -> None:
+        """Guarda o registro em memória e no arquivo rotativo."""
+        with self._lock:
+            self._records.append(query)
+            handler = self._handler
+        if handler is not None:
+            handler.handle(logging.makeLogRecord({
+                'name': __name__,
+                'levelno': logging.WARNING,
+                'levelname': 'WARNING',
+                'msg': json.dumps(query.to_dict(), ensure_ascii=False, default=str),
+            }))
+
+    def recent(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Registros mais recentes primeiro."""
+        with self._lock:
+            records = list(self._records)
+        records.reverse()
+        if limit is not None:
+            records = records[:limit]
+        return [r.to_dict() for r in records]
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Agrupa os registros em memória por comando (mais lento primeiro)."""
+        groups: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            records = list(self._records)
+        for r in records:
+            g = groups.get(r.statement)
+            if g is None:
+                g = groups[r.statement] = {
+                    'statement': r.statement, 'count': 0, 'total_ms': 0.0,
+                    'max_ms': 0.0, 'callers': set(), 'plan': r.plan,
+                }
+            g['count'] += 1
+            g['total_ms'] += r.duration_ms
+            g['max_ms'] = max(g['max_ms'], r.duration_ms)
+            if r.caller:
+                g['callers'].add(r.caller)
+        result = sorted(groups.values(), key=lambda g: g['total_ms'], reverse=True)
+        for g in result:
+            g['callers'] = sorted(g['callers'])
+        return result
+
+    def clear(self) -> None:
+        """Descarta registros em memória e planos em cache."""
+        with self._lock:
+            self._records.clear()
+            self._plans.clear()
+
+
+def _format_parameters(parameters, executemany: bool) -> str:
+    if executemany and parameters:
+        text = f"{len(parameters)}x {parameters[0]!r}"
+    else:
+        text = repr(parameters)
+    if len(text) > _MAX_PARAMS_CHARS:
+        text = text[:_MAX_PARAMS_CHARS] + "..."
+    return text
+
+
+# Registro global configurado pelo DatabaseManager e exposto pela API
+slow_query_log = SlowQueryLog()
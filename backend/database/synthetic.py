@@ -0,0 +1,364 @@
+"""
+Gerador de cidades sintéticas em massa para testes de carga e benchmarks.
+
+Gera operadoras, edifícios, estações, rotas (com paradas), agentes,
+veículos, horários e bilhetes em escala de 10^3 a 10^6 linhas, de forma
+determinística a partir de uma semente, e grava com inserções em lote:
+
+- PostgreSQL: ``COPY ... FROM STDIN`` (psycopg2 ``copy_expert``)
+- demais bancos (SQLite): ``executemany`` via ``table.insert()``
+
+Os objetos não passam pela sessão do ORM; nenhum evento de ORM é disparado.
+"""
+
+import random
+import time as _time
+import uuid
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy.engine import Engine
+
+from backend.database.bulk import bulk_insert
+from backend.database.models import (
+    Base, AgentStatus, BuildingType, CreatedBy, Gender, HealthStatus,
+    StationType, TicketStatus, TicketType, VehicleStatus
+)
+
+FIRST_NAMES = [
+    "Ana", "Bruno", "Carla", "Daniel", "Eduarda", "Felipe", "Gabriela", "Heitor",
+    "Isabela", "João", "Larissa", "Marcos", "Natália", "Otávio", "Paula", "Rafael",
+    "Sofia", "Thiago", "Valentina", "Yuri",
+]
+LAST_NAMES = [
+    "Silva", "Santos", "Oliveira", "Souza", "Lima", "Pereira", "Costa", "Ferreira",
+    "Almeida", "Ribeiro", "Carvalho", "Gomes", "Martins", "Araújo", "Rocha",
+]
+BUILDING_TYPES = [
+    BuildingType.RESIDENTIAL_HOUSE_SMALL,
+    BuildingType.RESIDENTIAL_APARTMENT_MID,
+    BuildingType.COMMERCIAL_STORE_SMALL,
+    BuildingType.COMMERCIAL_RESTAURANT,
+]
+STATION_TYPES = [
+    StationType.METRO_STATION,
+    StationType.BUS_STOP_SHELTER,
+    StationType.TRAM_STOP,
+]
+GENDERS = [Gender.CIS_MALE, Gender.CIS_FEMALE]
+
+
+@dataclass
+class CityScale:
+    """Tamanho da cidade gerada. Campos ``None`` são derivados de ``agents``."""
+    agents: int = 1000
+    buildings: Optional[int] = None
+    stations: Optional[int] = None
+    routes: Optional[int] = None
+    operators: Optional[int] = None
+    stops_per_route: int = 8
+    vehicles_per_route: int = 3
+    schedules_per_vehicle: int = 4
+    tickets: Optional[int] = None
+    grid_size: int = 1000
+
+    def resolved(self) -> 'CityScale':
+        """Retorna cópia com os campos derivados preenchidos."""
+        agents = max(self.agents, 1)
+        stations = self.stations if self.stations is not None else max(agents // 50, 10)
+        routes = self.routes if self.routes is not None else max(stations // 5, 2)
+        return CityScale(
+            agents=agents,
+            buildings=self.buildings if self.buildings is not None else max(agents // 4, 10),
+            stations=stations,
+            routes=routes,
+            operators=self.operators if self.operators is not None else max(routes // 10, 1),
+            stops_per_route=min(self.stops_per_route, stations),
+            vehicles_per_route=self.vehicles_per_route,
+            schedules_per_vehicle=self.schedules_per_vehicle,
+            tickets=self.tickets if self.tickets is not None else agents * 2,
+            grid_size=self.grid_size,
+        )
+
+
+@dataclass
+class GenerationReport:
+    """Resultado da geração: linhas e segundos por tabela."""
+    seed: int
+    scale: CityScale
+    rows: Dict[str, int] = field(default_factory=dict)
+    seconds: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def total_rows(self) -> int:
+        return sum(self.rows.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'seed': self.seed,
+            'scale': asdict(self.scale),
+            'rows': dict(self.rows),
+            'seconds': dict(self.seconds),
+            'total_rows': self.total_rows,
+        }
+
+
+# ==================== INSERÇÃO EM LOTE ====================
+
+def _chunks(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# ==================== GERADOR ====================
+
+class CityGenerator:
+    """
+    Gera uma cidade sintética determinística.
+
+    Cada tabela usa seu próprio fluxo aleatório derivado da semente, então
+    o conteúdo de uma tabela não muda quando outra muda de tamanho.
+
+    Example:
+        >>> report = CityGenerator(CityScale(agents=10_000), seed=42).generate(engine)
+        >>> report.rows['agents']
+        10000
+    """
+
+    def __init__(self, scale: CityScale = None, seed: int = 42, chunk_size: int = 10_000):
+        self.scale = (scale or CityScale()).resolved()
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.epoch = datetime(2025, 1, 1)
+        self._ids: Dict[str, List[uuid.UUID]] = {}
+
+    def _rng(self, stream: str) -> random.Random:
+        return random.Random(f"{self.seed}:{stream}")
+
+    @staticmethod
+    def _uuid(rng: random.Random) -> uuid.UUID:
+        return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+    def _keep(self, name: str, rows: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        ids = self._ids.setdefault(name, [])
+        for row in rows:
+            ids.append(row['id'])
+            yield row
+
+    # ---------- Linhas por tabela ----------
+    def _operators(self) -> Iterator[Dict[str, Any]]:
+        rng = self._rng('operators')
+        for i in range(self.scale.operators):
+            yield {
+                'id': self._uuid(rng),
+                'name': f"Operadora {i + 1:04d}",
+                'operator_type': StationType.METRO_STATION,
+                'revenue': Decimal(rng.randint(100_000, 5_000_000)),
+                'operational_costs': Decimal(rng.randint(50_000, 4_000_000)),
+                'is_active': True,
+            }
+
+    def _buildings(self) -> Iterator[Dict[str, Any]]:
+        rng = self._rng('buildings')
+        grid = self.scale.grid_size
+        # Um edifício de transporte por estação, usado em route_stations
+        for i in range(self.scale.stations):
+            yield {
+                'id': self._uuid(rng),
+                'name': f"Estação {i + 1:05d}",
+                'building_type': BuildingType.TRANSPORT_TRAIN_STATION_SMALL,
+                'x': rng.randrange(grid),
+                'y': rng.randrange(grid),
+            }
+        for i in range(self.scale.buildings):
+            yield {
+                'id': self._uuid(rng),
+                'name': f"Edifício {i + 1:06d}",
+                'building_type': rng.choice(BUILDING_TYPES),
+                'x': rng.randrange(grid),
+                'y': rng.randrange(grid),
+            }
+
+    def _stations(self) -> Iterator[Dict[str, Any]]:
+        rng = self._rng('stations')
+        station_buildings = self._ids['buildings'][:self.scale.stations]
+        for i, building_id in enumerate(station_buildings):
+            yield {
+                'id': self._uuid(rng),
+                'name': f"Estação {i + 1:05d}",
+                'station_type': rng.choice(STATION_TYPES),
+                'building_id': building_id,
+                'x': rng.randrange(self.scale.grid_size),
+                'y': rng.randrange(self.scale.grid_size),
+                'max_queue_length': 100,
+                'current_queue_length': rng.randint(0, 30),
+            }
+
+    def _routes(self) -> Iterator[Dict[str, Any]]:
+        rng = self._rng('routes')
+        operators = self._ids['operators']
+        for i in range(self.scale.routes):
+            yield {
+                'id': self._uuid(rng),
+                'name': f"Linha {i + 1:04d}",
+                'code': f"R{i + 1:05d}",
+                'route_type': StationType.METRO_STATION,
+                'operator_id': operators[i % len(operators)],
+                'fare_base': Decimal('4.40'),
+                'frequency_minutes': rng.choice([5, 10, 15, 20]),
+                'monthly_revenue': Decimal(rng.randint(10_000, 500_000)),
+                'monthly_operational_cost': Decimal(rng.randint(5_000, 300_000)),
+                'monthly_maintenance_cost': Decimal(rng.randint(1_000, 50_000)),
+                'is_active': True,
+            }
+
+    def _route_stations(self) -> Iterator[Dict[str, Any]]:
+        rng = self._rng('route_stations')
+        station_buildings = self._ids['buildings'][:self.scale.stations]
+        for route_id in self._ids['routes']:
+            stops = rng.sample(station_buildings, self.scale.stops_per_route)
+            for order, building_id in enumerate(stops, start=1):
+                yield {
+                    'id': self._uuid(rng),
+                    'route_id': route_id,
+                    'station_id': building_id,
+                    'sequence_order': order,
+                    'travel_time_from_previous': 0 if order == 1 else rng.randint(2, 6),
+                    'distance_from_previous_km': 0.0 if order == 1 else round(rng.uniform(0.5, 3.0), 2),
+                }
+
+    def _agents(self) -> Iterator[Dict[str, Any]]:
+        rng = self._rng('agents')
+        homes = self._ids['buildings'][self.scale.stations:]
+        stations = self._ids['stations']
+        for _ in range(self.scale.agents):
+            waiting = rng.random() < 0.1
+            yield {
+                'id': self._uuid(rng),
+                'name': f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                'birth_date': self.epoch - timedelta(days=rng.randint(18 * 365, 80 * 365)),
+                'gender': rng.choice(GENDERS),
+                'health_status': HealthStatus.HEALTHY,
+                'created_by': CreatedBy.IA,
+                'version': "1.0",
+                'energy_level': rng.randint(20, 100),
+                'wallet': Decimal(rng.randint(0, 5000)),
+                'home_building_id': rng.choice(homes),
+                'current_status': AgentStatus.WAITING if waiting else AgentStatus.IDLE,
+                'waiting_at_station_id': rng.choice(stations) if waiting else None,
+            }
+
+    def _vehicles(self) -> Iterator[Dict[str, Any]]:
+        rng = self._rng('vehicles')
+        operators = self._ids['operators']
+        stations = self._ids['stations']
+        for r, route_id in enumerate(self._ids['routes']):
+            for k in range(self.scale.vehicles_per_route):
+                yield {
+                    'id': self._uuid(rng),
+                    'name': f"Veículo {r + 1:04d}-{k + 1}",
+                    'vehicle_type': "metro_train",
+                    'passenger_capacity': 800,
+                    'current_passengers': rng.randint(0, 800),
+                    'operator_id': operators[r % len(operators)],
+                    'assigned_route_id': route_id,
+                    'current_route_id': route_id,
+                    'current_station_id': rng.choice(stations),
+                    'status': VehicleStatus.ACTIVE,
+                }
+
+    def _schedules(self) -> Iterator[Dict[str, Any]]:
+        rng = self._rng('schedules')
+        per_route = self.scale.vehicles_per_route
+        routes = self._ids['routes']
+        for v, vehicle_id in enumerate(self._ids['vehicles']):
+            route_id = routes[v // per_route]
+            for _ in range(self.scale.schedules_per_vehicle):
+                minutes = rng.randrange(5 * 60, 23 * 60)
+                yield {
+                    'id': self._uuid(rng),
+                    'route_id': route_id,
+                    'vehicle_id': vehicle_id,
+                    'departure_time': time(minutes // 60, minutes % 60),
+                    'days_of_week': [0, 1, 2, 3, 4],
+                    'is_active': True,
+                }
+
+    def _tickets(self) -> Iterator[Dict[str, Any]]:
+        rng = self._rng('tickets')
+        agents = self._ids['agents']
+        routes = self._ids['routes']
+        stations = self._ids['stations']
+        for _ in range(self.scale.tickets):
+            purchased_at = self.epoch + timedelta(seconds=rng.randrange(30 * 86400))
+            used = rng.random() < 0.7
+            yield {
+                'id': self._uuid(rng),
+                'ticket_type': TicketType.SINGLE,
+                'status': TicketStatus.USED if used else TicketStatus.ACTIVE,
+                'agent_id': rng.choice(agents),
+                'route_id': rng.choice(routes),
+                'origin_station_id': rng.choice(stations),
+                'destination_station_id': rng.choice(stations),
+                'purchased_at': purchased_at,
+                'valid_from': purchased_at,
+                'valid_until': purchased_at + timedelta(hours=2),
+                'used_at': purchased_at + timedelta(minutes=10) if used else None,
+                'price': Decimal('4.40'),
+                'validation_count': 1 if used else 0,
+                'max_validations': 1,
+            }
+
+    # ---------- Execução ----------
+    def plan(self) -> List[tuple]:
+        """Ordem de gravação (respeita chaves estrangeiras)."""
+        return [
+            ('transport_operators', 'operators', self._operators),
+            ('buildings', 'buildings', self._buildings),
+            ('stations', 'stations', self._stations),
+            ('routes', 'routes', self._routes),
+            ('route_stations', None, self._route_stations),
+            ('agents', 'agents', self._agents),
+            ('vehicles', 'vehicles', self._vehicles),
+            ('schedules', None, self._schedules),
+            ('tickets', None, self._tickets),
+        ]
+
+    def generate(self, engine: Engine) -> GenerationReport:
+        """
+        Gera e grava a cidade numa única transação.
+
+        As tabelas devem existir (``Base.metadata.create_all``).
+
+        Returns:
+            GenerationReport com linhas e tempo por tabela
+        """
+        report = GenerationReport(seed=self.seed, scale=self.scale)
+        self._ids = {}
+        with engine.begin() as connection:
+            for table_name, keep_as, rows_fn in self.plan():
+                table = Base.metadata.tables[table_name]
+                rows = rows_fn()
+                if keep_as:
+                    rows = self._keep(keep_as, rows)
+                started = _time.perf_counter()
+                count = 0
+                for chunk in _chunks(rows, self.chunk_size):
+                    count += bulk_insert(connection, table, chunk)
+                report.rows[table_name] = count
+                report.seconds[table_name] = _time.perf_counter() - started
+        return report
+
+
+def generate_city(engine: Engine, scale: CityScale = None, seed: int = 42,
+                  chunk_size: int = 10_000) -> GenerationReport:
+    """Atalho para ``CityGenerator(scale, seed, chunk_size).generate(engine)``."""
+    return CityGenerator(scale, seed=seed, chunk_size=chunk_size).generate(engine)
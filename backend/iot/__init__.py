@@ -0,0 +1,20 @@
+"""
+Integração com o hardware da maquete (sensores e atuadores).
+"""
+
+from backend.iot.dispatcher import LedFrameWriter, SensorDispatcher, SensorIndex
+from backend.iot.ingestion import ReadingFilter, SensorIngestionService, SensorReading
+from backend.iot.led_frames import LedFrameScheduler
+from backend.iot.serial_sim import FakeLedDevice, SimulatedSerialPort
+
+__all__ = [
+    "FakeLedDevice",
+    "LedFrameScheduler",
+    "LedFrameWriter",
+    "ReadingFilter",
+    "SensorDispatcher",
+    "SensorIndex",
+    "SensorIngestionService",
+    "SensorReading",
+    "SimulatedSerialPort",
+]
@@ -0,0 +1,416 @@
+"""
+Ponte entre os sensores da maquete, a simulação e os LEDs.
+
+Fluxo::
+
+    leitura (SensorReading/SensorEvent) -> SensorIndex: sensor_id -> vínculos
+        -> estado em memória dos veículos (posição na rota, acoplamento)
+        -> estados de LED por led_pin -> um quadro por tick -> serial/MQTT
+
+Os vínculos vêm de ``Route.sensor_ids``; cada item da lista pode ser:
+
+- ``"reed_07"``: sensor de trilho; as posições são distribuídas
+  uniformemente ao longo da rota, na ordem da lista;
+- ``{"sensor_id": "reed_07", "position": 0.25, "station_id": "<uuid>",
+  "x": 10, "y": 4}``: posição explícita (0.0-1.0), estação opcional
+  (sensor de plataforma: 1 acopla o veículo, 0 desacopla) e coordenadas
+  opcionais do ponto.
+
+Leituras entram por ``enqueue`` (thread da fonte, ver
+``SensorIngestionService.add_listener``) e são aplicadas em ``tick()``
+(thread da simulação), que também envia o quadro de LEDs do tick
+(binário e com limite de banda, ver ``backend.iot.led_frames``). O estado
+alterado vai ao banco em lote com ``persist``.
+"""
+
+import threading
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from backend.database.models import Route, Station, Vehicle
+from backend.database.queries import VehicleQueries
+from backend.iot.led_frames import LedFrameScheduler
+from backend.utils.telemetry import telemetry
+from backend.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Sensores que indicam a passagem/presença de um veículo
+TRIGGER_SENSOR_TYPES = ('reed_switch', 'presence')
+ACTIVE_VALUES = frozenset({'1', 'true', 'on', 'high'})
+
+# Prioridade dos LEDs quando a banda serial não comporta todas as mudanças
+STATION_LED_PRIORITY = 2  # ocupação das plataformas
+VEHICLE_LED_PRIORITY = 1
+
+
+@dataclass(frozen=True)
+class SensorBinding:
+    """Onde um sensor físico está na maquete."""
+    sensor_id: str
+    route_id: uuid.UUID
+    position: float
+    station_id: Optional[uuid.UUID] = None
+    x: Optional[int] = None
+    y: Optional[int] = None
+
+
+@dataclass
+class VehicleState:
+    """Estado em memória de um veículo da maquete."""
+    id: uuid.UUID
+    route_id: uuid.UUID
+    position: float = 0.0
+    is_docked: bool = False
+    current_station_id: Optional[uuid.UUID] = None
+    is_moving: bool = False
+    current_x: Optional[int] = None
+    current_y: Optional[int] = None
+    led_pin: Optional[int] = None
+    last_sensor_id: Optional[str] = None
+    updated_at: Optional[datetime] = None
+
+    def to_row(self) -> Dict[str, Any]:
+        """Linha para ``VehicleQueries.update_states``."""
+        row = {
+            'id': self.id,
+            'is_docked': self.is_docked,
+            'current_station_id': self.current_station_id,
+            'is_moving': self.is_moving,
+            'current_x': self.current_x,
+            'current_y': self.current_y,
+        }
+        if self.is_docked:
+            row['speed'] = 0.0
+        return row
+
+
+def _as_uuid(value) -> Optional[uuid.UUID]:
+    if value is None or isinstance(value, uuid.UUID):
+        return value
+    return uuid.UUID(str(value))
+
+
+class SensorIndex:
+    """Índices pré-calculados: sensor -> vínculos, rota -> veículos, estação -> LED."""
+
+    def __init__(self):
+        self.bindings: Dict[str, Tuple[SensorBinding, ...]] = {}
+        self.vehicles: Dict[uuid.UUID, VehicleState] = {}
+        self.vehicles_by_route: Dict[uuid.UUID, List[VehicleState]] = {}
+        self.station_leds: Dict[uuid.UUID, int] = {}
+
+    @staticmethod
+    def parse_route_sensors(route_id: uuid.UUID, sensor_ids: Iterable) -> List[SensorBinding]:
+        """Converte ``Route.sensor_ids`` em vínculos (itens inválidos são ignorados)."""
+        items = list(sensor_ids or [])
+        step = 1.0 / len(items) if items else 0.0
+        bindings = []
+        for i, item in enumerate(items):
+            if isinstance(item, str):
+                bindings.append(SensorBinding(item, route_id, i * step))
+            elif isinstance(item, dict) and item.get('sensor_id'):
+                try:
+                    bindings.append(SensorBinding(
+                        sensor_id=str(item['sensor_id']),
+                        route_id=route_id,
+                        position=float(item.get('position', i * step)) % 1.0,
+                        station_id=_as_uuid(item.get('station_id')),
+                        x=item.get('x'),
+                        y=item.get('y'),
+                    ))
+                except (TypeError, ValueError):
+                    logger.warning("Sensor inválido na rota %s: %r", route_id, item)
+            else:
+                logger.warning("Sensor inválido na rota %s: %r", route_id, item)
+        return bindings
+
+    def add_route(self, route_id: uuid.UUID, sensor_ids: Iterable) -> None:
+        for binding in self.parse_route_sensors(route_id, sensor_ids):
+            self.bindings[binding.sensor_id] = self.bindings.get(binding.sensor_id, ()) + (binding,)
+
+    def add_vehicle(self, state: VehicleState) -> None:
+        self.vehicles[state.id] = state
+        self.vehicles_by_route.setdefault(state.route_id, []).append(state)
+
+    def add_station_led(self, station_id: uuid.UUID, led_pin: int) -> None:
+        self.station_leds[station_id] = led_pin
+
+    def resolve(self, sensor_id: str) -> Tuple[SensorBinding, ...]:
+        return self.bindings.get(sensor_id, ())
+
+    @classmethod
+    def build(cls, session: Session) -> 'SensorIndex':
+        """Monta os índices com três consultas (rotas, veículos, estações com LED)."""
+        index = cls()
+        for route_id, sensor_ids in session.query(Route.id, Route.sensor_ids):
+            if sensor_ids:
+                index.add_route(route_id, sensor_ids)
+
+        route_id = func.coalesce(Vehicle.current_route_id, Vehicle.assigned_route_id, Vehicle.route_id)
+        vehicles = session.query(
+            Vehicle.id, route_id, Vehicle.is_docked, Vehicle.current_station_id,
+            Vehicle.is_moving, Vehicle.current_x, Vehicle.current_y, Vehicle.has_led, Vehicle.led_pin
+        ).filter(route_id.isnot(None))
+        for vid, rid, docked, station_id, moving, x, y, has_led, led_pin in vehicles:
+            index.add_vehicle(VehicleState(
+                id=vid, route_id=_as_uuid(rid), is_docked=bool(docked),
+                current_station_id=station_id if docked else None, is_moving=bool(moving),
+                current_x=x, current_y=y, led_pin=led_pin if has_led else None,
+            ))
+
+        stations = session.query(Station.id, Station.led_pin).filter(
+            Station.has_led == True,  # noqa: E712
+            Station.led_pin.isnot(None)
+        )
+        for station_id, led_pin in stations:
+            index.add_station_led(station_id, led_pin)
+        return index
+
+
+class LedFrameWriter:
+    """
+    Acumula estados de LED por pino e envia um quadro de texto por tick
+    (protocolo legível, para depuração; o padrão é ``LedFrameScheduler``).
+
+    Quadro: ``L <pino>=<0|1> <pino>=<0|1>...\\n`` apenas com os pinos cujo
+    estado difere do último enviado; várias mudanças do mesmo pino no tick
+    viram uma só.
+
+    Args:
+        write: Destino dos quadros (ex: ``SerialSource.write``); sem
+            destino os quadros só são contados
+    """
+
+    def __init__(self, write: Optional[Callable[[bytes], Any]] = None):
+        self.write = write
+        self.frames_sent = 0
+        self.commands_sent = 0
+        self._desired: Dict[int, bool] = {}
+        self._sent: Dict[int, bool] = {}
+
+    def set(self, pin: int, on: bool, priority: int = 0) -> None:
+        self._desired[pin] = bool(on)
+
+    def pending(self) -> Dict[int, bool]:
+        """Mudanças que sairiam no próximo quadro."""
+        return {pin: on for pin, on in self._desired.items() if self._sent.get(pin) != on}
+
+    def reset(self) -> None:
+        """Esquece o que foi enviado (o próximo quadro reenvia todos os pinos definidos)."""
+        self._sent.clear()
+
+    @staticmethod
+    def encode(changes: Dict[int, bool]) -> bytes:
+        return ('L ' + ' '.join(f"{pin}={int(on)}" for pin, on in sorted(changes.items())) + '\n').encode('ascii')
+
+    def flush(self) -> Optional[bytes]:
+        """Envia o quadro do tick; None se nada mudou."""
+        changes = self.pending()
+        self._desired.clear()
+        if not changes:
+            return None
+        frame = self.encode(changes)
+        if self.write is not None:
+            self.write(frame)
+        self._sent.update(changes)
+        self.frames_sent += 1
+        self.commands_sent += len(changes)
+        return frame
+
+
+class SensorDispatcher:
+    """
+    Aplica leituras de sensores ao estado dos veículos e aos LEDs.
+
+    Args:
+        index: Índices pré-calculados (``SensorIndex.build``)
+        leds: Saída dos quadros de LED (``LedFrameScheduler`` ou
+            ``LedFrameWriter``)
+    """
+
+    def __init__(self, index: SensorIndex, leds=None):
+        self.index = index
+        self.leds = leds if leds is not None else LedFrameScheduler()
+        self._queue: Deque[Any] = deque()
+        self._dirty: Dict[uuid.UUID, VehicleState] = {}
+        self._docked: Dict[uuid.UUID, int] = {}
+        for vehicle in index.vehicles.values():
+            if vehicle.is_docked and vehicle.current_station_id is not None:
+                self._docked[vehicle.current_station_id] = self._docked.get(vehicle.current_station_id, 0) + 1
+        self._lock = threading.Lock()
+        self._stats = {'received': 0, 'applied': 0, 'unmapped': 0, 'ignored': 0, 'unmatched': 0}
+
+    @classmethod
+    def from_session(cls, session: Session, write: Optional[Callable[[bytes], Any]] = None,
+                     leds=None) -> 'SensorDispatcher':
+        """Monta o índice do banco; sem ``leds``, usa ``LedFrameScheduler(write)``."""
+        return cls(SensorIndex.build(session), leds if leds is not None else LedFrameScheduler(write))
+
+    # ---------- Entrada ----------
+    def enqueue(self, reading) -> None:
+        """Recebe uma leitura de qualquer thread; aplicada no próximo ``tick()``."""
+        self._queue.append(reading)
+
+    def tick(self) -> int:
+        """
+        Aplica as leituras recebidas desde o último tick e envia o quadro de LEDs.
+
+        Returns:
+            Número de leituras que alteraram algum veículo
+        """
+        applied = 0
+        with telemetry.phase('sensor_dispatch', len(self._queue)):
+            while self._queue:
+                if self.dispatch(self._queue.popleft()):
+                    applied += 1
+            self.leds.flush()
+        return applied
+
+    def handle_events(self, events: Iterable) -> None:
+        """Handler para ``SensorIngestionService.process_pending``."""
+        for event in events:
+            self.dispatch(event)
+        self.leds.flush()
+
+    # ---------- Aplicação ----------
+    def dispatch(self, reading) -> bool:
+        """
+        Aplica uma leitura imediatamente (``sensor_id``, ``sensor_type``,
+        ``value`` e ``timestamp``, como SensorReading ou SensorEvent).
+
+        Returns:
+            True se algum veículo mudou de estado
+        """
+        with self._lock:
+            self._stats['received'] += 1
+            bindings = self.index.resolve(reading.sensor_id)
+            if not bindings:
+                self._stats['unmapped'] += 1
+                return False
+            if reading.sensor_type not in TRIGGER_SENSOR_TYPES:
+                self._stats['ignored'] += 1
+                return False
+
+            active = str(reading.value).strip().lower() in ACTIVE_VALUES
+            when = getattr(reading, 'timestamp', None) or datetime.utcnow()
+            changed = False
+            for binding in bindings:
+                changed = self._apply(binding, active, when) or changed
+            self._stats['applied' if changed else 'unmatched'] += 1
+            return changed
+
+    def _apply(self, binding: SensorBinding, active: bool, when: datetime) -> bool:
+        vehicles = self.index.vehicles_by_route.get(binding.route_id, ())
+        if not active:
+            # Sensor de plataforma liberado: o veículo acoplado parte
+            if binding.station_id is None:
+                return False
+            vehicle = next((v for v in vehicles
+                            if v.is_docked and v.current_station_id == binding.station_id), None)
+            if vehicle is None:
+                return False
+            self._undock(vehicle)
+            vehicle.is_moving = True
+            self._touch(vehicle, binding, when)
+            return True
+
+        vehicle = self._approaching(binding, vehicles)
+        if vehicle is None:
+            return False
+        vehicle.position = binding.position
+        if binding.x is not None and binding.y is not None:
+            vehicle.current_x, vehicle.current_y = binding.x, binding.y
+        if binding.station_id is not None:
+            if vehicle.current_station_id != binding.station_id:
+                self._undock(vehicle)
+                vehicle.is_docked = True
+                vehicle.current_station_id = binding.station_id
+                self._docked[binding.station_id] = self._docked.get(binding.station_id, 0) + 1
+                self._station_led(binding.station_id)
+            vehicle.is_moving = False
+        else:
+            self._undock(vehicle)
+            vehicle.is_moving = True
+        self._touch(vehicle, binding, when)
+        return True
+
+    @staticmethod
+    def _approaching(binding: SensorBinding, vehicles) -> Optional[VehicleState]:
+        """
+        Veículo que acabou de passar pelo sensor: o mais próximo atrás dele
+        na rota (circular). Veículos acoplados em outra estação só contam se
+        nenhum estiver em movimento.
+        """
+        if not vehicles:
+            return None
+        if binding.station_id is not None:
+            for vehicle in vehicles:
+                if vehicle.is_docked and vehicle.current_station_id == binding.station_id:
+                    return vehicle
+        candidates = [v for v in vehicles if not v.is_docked] or list(vehicles)
+        # Distância 0 = veículo que já passou por este sensor: volta inteira
+        return min(candidates, key=lambda v: ((binding.position - v.position) % 1.0) or 1.0)
+
+    def _undock(self, vehicle: VehicleState) -> None:
+        station_id = vehicle.current_station_id
+        vehicle.is_docked = False
+        vehicle.current_station_id = None
+        if station_id is not None:
+            self._docked[station_id] = max(0, self._docked.get(station_id, 0) - 1)
+            self._station_led(station_id)
+
+    def _touch(self, vehicle: VehicleState, binding: SensorBinding, when: datetime) -> None:
+        vehicle.last_sensor_id = binding.sensor_id
+        vehicle.updated_at = when
+        self._dirty[vehicle.id] = vehicle
+        if vehicle.led_pin is not None:
+            self.leds.set(vehicle.led_pin, vehicle.is_moving, VEHICLE_LED_PRIORITY)
+
+    def _station_led(self, station_id: uuid.UUID) -> None:
+        pin = self.index.station_leds.get(station_id)
+        if pin is not None:
+            self.leds.set(pin, self._docked.get(station_id, 0) > 0, STATION_LED_PRIORITY)
+
+    def sync_leds(self) -> Optional[bytes]:
+        """Reenvia o estado de todos os LEDs (ex: após reconectar o hardware)."""
+        with self._lock:
+            self.leds.reset()
+            for station_id in self.index.station_leds:
+                self._station_led(station_id)
+            for vehicle in self.index.vehicles.values():
+                if vehicle.led_pin is not None:
+                    self.leds.set(vehicle.led_pin, vehicle.is_moving, VEHICLE_LED_PRIORITY)
+            return self.leds.flush()
+
+    # ---------- Consulta e persistência ----------
+    def vehicle(self, vehicle_id: uuid.UUID) -> Optional[VehicleState]:
+        return self.index.vehicles.get(vehicle_id)
+
+    def docked_count(self, station_id: uuid.UUID) -> int:
+        return self._docked.get(station_id, 0)
+
+    def persist(self, session: Session) -> int:
+        """
+        Grava os veículos alterados com um UPDATE em lote. Não realiza
+        commit; responsabilidade do chamador.
+
+        Returns:
+            Número de veículos gravados
+        """
+        with self._lock:
+            dirty, self._dirty = list(self._dirty.values()), {}
+        return VehicleQueries(session).update_states([v.to_row() for v in dirty])
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update(queued=len(self._queue), dirty=len(self._dirty),
+                     led_frames=self.leds.frames_sent, led_commands=self.leds.commands_sent)
+        return stats
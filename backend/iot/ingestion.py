@@ -0,0 +1,436 @@
+"""
+Ingestão em lote de leituras de sensores da maquete.
+
+Fluxo::
+
+    fonte (serial/MQTT) -> submit() -> debounce/dedup -> buffer
+        -> flush() em lote (COPY/executemany) -> sensor_events (processed=False)
+        -> process_pending(handler) -> processed=True
+
+``submit`` é thread-safe e barato (roda no thread da fonte); o flush
+acontece quando o buffer atinge ``batch_size`` ou a cada
+``flush_interval`` segundos, no thread de background iniciado por
+``start()``.
+"""
+
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.exc import DataError, IntegrityError
+
+from backend.database.models import SensorEvent
+from backend.database.queries import SensorEventQueries
+from backend.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+REED_SWITCH = 'reed_switch'
+
+
+@dataclass
+class SensorReading:
+    """
+    Uma leitura recebida de um sensor.
+
+    ``timestamp`` é a hora de captura quando o dispositivo a envia (ISO) ou a
+    hora de chegada no host; ``device_ms`` é o relógio do dispositivo em
+    milissegundos (ex: ``millis()`` do Arduino), quando enviado.
+    """
+    sensor_id: str
+    sensor_type: str
+    reading_type: str
+    value: str
+    unit: Optional[str] = None
+    timestamp: datetime = field(default_factory=datetime.utcnow)
+    context: Dict[str, Any] = field(default_factory=dict)
+    device_ms: Optional[int] = None
+
+    def to_row(self) -> Dict[str, Any]:
+        """Linha pronta para ``SensorEventQueries.insert_batch``."""
+        context = self.context
+        if self.device_ms is not None:
+            context = {**context, 'device_ms': self.device_ms}
+        return {
+            'id': uuid.uuid4(),
+            'sensor_id': self.sensor_id,
+            'sensor_type': self.sensor_type,
+            'reading_type': self.reading_type,
+            'value': str(self.value),
+            'unit': self.unit,
+            'processed': False,
+            'processed_at': None,
+            'context': context,
+            'timestamp': self.timestamp,
+        }
+
+
+class ReadingFilter:
+    """
+    Descarta leituras redundantes antes do buffer.
+
+    - Reed switches: ignora a repetição do último estado aceito e qualquer
+      mudança dentro de ``debounce_ms`` da última mudança aceita (trepidação
+      do contato ao passar o ímã). A última leitura descartada pelo tempo
+      fica pendente: se ao fim da janela o contato ainda estiver nela
+      (diferente do estado aceito), ``settle`` a libera. Assim uma borda
+      real dentro da janela não se perde nem deixa o sensor preso no
+      estado errado.
+    - Demais sensores: ignora duplicatas exatas (mesmo valor e timestamp).
+
+    Os intervalos usam a hora de captura: com ``device_ms`` o relógio do
+    dispositivo (ancorado na chegada da primeira leitura do sensor e
+    reancorado se o contador voltar, ex: reset da placa); senão
+    ``timestamp``. Rajadas do buffer serial e ``--replay`` chegam juntas ao
+    host, mas as bordas mantêm o espaçamento real.
+    """
+
+    def __init__(self, debounce_ms: float = 30.0):
+        self.debounce = timedelta(milliseconds=debounce_ms)
+        # {(sensor_id, reading_type): (valor, hora de captura da última aceita)}
+        self._last: Dict[Tuple[str, str], Tuple[str, datetime]] = {}
+        # {(sensor_id, reading_type): (última leitura descartada pela janela, captura)}
+        self._pending: Dict[Tuple[str, str], Tuple[SensorReading, datetime]] = {}
+        # {(sensor_id, reading_type): (hora do device_ms 0, último device_ms)}
+        self._anchors: Dict[Tuple[str, str], Tuple[datetime, int]] = {}
+
+    def captured_at(self, reading: SensorReading) -> datetime:
+        """Hora de captura da leitura, na escala do host."""
+        if reading.device_ms is None:
+            return reading.timestamp
+        key = (reading.sensor_id, reading.reading_type)
+        anchor = self._anchors.get(key)
+        if anchor is None or reading.device_ms < anchor[1]:
+            origin = reading.timestamp - timedelta(milliseconds=reading.device_ms)
+        else:
+            origin = anchor[0]
+        self._anchors[key] = (origin, reading.device_ms)
+        return origin + timedelta(milliseconds=reading.device_ms)
+
+    def accept(self, reading: SensorReading) -> bool:
+        key = (reading.sensor_id, reading.reading_type)
+        value = str(reading.value)
+        captured = self.captured_at(reading)
+        last = self._last.get(key)
+        if last is not None:
+            last_value, last_time = last
+            if reading.sensor_type == REED_SWITCH:
+                if value == last_value:
+                    self._pending.pop(key, None)  # trepidação voltou ao estado aceito
+                    return False
+                if captured - last_time < self.debounce:
+                    self._pending[key] = (reading, captured)
+                    return False
+            elif value == last_value and captured == last_time:
+                return False
+        self._pending.pop(key, None)
+        self._last[key] = (value, captured)
+        return True
+
+    def settle(self, now: datetime, force: bool = False) -> List[SensorReading]:
+        """
+        Libera as leituras pendentes cuja janela de debounce já terminou.
+
+        Args:
+            now: Hora atual do host
+            force: Considera todas as janelas encerradas (fim da fonte, ex:
+                ``--replay``, cujas horas de captura podem passar de ``now``)
+
+        Returns:
+            Leituras aceitas agora (estado final do contato após a trepidação)
+        """
+        settled = []
+        for key, (reading, captured) in list(self._pending.items()):
+            last_value, last_time = self._last[key]
+            if not force and now - last_time < self.debounce:
+                continue
+            del self._pending[key]
+            if str(reading.value) != last_value:
+                self._last[key] = (str(reading.value), captured)
+                settled.append(reading)
+        return settled
+
+    def reset(self) -> None:
+        self._last.clear()
+        self._pending.clear()
+        self._anchors.clear()
+
+
+class SensorIngestionService:
+    """
+    Serviço de ingestão de leituras.
+
+    Args:
+        session_factory: Callable que retorna uma Session (ex:
+            ``db_manager.get_session``)
+        batch_size: Leituras por INSERT em lote
+        flush_interval: Intervalo máximo (s) entre flushes no modo background
+        queue_size: Capacidade do buffer; excedentes são descartados e contados
+        debounce_ms: Janela de debounce dos reed switches
+        max_retries: Falhas seguidas do lote da frente antes de separá-lo em
+            ``dead_letter`` (erros de dados separam as linhas ruins na hora)
+    """
+
+    def __init__(self, session_factory: Callable, batch_size: int = 500,
+                 flush_interval: float = 0.5, queue_size: int = 10000,
+                 debounce_ms: float = 30.0, max_retries: int = 3):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue_size = queue_size
+        self.max_retries = max(1, max_retries)
+        # Leituras que o banco recusou (inspeção/reprocessamento manual)
+        self.dead_letter: Deque[SensorReading] = deque(maxlen=queue_size)
+        self._failures = 0
+        self.filter = ReadingFilter(debounce_ms)
+        self._buffer: Deque[SensorReading] = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._listeners: List[Callable[[SensorReading], None]] = []
+        self._stats = {
+            'received': 0, 'debounced': 0, 'settled': 0, 'dropped': 0,
+            'inserted': 0, 'batches': 0, 'processed': 0, 'errors': 0,
+            'dead_lettered': 0,
+        }
+
+    @classmethod
+    def from_config(cls, iot_config, session_factory: Callable) -> 'SensorIngestionService':
+        """Cria o serviço a partir de ``IoTConfig``."""
+        return cls(
+            session_factory,
+            batch_size=iot_config.ingest_batch_size,
+            flush_interval=iot_config.ingest_flush_interval,
+            queue_size=iot_config.ingest_queue_size,
+            debounce_ms=iot_config.reed_debounce_ms,
+            max_retries=iot_config.ingest_max_retries,
+        )
+
+    # ---------- Entrada ----------
+    def add_listener(self, callback: Callable[[SensorReading], None]) -> None:
+        """
+        Registra um callback chamado com cada leitura que entrou no buffer,
+        antes da gravação (ex: ``SensorDispatcher.enqueue``). Leituras
+        descartadas pelo filtro ou por falta de capacidade não são
+        notificadas, para o estado aplicado bater com o gravado. Roda no
+        thread da fonte; deve ser barato.
+        """
+        self._listeners.append(callback)
+
+    def submit(self, reading: SensorReading) -> bool:
+        """
+        Recebe uma leitura (thread-safe).
+
+        Returns:
+            True se a leitura entrou no buffer
+        """
+        with self._lock:
+            self._stats['received'] += 1
+            if not self.filter.accept(reading):
+                self._stats['debounced'] += 1
+                return False
+            buffered = len(self._buffer) < self.queue_size
+            if buffered:
+                self._buffer.append(reading)
+            else:
+                self._stats['dropped'] += 1
+            full = len(self._buffer) >= self.batch_size
+        if buffered:
+            for listener in self._listeners:
+                listener(reading)
+        if full:
+            self._wakeup.set()
+        return buffered
+
+    def settle(self, now: Optional[datetime] = None, force: bool = False) -> int:
+        """
+        Aceita os estados finais de reed switches que terminaram a janela
+        de debounce (chamado a cada ``flush``; ``force`` no fim da fonte).
+
+        Returns:
+            Quantas leituras entraram no buffer
+        """
+        with self._lock:
+            settled = self.filter.settle(now or datetime.utcnow(), force)
+            self._stats['settled'] += len(settled)
+            buffered = []
+            for reading in settled:
+                if len(self._buffer) < self.queue_size:
+                    self._buffer.append(reading)
+                    buffered.append(reading)
+                else:
+                    self._stats['dropped'] += 1
+        for reading in buffered:
+            for listener in self._listeners:
+                listener(reading)
+        return len(buffered)
+
+    def submit_many(self, readings: Iterable[SensorReading]) -> int:
+        """Recebe várias leituras; retorna quantas entraram no buffer."""
+        return sum(1 for reading in readings if self.submit(reading))
+
+    @property
+    def pending(self) -> int:
+        """Leituras no buffer aguardando flush."""
+        return len(self._buffer)
+
+    # ---------- Gravação ----------
+    def flush(self) -> int:
+        """
+        Grava o buffer no banco em lotes de ``batch_size``.
+
+        Em caso de erro transitório o lote volta para o início do buffer
+        (até a capacidade) e o erro é registrado; após ``max_retries``
+        falhas seguidas o lote vai para ``dead_letter``. Erros de dados
+        (``IntegrityError``/``DataError``) não se resolvem repetindo: o lote
+        é dividido ao meio até isolar as leituras recusadas, e só elas vão
+        para ``dead_letter``. Assim uma linha ruim não trava a ingestão.
+
+        Returns:
+            Número de leituras gravadas
+        """
+        self.settle()
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = [self._buffer.popleft()
+                             for _ in range(min(self.batch_size, len(self._buffer)))]
+                if not batch:
+                    break
+
+                try:
+                    self._insert(batch)
+                except (IntegrityError, DataError) as e:
+                    logger.error("Lote de %d leituras recusado pelo banco: %s", len(batch), e)
+                    self._failures = 0
+                    written += self._salvage(batch)
+                    continue
+                except Exception as e:
+                    self._failures += 1
+                    logger.error("Falha ao gravar %d leituras de sensores (tentativa %d/%d): %s",
+                                 len(batch), self._failures, self.max_retries, e)
+                    if self._failures >= self.max_retries:
+                        self._failures = 0
+                        self._reject(batch)
+                        continue
+                    with self._lock:
+                        room = max(0, self.queue_size - len(self._buffer))
+                        self._buffer.extendleft(reversed(batch[:room]))
+                        self._stats['dropped'] += len(batch) - min(room, len(batch))
+                    break
+
+                self._failures = 0
+                written += len(batch)
+        return written
+
+    def _insert(self, batch: List[SensorReading]) -> None:
+        """Grava um lote numa transação própria (desfeita em caso de erro)."""
+        session = self.session_factory()
+        try:
+            SensorEventQueries(session).insert_batch([r.to_row() for r in batch])
+            session.commit()
+        except Exception:
+            session.rollback()
+            with self._lock:
+                self._stats['errors'] += 1
+            raise
+        finally:
+            session.close()
+        with self._lock:
+            self._stats['inserted'] += len(batch)
+            self._stats['batches'] += 1
+
+    def _salvage(self, batch: List[SensorReading]) -> int:
+        """Bisseção de um lote recusado: grava as metades boas, separa as leituras ruins."""
+        if len(batch) == 1:
+            self._reject(batch)
+            return 0
+        written = 0
+        middle = len(batch) // 2
+        for half in (batch[:middle], batch[middle:]):
+            try:
+                self._insert(half)
+                written += len(half)
+            except Exception:
+                written += self._salvage(half)
+        return written
+
+    def _reject(self, batch: List[SensorReading]) -> None:
+        with self._lock:
+            self.dead_letter.extend(batch)
+            self._stats['dead_lettered'] += len(batch)
+        logger.warning("%d leituras de sensores movidas para a fila de rejeitados", len(batch))
+
+    def process_pending(self, handler: Callable[[List[SensorEvent]], None],
+                        limit: int = 500, sensor_type: Optional[str] = None) -> int:
+        """
+        Entrega leituras não processadas ao ``handler`` e marca como processadas.
+
+        Se o handler falhar, a transação é desfeita e as leituras continuam
+        pendentes.
+
+        Returns:
+            Número de leituras processadas
+        """
+        session = self.session_factory()
+        try:
+            queries = SensorEventQueries(session)
+            events = queries.get_pending(limit=limit, sensor_type=sensor_type)
+            if not events:
+                session.rollback()
+                return 0
+            handler(events)
+            queries.mark_processed([e.id for e in events])
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+        with self._lock:
+            self._stats['processed'] += len(events)
+        return len(events)
+
+    # ---------- Background ----------
+    def start(self) -> None:
+        """Inicia o thread de flush periódico."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='sensor-ingestion', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Para o thread e grava o que restou no buffer (inclusive bordas pendentes)."""
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.settle(force=True)
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:  # o thread não pode morrer
+                logger.error("Erro no flush de sensores: %s", e)
+                time.sleep(self.flush_interval)
+
+    def stats(self) -> Dict[str, int]:
+        """Contadores de ingestão."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['buffered'] = len(self._buffer)
+        return stats
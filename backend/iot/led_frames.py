@@ -0,0 +1,264 @@
+"""
+Quadros binários de LED e agendador de saída para a serial da maquete.
+
+A 115200 bauds cabem ~11.5 KB/s (10 bits por byte). Um comando de texto por
+mudança de LED satura o link em cenas movimentadas; aqui as mudanças de um
+tick viram um único quadro binário com bitmaps por ``led_pin``::
+
+    0xA5 | seq | primeiro | n | máscara[n] | estados[n] | xor
+
+- ``primeiro``/``n``: faixa de bytes de pinos coberta (byte k = pinos
+  8k..8k+7, bit 0 = pino 8k);
+- ``máscara``: bits dos pinos que mudam neste quadro;
+- ``estados``: novo estado (1 = aceso) dos pinos da máscara;
+- ``xor``: XOR de ``seq`` até o último byte de ``estados``.
+
+``LedFrameScheduler`` limita a taxa com um token bucket na fração
+configurada da banda serial; quando o orçamento não cobre todas as
+mudanças pendentes, as de maior prioridade (mais o envelhecimento, para
+não haver inanição) saem primeiro e as demais esperam o próximo tick.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+SYNC = 0xA5
+HEADER_BYTES = 4  # sync, seq, primeiro, n
+MAX_SPAN = 255  # bytes de pinos por quadro (pinos 0..2039)
+
+
+def frame_size(pins) -> int:
+    """Tamanho em bytes do quadro que carrega ``pins``."""
+    if not pins:
+        return 0
+    return HEADER_BYTES + 2 * (max(pins) // 8 - min(pins) // 8 + 1) + 1
+
+
+def encode_frame(changes: Dict[int, bool], seq: int = 0) -> bytes:
+    """Codifica ``{pino: aceso}`` em um quadro."""
+    if not changes:
+        raise ValueError("Quadro sem mudanças")
+    first = min(changes) // 8
+    n = max(changes) // 8 - first + 1
+    if min(changes) < 0 or n > MAX_SPAN:
+        raise ValueError(f"Pinos fora da faixa de um quadro: {min(changes)}..{max(changes)}")
+    mask = bytearray(n)
+    states = bytearray(n)
+    for pin, on in changes.items():
+        index, bit = pin // 8 - first, 1 << (pin % 8)
+        mask[index] |= bit
+        if on:
+            states[index] |= bit
+    body = bytes([seq & 0xFF, first, n]) + bytes(mask) + bytes(states)
+    checksum = 0
+    for byte in body:
+        checksum ^= byte
+    return bytes([SYNC]) + body + bytes([checksum])
+
+
+def decode_frame(frame: bytes) -> Tuple[int, Dict[int, bool]]:
+    """
+    Decodifica um quadro completo.
+
+    Returns:
+        (seq, {pino: aceso})
+
+    Raises:
+        ValueError: Se o quadro estiver truncado ou corrompido
+    """
+    if len(frame) < HEADER_BYTES + 1 or frame[0] != SYNC:
+        raise ValueError("Quadro inválido")
+    seq, first, n = frame[1], frame[2], frame[3]
+    if len(frame) != HEADER_BYTES + 2 * n + 1:
+        raise ValueError("Tamanho de quadro inválido")
+    checksum = 0
+    for byte in frame[1:-1]:
+        checksum ^= byte
+    if checksum != frame[-1]:
+        raise ValueError("Checksum inválido")
+    mask = frame[HEADER_BYTES:HEADER_BYTES + n]
+    states = frame[HEADER_BYTES + n:HEADER_BYTES + 2 * n]
+    changes = {}
+    for index in range(n):
+        for bit in range(8):
+            if mask[index] & (1 << bit):
+                changes[(first + index) * 8 + bit] = bool(states[index] & (1 << bit))
+    return seq, changes
+
+
+class FrameDecoder:
+    """Decodificador incremental (lado do dispositivo): ressincroniza em 0xA5."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self.errors = 0
+
+    def feed(self, data: bytes) -> List[Tuple[int, Dict[int, bool]]]:
+        """Acrescenta bytes recebidos; retorna os quadros completos."""
+        self._buffer.extend(data)
+        frames = []
+        while True:
+            start = self._buffer.find(SYNC)
+            if start < 0:
+                self._buffer.clear()
+                break
+            del self._buffer[:start]
+            if len(self._buffer) < HEADER_BYTES:
+                break
+            size = HEADER_BYTES + 2 * self._buffer[3] + 1
+            if len(self._buffer) < size:
+                break
+            try:
+                frames.append(decode_frame(bytes(self._buffer[:size])))
+                del self._buffer[:size]
+            except ValueError:
+                # Falso sync no meio de dados: descarta um byte e procura de novo
+                self.errors += 1
+                del self._buffer[:1]
+        return frames
+
+
+@dataclass
+class _PendingChange:
+    on: bool
+    priority: int
+    since: int
+
+
+class LedFrameScheduler:
+    """
+    Agenda as mudanças de LED em quadros binários dentro do orçamento serial.
+
+    Mesma interface de ``LedFrameWriter`` (``set``/``pending``/``reset``/
+    ``flush``), para uso em ``SensorDispatcher``.
+
+    Args:
+        write: Destino dos quadros (ex: ``SerialSource.write``)
+        baud_rate: Velocidade da serial
+        bandwidth_share: Fração da banda reservada aos LEDs (0-1)
+        max_frame_bytes: Tamanho máximo de um quadro
+        burst_seconds: Tokens acumuláveis, em segundos de banda
+        aging_ticks: A cada quantos ticks de espera uma mudança ganha +1
+            de prioridade
+        clock: Relógio monotônico (injetável em testes)
+    """
+
+    def __init__(self, write: Optional[Callable[[bytes], Any]] = None, baud_rate: int = 115200,
+                 bandwidth_share: float = 0.5, max_frame_bytes: int = 64,
+                 burst_seconds: float = 0.1, aging_ticks: int = 10,
+                 clock: Callable[[], float] = time.monotonic):
+        if max_frame_bytes < frame_size([0]):
+            raise ValueError(f"max_frame_bytes deve ser >= {frame_size([0])}")
+        self.write = write
+        self.bytes_per_second = baud_rate / 10.0 * bandwidth_share
+        self.max_frame_bytes = max_frame_bytes
+        self.capacity = max(float(max_frame_bytes), self.bytes_per_second * burst_seconds)
+        self.aging_ticks = max(1, aging_ticks)
+        self.clock = clock
+        self.tokens = self.capacity
+        self._last_refill = clock()
+        self._tick = 0
+        self._seq = 0
+        self._pending: Dict[int, _PendingChange] = {}
+        self._sent: Dict[int, bool] = {}
+        self.frames_sent = 0
+        self.commands_sent = 0
+        self.bytes_sent = 0
+        self.deferred_ticks = 0
+
+    @classmethod
+    def from_config(cls, iot_config, write: Optional[Callable[[bytes], Any]] = None) -> 'LedFrameScheduler':
+        """Cria o agendador a partir de ``IoTConfig``."""
+        return cls(
+            write,
+            baud_rate=iot_config.baud_rate,
+            bandwidth_share=iot_config.led_bandwidth_share,
+            max_frame_bytes=iot_config.led_max_frame_bytes,
+        )
+
+    # ---------- Entrada ----------
+    def set(self, pin: int, on: bool, priority: int = 0) -> None:
+        """Pede um estado para o pino; mudanças repetidas no mesmo pino se fundem."""
+        on = bool(on)
+        if self._sent.get(pin) == on:
+            self._pending.pop(pin, None)
+            return
+        change = self._pending.get(pin)
+        if change is None:
+            self._pending[pin] = _PendingChange(on, priority, self._tick)
+        else:
+            change.on = on
+            change.priority = max(change.priority, priority)
+
+    def pending(self) -> Dict[int, bool]:
+        return {pin: change.on for pin, change in self._pending.items()}
+
+    def reset(self) -> None:
+        """Esquece o que foi enviado (o próximo quadro reenvia os pinos definidos)."""
+        self._sent.clear()
+
+    # ---------- Saída ----------
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._last_refill) * self.bytes_per_second)
+        self._last_refill = now
+
+    def _select(self, budget: float) -> Dict[int, bool]:
+        """Escolhe as mudanças do quadro: maior prioridade efetiva primeiro."""
+        def effective(item):
+            pin, change = item
+            return (-(change.priority + (self._tick - change.since) // self.aging_ticks), change.since, pin)
+
+        chosen: Dict[int, bool] = {}
+        low = high = None
+        for pin, change in sorted(self._pending.items(), key=effective):
+            lo, hi = (pin, pin) if low is None else (min(low, pin), max(high, pin))
+            if hi // 8 - lo // 8 + 1 > MAX_SPAN or frame_size((lo, hi)) > budget:
+                continue
+            chosen[pin] = change.on
+            low, high = lo, hi
+        return chosen
+
+    def flush(self) -> Optional[bytes]:
+        """
+        Envia o quadro do tick dentro do orçamento; o que não couber fica
+        pendente para os próximos ticks.
+
+        Returns:
+            Quadro enviado, ou None se nada saiu
+        """
+        self._tick += 1
+        self._refill()
+        if not self._pending:
+            return None
+        changes = self._select(min(self.tokens, self.max_frame_bytes))
+        if not changes:
+            self.deferred_ticks += 1
+            return None
+
+        frame = encode_frame(changes, self._seq)
+        self._seq = (self._seq + 1) & 0xFF
+        if self.write is not None:
+            self.write(frame)
+        self.tokens -= len(frame)
+        for pin, on in changes.items():
+            del self._pending[pin]
+            self._sent[pin] = on
+        if self._pending:
+            self.deferred_ticks += 1
+        self.frames_sent += 1
+        self.commands_sent += len(changes)
+        self.bytes_sent += len(frame)
+        return frame
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'frames': self.frames_sent,
+            'commands': self.commands_sent,
+            'bytes': self.bytes_sent,
+            'pending': len(self._pending),
+            'deferred_ticks': self.deferred_ticks,
+            'tokens': round(self.tokens, 1),
+            'bytes_per_second': self.bytes_per_second,
+        }
@@ -0,0 +1,194 @@
+"""
+Porta serial simulada para testes e demonstrações sem o Arduino.
+
+``SimulatedSerialPort`` implementa o subconjunto de ``serial.Serial``
+usado pelo projeto (``readline``, ``write``, ``in_waiting``, ``close``):
+linhas injetadas com ``feed`` são lidas como se viessem da maquete e
+tudo que é escrito fica disponível em ``written``.
+
+``open_serial_port`` escolhe a implementação pelo nome da porta: nomes
+``sim://...`` (ex: ``iot.serial_port: "sim://maquete"``) abrem a porta
+simulada; os demais, ``serial.Serial`` do pyserial.
+
+``FakeLedDevice`` vai um nível abaixo: cria um pseudo-terminal (POSIX) e
+faz o papel do Arduino do outro lado, decodificando os quadros binários
+de LED (``backend.iot.led_frames``) que chegam pelo tty.
+"""
+
+import os
+import queue
+import select
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from backend.iot.led_frames import FrameDecoder
+
+SIMULATED_PREFIX = 'sim://'
+
+
+class SimulatedSerialPort:
+    """
+    Porta serial em memória.
+
+    Args:
+        port: Nome da porta (apenas informativo)
+        baudrate: Velocidade (apenas informativa)
+        timeout: Espera máxima (s) de ``readline``; devolve b'' ao expirar,
+            como o pyserial
+    """
+
+    def __init__(self, port: str = 'sim://maquete', baudrate: int = 115200, timeout: float = 0.1):
+        self.port = port
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.is_open = True
+        self._inbound: 'queue.Queue[bytes]' = queue.Queue()
+        self._written = bytearray()
+        self._write_lock = threading.Lock()
+
+    # ---------- Lado da maquete ----------
+    def feed(self, line) -> None:
+        """Injeta uma linha como se tivesse sido enviada pelo hardware."""
+        if isinstance(line, str):
+            line = line.encode('utf-8')
+        if not line.endswith(b'\n'):
+            line += b'\n'
+        self._inbound.put(line)
+
+    def feed_reading(self, sensor_id: str, sensor_type: str, value, reading_type: str = 'state') -> None:
+        """Injeta uma leitura no protocolo de linha (CSV)."""
+        self.feed(f"{sensor_id},{sensor_type},{reading_type},{value}")
+
+    @property
+    def written(self) -> bytes:
+        """Tudo que foi escrito na porta."""
+        with self._write_lock:
+            return bytes(self._written)
+
+    def take_written(self) -> bytes:
+        """Retorna e descarta o que foi escrito desde a última chamada."""
+        with self._write_lock:
+            data = bytes(self._written)
+            self._written.clear()
+        return data
+
+    def written_lines(self) -> List[str]:
+        return self.written.decode('utf-8', errors='replace').splitlines()
+
+    # ---------- API de serial.Serial ----------
+    @property
+    def in_waiting(self) -> int:
+        return self._inbound.qsize()
+
+    def readline(self) -> bytes:
+        if not self.is_open:
+            raise ValueError("Porta serial simulada fechada")
+        try:
+            return self._inbound.get(timeout=self.timeout)
+        except queue.Empty:
+            return b''
+
+    def write(self, data: bytes) -> int:
+        if not self.is_open:
+            raise ValueError("Porta serial simulada fechada")
+        with self._write_lock:
+            self._written.extend(data)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.is_open = False
+
+
+class FakeLedDevice:
+    """
+    Placa de LEDs falsa atrás de um pseudo-terminal (somente POSIX).
+
+    ``port_name`` é um tty real (ex: ``/dev/pts/5``): o código sob teste
+    escreve nele como numa serial (``connect()`` ou pyserial) e um thread
+    lê o lado mestre, decodifica os quadros e mantém o estado dos LEDs.
+    """
+
+    def __init__(self):
+        self.port_name: Optional[str] = None
+        self.leds: Dict[int, bool] = {}
+        self.frames: List[Tuple[float, int, Dict[int, bool]]] = []
+        self.bytes_received = 0
+        self.decoder = FrameDecoder()
+        self._master: Optional[int] = None
+        self._slave: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._changed = threading.Condition()
+
+    def start(self) -> 'FakeLedDevice':
+        import tty
+
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._slave)  # sem eco nem tradução de bytes de controle
+        self.port_name = os.ttyname(self._slave)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='fake-led-device', daemon=True)
+        self._thread.start()
+        return self
+
+    def connect(self):
+        """Abre o tty como o host faria; retorna um arquivo binário com ``write``."""
+        import tty
+
+        fd = os.open(self.port_name, os.O_RDWR | os.O_NOCTTY)
+        tty.setraw(fd)
+        return os.fdopen(fd, 'r+b', buffering=0)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            ready, _, _ = select.select([self._master], [], [], 0.05)
+            if not ready:
+                continue
+            try:
+                data = os.read(self._master, 4096)
+            except OSError:
+                break
+            frames = self.decoder.feed(data)
+            with self._changed:
+                self.bytes_received += len(data)
+                now = time.monotonic()
+                for seq, changes in frames:
+                    self.frames.append((now, seq, changes))
+                    self.leds.update(changes)
+                self._changed.notify_all()
+
+    def wait_for_frames(self, count: int, timeout: float = 2.0) -> bool:
+        """Espera até ``count`` quadros recebidos no total."""
+        with self._changed:
+            return self._changed.wait_for(lambda: len(self.frames) >= count, timeout)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(1.0)
+            self._thread = None
+        for fd in (self._master, self._slave):
+            if fd is not None:
+                os.close(fd)
+        self._master = self._slave = None
+
+    def __enter__(self) -> 'FakeLedDevice':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def open_serial_port(port: str, baud_rate: int = 115200, timeout: float = 1.0):
+    """Abre a porta serial real (requer ``pyserial``) ou a simulada (``sim://``)."""
+    if port.startswith(SIMULATED_PREFIX):
+        return SimulatedSerialPort(port, baud_rate, timeout)
+    try:
+        import serial
+    except ImportError as e:
+        raise ImportError("Porta serial requer pyserial (pip install pyserial)") from e
+    return serial.Serial(port, baud_rate, timeout=timeout)
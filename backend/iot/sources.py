@@ -0,0 +1,298 @@
+"""
+Fontes de leituras de sensores: porta serial (Arduino) e broker MQTT local.
+
+Protocolo de linha (serial), um registro por linha, em CSV::
+
+    sensor_id,sensor_type,reading_type,value[,unit[,ts]]
+    reed_07,reed_switch,state,1
+    reed_07,reed_switch,state,0,,183422
+
+ou JSON com as mesmas chaves::
+
+    {"sensor_id": "lux_02", "sensor_type": "light", "reading_type": "lux", "value": 312, "unit": "lx"}
+
+MQTT: tópico ``<prefixo>/sensors/<sensor_type>/<sensor_id>`` com payload
+JSON (``reading_type``, ``value``, ``unit``, ``ts``) ou o valor puro
+(``reading_type`` = ``state``).
+
+``ts`` (opcional) é a hora de captura no dispositivo: um número é o
+relógio da placa em milissegundos (``millis()``), um texto ISO 8601 é a
+hora absoluta. O debounce usa essa hora; sem ``ts`` vale a hora de
+chegada no host.
+
+``pyserial`` e ``paho-mqtt`` são opcionais e só são importados ao
+iniciar a fonte correspondente; portas ``sim://`` usam a porta simulada
+de ``backend.iot.serial_sim``.
+"""
+
+import json
+import threading
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
+
+from backend.iot.ingestion import SensorIngestionService, SensorReading
+from backend.iot.serial_sim import open_serial_port
+from backend.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _with_capture_time(reading: SensorReading, ts: Any) -> Optional[SensorReading]:
+    """Aplica o ``ts`` do protocolo à leitura (None se inválido)."""
+    if ts is None or ts == '':
+        return reading
+    if isinstance(ts, bool):
+        return None
+    try:
+        reading.device_ms = int(float(ts))
+        return reading
+    except (TypeError, ValueError):
+        pass
+    try:
+        captured = datetime.fromisoformat(str(ts).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if captured.tzinfo is not None:
+        captured = captured.astimezone(timezone.utc).replace(tzinfo=None)
+    reading.timestamp = captured
+    return reading
+
+
+def parse_serial_line(line) -> Optional[SensorReading]:
+    """
+    Converte uma linha do protocolo serial em leitura.
+
+    Returns:
+        SensorReading, ou None se a linha for vazia, comentário (``#``) ou inválida
+    """
+    if isinstance(line, bytes):
+        line = line.decode('utf-8', errors='replace')
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+
+    if line.startswith('{'):
+        try:
+            data = json.loads(line)
+            reading = SensorReading(
+                sensor_id=str(data['sensor_id']),
+                sensor_type=str(data['sensor_type']),
+                reading_type=str(data.get('reading_type', 'state')),
+                value=str(data['value']),
+                unit=data.get('unit'),
+                context=data.get('context') or {},
+            )
+            return _with_capture_time(reading, data.get('ts'))
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return None
+
+    parts = [p.strip() for p in line.split(',')]
+    if len(parts) < 4 or not all(parts[:4]):
+        return None
+    reading = SensorReading(
+        sensor_id=parts[0],
+        sensor_type=parts[1],
+        reading_type=parts[2],
+        value=parts[3],
+        unit=parts[4] if len(parts) > 4 and parts[4] else None,
+    )
+    return _with_capture_time(reading, parts[5] if len(parts) > 5 else None)
+
+
+def parse_mqtt_message(topic: str, payload, prefix: str = 'ferritine') -> Optional[SensorReading]:
+    """Converte uma mensagem MQTT em leitura (None se o tópico não for de sensores)."""
+    parts = topic.split('/')
+    base = prefix.strip('/').split('/') + ['sensors']
+    if len(parts) != len(base) + 2 or parts[:len(base)] != base:
+        return None
+    sensor_type, sensor_id = parts[-2], parts[-1]
+
+    if isinstance(payload, bytes):
+        payload = payload.decode('utf-8', errors='replace')
+    payload = payload.strip()
+    reading_type, value, unit, context, ts = 'state', payload, None, {}, None
+    if payload.startswith('{'):
+        try:
+            data = json.loads(payload)
+            reading_type = str(data.get('reading_type', 'state'))
+            value = data['value']
+            unit = data.get('unit')
+            context = data.get('context') or {}
+            ts = data.get('ts')
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return None
+    if value == '':
+        return None
+    reading = SensorReading(sensor_id=sensor_id, sensor_type=sensor_type,
+                            reading_type=reading_type, value=str(value),
+                            unit=unit, context=context)
+    return _with_capture_time(reading, ts)
+
+
+class LineSource:
+    """
+    Lê linhas de um callable ``readline`` e envia as leituras ao serviço.
+
+    Base da fonte serial; também serve para reproduzir capturas gravadas.
+    """
+
+    def __init__(self, service: SensorIngestionService, readline: Callable[[], bytes] = None):
+        self.service = service
+        self.readline = readline
+        self.invalid_lines = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def pump(self, max_lines: Optional[int] = None) -> int:
+        """
+        Lê até EOF (linha vazia sem terminador), ``stop()`` ou ``max_lines``.
+
+        Returns:
+            Número de linhas lidas
+        """
+        count = 0
+        while not self._stop.is_set() and (max_lines is None or count < max_lines):
+            line = self.readline()
+            if line is None or len(line) == 0:
+                break
+            count += 1
+            reading = parse_serial_line(line)
+            if reading is None:
+                if line.strip():
+                    self.invalid_lines += 1
+                continue
+            self.service.submit(reading)
+        return count
+
+    def start(self) -> None:
+        """Lê em um thread de background."""
+        self._open()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=type(self).__name__, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self._close()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.pump()
+            except Exception as e:
+                logger.error("Erro lendo sensores: %s", e)
+                self._stop.wait(1.0)
+
+    def _open(self) -> None:
+        pass
+
+    def _close(self) -> None:
+        pass
+
+
+class SerialSource(LineSource):
+    """
+    Leituras da porta serial do Arduino (requer ``pyserial``; portas
+    ``sim://`` usam ``SimulatedSerialPort``).
+
+    A mesma porta leva os comandos de LED de volta ao hardware: ``write``
+    pode ser passado como destino dos quadros do dispatcher.
+
+    Args:
+        connection: Porta já aberta (ex: ``SimulatedSerialPort``); não é
+            fechada por ``stop()``
+    """
+
+    def __init__(self, service: SensorIngestionService, port: str, baud_rate: int = 115200,
+                 timeout: float = 1.0, connection=None):
+        super().__init__(service)
+        self.port = port
+        self.baud_rate = baud_rate
+        self.timeout = timeout
+        self._serial = connection
+        self._owns_serial = connection is None
+        if connection is not None:
+            self.readline = self._readline
+
+    def _open(self) -> None:
+        if self._serial is None:
+            self._serial = open_serial_port(self.port, self.baud_rate, self.timeout)
+            self._owns_serial = True
+        self.readline = self._readline
+        logger.info("Lendo sensores da serial %s @ %d", self.port, self.baud_rate)
+
+    def _readline(self) -> bytes:
+        # Timeout de leitura devolve b'': não é EOF na serial
+        line = self._serial.readline()
+        return line if line else b'\n'
+
+    def write(self, data: bytes) -> int:
+        """Envia comandos ao hardware pela mesma porta."""
+        if self._serial is None:
+            raise RuntimeError("Porta serial não aberta")
+        return self._serial.write(data)
+
+    def _close(self) -> None:
+        if self._serial is not None and self._owns_serial:
+            self._serial.close()
+            self._serial = None
+
+
+class MqttSource:
+    """Leituras de um broker MQTT local (requer ``paho-mqtt``)."""
+
+    def __init__(self, service: SensorIngestionService, broker: str = 'localhost',
+                 port: int = 1883, topic_prefix: str = 'ferritine'):
+        self.service = service
+        self.broker = broker
+        self.port = port
+        self.topic_prefix = topic_prefix
+        self.invalid_messages = 0
+        self._client = None
+
+    def handle_message(self, topic: str, payload) -> bool:
+        """Processa uma mensagem; retorna True se virou leitura."""
+        reading = parse_mqtt_message(topic, payload, self.topic_prefix)
+        if reading is None:
+            self.invalid_messages += 1
+            return False
+        self.service.submit(reading)
+        return True
+
+    def start(self) -> None:
+        try:
+            import paho.mqtt.client as mqtt
+        except ImportError as e:
+            raise ImportError("MqttSource requer paho-mqtt (pip install paho-mqtt)") from e
+        self._client = mqtt.Client()
+        self._client.on_message = lambda client, userdata, msg: self.handle_message(msg.topic, msg.payload)
+        self._client.connect(self.broker, self.port)
+        self._client.subscribe(f"{self.topic_prefix}/sensors/#")
+        self._client.loop_start()
+        logger.info("Assinando %s/sensors/# em %s:%d", self.topic_prefix, self.broker, self.port)
+
+    def write(self, data: bytes) -> int:
+        """Publica comandos para o hardware em ``<prefixo>/leds``."""
+        if self._client is None:
+            raise RuntimeError("Cliente MQTT não iniciado")
+        self._client.publish(f"{self.topic_prefix}/leds", data)
+        return len(data)
+
+    def stop(self, timeout: float = 2.0) -> None:
+        if self._client is not None:
+            self._client.loop_stop()
+            self._client.disconnect()
+            self._client = None
+
+
+def create_source(iot_config, service: SensorIngestionService):
+    """Cria a fonte configurada em ``iot.ingest_source`` ('serial' ou 'mqtt')."""
+    if iot_config.ingest_source == 'mqtt':
+        return MqttSource(service, iot_config.mqtt_broker, iot_config.mqtt_port,
+                          iot_config.mqtt_topic_prefix)
+    if iot_config.ingest_source == 'serial':
+        return SerialSource(service, iot_config.serial_port, iot_config.baud_rate)
+    raise ValueError(f"Fonte de sensores desconhecida: {iot_config.ingest_source!r}")
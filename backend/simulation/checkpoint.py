@@ -0,0 +1,564 @@
+"""
+Checkpoint e restauração rápidos do estado da simulação.
+
+Em vez de recarregar tudo linha a linha pelo ORM, o estado "quente" é
+gravado em formato colunar: um arquivo com cabeçalho JSON seguido de uma
+seção binária por coluna (``array`` da biblioteca padrão, alinhada em 8
+bytes). ``load_checkpoint`` mapeia o arquivo em memória e cada coluna
+numérica é um ``memoryview`` sobre o mapa, sem cópia nem decodificação,
+então abrir um checkpoint de 1M agentes custa só o cabeçalho.
+O mesmo formato serve para buffers em memória (``encode_checkpoint`` /
+``SimulationCheckpoint.from_buffer``), usado pelo estado do mundo em
+memória compartilhada (``world_snapshot``).
+
+Conteúdo:
+
+- ``agents``/``vehicles``/``stations``: id + colunas de estado do banco
+  (``CHECKPOINT_COLUMNS``);
+- ``cidade``: agentes da ``Cidade`` (nome, casa, trabalho, local);
+- ``fatigue``: níveis do ``DriverFatigueSystem``;
+- ``clock``: tick/hora e demais valores do relógio (no cabeçalho).
+
+Textos (enums, tipos de local, nomes) ficam numa tabela única de strings
+e as colunas guardam o índice. Nulos: índice -1, ``INT_NULL`` para
+inteiros/decimais, NaN para reais e datas, UUID zerado para ids.
+
+``CheckpointScheduler`` grava em segundo plano a cada
+``simulation.auto_save_interval`` segundos.
+"""
+
+import array
+import json
+import math
+import mmap
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from backend.utils.telemetry import telemetry
+from backend.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+MAGIC = b'FRTCKPT\x01'
+VERSION = 1
+ALIGN = 8
+INT_NULL = -(1 << 63)
+_ZERO_UUID = bytes(16)
+_EPOCH = datetime(1970, 1, 1)
+
+# Colunas gravadas por tabela do banco (além do id)
+CHECKPOINT_COLUMNS = {
+    'agents': (
+        'current_location_type', 'current_location_id', 'current_status', 'energy_level',
+        'wallet', 'waiting_at_station_id', 'destination_type', 'destination_id', 'last_seen_at',
+    ),
+    'vehicles': (
+        'is_docked', 'current_station_id', 'is_moving', 'speed', 'current_x', 'current_y',
+        'status', 'current_passengers', 'current_fuel', 'odometer',
+    ),
+    'stations': ('current_queue_length', 'status', 'is_operational'),
+}
+
+_TYPECODES = {
+    'uuid': 'B', 'str': 'i', 'enum': 'i', 'int': 'q', 'decimal': 'q',
+    'bool': 'b', 'float': 'd', 'datetime': 'd',
+}
+
+
+def _align(n: int) -> int:
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def _models():
+    from backend.database.models import Agent, Route, Station, Vehicle
+    return {'agents': Agent, 'vehicles': Vehicle, 'stations': Station, 'routes': Route}
+
+
+def _column_kind(column) -> Tuple[str, int]:
+    """Tipo de coluna do checkpoint (e escala dos decimais) para uma coluna SQLAlchemy."""
+    from sqlalchemy import Boolean, DateTime, Enum, Float, Integer, Numeric, String
+    from backend.database.models import GUID
+
+    t = column.type
+    if isinstance(t, GUID):
+        return 'uuid', 0
+    if isinstance(t, Enum):
+        return 'enum', 0
+    if isinstance(t, Boolean):
+        return 'bool', 0
+    if isinstance(t, Integer):
+        return 'int', 0
+    if isinstance(t, Float):
+        return 'float', 0
+    if isinstance(t, Numeric):
+        return 'decimal', t.scale or 0
+    if isinstance(t, DateTime):
+        return 'datetime', 0
+    if isinstance(t, String):
+        return 'str', 0
+    raise TypeError(f"Coluna {column.name} ({t}) não suportada no checkpoint")
+
+
+class _StringTable:
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+
+    def code(self, text) -> int:
+        if text is None:
+            return -1
+        sid = self.ids.get(text)
+        if sid is None:
+            sid = self.ids[text] = len(self.ids)
+        return sid
+
+    def encode(self) -> Tuple[bytes, bytes]:
+        offsets = array.array('q', [0])
+        blob = bytearray()
+        for text in self.ids:
+            blob += text.encode('utf-8')
+            offsets.append(len(blob))
+        return offsets.tobytes(), bytes(blob)
+
+
+def _encode(kind: str, values: Sequence, strings: _StringTable, scale: int = 0) -> bytes:
+    if kind == 'uuid':
+        return b''.join(_ZERO_UUID if v is None else v.bytes for v in values)
+    if kind in ('str', 'enum'):
+        codes = (strings.code(getattr(v, 'value', v)) for v in values)
+    elif kind == 'int':
+        codes = (INT_NULL if v is None else int(v) for v in values)
+    elif kind == 'decimal':
+        factor = 10 ** scale
+        codes = (INT_NULL if v is None else int(round(Decimal(v) * factor)) for v in values)
+    elif kind == 'bool':
+        codes = (-1 if v is None else int(bool(v)) for v in values)
+    elif kind == 'float':
+        codes = (math.nan if v is None else float(v) for v in values)
+    elif kind == 'datetime':
+        codes = (math.nan if v is None else (v - _EPOCH).total_seconds() for v in values)
+    else:
+        raise ValueError(f"Tipo de coluna desconhecido: {kind}")
+    return array.array(_TYPECODES[kind], codes).tobytes()
+
+
+# ---------- Captura ----------
+
+def capture_database(session, columns: Optional[Dict[str, Sequence[str]]] = None
+                     ) -> Dict[str, Dict[str, Tuple[str, Sequence, int]]]:
+    """
+    Lê as colunas de estado do banco (uma consulta por tabela, sem objetos ORM).
+
+    Args:
+        session: Sessão do banco
+        columns: {tabela: colunas além do id} (padrão: ``CHECKPOINT_COLUMNS``)
+
+    Returns:
+        {tabela: {coluna: (tipo, valores, escala)}}
+    """
+    models = _models()
+    tables = {}
+    for name, extra in (columns or CHECKPOINT_COLUMNS).items():
+        model = models[name]
+        names = ('id',) + tuple(extra)
+        query = session.query(*(getattr(model, column) for column in names))
+        if name == 'agents':
+            query = query.filter(model.is_deleted == False)
+        elif name == 'routes':
+            query = query.filter(model.is_active == True)
+        rows = query.all()
+        columns = list(zip(*rows)) if rows else [()] * len(names)
+        table = tables[name] = {}
+        for column, values in zip(names, columns):
+            kind, scale = _column_kind(model.__table__.c[column])
+            table[column] = (kind, values, scale)
+    return tables
+
+
+def capture_memory(cidade=None, fatigue=None) -> Dict[str, Dict[str, Tuple[str, Sequence, int]]]:
+    """Copia o estado em memória (``Cidade`` e fadiga) para gravação posterior."""
+    tables = {}
+    if cidade is not None:
+        agentes = cidade.agentes
+        tables['cidade'] = {
+            attr: ('str', [getattr(a, attr) for a in agentes], 0)
+            for attr in ('nome', 'casa', 'trabalho', 'local')
+        }
+    if fatigue is not None:
+        levels = dict(fatigue.fatigue_levels)
+        tables['fatigue'] = {
+            'driver_id': ('int', list(levels), 0),
+            'level': ('float', list(levels.values()), 0),
+        }
+    return tables
+
+
+# ---------- Gravação ----------
+
+def encode_checkpoint(tables: Dict[str, Dict[str, Tuple[str, Sequence, int]]],
+                      clock: Optional[Dict[str, Any]] = None,
+                      metadata: Optional[Dict[str, Any]] = None) -> Tuple[bytes, List[bytes]]:
+    """
+    Codifica as tabelas no formato do checkpoint, sem gravar.
+
+    Returns:
+        (prefixo com MAGIC e cabeçalho, seções das colunas); o conteúdo
+        completo é a concatenação das duas partes.
+    """
+    strings = _StringTable()
+    sections: List[bytes] = []
+    offset = 0
+    header_tables = {}
+
+    def add(data: bytes) -> Dict[str, int]:
+        nonlocal offset
+        info = {'offset': offset, 'nbytes': len(data)}
+        sections.append(data)
+        padded = _align(len(data))
+        if padded > len(data):
+            sections.append(bytes(padded - len(data)))
+        offset += padded
+        return info
+
+    for table, columns in tables.items():
+        rows = len(next(iter(columns.values()))[1]) if columns else 0
+        meta = {}
+        for column, (kind, values, scale) in columns.items():
+            if len(values) != rows:
+                raise ValueError(f"Coluna {table}.{column} com {len(values)} linhas (esperado {rows})")
+            meta[column] = {'kind': kind, 'scale': scale, **add(_encode(kind, values, strings, scale))}
+        header_tables[table] = {'rows': rows, 'columns': meta}
+
+    string_offsets, string_blob = strings.encode()
+    header = json.dumps({
+        'version': VERSION,
+        'created_at': datetime.utcnow().isoformat(),
+        'clock': clock or {},
+        'metadata': metadata or {},
+        'tables': header_tables,
+        'strings': {'count': len(strings.ids), 'offsets': add(string_offsets), 'blob': add(string_blob)},
+    }).encode('utf-8')
+
+    prefix = MAGIC + len(header).to_bytes(8, 'little') + header
+    return prefix + bytes(_align(len(prefix)) - len(prefix)), sections
+
+
+def write_checkpoint(path, tables: Dict[str, Dict[str, Tuple[str, Sequence, int]]],
+                     clock: Optional[Dict[str, Any]] = None) -> Path:
+    """
+    Grava o checkpoint de forma atômica (arquivo temporário + rename).
+
+    Args:
+        path: Arquivo de destino
+        tables: Saída de ``capture_database``/``capture_memory`` (combinadas)
+        clock: Valores do relógio (tick, hora, ...), guardados no cabeçalho
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    prefix, sections = encode_checkpoint(tables, clock)
+
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'wb') as f:
+        f.write(prefix)
+        for data in sections:
+            f.write(data)
+    os.replace(tmp, path)
+    return path
+
+
+def save_checkpoint(path, session=None, cidade=None, fatigue=None, **clock) -> Path:
+    """Captura e grava o checkpoint no thread atual."""
+    tables = capture_memory(cidade, fatigue)
+    if session is not None:
+        tables.update(capture_database(session))
+    if cidade is not None:
+        clock.setdefault('tick', cidade.tick)
+    return write_checkpoint(path, tables, clock)
+
+
+# ---------- Leitura ----------
+
+class SimulationCheckpoint:
+    """
+    Checkpoint mapeado em memória.
+
+    ``column`` devolve a coluna crua (``memoryview`` tipado sobre o mapa,
+    sem cópia); ``values`` decodifica para objetos Python (UUID, Decimal,
+    enums como texto, None nos nulos).
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{self.path} não é um checkpoint da simulação")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._attach(memoryview(self._mmap))
+
+    @classmethod
+    def from_buffer(cls, buffer) -> 'SimulationCheckpoint':
+        """
+        Lê um checkpoint já em memória (ex: memória compartilhada), sem cópia.
+
+        O buffer precisa continuar válido até ``close``.
+        """
+        checkpoint = cls.__new__(cls)
+        checkpoint.path = None
+        checkpoint._mmap = None
+        view = memoryview(buffer).cast('B')
+        if view[:len(MAGIC)] != MAGIC:
+            view.release()
+            raise ValueError("Buffer não contém um checkpoint da simulação")
+        checkpoint._attach(view)
+        return checkpoint
+
+    def _attach(self, view: memoryview) -> None:
+        header_len = int.from_bytes(view[len(MAGIC):len(MAGIC) + 8], 'little')
+        start = len(MAGIC) + 8
+        self.header = json.loads(bytes(view[start:start + header_len]))
+        self._base = _align(start + header_len)
+        self._view = view
+        self._views: List[memoryview] = []
+        strings = self.header['strings']
+        self._string_offsets = self._section(strings['offsets'], 'q')
+        self._string_blob = self._section(strings['blob'], 'B')
+        self._string_cache: Dict[int, str] = {}
+
+    @property
+    def clock(self) -> Dict[str, Any]:
+        return self.header['clock']
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return self.header.get('metadata', {})
+
+    @property
+    def tables(self) -> Dict[str, Dict[str, Any]]:
+        return self.header['tables']
+
+    def rows(self, table: str) -> int:
+        return self.tables[table]['rows'] if table in self.tables else 0
+
+    def _section(self, info: Dict[str, int], typecode: str) -> memoryview:
+        start = self._base + info['offset']
+        view = self._view[start:start + info['nbytes']].cast(typecode)
+        self._views.append(view)
+        return view
+
+    def string(self, sid: int) -> Optional[str]:
+        if sid < 0:
+            return None
+        text = self._string_cache.get(sid)
+        if text is None:
+            start, end = self._string_offsets[sid], self._string_offsets[sid + 1]
+            text = self._string_cache[sid] = bytes(self._string_blob[start:end]).decode('utf-8')
+        return text
+
+    def column(self, table: str, column: str) -> memoryview:
+        """Coluna crua, sem cópia (UUIDs: 16 bytes por linha)."""
+        meta = self.tables[table]['columns'][column]
+        return self._section(meta, _TYPECODES[meta['kind']])
+
+    def values(self, table: str, column: str, start: int = 0, stop: Optional[int] = None) -> List[Any]:
+        """Coluna decodificada em objetos Python (linhas ``start:stop``)."""
+        meta = self.tables[table]['columns'][column]
+        kind = meta['kind']
+        raw = self.column(table, column)
+        if kind == 'uuid':
+            data = raw[start * 16:None if stop is None else stop * 16].tobytes()
+            return [None if data[i:i + 16] == _ZERO_UUID else uuid.UUID(bytes=data[i:i + 16])
+                    for i in range(0, len(data), 16)]
+        raw = raw[start:stop]
+        if kind in ('str', 'enum'):
+            return [self.string(code) for code in raw]
+        if kind == 'int':
+            return [None if v == INT_NULL else v for v in raw]
+        if kind == 'decimal':
+            scale = meta['scale']
+            return [None if v == INT_NULL else Decimal(v).scaleb(-scale) for v in raw]
+        if kind == 'bool':
+            return [None if v < 0 else bool(v) for v in raw]
+        if kind == 'float':
+            return [None if math.isnan(v) else v for v in raw]
+        return [None if math.isnan(v) else datetime.utcfromtimestamp(v) for v in raw]
+
+    def close(self) -> None:
+        for view in self._views:
+            view.release()
+        self._views.clear()
+        self._view.release()
+        if self._mmap is not None:
+            self._mmap.close()
+
+    def __enter__(self) -> 'SimulationCheckpoint':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def load_checkpoint(path) -> SimulationCheckpoint:
+    """Abre (mapeia) um checkpoint; as colunas são lidas sob demanda."""
+    return SimulationCheckpoint(path)
+
+
+# ---------- Restauração ----------
+
+def restore_database(checkpoint: SimulationCheckpoint, session) -> Dict[str, int]:
+    """
+    Regrava as colunas de estado no banco (um UPDATE executemany por tabela).
+
+    Linhas cujo id não existe mais no banco são descartadas antes do UPDATE
+    (o executemany por chave primária do ORM exige que todas existam).
+
+    Returns:
+        {tabela: linhas regravadas}
+    """
+    from sqlalchemy import Enum, select, update
+
+    models = _models()
+    counts = {}
+    for name, extra in CHECKPOINT_COLUMNS.items():
+        if not checkpoint.rows(name):
+            continue
+        model = models[name]
+        names = ('id',) + extra
+        columns = []
+        for column in names:
+            values = checkpoint.values(name, column)
+            column_type = model.__table__.c[column].type
+            if isinstance(column_type, Enum) and column_type.enum_class is not None:
+                enum_class = column_type.enum_class
+                values = [None if v is None else enum_class(v) for v in values]
+            columns.append(values)
+        existing = set(session.execute(select(model.id)).scalars())
+        mappings = [dict(zip(names, row)) for row in zip(*columns) if row[0] in existing]
+        if mappings:
+            with telemetry.phase('persistence', len(mappings)):
+                session.execute(update(model), mappings)
+        counts[name] = len(mappings)
+    return counts
+
+
+def restore_cidade(checkpoint: SimulationCheckpoint, event_log=None):
+    """Recria a ``Cidade`` (agentes e tick) gravada no checkpoint."""
+    from backend.simulation.models.agente import Agente
+    from backend.simulation.models.cidade import Cidade
+
+    agentes = []
+    if checkpoint.rows('cidade'):
+        columns = [checkpoint.values('cidade', attr) for attr in ('nome', 'casa', 'trabalho', 'local')]
+        for nome, casa, trabalho, local in zip(*columns):
+            agente = Agente(nome, casa, trabalho)
+            agente.local = local
+            agentes.append(agente)
+    cidade = Cidade(agentes)
+    cidade.tick = checkpoint.clock.get('tick', 0)
+    if event_log is not None:
+        cidade.attach_event_log(event_log)
+    return cidade
+
+
+def restore_fatigue(checkpoint: SimulationCheckpoint, fatigue) -> int:
+    """Recarrega os níveis de fadiga; retorna quantos motoristas."""
+    if not checkpoint.rows('fatigue'):
+        return 0
+    fatigue.fatigue_levels = dict(zip(checkpoint.column('fatigue', 'driver_id').tolist(),
+                                      checkpoint.column('fatigue', 'level').tolist()))
+    return len(fatigue.fatigue_levels)
+
+
+# ---------- Auto-save ----------
+
+class CheckpointScheduler:
+    """
+    Checkpoints periódicos em segundo plano.
+
+    O estado em memória é copiado no thread da simulação (consistente com o
+    tick); leitura do banco e gravação do arquivo rodam num thread à parte,
+    com sessão própria de ``session_factory``. Se a gravação anterior ainda
+    não terminou, o checkpoint do intervalo é pulado.
+
+    Args:
+        path: Arquivo do checkpoint (substituído a cada gravação)
+        interval: Segundos entre checkpoints (``simulation.auto_save_interval``)
+        session_factory: Cria a sessão do banco (None = sem tabelas do banco)
+        clock: Relógio monotônico (injetável em testes)
+    """
+
+    def __init__(self, path, interval: float = 300, session_factory: Optional[Callable[[], Any]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.path = Path(path)
+        self.interval = interval
+        self.session_factory = session_factory
+        self.clock = clock
+        self._last = clock()
+        self._thread: Optional[threading.Thread] = None
+        self.saves = 0
+        self.skipped = 0
+        self.last_duration: Optional[float] = None
+        self.last_error: Optional[BaseException] = None
+
+    @classmethod
+    def from_config(cls, sim_config, session_factory=None) -> Optional['CheckpointScheduler']:
+        """Agendador de ``simulation.checkpoint_path`` (None se vazio)."""
+        if not sim_config.checkpoint_path:
+            return None
+        return cls(sim_config.checkpoint_path, sim_config.auto_save_interval, session_factory)
+
+    @property
+    def busy(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def maybe_save(self, cidade=None, fatigue=None, **clock) -> bool:
+        """Chamado a cada tick; dispara o checkpoint quando o intervalo venceu."""
+        if self.clock() - self._last < self.interval:
+            return False
+        if self.busy:
+            self.skipped += 1
+            return False
+        self.save(cidade, fatigue, **clock)
+        return True
+
+    def save(self, cidade=None, fatigue=None, background: bool = True, **clock) -> None:
+        """Captura o estado agora e grava (em segundo plano por padrão)."""
+        self._last = self.clock()
+        tables = capture_memory(cidade, fatigue)
+        if cidade is not None:
+            clock.setdefault('tick', cidade.tick)
+        # Gravação anterior ainda em andamento usa o mesmo <path>.tmp
+        self.wait()
+        if background:
+            self._thread = threading.Thread(
+                target=self._write, args=(tables, clock), name='checkpoint-writer', daemon=True
+            )
+            self._thread.start()
+        else:
+            self._write(tables, clock)
+
+    def _write(self, tables, clock) -> None:
+        started = time.perf_counter()
+        try:
+            if self.session_factory is not None:
+                session = self.session_factory()
+                try:
+                    tables.update(capture_database(session))
+                finally:
+                    session.close()
+            write_checkpoint(self.path, tables, clock)
+            self.saves += 1
+            self.last_duration = time.perf_counter() - started
+            logger.info("Checkpoint gravado em %s (%.2fs)", self.path, self.last_duration)
+        except Exception as e:
+            self.last_error = e
+            logger.error("Falha ao gravar checkpoint %s: %s", self.path, e)
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Espera a gravação em andamento terminar."""
+        if self._thread is not None:
+            self._thread.join(timeout)
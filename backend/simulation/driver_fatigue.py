@@ -3,6 +3,10 @@ Sistema de fadiga de motoristas/maquinistas.
 Simula cansaço da tripulação e impactos na segurança.
 """
 
+from typing import Dict
+
+from backend.utils.telemetry import telemetry
+
 
 class DriverFatigueSystem:
     """
@@ -17,15 +21,30 @@ class DriverFatigueSystem:
         """
         Atualiza nível de fadiga
         """
-        if driver_id not in self.fatigue_levels:
-            self.fatigue_levels[driver_id] = 0
+        previous = self.fatigue_levels.get(driver_id, 0)
 
         # Fadiga aumenta com horas trabalhadas
         fatigue_increase = hours_worked * 5  # 5% por hora
-        self.fatigue_levels[driver_id] += fatigue_increase
 
         # Máximo 100%
-        self.fatigue_levels[driver_id] = min(100, self.fatigue_levels[driver_id])
+        self.fatigue_levels[driver_id] = min(100, previous + fatigue_increase)
+
+        if telemetry.enabled:
+            telemetry.count('fatigue.updates')
+            if previous < 80.0 <= self.fatigue_levels[driver_id]:
+                telemetry.count('fatigue.too_tired')
+
+    def update_many(self, hours_by_driver: Dict[int, float]) -> int:
+        """
+        Atualiza a fadiga de vários motoristas num tick
+
+        Returns:
+            int: Número de motoristas atualizados
+        """
+        with telemetry.phase('driver_fatigue', len(hours_by_driver)):
+            for driver_id, hours_worked in hours_by_driver.items():
+                self.update_fatigue(driver_id, hours_worked)
+        return len(hours_by_driver)
 
     def reset_fatigue(self, driver_id: int):
         """
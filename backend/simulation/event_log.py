@@ -0,0 +1,410 @@
+"""
+Log de eventos binário e append-only da simulação, com replay.
+
+O motor (``Cidade``) grava cada mudança de estado em vez do estado
+inteiro; o replay reconstrói o mundo em qualquer tick aplicando só as
+mudanças a partir do snapshot mais próximo, sem reexecutar a lógica dos
+agentes.
+
+Formato (little-endian)::
+
+    arquivo:  MAGIC (8 bytes) | registro | registro | ...
+    registro: tipo u8 | tick u32 | n u8 | tam u32 | entidades u32 * n | payload
+
+Tipos (``EventType``):
+
+- ``STRING``: define o id de um texto (entidades: [id]; payload: UTF-8).
+  Nomes e locais são gravados uma vez e referenciados pelo id.
+- ``TICK``: início de um tick (payload: hora u8).
+- ``AGENT_ADDED``: [índice, nome, casa, trabalho, local].
+- ``AGENT_MOVED``: [índice, local].
+- ``SNAPSHOT``: estado de todos os agentes ao fim do tick (payload:
+  n u32 + n * [nome, casa, trabalho, local] u32).
+- ``EVENT``: evento livre [tipo, ids...] com payload JSON.
+
+Um registro incompleto no fim (processo interrompido) é ignorado na
+leitura e descartado quando a gravação é retomada (``resume_tick``).
+"""
+
+import bisect
+import json
+import mmap
+import struct
+from dataclasses import dataclass, field
+from enum import IntEnum
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from backend.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+MAGIC = b'FRTEVL\x00\x01'
+_HEADER = struct.Struct('<BIBI')
+_U32 = struct.Struct('<I')
+_AGENT = struct.Struct('<4I')
+
+
+class EventType(IntEnum):
+    STRING = 1
+    TICK = 2
+    AGENT_ADDED = 3
+    AGENT_MOVED = 4
+    SNAPSHOT = 5
+    EVENT = 6
+
+
+class Record(NamedTuple):
+    """Um registro lido do log."""
+    type: EventType
+    tick: int
+    entities: Tuple[int, ...]
+    payload: bytes
+    offset: int
+
+
+class EventLogWriter:
+    """
+    Grava o log de uma execução.
+
+    Sem ``resume_tick`` começa um log novo; um arquivo existente é
+    rotacionado (``<arquivo>.1``, ``.2``...) em vez de sobrescrito. Com
+    ``resume_tick`` (retomada de checkpoint) continua o log existente:
+    valida o MAGIC, recarrega a tabela de textos e descarta o registro
+    incompleto do fim e os ticks posteriores a ``resume_tick``, que a
+    execução retomada vai gravar de novo. Um arquivo que não é um log
+    válido é rotacionado e o log recomeça.
+
+    Args:
+        path: Arquivo do log
+        snapshot_every: Snapshot completo a cada N ticks (0 = nunca);
+            limita o trabalho do replay para chegar a um tick
+        buffer_size: Buffer de escrita em bytes; esvaziado ao fim de cada
+            tick (``end_tick``), para leitores acompanharem o log em gravação
+        resume_tick: Último tick já simulado, para continuar o log existente
+        backups: Quantos logs rotacionados manter
+    """
+
+    def __init__(self, path, snapshot_every: int = 24, buffer_size: int = 1 << 16,
+                 resume_tick: Optional[int] = None, backups: int = 3):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.snapshot_every = snapshot_every
+        self.backups = backups
+        self.current_tick = 0
+        self.records_written = 0
+        self._strings: Dict[str, int] = {}
+        if resume_tick is not None and self._resume(resume_tick):
+            self._file = open(self.path, 'ab', buffering=buffer_size)
+            return
+        self._rotate()
+        self._file = open(self.path, 'wb', buffering=buffer_size)
+        self._file.write(MAGIC)
+        self._file.flush()
+
+    def _resume(self, tick: int) -> bool:
+        """Prepara o log existente para continuar após ``tick``; False se não há log válido."""
+        if not self.path.exists() or self.path.stat().st_size == 0:
+            return False
+        try:
+            reader = EventLogReader(self.path)
+        except ValueError as e:
+            logger.warning("Log de eventos %s não será continuado: %s", self.path, e)
+            return False
+        end = min([offset for t, offset in reader.tick_offsets.items() if t > tick],
+                  default=reader.end_offset)
+        reader.close()
+        if end < self.path.stat().st_size:
+            with open(self.path, 'r+b') as f:
+                f.truncate(end)
+        if end < reader.end_offset:
+            # Textos definidos nos ticks descartados deixam de existir
+            reader = EventLogReader(self.path)
+            reader.close()
+        self._strings = {text: sid for sid, text in enumerate(reader.strings)}
+        self.current_tick = tick
+        logger.info("Continuando log de eventos %s a partir do tick %d", self.path, tick)
+        return True
+
+    def _rotate(self) -> None:
+        """Move o log existente para ``<arquivo>.1`` (e os anteriores adiante)."""
+        if not self.path.exists() or self.path.stat().st_size == 0:
+            return
+        if self.backups <= 0:
+            return
+        for n in range(self.backups - 1, 0, -1):
+            older = self.path.with_name(f"{self.path.name}.{n}")
+            if older.exists():
+                older.replace(self.path.with_name(f"{self.path.name}.{n + 1}"))
+        self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+
+    # ---------- Baixo nível ----------
+    def _write(self, event_type: EventType, entities: Sequence[int] = (), payload: bytes = b'') -> None:
+        self._file.write(_HEADER.pack(event_type, self.current_tick, len(entities), len(payload)))
+        if entities:
+            self._file.write(struct.pack(f'<{len(entities)}I', *entities))
+        if payload:
+            self._file.write(payload)
+        self.records_written += 1
+
+    def intern(self, text: str) -> int:
+        """Id do texto, gravando sua definição na primeira vez."""
+        sid = self._strings.get(text)
+        if sid is None:
+            sid = self._strings[text] = len(self._strings)
+            self._write(EventType.STRING, (sid,), text.encode('utf-8'))
+        return sid
+
+    # ---------- Eventos do motor ----------
+    def begin_tick(self, tick: int, hora: int) -> None:
+        self.current_tick = tick
+        self._write(EventType.TICK, (), bytes([hora % 256]))
+
+    def end_tick(self) -> None:
+        """Fim do tick: grava o buffer no arquivo."""
+        self._file.flush()
+
+    def agent_added(self, index: int, agente) -> None:
+        self._write(EventType.AGENT_ADDED, (
+            index, self.intern(agente.nome), self.intern(agente.casa),
+            self.intern(agente.trabalho), self.intern(agente.local),
+        ))
+
+    def agent_moved(self, index: int, local: str) -> None:
+        self._write(EventType.AGENT_MOVED, (index, self.intern(local)))
+
+    def event(self, kind: str, entity_ids: Iterable[int] = (), data: Optional[Dict[str, Any]] = None) -> None:
+        """Evento livre (ex: acidente), consultável com ``EventLogReplayer.events``."""
+        payload = json.dumps(data, default=str).encode('utf-8') if data else b''
+        self._write(EventType.EVENT, (self.intern(kind), *entity_ids), payload)
+
+    def should_snapshot(self, tick: int) -> bool:
+        return self.snapshot_every > 0 and tick % self.snapshot_every == 0
+
+    def snapshot(self, agentes) -> None:
+        rows = [
+            _AGENT.pack(self.intern(a.nome), self.intern(a.casa), self.intern(a.trabalho), self.intern(a.local))
+            for a in agentes
+        ]
+        self._write(EventType.SNAPSHOT, (), _U32.pack(len(rows)) + b''.join(rows))
+
+    # ---------- Arquivo ----------
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self) -> 'EventLogWriter':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class EventLogReader:
+    """
+    Leitura e índice do log (mapeado em memória).
+
+    ``refresh()`` indexa registros acrescentados desde a última leitura,
+    permitindo acompanhar um log ainda em gravação.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.strings: List[str] = []
+        self.tick_offsets: Dict[int, int] = {}
+        self.snapshots: List[Tuple[int, int]] = []  # (tick, offset), em ordem
+        self.hours: Dict[int, int] = {}
+        self.first_tick = 0
+        self.last_tick = 0
+        self.end_offset = len(MAGIC)
+        self._data = b''
+        self.refresh()
+
+    def _load(self) -> None:
+        with open(self.path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{self.path} não é um log de eventos da simulação")
+            f.seek(0, 2)
+            size = f.tell()
+            self.close()
+            self._data = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+
+    def refresh(self) -> int:
+        """Indexa registros novos; retorna quantos foram lidos."""
+        self._load()
+        data = self._data
+        size = len(data)
+        if size < self.end_offset:
+            raise ValueError(f"{self.path} foi recriado desde a última leitura")
+        header = _HEADER.unpack_from
+        header_size = _HEADER.size
+        offset = self.end_offset
+        count = 0
+        # Só STRING, TICK e SNAPSHOT entram no índice; os demais são pulados
+        while offset + header_size <= size:
+            event_type, tick, n, length = header(data, offset)
+            end = offset + header_size + 4 * n + length
+            if end > size:
+                break  # registro incompleto no fim
+            if event_type == EventType.STRING:
+                (sid,) = _U32.unpack_from(data, offset + header_size)
+                if sid == len(self.strings):
+                    self.strings.append(data[offset + header_size + 4:end].decode('utf-8'))
+            elif event_type == EventType.TICK:
+                if not self.tick_offsets:
+                    self.first_tick = tick
+                self.tick_offsets[tick] = offset
+                self.hours[tick] = data[end - 1] if length else 0
+            elif event_type == EventType.SNAPSHOT:
+                self.snapshots.append((tick, offset))
+            if tick > self.last_tick:
+                self.last_tick = tick
+            offset = end
+            count += 1
+        self.end_offset = offset
+        return count
+
+    def records(self, start: Optional[int] = None) -> Iterator[Record]:
+        """Registros já indexados a partir de ``start`` (offset)."""
+        data = self._data
+        offset = len(MAGIC) if start is None else start
+        while offset < self.end_offset:
+            event_type, tick, n, length = _HEADER.unpack_from(data, offset)
+            begin = offset + _HEADER.size
+            end = begin + 4 * n + length
+            entities = struct.unpack_from(f'<{n}I', data, begin) if n else ()
+            yield Record(EventType(event_type), tick, entities, data[begin + 4 * n:end], offset)
+            offset = end
+
+    def close(self) -> None:
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+
+
+@dataclass
+class ReplayedAgent:
+    nome: str
+    casa: str
+    trabalho: str
+    local: str
+
+
+@dataclass
+class ReplayState:
+    """Estado do mundo reconstruído em um tick."""
+    tick: int
+    hora: Optional[int]
+    agentes: List[ReplayedAgent] = field(default_factory=list)
+
+    def snapshot(self) -> Dict[str, str]:
+        """Mesmo formato de ``Cidade.snapshot``."""
+        return {a.nome: a.local for a in self.agentes}
+
+    def to_cidade(self):
+        """Cria uma ``Cidade`` com os agentes neste estado."""
+        from backend.simulation.models.agente import Agente
+        from backend.simulation.models.cidade import Cidade
+
+        agentes = []
+        for replayed in self.agentes:
+            agente = Agente(replayed.nome, replayed.casa, replayed.trabalho)
+            agente.local = replayed.local
+            agentes.append(agente)
+        cidade = Cidade(agentes)
+        cidade.tick = self.tick
+        return cidade
+
+
+class EventLogReplayer:
+    """
+    Reconstrói o estado do mundo em qualquer tick a partir do log.
+
+    Parte do último snapshot anterior ao tick pedido e aplica só os
+    registros de mudança até ele.
+    """
+
+    def __init__(self, path_or_reader):
+        self.reader = path_or_reader if isinstance(path_or_reader, EventLogReader) else EventLogReader(path_or_reader)
+
+    def refresh(self) -> int:
+        return self.reader.refresh()
+
+    @property
+    def first_tick(self) -> int:
+        return self.reader.first_tick
+
+    @property
+    def last_tick(self) -> int:
+        return self.reader.last_tick
+
+    def state_at(self, tick: int) -> ReplayState:
+        """Estado ao fim de ``tick`` (0 = antes do primeiro step)."""
+        reader = self.reader
+        agents: List[List[int]] = []
+        start = None
+        i = bisect.bisect_right(reader.snapshots, (tick, float('inf'))) - 1
+        if i >= 0:
+            snap_tick, offset = reader.snapshots[i]
+            record = next(reader.records(offset))
+            (count,) = _U32.unpack_from(record.payload, 0)
+            agents = [list(_AGENT.unpack_from(record.payload, 4 + k * _AGENT.size)) for k in range(count)]
+            start = offset + _HEADER.size + len(record.payload)
+
+        for record in reader.records(start):
+            if record.tick > tick:
+                break
+            if record.type == EventType.AGENT_MOVED:
+                agents[record.entities[0]][3] = record.entities[1]
+            elif record.type == EventType.AGENT_ADDED:
+                index = record.entities[0]
+                row = list(record.entities[1:5])
+                if index < len(agents):
+                    agents[index] = row
+                else:
+                    agents.append(row)
+
+        strings = reader.strings
+        return ReplayState(
+            tick=tick,
+            hora=reader.hours.get(tick),
+            agentes=[ReplayedAgent(*(strings[sid] for sid in row)) for row in agents],
+        )
+
+    def events(self, start_tick: int = 0, end_tick: Optional[int] = None,
+               kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Eventos livres (``EventLogWriter.event``) entre dois ticks, inclusive."""
+        reader = self.reader
+        end_tick = reader.last_tick if end_tick is None else end_tick
+        start = reader.tick_offsets.get(start_tick) if start_tick > reader.first_tick else None
+        found = []
+        for record in reader.records(start):
+            if record.tick > end_tick:
+                break
+            if record.type != EventType.EVENT or record.tick < start_tick:
+                continue
+            name = reader.strings[record.entities[0]]
+            if kind is not None and name != kind:
+                continue
+            found.append({
+                'tick': record.tick,
+                'kind': name,
+                'entities': list(record.entities[1:]),
+                'data': json.loads(record.payload) if record.payload else {},
+            })
+        return found
+
+
+def open_from_config(sim_config, resume_tick: Optional[int] = None) -> Optional[EventLogWriter]:
+    """Abre o log configurado em ``simulation.event_log_path`` (None se vazio).
+
+    ``resume_tick`` continua o log existente (retomada de checkpoint).
+    """
+    path = getattr(sim_config, 'event_log_path', None)
+    if not path:
+        return None
+    logger.info("Gravando log de eventos em %s", path)
+    return EventLogWriter(path, snapshot_every=getattr(sim_config, 'event_log_snapshot_every', 24),
+                          resume_tick=resume_tick)
@@ -2,6 +2,8 @@
 from backend.utils.logger import get_logger
 
 logger = get_logger(__name__)
+# Criação de agentes em massa: 1 registro a cada 1000, no máximo 10/s
+_creation_logger = logger.sampled(every_n=1000, per_second=10)
 
 
 class Agente:
@@ -19,7 +21,7 @@ class Agente:
         self.casa = casa
         self.trabalho = trabalho
         self.local = casa  # Estado inicial: o agente começa em casa
-        logger.debug("Criando agente: %s (casa=%s, trabalho=%s)", nome, casa, trabalho)
+        _creation_logger.debug("Criando agente: %s (casa=%s, trabalho=%s)", nome, casa, trabalho)
 
     def step(self, hora: int):
         """
@@ -28,14 +30,19 @@ class Agente:
         Das 7h às 17h, o agente está no trabalho.
         Fora desse intervalo, o agente está em casa.
 
+        Não registra log por agente; ``Cidade.step`` emite um resumo por tick.
+
         Args:
             hora (int): Hora atual (0-23).
+
+        Returns:
+            bool: True se o agente mudou de local.
         """
-        if 7 <= hora < 17:
-            self.local = self.trabalho
-        else:
-            self.local = self.casa
-        logger.debug("Agente %s movido para %s (hora=%d)", self.nome, self.local, hora)
+        destino = self.trabalho if 7 <= hora < 17 else self.casa
+        if destino == self.local:
+            return False
+        self.local = destino
+        return True
 
     def __repr__(self):
         """
@@ -1,7 +1,8 @@
 # cidade.py
 from typing import List
 from .agente import Agente
-from backend.utils.logger import get_logger
+from backend.utils.logger import LogAggregator, get_logger, set_simulation_time
+from backend.utils.telemetry import telemetry
 
 logger = get_logger(__name__)
 
@@ -12,11 +13,32 @@ class Cidade:
 
     Atributos:
         agentes (List[Agente]): Lista de agentes presentes na cidade.
+        tick (int): Número de steps executados.
+        event_log (EventLogWriter | None): Log de eventos para replay.
     """
-    def __init__(self, agentes: List[Agente] = None):
+    def __init__(self, agentes: List[Agente] = None, event_log=None):
         self.agentes = agentes or []  # Inicializa com uma lista vazia se nenhum agente for fornecido
+        self._tick_log = LogAggregator(logger)  # Resumo por tick no lugar de logs por agente
+        self.tick = 0
+        self.event_log = None
+        if event_log is not None:
+            self.attach_event_log(event_log)
         logger.info("Cidade criada com %d agentes", len(self.agentes))
 
+    def attach_event_log(self, event_log):
+        """
+        Passa a gravar as mudanças de estado em um log de eventos.
+
+        Os agentes já presentes são registrados no tick atual.
+
+        Args:
+            event_log (EventLogWriter): Destino dos eventos.
+        """
+        self.event_log = event_log
+        event_log.current_tick = self.tick
+        for i, agente in enumerate(self.agentes):
+            event_log.agent_added(i, agente)
+
     def add_agente(self, agente: Agente):
         """
         Adiciona um agente à cidade.
@@ -25,7 +47,9 @@ class Cidade:
             agente (Agente): O agente a ser adicionado.
         """
         self.agentes.append(agente)
-        logger.debug("Agente %s adicionado à cidade", agente.nome)
+        self._tick_log.count("agentes_adicionados")
+        if self.event_log is not None:
+            self.event_log.agent_added(len(self.agentes) - 1, agente)
 
     def step(self, hora: int):
         """
@@ -36,9 +60,30 @@ class Cidade:
         Args:
             hora (int): Hora atual (0-23).
         """
-        logger.debug("Processando step da cidade para hora %d com %d agentes", hora, len(self.agentes))
-        for agente in self.agentes:
-            agente.step(hora)
+        set_simulation_time(hora)
+        self.tick += 1
+        event_log = self.event_log
+        movidos = 0
+        with telemetry.phase('agent_update', len(self.agentes)):
+            if event_log is None:
+                for agente in self.agentes:
+                    if agente.step(hora):
+                        movidos += 1
+            else:
+                event_log.begin_tick(self.tick, hora)
+                for i, agente in enumerate(self.agentes):
+                    if agente.step(hora):
+                        movidos += 1
+                        event_log.agent_moved(i, agente.local)
+
+        if event_log is not None:
+            if event_log.should_snapshot(self.tick):
+                event_log.snapshot(self.agentes)
+            event_log.end_tick()
+
+        if self._tick_log.enabled:
+            self._tick_log.count("mudaram_de_local", movidos)
+            self._tick_log.flush("Step da cidade hora=%d com %d agentes", hora, len(self.agentes))
 
     def snapshot(self):
         """
@@ -8,6 +8,9 @@ from typing import Optional, Dict
 from enum import Enum
 import random
 
+from backend.utils.rng import rng_streams
+from backend.utils.telemetry import telemetry
+
 
 # ===== ENUMS =====
 
@@ -133,6 +136,9 @@ class Vehicle:
 
         # Atualiza estatísticas
         self.total_km_traveled += distance_km
+        if telemetry.enabled:
+            telemetry.count('vehicle.moves')
+            telemetry.count('vehicle.km', distance_km)
 
         # Consome combustível
         self._consume_fuel(distance_km)
@@ -262,6 +268,7 @@ class Vehicle:
         self.last_maintenance_date = datetime.now()
         self.next_maintenance_due = None
         self.repairs_count += 1
+        telemetry.count('vehicle.maintenance')
 
         # Retorna ao serviço após algumas horas
         self.status = VehicleStatus.IDLE
@@ -305,17 +312,25 @@ class Vehicle:
 
     # ===== ACIDENTES =====
 
-    def trigger_accident(self, severity: str = "minor", cause: str = "unknown"):
+    def trigger_accident(self, severity: str = "minor", cause: str = "unknown",
+                         rng: Optional[random.Random] = None):
         """
         Registra um acidente
+
+        Args:
+            rng: Gerador dos danos/vítimas (padrão: sorteio 'accidents' do
+                veículo pelo número do acidente, ``rng_streams.at``;
+                reprodutível pela semente, mesmo após retomar a execução)
         """
+        rng = rng or rng_streams.at('accidents', self.id, counter=self.accidents_count)
         self.status = VehicleStatus.BROKEN
         self.accidents_count += 1
+        telemetry.count('vehicle.accidents')
 
         # Danos
         damage_ranges = {"minor": (5, 15), "moderate": (15, 40), "severe": (40, 70), "fatal": (70, 100)}
 
-        damage_percent = random.randint(*damage_ranges[severity])
+        damage_percent = rng.randint(*damage_ranges[severity])
         self.condition_percent = max(0, self.condition_percent - damage_percent)
 
         # Vítimas (se houver passageiros)
@@ -324,8 +339,8 @@ class Vehicle:
 
         if self.current_passengers > 0:
             if severity in ["severe", "fatal"]:
-                fatalities = random.randint(0, self.current_passengers // 3)
-                injuries = random.randint(0, self.current_passengers // 2)
+                fatalities = rng.randint(0, self.current_passengers // 3)
+                injuries = rng.randint(0, self.current_passengers // 2)
 
         # Registra incidente
         self.db.create_incident(
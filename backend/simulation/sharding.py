@@ -0,0 +1,430 @@
+"""
+Simulação particionada por região em vários processos.
+
+Cada processo (shard) guarda os agentes que estão nas regiões dele e
+executa o step só desses agentes. Entre processos trafegam apenas:
+
+- as mudanças de local do tick (para o snapshot consolidado), como um
+  ``array`` de ids: ``id`` foi para o trabalho, ``~id`` voltou para casa;
+- os agentes que cruzaram a fronteira (foram para um local de outra
+  região), transferidos ao shard de destino antes do próximo step; o
+  registro completo só vai na primeira vez que o destino recebe o agente.
+
+O coordenador (``ShardedSimulation``) envia o step a todos os shards em
+paralelo por ``multiprocessing.Pipe``, roteia as transferências e mantém
+o snapshot consolidado no formato de ``Cidade.snapshot``.
+
+Regiões vêm de ``Tile.region_id`` (tile nas coordenadas do prédio) ou,
+na falta dela, de ``Building.neighborhood``; locais sem região conhecida
+caem num shard fixo pelo CRC32 do nome. ``ShardRouter.from_regions``
+distribui as regiões entre os shards equilibrando o número de agentes.
+
+Os fluxos aleatórios (``backend.utils.rng``) de cada shard usam a
+mesma semente: como são por entidade, o resultado não depende do número
+de shards.
+"""
+
+import array
+import multiprocessing
+import time
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from backend.simulation.models.agente import Agente
+from backend.utils.rng import rng_streams
+from backend.utils.telemetry import telemetry
+from backend.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# (id global, nome, casa, trabalho, local)
+AgentRecord = Tuple[int, str, str, str, str]
+
+
+class ShardRouter:
+    """
+    Decide o shard de cada local.
+
+    Args:
+        n_shards: Número de shards
+        location_shards: {local: shard} conhecidos; os demais vão para
+            ``crc32(local) % n_shards`` (estável entre processos)
+    """
+
+    def __init__(self, n_shards: int, location_shards: Optional[Dict[str, int]] = None):
+        if n_shards < 1:
+            raise ValueError("n_shards deve ser >= 1")
+        self.n_shards = n_shards
+        self.location_shards = dict(location_shards or {})
+
+    @classmethod
+    def from_regions(cls, region_of: Dict[str, Any], n_shards: int,
+                     loads: Optional[Dict[Any, int]] = None) -> 'ShardRouter':
+        """
+        Distribui regiões inteiras entre os shards.
+
+        Args:
+            region_of: {local: região}
+            n_shards: Número de shards
+            loads: Agentes por região (padrão: número de locais), para
+                equilibrar; a maior região vai para o shard menos carregado
+        """
+        if loads is None:
+            loads = {}
+            for region in region_of.values():
+                loads[region] = loads.get(region, 0) + 1
+        totals = [0] * n_shards
+        region_shard = {}
+        for region in sorted(loads, key=lambda r: (-loads[r], str(r))):
+            shard = min(range(n_shards), key=lambda s: (totals[s], s))
+            region_shard[region] = shard
+            totals[shard] += loads[region]
+        return cls(n_shards, {
+            location: region_shard.get(region, 0) for location, region in region_of.items()
+        })
+
+    def shard_for(self, location: str) -> int:
+        shard = self.location_shards.get(location)
+        if shard is None:
+            shard = self.location_shards[location] = zlib.crc32(location.encode('utf-8')) % self.n_shards
+        return shard
+
+
+def region_map(session) -> Dict[str, str]:
+    """
+    {nome do prédio: região} a partir do banco.
+
+    Usa ``Tile.region_id`` do tile nas coordenadas do prédio; sem tile com
+    região, ``Building.neighborhood``. Prédios sem nenhum dos dois ficam de
+    fora (vão para o shard do hash).
+    """
+    from backend.database.models import Building, Tile
+
+    rows = session.query(Building.name, Building.neighborhood, Tile.region_id).outerjoin(
+        Tile, (Tile.x == Building.x) & (Tile.y == Building.y) & (Tile.region_id.isnot(None))
+    ).all()
+    regions = {}
+    for name, neighborhood, region_id in rows:
+        region = str(region_id) if region_id is not None else neighborhood
+        if region:
+            regions.setdefault(name, region)
+    return regions
+
+
+def _materialize(nome: str, casa: str, trabalho: str, local: str) -> Agente:
+    """Recria um agente vindo de outro processo (sem o log de criação de ``Agente``)."""
+    agente = Agente.__new__(Agente)
+    agente.nome, agente.casa, agente.trabalho, agente.local = nome, casa, trabalho, local
+    return agente
+
+
+def _new_transfer(source: int) -> Dict[str, Any]:
+    return {'source': source, 'records': [], 'codes': array.array('q'), 'other': []}
+
+
+class Shard:
+    """
+    Estado de um shard: os agentes que estão nas regiões dele.
+
+    Agentes que saem ficam estacionados (``parked``); quando voltam a um
+    shard que já os conhece, a transferência leva só o código do destino
+    (como em ``moved``), não o registro completo. Em rotinas casa-trabalho
+    isso reduz as trocas a um inteiro por agente depois do primeiro dia.
+    """
+
+    def __init__(self, shard_id: int, router: ShardRouter):
+        self.shard_id = shard_id
+        self.router = router
+        self.agents: Dict[int, Agente] = {}
+        self.parked: Dict[int, Agente] = {}
+        self._known: Dict[int, int] = {}  # id -> máscara dos shards que têm o agente
+        self._strings: Dict[str, str] = {}
+
+    def add(self, records: Iterable[AgentRecord], known: int = 0) -> None:
+        # Textos compartilhados: o pickle das transferências grava cada local uma vez
+        intern = self._strings.setdefault
+        known |= 1 << self.shard_id
+        for gid, nome, casa, trabalho, local in records:
+            self.agents[gid] = _materialize(nome, intern(casa, casa), intern(trabalho, trabalho),
+                                            intern(local, local))
+            self._known[gid] = known
+
+    def receive(self, transfer: Dict[str, Any]) -> None:
+        """Recebe os agentes transferidos por outro shard."""
+        source_bit = 1 << transfer['source']
+        self.add(transfer['records'], source_bit)
+        arrivals = [(code if code >= 0 else ~code, code) for code in transfer['codes']]
+        arrivals += transfer['other']
+        for gid, destination in arrivals:
+            agente = self.parked.pop(gid)
+            if isinstance(destination, str):
+                agente.local = destination
+            else:
+                agente.local = agente.trabalho if destination >= 0 else agente.casa
+            self.agents[gid] = agente
+            self._known[gid] |= source_bit
+
+    def step(self, hora: int, incoming: Sequence[Dict[str, Any]] = ()) -> Dict[str, Any]:
+        """
+        Recebe as transferências e executa o step dos agentes do shard.
+
+        Returns:
+            moved: ``array`` de ids movidos (``id`` = foi para o trabalho,
+            ``~id`` = voltou para casa); moved_other: [(id, local)] para
+            outros destinos; outgoing: {shard destino: transferência};
+            agents: agentes no shard após o tick; seconds: tempo do step
+        """
+        started = time.perf_counter()
+        for transfer in incoming:
+            self.receive(transfer)
+        moved = array.array('q')
+        moved_other: List[Tuple[int, str]] = []
+        outgoing: Dict[int, Dict[str, Any]] = {}
+        leaving: List[Tuple[int, int, Agente, Any]] = []
+        shard_for = self.router.shard_for
+        shard_id = self.shard_id
+        for gid, agente in self.agents.items():
+            if not agente.step(hora):
+                continue
+            local = agente.local
+            if local == agente.trabalho:
+                code = gid
+                moved.append(code)
+            elif local == agente.casa:
+                code = ~gid
+                moved.append(code)
+            else:
+                code = local
+                moved_other.append((gid, local))
+            target = shard_for(local)
+            if target != shard_id:
+                leaving.append((gid, target, agente, code))
+
+        for gid, target, agente, code in leaving:
+            del self.agents[gid]
+            self.parked[gid] = agente
+            transfer = outgoing.get(target)
+            if transfer is None:
+                transfer = outgoing[target] = _new_transfer(shard_id)
+            known = self._known[gid]
+            if not known & (1 << target):
+                transfer['records'].append((gid, agente.nome, agente.casa, agente.trabalho, agente.local))
+                self._known[gid] = known | (1 << target)
+            elif isinstance(code, str):
+                transfer['other'].append((gid, code))
+            else:
+                transfer['codes'].append(code)
+        return {
+            'moved': moved,
+            'moved_other': moved_other,
+            'outgoing': outgoing,
+            'agents': len(self.agents),
+            'seconds': time.perf_counter() - started,
+        }
+
+
+def _worker_main(conn, shard_id: int, router: ShardRouter, seed: int) -> None:
+    """Laço do processo de um shard: responde aos comandos do coordenador."""
+    rng_streams.configure(seed)
+    shard = Shard(shard_id, router)
+    try:
+        while True:
+            command, *args = conn.recv()
+            if command == 'add':
+                shard.add(args[0])
+                conn.send(len(shard.agents))
+            elif command == 'step':
+                conn.send(shard.step(*args))
+            elif command == 'stop':
+                break
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        conn.close()
+
+
+class _InlineShard:
+    """Shard no próprio processo, com o mesmo protocolo do worker (depuração/testes)."""
+
+    def __init__(self, shard_id: int, router: ShardRouter):
+        self.shard = Shard(shard_id, router)
+        self._reply = None
+
+    def send(self, message) -> None:
+        command, *args = message
+        if command == 'add':
+            self.shard.add(args[0])
+            self._reply = len(self.shard.agents)
+        elif command == 'step':
+            self._reply = self.shard.step(*args)
+
+    def recv(self):
+        return self._reply
+
+
+class ShardedSimulation:
+    """
+    Coordenador da simulação particionada.
+
+    Args:
+        agentes: Agentes iniciais
+        router: Regiões -> shards (``ShardRouter``)
+        processes: False executa os shards no próprio processo (mesmo
+            resultado, útil para depurar)
+        seed: Semente dos fluxos aleatórios dos shards (padrão: a de
+            ``rng_streams``)
+    """
+
+    def __init__(self, agentes: Iterable[Agente], router: ShardRouter, processes: bool = True,
+                 seed: Optional[int] = None):
+        self.router = router
+        self.processes = processes
+        self.seed = rng_streams.seed if seed is None else seed
+        self.tick = 0
+        self.transfers = 0
+        self.names: List[str] = []
+        self.locations: List[str] = []
+        self._homes: List[str] = []
+        self._works: List[str] = []
+        self._initial: List[List[AgentRecord]] = [[] for _ in range(router.n_shards)]
+        for agente in agentes:
+            gid = len(self.names)
+            self.names.append(agente.nome)
+            self.locations.append(agente.local)
+            self._homes.append(agente.casa)
+            self._works.append(agente.trabalho)
+            self._initial[router.shard_for(agente.local)].append(
+                (gid, agente.nome, agente.casa, agente.trabalho, agente.local)
+            )
+        self._pending: List[List[Dict[str, Any]]] = [[] for _ in range(router.n_shards)]
+        self._conns: List[Any] = []
+        self._workers: List[multiprocessing.Process] = []
+        self.shard_agents = [len(records) for records in self._initial]
+
+    @classmethod
+    def from_config(cls, agentes: Iterable[Agente], sim_config, session=None) -> 'ShardedSimulation':
+        """
+        Simulação com ``simulation.shards`` processos; regiões do banco
+        (``region_map``) se ``session`` for informada.
+        """
+        agentes = list(agentes)
+        if session is None:
+            router = ShardRouter(sim_config.shards)
+        else:
+            regions = region_map(session)
+            loads: Dict[Any, int] = {}
+            for agente in agentes:
+                region = regions.get(agente.local)
+                if region is not None:
+                    loads[region] = loads.get(region, 0) + 1
+            for region in regions.values():
+                loads.setdefault(region, 0)
+            router = ShardRouter.from_regions(regions, sim_config.shards, loads)
+        return cls(agentes, router, seed=sim_config.random_seed)
+
+    # ---------- Ciclo de vida ----------
+    def start(self) -> 'ShardedSimulation':
+        if self._conns:
+            return self
+        for shard_id in range(self.router.n_shards):
+            if self.processes:
+                parent, child = multiprocessing.Pipe()
+                worker = multiprocessing.Process(
+                    target=_worker_main, args=(child, shard_id, self.router, self.seed),
+                    name=f'shard-{shard_id}', daemon=True,
+                )
+                worker.start()
+                child.close()
+                self._workers.append(worker)
+                self._conns.append(parent)
+            else:
+                self._conns.append(_InlineShard(shard_id, self.router))
+        for conn, records in zip(self._conns, self._initial):
+            conn.send(('add', records))
+        for conn in self._conns:
+            conn.recv()
+        self._initial = [[] for _ in range(self.router.n_shards)]
+        logger.info("Simulação particionada: %d agentes em %d shards (%s)",
+                    len(self.names), self.router.n_shards, 'processos' if self.processes else 'inline')
+        return self
+
+    def close(self) -> None:
+        for conn in self._conns:
+            if self.processes:
+                try:
+                    conn.send(('stop',))
+                except (BrokenPipeError, OSError):
+                    pass
+                conn.close()
+        for worker in self._workers:
+            worker.join(5)
+            if worker.is_alive():
+                worker.terminate()
+        self._conns.clear()
+        self._workers.clear()
+
+    def __enter__(self) -> 'ShardedSimulation':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ---------- Tick ----------
+    def step(self, hora: int) -> Dict[str, Any]:
+        """
+        Executa um tick em todos os shards e troca os agentes que cruzaram
+        fronteiras.
+
+        Returns:
+            Resumo do tick: agentes movidos, transferências e tempo por shard
+        """
+        self.start()
+        self.tick += 1
+        with telemetry.phase('shard_step', len(self.names)):
+            for conn, incoming in zip(self._conns, self._pending):
+                conn.send(('step', hora, incoming))
+            results = [conn.recv() for conn in self._conns]
+
+        moved = 0
+        transfers = 0
+        pending: List[List[Dict[str, Any]]] = [[] for _ in range(self.router.n_shards)]
+        incoming = [0] * self.router.n_shards
+        locations, homes, works = self.locations, self._homes, self._works
+        with telemetry.phase('shard_exchange', len(results)):
+            for result in results:
+                for code in result['moved']:
+                    if code >= 0:
+                        locations[code] = works[code]
+                    else:
+                        locations[~code] = homes[~code]
+                for gid, local in result['moved_other']:
+                    locations[gid] = local
+                moved += len(result['moved']) + len(result['moved_other'])
+                for target, transfer in result['outgoing'].items():
+                    pending[target].append(transfer)
+                    count = len(transfer['records']) + len(transfer['codes']) + len(transfer['other'])
+                    incoming[target] += count
+                    transfers += count
+        self._pending = pending
+        self.transfers += transfers
+        self.shard_agents = [r['agents'] + n for r, n in zip(results, incoming)]
+        return {
+            'tick': self.tick,
+            'moved': moved,
+            'transfers': transfers,
+            'shard_agents': list(self.shard_agents),
+            'shard_seconds': [round(r['seconds'], 6) for r in results],
+        }
+
+    def snapshot(self) -> Dict[str, str]:
+        """Estado consolidado, no formato de ``Cidade.snapshot``."""
+        return dict(zip(self.names, self.locations))
+
+    @property
+    def agentes(self) -> List[Agente]:
+        """
+        Cópias dos agentes no estado consolidado, como ``Cidade.agentes``
+        (permite passar a simulação a ``CheckpointScheduler`` e
+        ``WorldSnapshotPublisher.publish`` no lugar da ``Cidade``).
+        """
+        return [_materialize(*fields) for fields in zip(self.names, self._homes, self._works, self.locations)]
@@ -0,0 +1,438 @@
+"""
+Estado do mundo em memória compartilhada para os workers da API.
+
+A cada tick a simulação publica posições, status, filas e métricas num
+segmento ``multiprocessing.shared_memory`` com dois buffers: grava no
+buffer inativo e só então o torna ativo, incrementando o contador de
+versão. Os workers do uvicorn mapeiam o mesmo segmento e leem as colunas
+direto dele (formato colunar do checkpoint, ``SimulationCheckpoint``),
+sem consultar o banco nem copiar o estado.
+
+Cada buffer tem um número de sequência (ímpar durante a gravação). O
+leitor confere a sequência antes e depois de usar o estado e repete a
+leitura se o buffer foi reescrito no meio (só acontece com um leitor mais
+lento que um tick inteiro).
+
+Layout do segmento::
+
+    [controle, 128 bytes][buffer 0: capacidade][buffer 1: capacidade]
+
+Uso (simulação)::
+
+    publisher = WorldSnapshotPublisher.from_config(get_config().simulation, get_session)
+    publisher.publish(cidade=cidade, hora=hora)
+
+Uso (API)::
+
+    reader = attach_from_config(get_config().simulation)
+    if reader is not None and reader.live:
+        metrics = reader.read(lambda snapshot: snapshot.metadata['metrics'])
+"""
+
+import os
+import struct
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from backend.simulation.checkpoint import SimulationCheckpoint, capture_database, capture_memory, encode_checkpoint
+from backend.utils.telemetry import telemetry
+from backend.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+MAGIC = b'FRTWRLD\x01'
+CONTROL_SIZE = 128
+
+# Campos do bloco de controle: (offset, formato)
+_VERSION = (8, '<Q')
+_ACTIVE = (16, '<I')
+_PID = (20, '<I')
+_CAPACITY = (24, '<Q')
+_PUBLISHED_AT = (32, '<d')
+_CLOSED = (40, '<I')
+_SLOT_SEQ = (48, 64)    # sequência do buffer 0 / 1
+_SLOT_SIZE = (56, 72)   # bytes válidos do buffer 0 / 1
+
+# Colunas publicadas por tabela do banco (além do id)
+WORLD_COLUMNS = {
+    'agents': (
+        'name', 'current_status', 'current_location_type', 'current_location_id',
+        'energy_level', 'wallet',
+    ),
+    'vehicles': (
+        'name', 'vehicle_type', 'current_passengers', 'passenger_capacity', 'status',
+        'current_station_id', 'current_route_id', 'current_fuel', 'current_x', 'current_y',
+    ),
+    'stations': (
+        'name', 'station_type', 'x', 'y', 'current_queue_length', 'max_queue_length',
+        'is_operational',
+    ),
+    'routes': ('name', 'code', 'route_type', 'fare_base', 'frequency_minutes', 'is_active'),
+}
+
+
+class SnapshotBusyError(RuntimeError):
+    """O leitor não conseguiu uma leitura consistente (simulação reescrevendo)."""
+
+
+def _get(buf, field) -> Any:
+    offset, fmt = field
+    return struct.unpack_from(fmt, buf, offset)[0]
+
+
+def _set(buf, field, value) -> None:
+    offset, fmt = field
+    struct.pack_into(fmt, buf, offset, value)
+
+
+def _slot_seq(slot: int) -> Tuple[int, str]:
+    return _SLOT_SEQ[slot], '<Q'
+
+
+def _slot_size(slot: int) -> Tuple[int, str]:
+    return _SLOT_SIZE[slot], '<Q'
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class _NoTracker:
+    """Substitui o resource_tracker ao abrir segmentos alheios (Python < 3.13)."""
+
+    @staticmethod
+    def register(name, rtype):
+        pass
+
+    @staticmethod
+    def unregister(name, rtype):
+        pass
+
+
+_attach_lock = threading.Lock()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """
+    Abre um segmento existente sem registrá-lo no resource_tracker.
+
+    Registrado, o segmento seria removido quando o processo do leitor
+    terminasse, mesmo com a simulação ainda publicando nele.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13 não tem ``track``
+        pass
+    with _attach_lock:
+        tracker = shared_memory.resource_tracker
+        shared_memory.resource_tracker = _NoTracker
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            shared_memory.resource_tracker = tracker
+
+
+# ---------- Captura ----------
+
+def capture_operators(session) -> Dict[str, Tuple[str, Sequence, int]]:
+    """Operadoras (inclusive inativas) ordenadas por lucro, como no ranking da API."""
+    from sqlalchemy import desc
+    from backend.database.models import TransportOperator
+
+    profit = TransportOperator.profit.label('profit')
+    rows = (session.query(TransportOperator.id, TransportOperator.name, TransportOperator.operator_type,
+                          TransportOperator.revenue, TransportOperator.operational_costs, profit)
+            .order_by(desc(profit), TransportOperator.name)
+            .all())
+    ids, names, types, revenue, costs, profits = list(zip(*rows)) if rows else [()] * 6
+    return {
+        'id': ('uuid', ids, 0),
+        'name': ('str', names, 0),
+        'operator_type': ('enum', types, 0),
+        'revenue': ('decimal', revenue, 2),
+        'operational_costs': ('decimal', costs, 2),
+        'profit': ('float', [float(p or 0) for p in profits], 0),
+    }
+
+
+def compute_metrics(tables: Dict[str, Dict[str, Tuple[str, Sequence, int]]]) -> Dict[str, Any]:
+    """Métricas agregadas da API (mesmas regras do SQL de ``/api/metrics``)."""
+    def values(table, column):
+        return tables[table][column][1] if table in tables else ()
+
+    queues = [q for q in values('stations', 'current_queue_length') if q is not None]
+    return {
+        'total_passengers_waiting': int(sum(queues)),
+        'total_passengers_in_vehicles': int(sum(p or 0 for p in values('vehicles', 'current_passengers'))),
+        'total_vehicles': len(values('vehicles', 'id')),
+        'total_stations': len(values('stations', 'id')),
+        'total_routes': len(values('routes', 'id')),
+        'total_revenue': float(sum(r or 0 for r in values('operators', 'revenue'))),
+        'avg_queue_length': sum(queues) / len(queues) if queues else 0.0,
+    }
+
+
+# ---------- Publicação ----------
+
+class WorldSnapshotPublisher:
+    """
+    Dono do segmento compartilhado (processo da simulação).
+
+    Args:
+        name: Nome do segmento (``simulation.world_snapshot_name``)
+        capacity: Bytes de cada um dos dois buffers
+        session_factory: Cria a sessão usada por ``publish`` quando nenhuma
+            é passada (tabelas do mundo e métricas); None publica só o
+            estado em memória
+        db_retry_interval: Segundos sem consultar o banco depois de uma
+            falha de captura; dobra a cada falha seguida, até
+            ``db_retry_max``, e volta ao início no primeiro sucesso
+
+    Raises:
+        FileExistsError: Se outra simulação viva já publica no segmento
+    """
+
+    def __init__(self, name: str, capacity: int = 64 * 2 ** 20,
+                 session_factory: Optional[Callable[[], Any]] = None,
+                 db_retry_interval: float = 5.0, db_retry_max: float = 300.0):
+        self.name = name
+        self.capacity = capacity
+        self.session_factory = session_factory
+        self.db_retry_interval = db_retry_interval
+        self.db_retry_max = db_retry_max
+        self.db_failures = 0
+        self.db_retry_at = 0.0  # time.monotonic() a partir do qual o banco é consultado de novo
+        try:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=CONTROL_SIZE + 2 * capacity)
+        except FileExistsError:
+            self._remove_stale(name)
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=CONTROL_SIZE + 2 * capacity)
+        buf = self._shm.buf
+        buf[:CONTROL_SIZE] = bytes(CONTROL_SIZE)
+        buf[:len(MAGIC)] = MAGIC
+        _set(buf, _PID, os.getpid())
+        _set(buf, _CAPACITY, capacity)
+        self.version = 0
+        self.dropped = 0
+        self.last_size = 0
+
+    @staticmethod
+    def _remove_stale(name: str) -> None:
+        """Remove o segmento de uma execução anterior que não o fechou."""
+        stale = _attach(name)
+        try:
+            buf = stale.buf
+            owner = _get(buf, _PID) if bytes(buf[:len(MAGIC)]) == MAGIC else 0
+            if not _get(buf, _CLOSED) and owner != os.getpid() and _pid_alive(owner):
+                raise FileExistsError(f"Segmento {name} em uso pela simulação de pid {owner}")
+        finally:
+            stale.close()
+        logger.warning("Segmento %s já existia (execução anterior encerrada); substituindo", name)
+        stale = shared_memory.SharedMemory(name=name)
+        stale.close()
+        stale.unlink()
+
+    @classmethod
+    def from_config(cls, sim_config, session_factory=None) -> Optional['WorldSnapshotPublisher']:
+        """Publicador de ``simulation.world_snapshot_name`` (None se vazio)."""
+        if not sim_config.world_snapshot_name:
+            return None
+        return cls(sim_config.world_snapshot_name, sim_config.world_snapshot_capacity_mb * 2 ** 20,
+                   session_factory)
+
+    def publish(self, session=None, cidade=None, **clock) -> bool:
+        """
+        Captura o estado atual e publica no buffer inativo.
+
+        Args:
+            session: Sessão da simulação (tabelas do mundo e métricas); None
+                usa ``session_factory`` ou publica só o estado em memória
+            cidade: ``Cidade`` em memória (opcional)
+            **clock: Relógio da simulação (tick, hora, simulation_time, ...)
+
+        Returns:
+            False se o estado não coube no buffer (a versão anterior continua valendo)
+        """
+        tables = capture_memory(cidade)
+        if cidade is not None:
+            clock.setdefault('tick', cidade.tick)
+        if session is not None:
+            tables.update(self._capture_world(session))
+        elif self.session_factory is not None and time.monotonic() >= self.db_retry_at:
+            tables.update(self._capture_from_factory())
+        metadata = {'world': 'agents' in tables, 'metrics': compute_metrics(tables)}
+
+        with telemetry.phase('world_publish', sum(len(next(iter(t.values()))[1]) for t in tables.values() if t)):
+            prefix, sections = encode_checkpoint(tables, clock, metadata)
+            return self._write(prefix, sections)
+
+    def _capture_from_factory(self) -> Dict[str, Dict[str, Tuple[str, Sequence, int]]]:
+        """Tabelas do mundo por uma sessão nova; vazio (e espera para tentar de novo) se falhar."""
+        try:
+            session = self.session_factory()
+            try:
+                tables = self._capture_world(session)
+            finally:
+                session.close()
+        except Exception as e:
+            # Banco indisponível ou sem tabelas: segue só com a memória
+            self.db_failures += 1
+            delay = min(self.db_retry_interval * 2 ** (self.db_failures - 1), self.db_retry_max)
+            self.db_retry_at = time.monotonic() + delay
+            logger.warning("Estado do mundo publicado sem as tabelas do banco (nova tentativa em %.0fs): %s",
+                           delay, e)
+            return {}
+        if self.db_failures:
+            logger.info("Tabelas do banco de volta ao estado do mundo após %d falha(s)", self.db_failures)
+            self.db_failures = 0
+        return tables
+
+    @staticmethod
+    def _capture_world(session) -> Dict[str, Dict[str, Tuple[str, Sequence, int]]]:
+        tables = capture_database(session, WORLD_COLUMNS)
+        tables['operators'] = capture_operators(session)
+        return tables
+
+    def _write(self, prefix: bytes, sections: Sequence[bytes]) -> bool:
+        size = len(prefix) + sum(len(data) for data in sections)
+        if size > self.capacity:
+            self.dropped += 1
+            logger.warning("Estado do mundo (%d bytes) não cabe no buffer de %d bytes; publicação ignorada",
+                           size, self.capacity)
+            return False
+
+        buf = self._shm.buf
+        slot = 1 - _get(buf, _ACTIVE) if self.version else 0
+        seq = _get(buf, _slot_seq(slot))
+        _set(buf, _slot_seq(slot), seq + 1)  # ímpar: gravando
+
+        position = CONTROL_SIZE + slot * self.capacity
+        for data in (prefix, *sections):
+            buf[position:position + len(data)] = data
+            position += len(data)
+
+        _set(buf, _slot_size(slot), size)
+        _set(buf, _slot_seq(slot), seq + 2)
+        _set(buf, _ACTIVE, slot)
+        _set(buf, _PUBLISHED_AT, time.time())
+        self.version += 1
+        _set(buf, _VERSION, self.version)
+        self.last_size = size
+        return True
+
+    def close(self) -> None:
+        """Marca o segmento como encerrado e o remove."""
+        if self._shm is None:
+            return
+        _set(self._shm.buf, _CLOSED, 1)
+        self._shm.close()
+        try:
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
+        self._shm = None
+
+    def __enter__(self) -> 'WorldSnapshotPublisher':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# ---------- Leitura ----------
+
+class WorldSnapshotReader:
+    """
+    Leitor do segmento publicado pela simulação (workers da API).
+
+    Raises:
+        FileNotFoundError: Se nenhuma simulação criou o segmento
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._shm = _attach(name)
+        if bytes(self._shm.buf[:len(MAGIC)]) != MAGIC:
+            self._shm.close()
+            raise ValueError(f"Segmento {name} não é um estado do mundo da simulação")
+        self.capacity = _get(self._shm.buf, _CAPACITY)
+
+    @property
+    def version(self) -> int:
+        return _get(self._shm.buf, _VERSION)
+
+    @property
+    def published_at(self) -> float:
+        return _get(self._shm.buf, _PUBLISHED_AT)
+
+    @property
+    def live(self) -> bool:
+        """Há estado publicado e a simulação dona do segmento continua rodando."""
+        buf = self._shm.buf
+        return _get(buf, _VERSION) > 0 and not _get(buf, _CLOSED) and _pid_alive(_get(buf, _PID))
+
+    def read(self, fn: Callable[[SimulationCheckpoint], Any], retries: int = 8) -> Any:
+        """
+        Chama ``fn`` com o estado mais recente, lido direto da memória compartilhada.
+
+        As colunas só valem dentro de ``fn``; o resultado precisa ser
+        independente do snapshot (listas, DTOs, números).
+
+        Raises:
+            SnapshotBusyError: Se o buffer foi reescrito em todas as tentativas
+        """
+        buf = self._shm.buf
+        for _ in range(retries):
+            slot = _get(buf, _ACTIVE)
+            seq = _get(buf, _slot_seq(slot))
+            if seq % 2:
+                continue
+            start = CONTROL_SIZE + slot * self.capacity
+            size = _get(buf, _slot_size(slot))
+            view = buf[start:start + size]
+            try:
+                snapshot = SimulationCheckpoint.from_buffer(view)
+                try:
+                    result = fn(snapshot)
+                finally:
+                    snapshot.close()
+            except Exception:
+                if _get(buf, _slot_seq(slot)) == seq:
+                    raise
+                continue  # leu um buffer sendo reescrito
+            finally:
+                view.release()
+            if _get(buf, _slot_seq(slot)) == seq:
+                return result
+        raise SnapshotBusyError(f"Estado do mundo {self.name} reescrito durante {retries} leituras")
+
+    def close(self) -> None:
+        if self._shm is not None:
+            self._shm.close()
+            self._shm = None
+
+    def __enter__(self) -> 'WorldSnapshotReader':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def attach_from_config(sim_config) -> Optional[WorldSnapshotReader]:
+    """Leitor de ``simulation.world_snapshot_name`` (None se desligado ou sem simulação)."""
+    if not sim_config.world_snapshot_name:
+        return None
+    try:
+        return WorldSnapshotReader(sim_config.world_snapshot_name)
+    except FileNotFoundError:
+        return None
@@ -24,7 +24,7 @@ Exemplo de uso:
 import yaml
 from pathlib import Path
 from typing import Any, Dict, Optional
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from backend.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -36,7 +36,18 @@ class SimulationConfig:
     speed: float = 1.0  # Velocidade de simulação (1.0 = tempo real)
     start_time: int = 0  # Hora inicial (0-23)
     tick_rate: int = 60  # Ticks por segundo
+    random_seed: Optional[int] = None  # Semente dos fluxos aleatórios (None = sorteada)
+    shards: int = 1  # Processos da simulação particionada por região
     auto_save_interval: int = 300  # Segundos entre auto-saves
+    checkpoint_path: str = "data/checkpoints/simulation.ckpt"  # Checkpoint do auto-save ("" = desativado)
+    telemetry_enabled: bool = False  # Telemetria por fase do tick
+    telemetry_buffer_size: int = 600  # Ticks mantidos no buffer circular
+    telemetry_dump_path: str = "data/logs/ticks.jsonl"  # Arquivo do buffer
+    telemetry_dump_every: int = 60  # Grava o buffer a cada N ticks (0 = nunca)
+    event_log_path: str = ""  # Log binário de eventos para replay ("" = desativado)
+    event_log_snapshot_every: int = 24  # Snapshot completo a cada N ticks
+    world_snapshot_name: str = ""  # Memória compartilhada do estado p/ a API (ex: "ferritine_world"; "" = desativado)
+    world_snapshot_capacity_mb: int = 64  # Tamanho de cada um dos dois buffers
 
 
 @dataclass
@@ -45,6 +56,13 @@ class DatabaseConfig:
     path: str = "data/db/city.db"
     echo_sql: bool = False  # Mostrar SQL no console
     pool_size: int = 10
+    archive_dir: str = "data/archive"  # Partições expiradas (.jsonl.gz)
+    # Retenção em dias por tabela particionada (None = manter para sempre)
+    retention_days: Dict[str, Optional[int]] = field(default_factory=lambda: {
+        "sensor_events": 30,
+        "events": 365,
+        "log_entries": 90,
+    })
 
 
 @dataclass
@@ -55,6 +73,16 @@ class IoTConfig:
     mqtt_broker: str = "localhost"
     mqtt_port: int = 1883
     mqtt_topic_prefix: str = "ferritine"
+    ingest_source: str = "serial"  # Fonte de leituras: serial ou mqtt
+    ingest_batch_size: int = 500  # Leituras por INSERT em lote
+    ingest_flush_interval: float = 0.5  # Segundos máximos entre gravações
+    ingest_queue_size: int = 10000  # Capacidade do buffer de leituras
+    ingest_max_retries: int = 3  # Falhas seguidas de um lote antes de ir para a fila de rejeitados
+    reed_debounce_ms: float = 30.0  # Janela de debounce dos reed switches
+    dispatch_interval: float = 0.05  # Segundos entre ticks do dispatcher sensores -> simulação
+    dispatch_persist_every: int = 20  # Ticks do dispatcher entre gravações do estado dos veículos
+    led_bandwidth_share: float = 0.5  # Fração da banda serial reservada aos quadros de LED
+    led_max_frame_bytes: int = 64  # Tamanho máximo de um quadro de LED
 
 
 @dataclass
@@ -214,6 +242,14 @@ class Config:
                 logger.warning("simulation.auto_save_interval deve ser positivo")
                 return False
 
+            if self.simulation.shards < 1:
+                logger.warning("simulation.shards deve ser >= 1")
+                return False
+
+            if self.simulation.world_snapshot_capacity_mb <= 0:
+                logger.warning("simulation.world_snapshot_capacity_mb deve ser positivo")
+                return False
+
             # Validar DatabaseConfig
             if not self.database.path:
                 logger.warning("database.path não pode estar vazio")
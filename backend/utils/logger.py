@@ -6,6 +6,38 @@ Fornece um logger configurado com múltiplos handlers:
 - Arquivo: DEBUG e acima (com rotação)
 - Arquivo de Erros: ERROR e acima (com rotação)
 
+Os handlers não rodam no thread que loga: os registros passam por uma fila
+limitada (``QueueHandler``) e um ``QueueListener`` em background faz a
+formatação e o I/O. Com a fila cheia, registros abaixo de ERROR são
+descartados e contados (``get_log_stats()``); ERROR e acima esperam
+brevemente por espaço antes de serem descartados.
+
+Variáveis de ambiente:
+    LOG_LEVEL=DEBUG         # Nível do logger 'ferritine' (valor inválido: DEBUG, com aviso)
+    LOG_ASYNC=True          # False volta aos handlers síncronos
+    LOG_QUEUE_SIZE=10000    # Capacidade da fila
+    LOG_FORMAT=text         # 'json' grava os arquivos em JSON-lines
+    LOG_ARCHIVE=none        # 'gzip' comprime os arquivos rotacionados
+
+Com ``LOG_FORMAT=json`` cada linha dos arquivos é um objeto com ``ts``,
+``level``, ``logger``, ``module``, ``line``, ``msg``, o horário simulado
+(``sim_time``, definido por ``set_simulation_time``) e os campos passados
+em ``extra`` (ex: ``extra={"agent_id": agent.id}``). ``iter_json_logs``
+lê o arquivo atual e os arquivos rotacionados (inclusive ``.gz``).
+
+Laços quentes (um registro por entidade) devem evitar até o custo da
+chamada quando o nível está desligado, amostrar ou agregar por tick:
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Estado: %s", estado_caro())
+
+    sampled = logger.sampled(every_n=1000, per_second=10)
+    sampled.debug("Criando agente: %s", nome)   # 1 em 1000, no máximo 10/s
+
+    resumo = LogAggregator(logger)
+    resumo.count("mudaram_de_local", movidos)
+    resumo.flush("Step hora=%d", hora)          # uma linha por tick
+
 Exemplo de uso:
     from backend.utils.logger import get_logger
 
@@ -17,13 +49,288 @@ Exemplo de uso:
     logger.critical("Falha crítica do sistema")
 """
 
+import atexit
+import copy
+import gzip
+import json
 import logging
-from logging.handlers import RotatingFileHandler
+import os
+import queue
+import shutil
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
 
 # Flag para garantir que a configuração global seja feita apenas uma vez
 _configured = False
 
+# Pipeline assíncrono (criado na configuração global)
+_queue_handler: Optional["BoundedQueueHandler"] = None
+_listener: Optional[QueueListener] = None
+
+# Horário simulado anexado aos registros (ver set_simulation_time)
+_simulation_time: Any = None
+
+# Atributos padrão do LogRecord (o resto veio de ``extra``)
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {
+    "message", "asctime", "sim_time",
+}
+
+
+def set_simulation_time(value: Any) -> None:
+    """Define o horário simulado anexado aos próximos registros (ex: hora do tick)."""
+    global _simulation_time
+    _simulation_time = value
+
+
+class SimulationContextFilter(logging.Filter):
+    """
+    Anexa ``sim_time`` ao registro.
+
+    Roda no handler do thread que loga, antes da fila, para que o horário
+    seja o do momento do registro e não o da escrita.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "sim_time"):
+            record.sim_time = _simulation_time
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Formata cada registro como um objeto JSON em uma linha."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "line": record.lineno,
+            "msg": record.getMessage(),
+        }
+        sim_time = getattr(record, "sim_time", None)
+        if sim_time is not None:
+            entry["sim_time"] = sim_time
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def _gzip_namer(name: str) -> str:
+    return name + ".gz"
+
+
+def _gzip_rotator(source: str, dest: str) -> None:
+    """Comprime o arquivo rotacionado e remove o original."""
+    with open(source, "rb") as f_in, gzip.open(dest, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
+def _rotating_file_handler(path: Path, level: int, formatter: logging.Formatter,
+                           archive: str) -> RotatingFileHandler:
+    handler = RotatingFileHandler(
+        filename=str(path),
+        maxBytes=10 * 1024 * 1024,  # 10MB
+        backupCount=5,
+        encoding="utf-8"
+    )
+    if archive == "gzip":
+        handler.namer = _gzip_namer
+        handler.rotator = _gzip_rotator
+    handler.setLevel(level)
+    handler.setFormatter(formatter)
+    return handler
+
+
+def iter_json_logs(path, include_rotated: bool = True) -> Iterator[Dict[str, Any]]:
+    """
+    Lê um arquivo de log JSON-lines (do mais antigo para o mais novo).
+
+    Args:
+        path: Arquivo atual (ex: data/logs/ferritine.log)
+        include_rotated: Inclui ``.N`` e ``.N.gz`` rotacionados
+    """
+    path = Path(path)
+    files = []
+    if include_rotated:
+        rotated = []
+        for candidate in path.parent.glob(path.name + ".*"):
+            suffix = candidate.name[len(path.name) + 1:].replace(".gz", "")
+            if suffix.isdigit():
+                rotated.append((int(suffix), candidate))
+        files += [candidate for _, candidate in sorted(rotated, reverse=True)]
+    if path.exists():
+        files.append(path)
+
+    for file in files:
+        opener = gzip.open if file.suffix == ".gz" else open
+        with opener(file, "rt", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    QueueHandler com fila limitada que nunca bloqueia logs de rotina.
+
+    Args:
+        log_queue: Fila limitada (``queue.Queue(maxsize)``)
+        never_drop_level: A partir deste nível espera por espaço na fila
+        block_timeout: Tempo máximo de espera (segundos) desses registros
+    """
+
+    def __init__(self, log_queue: queue.Queue, never_drop_level: int = logging.ERROR,
+                 block_timeout: float = 1.0):
+        super().__init__(log_queue)
+        self.never_drop_level = never_drop_level
+        self.block_timeout = block_timeout
+        self._stats_lock = threading.Lock()
+        self.enqueued = 0
+        self.dropped: Dict[str, int] = {}
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Junta mensagem e argumentos e serializa a exceção antes de enfileirar.
+
+        Diferente do padrão, não anexa o traceback à mensagem: ele segue
+        em ``exc_text`` para o formatador de cada handler.
+        """
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            if record.levelno >= self.never_drop_level:
+                self.queue.put(record, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            with self._stats_lock:
+                self.dropped[record.levelname] = self.dropped.get(record.levelname, 0) + 1
+            return
+        with self._stats_lock:
+            self.enqueued += 1
+
+    def stats(self) -> Dict[str, object]:
+        """Contadores da fila."""
+        with self._stats_lock:
+            dropped = dict(self.dropped)
+            enqueued = self.enqueued
+        return {
+            "queued": self.queue.qsize(),
+            "capacity": self.queue.maxsize,
+            "enqueued": enqueued,
+            "dropped": dropped,
+            "dropped_total": sum(dropped.values()),
+        }
+
+
+def _start_queue_pipeline(base_logger: logging.Logger, handlers) -> None:
+    """Liga o logger 'ferritine' aos handlers através da fila."""
+    global _queue_handler, _listener
+    capacity = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    log_queue = queue.Queue(maxsize=capacity)
+    _queue_handler = BoundedQueueHandler(log_queue)
+    _queue_handler.addFilter(SimulationContextFilter())
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    base_logger.addHandler(_queue_handler)
+    atexit.register(shutdown_logging)
+
+
+def get_log_stats() -> Dict[str, object]:
+    """
+    Estatísticas do pipeline assíncrono.
+
+    Returns:
+        dict com 'queued', 'capacity', 'enqueued', 'dropped' (por nível)
+        e 'dropped_total'; vazio se o logging for síncrono
+    """
+    if _queue_handler is None:
+        return {}
+    return _queue_handler.stats()
+
+
+def flush_logs(timeout: float = 5.0) -> bool:
+    """
+    Espera o listener esvaziar a fila.
+
+    Returns:
+        True se a fila foi esvaziada dentro do prazo
+    """
+    if _queue_handler is None or _listener is None:
+        return True
+    log_queue = _queue_handler.queue
+    deadline = time.monotonic() + timeout
+    while log_queue.unfinished_tasks:
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+def shutdown_logging() -> None:
+    """
+    Esvazia a fila e para o listener (registrado no atexit).
+
+    Logs emitidos depois disso vão direto para os handlers (síncrono).
+    """
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()  # processa o que ainda está na fila
+    base_logger = logging.getLogger("ferritine")
+    base_logger.removeHandler(_queue_handler)
+    for handler in _listener.handlers:
+        try:
+            handler.flush()
+        except (OSError, ValueError):  # stream já fechado no encerramento
+            pass
+        handler.addFilter(SimulationContextFilter())
+        base_logger.addHandler(handler)
+    _listener = None
+
+
+def render_log_metrics() -> str:
+    """Contadores da fila de logs no formato de texto do Prometheus."""
+    stats = get_log_stats()
+    if not stats:
+        return ""
+    lines = [
+        "# HELP ferritine_log_queue_size Registros aguardando o listener.",
+        "# TYPE ferritine_log_queue_size gauge",
+        f"ferritine_log_queue_size {stats['queued']}",
+        "# HELP ferritine_log_records_total Registros enfileirados.",
+        "# TYPE ferritine_log_records_total counter",
+        f"ferritine_log_records_total {stats['enqueued']}",
+        "# HELP ferritine_log_records_dropped_total Registros descartados com a fila cheia.",
+        "# TYPE ferritine_log_records_dropped_total counter",
+    ]
+    for level, count in sorted(stats["dropped"].items()):
+        lines.append(f'ferritine_log_records_dropped_total{{level="{level}"}} {count}')
+    return "\n".join(lines) + "\n"
+
 
 class FerritineLogger:
     """
@@ -48,9 +355,8 @@ class FerritineLogger:
         # Configura logger global na primeira inicialização
         self._ensure_configured()
 
-        # Obtém logger filho que propaga para 'ferritine'
+        # Obtém logger filho que propaga para 'ferritine' (e herda o nível)
         self._logger = logging.getLogger(f"ferritine.{name}")
-        self._logger.setLevel(logging.DEBUG)
 
     def _ensure_configured(self) -> None:
         """Configura o logger raiz 'ferritine' na primeira vez."""
@@ -60,7 +366,11 @@ class FerritineLogger:
 
         # Logger raiz 'ferritine'
         base_logger = logging.getLogger("ferritine")
-        base_logger.setLevel(logging.DEBUG)
+        level_name = os.getenv("LOG_LEVEL", "DEBUG").strip().upper()
+        level = logging.getLevelName(level_name)
+        if level_name.isdigit():
+            level = int(level_name)
+        base_logger.setLevel(level if isinstance(level, int) else logging.DEBUG)
         base_logger.propagate = False
 
         # Formatadores
@@ -72,58 +382,193 @@ class FerritineLogger:
             "[%(asctime)s] [%(levelname)s] [%(name)s:%(lineno)d] %(message)s",
             datefmt="%Y-%m-%d %H:%M:%S"
         )
+        # Arquivos em JSON-lines opcionalmente (console continua texto)
+        fmt_file = JsonFormatter() if os.getenv("LOG_FORMAT", "text").lower() == "json" else fmt_detailed
+        archive = os.getenv("LOG_ARCHIVE", "none").lower()
+
+        handlers = []
 
         # Handler: Console (INFO+)
         console_handler = logging.StreamHandler()
         console_handler.setLevel(logging.INFO)
         console_handler.setFormatter(fmt_standard)
-        base_logger.addHandler(console_handler)
+        handlers.append(console_handler)
 
         # Handler: Arquivo geral (DEBUG+) com rotação
-        file_path = self.log_dir / "ferritine.log"
-        file_handler = RotatingFileHandler(
-            filename=str(file_path),
-            maxBytes=10 * 1024 * 1024,  # 10MB
-            backupCount=5,
-            encoding="utf-8"
-        )
-        file_handler.setLevel(logging.DEBUG)
-        file_handler.setFormatter(fmt_detailed)
-        base_logger.addHandler(file_handler)
+        handlers.append(_rotating_file_handler(
+            self.log_dir / "ferritine.log", logging.DEBUG, fmt_file, archive
+        ))
 
         # Handler: Arquivo de erros (ERROR+) com rotação
-        error_path = self.log_dir / "errors.log"
-        error_handler = RotatingFileHandler(
-            filename=str(error_path),
-            maxBytes=10 * 1024 * 1024,  # 10MB
-            backupCount=5,
-            encoding="utf-8"
-        )
-        error_handler.setLevel(logging.ERROR)
-        error_handler.setFormatter(fmt_detailed)
-        base_logger.addHandler(error_handler)
+        handlers.append(_rotating_file_handler(
+            self.log_dir / "errors.log", logging.ERROR, fmt_file, archive
+        ))
+
+        # Com LOG_ASYNC (padrão), o thread que loga só enfileira o registro;
+        # formatação final e I/O ficam no thread do QueueListener
+        if os.getenv("LOG_ASYNC", "True").lower() == "true":
+            _start_queue_pipeline(base_logger, handlers)
+        else:
+            for handler in handlers:
+                handler.addFilter(SimulationContextFilter())
+                base_logger.addHandler(handler)
 
         _configured = True
+        if not isinstance(level, int):
+            base_logger.warning("LOG_LEVEL inválido (%r); usando DEBUG", level_name)
+
+    def isEnabledFor(self, level: int) -> bool:
+        """Verifica (com cache do logging) se o nível está habilitado."""
+        return self._logger.isEnabledFor(level)
+
+    def log(self, level: int, message: str, *args, **kwargs) -> None:
+        """Log no nível informado."""
+        if self._logger.isEnabledFor(level):
+            kwargs.setdefault("stacklevel", 2)
+            self._logger.log(level, message, *args, **kwargs)
 
     def debug(self, message: str, *args, **kwargs) -> None:
         """Log de nível DEBUG."""
-        self._logger.debug(message, *args, **kwargs)
+        if self._logger.isEnabledFor(logging.DEBUG):
+            kwargs.setdefault("stacklevel", 2)
+            self._logger.log(logging.DEBUG, message, *args, **kwargs)
 
     def info(self, message: str, *args, **kwargs) -> None:
         """Log de nível INFO."""
-        self._logger.info(message, *args, **kwargs)
+        if self._logger.isEnabledFor(logging.INFO):
+            kwargs.setdefault("stacklevel", 2)
+            self._logger.log(logging.INFO, message, *args, **kwargs)
 
     def warning(self, message: str, *args, **kwargs) -> None:
         """Log de nível WARNING."""
-        self._logger.warning(message, *args, **kwargs)
+        if self._logger.isEnabledFor(logging.WARNING):
+            kwargs.setdefault("stacklevel", 2)
+            self._logger.log(logging.WARNING, message, *args, **kwargs)
 
     def error(self, message: str, *args, **kwargs) -> None:
         """Log de nível ERROR."""
-        self._logger.error(message, *args, **kwargs)
+        if self._logger.isEnabledFor(logging.ERROR):
+            kwargs.setdefault("stacklevel", 2)
+            self._logger.log(logging.ERROR, message, *args, **kwargs)
 
     def critical(self, message: str, *args, **kwargs) -> None:
         """Log de nível CRITICAL."""
-        self._logger.critical(message, *args, **kwargs)
+        if self._logger.isEnabledFor(logging.CRITICAL):
+            kwargs.setdefault("stacklevel", 2)
+            self._logger.log(logging.CRITICAL, message, *args, **kwargs)
+
+    def sampled(self, every_n: int = 1, per_second: Optional[int] = None) -> "SampledLogger":
+        """
+        Logger amostrado para laços quentes.
+
+        Args:
+            every_n: Emite 1 a cada N chamadas de cada ponto de chamada
+            per_second: Emite no máximo K registros por segundo por ponto
+        """
+        return SampledLogger(self, every_n=every_n, per_second=per_second)
+
+
+class SampledLogger:
+    """
+    Logger com amostragem por ponto de chamada (arquivo e linha).
+
+    O nível é verificado antes de qualquer outra coisa, então chamadas
+    com o nível desligado custam o mesmo que no ``FerritineLogger``.
+    Ao emitir, informa quantos registros do mesmo ponto foram suprimidos.
+    """
+
+    def __init__(self, logger: FerritineLogger, every_n: int = 1,
+                 per_second: Optional[int] = None):
+        if every_n < 1:
+            raise ValueError("every_n deve ser >= 1")
+        self._logger = logger._logger
+        self.every_n = every_n
+        self.per_second = per_second
+        self._lock = threading.Lock()
+        # {(arquivo, linha): [chamadas, início da janela, emitidos na janela, suprimidos]}
+        self._sites: Dict[Tuple[str, int], list] = {}
+
+    def isEnabledFor(self, level: int) -> bool:
+        return self._logger.isEnabledFor(level)
+
+    def _emit(self, level: int, message: str, args: tuple, kwargs: dict) -> None:
+        frame = sys._getframe(2)
+        site = (frame.f_code.co_filename, frame.f_lineno)
+        with self._lock:
+            state = self._sites.get(site)
+            if state is None:
+                state = self._sites[site] = [0, time.monotonic(), 0, 0]
+            state[0] += 1
+            allowed = (state[0] - 1) % self.every_n == 0
+            if allowed and self.per_second is not None:
+                now = time.monotonic()
+                if now - state[1] >= 1.0:
+                    state[1], state[2] = now, 0
+                allowed = state[2] < self.per_second
+            if not allowed:
+                state[3] += 1
+                return
+            state[2] += 1
+            suppressed, state[3] = state[3], 0
+
+        if suppressed:
+            message = message + " (+%d suprimidos)"
+            args = args + (suppressed,)
+        kwargs.setdefault("stacklevel", 3)
+        self._logger.log(level, message, *args, **kwargs)
+
+    def debug(self, message: str, *args, **kwargs) -> None:
+        if self._logger.isEnabledFor(logging.DEBUG):
+            self._emit(logging.DEBUG, message, args, kwargs)
+
+    def info(self, message: str, *args, **kwargs) -> None:
+        if self._logger.isEnabledFor(logging.INFO):
+            self._emit(logging.INFO, message, args, kwargs)
+
+    def warning(self, message: str, *args, **kwargs) -> None:
+        if self._logger.isEnabledFor(logging.WARNING):
+            self._emit(logging.WARNING, message, args, kwargs)
+
+    def error(self, message: str, *args, **kwargs) -> None:
+        if self._logger.isEnabledFor(logging.ERROR):
+            self._emit(logging.ERROR, message, args, kwargs)
+
+
+class LogAggregator:
+    """
+    Acumula contadores e emite uma única linha de resumo (ex: por tick).
+
+    Substitui registros por entidade: o laço conta, o tick emite.
+    Com o nível desligado, ``count`` e ``flush`` não fazem nada.
+    """
+
+    def __init__(self, logger: FerritineLogger, level: int = logging.DEBUG):
+        self._logger = logger._logger
+        self.level = level
+        self._counts: Dict[str, float] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self._logger.isEnabledFor(self.level)
+
+    def count(self, key: str, value: float = 1) -> None:
+        """Incrementa um contador do resumo."""
+        if self._logger.isEnabledFor(self.level):
+            self._counts[key] = self._counts.get(key, 0) + value
+
+    def flush(self, message: str, *args) -> Dict[str, float]:
+        """
+        Emite ``message`` seguido dos contadores e zera o resumo.
+
+        Returns:
+            Os contadores emitidos
+        """
+        counts, self._counts = self._counts, {}
+        if self._logger.isEnabledFor(self.level):
+            if counts:
+                message = message + " | " + " ".join(f"{k}={v:g}" for k, v in counts.items())
+            self._logger.log(self.level, message, *args, stacklevel=2)
+        return counts
 
 
 def get_logger(name: str) -> FerritineLogger:
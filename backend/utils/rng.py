@@ -0,0 +1,131 @@
+"""
+Fluxos de números aleatórios determinísticos por subsistema e entidade.
+
+Com o ``random`` global, o resultado de um sorteio depende de tudo que
+foi sorteado antes em qualquer parte do processo: a execução não se
+repete e não pode ser dividida entre threads/processos. Aqui cada
+(subsistema, entidade) tem seu próprio gerador, com semente derivada da
+semente da execução por hash (BLAKE2b); o fluxo de um veículo é o mesmo
+independentemente da ordem de criação, de quantos outros existam ou de
+qual processo o simula.
+
+Dois modos:
+
+- ``stream(subsistema, *chave)``: ``random.Random`` com estado, para um
+  dono sequencial de nível de subsistema (ex: os sorteios de nomes). Os
+  fluxos ficam num cache LRU limitado (``max_streams``): um fluxo
+  despejado perde a posição e recomeça do início se for pedido de novo;
+- ``at(subsistema, *chave, counter=n)`` / ``uniform(...)``: sem estado,
+  função pura de (semente, subsistema, chave, contador), por exemplo o
+  tick ou um contador da entidade. Mesmo resultado seja qual for a ordem
+  das chamadas; é o modo para sorteios por entidade (veículo, agente),
+  que não ocupam memória.
+
+Uso::
+
+    from backend.utils.rng import rng_streams
+
+    damage = rng_streams.at('accidents', vehicle.id, counter=vehicle.accidents_count).randint(5, 15)
+    if rng_streams.uniform('breakdown', vehicle.id, counter=tick) < 0.01:
+        ...
+"""
+
+import hashlib
+import os
+import random
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from backend.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_SEP = b'\x1f'
+
+
+def _encode(part: Any) -> bytes:
+    # Inclui o tipo para que 1 e "1" gerem fluxos diferentes
+    return f"{type(part).__name__}:{part}".encode('utf-8')
+
+
+class RandomStreams:
+    """
+    Gerador de fluxos aleatórios independentes a partir de uma semente.
+
+    Args:
+        seed: Semente da execução; None sorteia uma (registrada no log para
+            poder repetir a execução com ``simulation.random_seed``)
+        max_streams: Fluxos com estado mantidos em cache (LRU)
+    """
+
+    def __init__(self, seed: Optional[int] = None, max_streams: int = 1024):
+        self._lock = threading.Lock()
+        self.max_streams = max_streams
+        self.configure(seed)
+
+    def configure(self, seed: Optional[int] = None) -> None:
+        """Troca a semente e descarta os fluxos já criados."""
+        if seed is None:
+            seed = int.from_bytes(os.urandom(8), 'little')
+            logger.debug("Semente aleatória sorteada: %d", seed)
+        self.seed = int(seed)
+        self._key = hashlib.blake2b(str(self.seed).encode('ascii'), digest_size=32).digest()
+        with self._lock:
+            self._streams: 'OrderedDict[Tuple[Any, ...], random.Random]' = OrderedDict()
+
+    def _digest(self, parts: Tuple[Any, ...], size: int) -> bytes:
+        h = hashlib.blake2b(key=self._key, digest_size=size)
+        h.update(_SEP.join(_encode(part) for part in parts))
+        return h.digest()
+
+    def seed_for(self, subsystem: str, *key: Any) -> int:
+        """Semente (128 bits) do fluxo de ``subsystem`` para a chave."""
+        return int.from_bytes(self._digest((subsystem,) + key, 16), 'little')
+
+    def stream(self, subsystem: str, *key: Any) -> random.Random:
+        """
+        Gerador com estado do subsistema (criado na primeira chamada).
+
+        Um fluxo deve ter um único dono sequencial. Para sorteios por
+        entidade use ``at``/``uniform``: além de ``max_streams`` os fluxos
+        menos usados são descartados e, pedidos de novo, recomeçam do início.
+        """
+        name = (subsystem,) + key
+        with self._lock:
+            rng = self._streams.get(name)
+            if rng is None:
+                rng = self._streams[name] = random.Random(self.seed_for(subsystem, *key))
+                if len(self._streams) > self.max_streams:
+                    self._streams.popitem(last=False)
+            else:
+                self._streams.move_to_end(name)
+        return rng
+
+    def at(self, subsystem: str, *key: Any, counter: int) -> random.Random:
+        """Gerador novo para (chave, contador): não depende de sorteios anteriores."""
+        return random.Random(self.seed_for(subsystem, *key, counter))
+
+    def uniform(self, subsystem: str, *key: Any, counter: int) -> float:
+        """Número em [0, 1) como função pura de (semente, subsistema, chave, contador)."""
+        value = int.from_bytes(self._digest((subsystem,) + key + (counter,), 8), 'little')
+        return (value >> 11) * (1.0 / (1 << 53))
+
+    def reset(self) -> None:
+        """Reinicia todos os fluxos (nova execução com a mesma semente)."""
+        with self._lock:
+            self._streams.clear()
+
+    def __len__(self) -> int:
+        return len(self._streams)
+
+
+# Fluxos globais da simulação; configure com ``configure_from_config``
+rng_streams = RandomStreams()
+
+
+def configure_from_config(simulation_config) -> RandomStreams:
+    """Aplica ``simulation.random_seed`` aos fluxos globais."""
+    rng_streams.configure(simulation_config.random_seed)
+    logger.info("Semente da simulação: %d", rng_streams.seed)
+    return rng_streams
@@ -0,0 +1,84 @@
+"""
+Amostragem ponderada com o método de alias (Walker/Vose).
+
+Construção O(n) e cada amostra em O(1): útil para gerar nomes, profissões
+etc. em massa sem ordenar ou percorrer a população a cada sorteio.
+"""
+
+import random
+from typing import Generic, List, Optional, Sequence, TypeVar
+
+T = TypeVar('T')
+
+
+class AliasSampler(Generic[T]):
+    """
+    Tabela de alias para sorteio ponderado com reposição.
+
+    Pesos negativos ou ``None`` são tratados como zero. Se todos os pesos
+    forem zero, a amostragem é uniforme.
+
+    Example:
+        >>> sampler = AliasSampler(['a', 'b'], [3.0, 1.0])
+        >>> sampler.sample(random.Random(42))
+        'a'
+    """
+
+    def __init__(self, items: Sequence[T], weights: Sequence[Optional[float]]):
+        if len(items) != len(weights):
+            raise ValueError("items e weights devem ter o mesmo tamanho")
+        if not items:
+            raise ValueError("AliasSampler requer ao menos um item")
+
+        self.items: List[T] = list(items)
+        n = len(self.items)
+        cleaned = [max(float(w or 0.0), 0.0) for w in weights]
+        total = sum(cleaned)
+        if total <= 0.0:
+            cleaned = [1.0] * n
+            total = float(n)
+
+        # Probabilidades escaladas para média 1
+        scaled = [w * n / total for w in cleaned]
+        self._prob = [0.0] * n
+        self._alias = [0] * n
+
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            self._prob[s] = scaled[s]
+            self._alias[s] = l
+            scaled[l] = (scaled[l] + scaled[s]) - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+
+        # Sobras (por erro de arredondamento) têm probabilidade 1
+        for i in large + small:
+            self._prob[i] = 1.0
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def sample_index(self, rng: Optional[random.Random] = None) -> int:
+        """Sorteia um índice de ``items``."""
+        u = (rng or random).random() * len(self.items)
+        i = int(u)
+        return i if (u - i) < self._prob[i] else self._alias[i]
+
+    def sample(self, rng: Optional[random.Random] = None) -> T:
+        """Sorteia um item."""
+        return self.items[self.sample_index(rng)]
+
+    def sample_many(self, n: int, rng: Optional[random.Random] = None) -> List[T]:
+        """Sorteia ``n`` itens (com reposição)."""
+        draw = (rng or random).random
+        items, prob, alias = self.items, self._prob, self._alias
+        size = len(items)
+        result = []
+        append = result.append
+        for _ in range(n):
+            u = draw() * size
+            i = int(u)
+            append(items[i] if (u - i) < prob[i] else items[alias[i]])
+        return result
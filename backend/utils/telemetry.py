@@ -0,0 +1,287 @@
+"""
+Telemetria por fase do tick da simulação.
+
+Registro leve de tempos e contadores para descobrir qual fase consome o
+orçamento do tick. As fases reportam com::
+
+    from backend.utils.telemetry import telemetry
+
+    with telemetry.tick(hora):
+        with telemetry.phase('agent_update', entities=len(agentes)):
+            ...
+        telemetry.count('vehicle.accidents')
+
+Desativado (padrão), ``phase`` devolve um context manager nulo
+compartilhado e ``count`` retorna imediatamente: o custo é uma chamada
+de método. Ativado, cada tick vira um ``TickRecord`` guardado num buffer
+circular (``deque(maxlen=capacity)``) gravado em arquivo JSON-lines com
+os últimos N ticks (a cada ``dump_every`` ticks). A API roda em outro
+processo e lê esse arquivo (``read_dump``).
+"""
+
+import json
+import statistics
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+
+@dataclass
+class TickRecord:
+    """Tempos e contadores de um tick."""
+    tick: Optional[int]
+    started_at: float
+    duration: float = 0.0
+    phases: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    counters: Dict[str, float] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class _NullPhase:
+    """Context manager sem efeito usado quando a telemetria está desativada."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    __slots__ = ('registry', 'name', 'entities', 'started')
+
+    def __init__(self, registry: 'TickTelemetry', name: str, entities: int):
+        self.registry = registry
+        self.name = name
+        self.entities = entities
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry._record_phase(self.name, time.perf_counter() - self.started, self.entities)
+        return False
+
+
+class TickTelemetry:
+    """
+    Registro de telemetria do tick.
+
+    Fases e contadores fora de um ``tick()`` entram apenas nos totais
+    acumulados (``totals()``), não no buffer circular.
+    """
+
+    def __init__(self, capacity: int = 600, enabled: bool = False,
+                 dump_path: Optional[str] = None, dump_every: int = 0):
+        self.enabled = enabled
+        self.dump_path = dump_path
+        self.dump_every = dump_every
+        self._lock = threading.Lock()
+        self._buffer: Deque[TickRecord] = deque(maxlen=capacity)
+        self._current: Optional[TickRecord] = None
+        self._totals: Dict[str, Dict[str, float]] = {}
+        self._counters: Dict[str, float] = {}
+        self._ticks_recorded = 0
+
+    # ---------- Configuração ----------
+    def configure(self, enabled: Optional[bool] = None, capacity: Optional[int] = None,
+                  dump_path: Optional[str] = None, dump_every: Optional[int] = None) -> None:
+        """Altera a configuração; mudar ``capacity`` preserva os ticks mais recentes."""
+        with self._lock:
+            if capacity is not None and capacity != self._buffer.maxlen:
+                self._buffer = deque(self._buffer, maxlen=capacity)
+            if dump_path is not None:
+                self.dump_path = dump_path
+            if dump_every is not None:
+                self.dump_every = dump_every
+            if enabled is not None:
+                self.enabled = enabled
+                if not enabled:
+                    self._current = None
+
+    def reset(self) -> None:
+        """Descarta buffer, totais e contadores."""
+        with self._lock:
+            self._buffer.clear()
+            self._current = None
+            self._totals.clear()
+            self._counters.clear()
+            self._ticks_recorded = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._buffer.maxlen
+
+    # ---------- Coleta ----------
+    @contextmanager
+    def tick(self, tick_id: Optional[int] = None) -> Iterator[Optional[TickRecord]]:
+        """Delimita um tick; ao sair, o registro vai para o buffer circular."""
+        if not self.enabled:
+            yield None
+            return
+
+        record = TickRecord(tick=tick_id, started_at=time.time())
+        previous, self._current = self._current, record
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.duration = time.perf_counter() - started
+            self._current = previous
+            self._commit(record)
+
+    def phase(self, name: str, entities: int = 0):
+        """Context manager que mede uma fase (nulo se desativado)."""
+        if not self.enabled:
+            return _NULL_PHASE
+        return _Phase(self, name, entities)
+
+    def count(self, name: str, value: float = 1) -> None:
+        """Incrementa um contador (eventos emitidos, entidades etc.)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+            if self._current is not None:
+                counters = self._current.counters
+                counters[name] = counters.get(name, 0) + value
+
+    def _record_phase(self, name: str, seconds: float, entities: int) -> None:
+        with self._lock:
+            total = self._totals.get(name)
+            if total is None:
+                total = self._totals[name] = {'seconds': 0.0, 'entities': 0, 'calls': 0}
+            total['seconds'] += seconds
+            total['entities'] += entities
+            total['calls'] += 1
+
+            if self._current is not None:
+                phases = self._current.phases
+                entry = phases.get(name)
+                if entry is None:
+                    phases[name] = {'seconds': seconds, 'entities': entities, 'calls': 1}
+                else:
+                    entry['seconds'] += seconds
+                    entry['entities'] += entities
+                    entry['calls'] += 1
+
+    def _commit(self, record: TickRecord) -> None:
+        with self._lock:
+            self._buffer.append(record)
+            self._ticks_recorded += 1
+            should_dump = (self.dump_path and self.dump_every
+                           and self._ticks_recorded % self.dump_every == 0)
+        if should_dump:
+            self.dump()
+
+    # ---------- Consulta ----------
+    def recent(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Últimos ticks (mais antigo primeiro)."""
+        with self._lock:
+            records = list(self._buffer)
+        if limit is not None:
+            records = records[-limit:] if limit > 0 else []
+        return [r.to_dict() for r in records]
+
+    def totals(self) -> Dict[str, Any]:
+        """Totais acumulados desde o último reset (inclui fases fora de ticks)."""
+        with self._lock:
+            return {
+                'phases': {k: dict(v) for k, v in self._totals.items()},
+                'counters': dict(self._counters),
+                'ticks_recorded': self._ticks_recorded,
+            }
+
+    def summary(self) -> Dict[str, Any]:
+        """Estatísticas por fase sobre os ticks do buffer."""
+        return {
+            'enabled': self.enabled,
+            'capacity': self.capacity,
+            **summarize(self.recent()),
+        }
+
+    def dump(self, path: Optional[str] = None) -> Optional[Path]:
+        """
+        Grava o buffer circular em JSON-lines (um tick por linha).
+
+        O arquivo é sobrescrito: contém sempre os últimos ``capacity`` ticks.
+        """
+        target = Path(path or self.dump_path) if (path or self.dump_path) else None
+        if target is None:
+            return None
+        records = self.recent()
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(target.suffix + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record) + '\n')
+        tmp.replace(target)
+        return target
+
+
+def summarize(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Estatísticas por fase (média, p95, máximo) de registros de tick."""
+    phases: Dict[str, List[float]] = {}
+    entities: Dict[str, float] = {}
+    for record in records:
+        for name, entry in record['phases'].items():
+            phases.setdefault(name, []).append(entry['seconds'])
+            entities[name] = entities.get(name, 0) + entry['entities']
+
+    def stats(values: List[float]) -> Dict[str, float]:
+        ordered = sorted(values)
+        return {
+            'samples': len(values),
+            'mean_ms': statistics.fmean(values) * 1000.0,
+            'p95_ms': ordered[int(0.95 * (len(ordered) - 1))] * 1000.0,
+            'max_ms': ordered[-1] * 1000.0,
+        }
+
+    durations = [r['duration'] for r in records]
+    return {
+        'ticks': len(records),
+        'tick': stats(durations) if durations else None,
+        'phases': {
+            name: {**stats(values), 'entities': entities[name]}
+            for name, values in phases.items()
+        },
+    }
+
+
+def read_dump(path) -> List[Dict[str, Any]]:
+    """
+    Lê os ticks gravados por ``dump`` (outro processo, ex: a simulação).
+
+    Arquivo ausente devolve lista vazia.
+    """
+    try:
+        with open(path, encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+# Registro global usado pela simulação e pela API
+telemetry = TickTelemetry()
+
+
+def configure_from_config(simulation_config) -> TickTelemetry:
+    """Aplica ``SimulationConfig`` (telemetry_*) ao registro global."""
+    telemetry.configure(
+        enabled=simulation_config.telemetry_enabled,
+        capacity=simulation_config.telemetry_buffer_size,
+        dump_path=simulation_config.telemetry_dump_path,
+        dump_every=simulation_config.telemetry_dump_every,
+    )
+    return telemetry
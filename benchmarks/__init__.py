@@ -0,0 +1,11 @@
+"""
+Benchmarks de desempenho do Ferritine.
+
+Executáveis como módulos, por exemplo::
+
+    python -m benchmarks.api_queries --sizes 1000,10000 --output results.json
+    python -m benchmarks.api_queries --compare baseline.json
+
+Os resultados são gravados em JSON (com commit e ambiente) para
+comparação entre commits.
+"""
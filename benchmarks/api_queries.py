@@ -0,0 +1,149 @@
+"""
+Benchmarks da API e da camada de queries.
+
+Para cada tamanho de mundo, gera uma cidade sintética em SQLite
+(``backend.database.synthetic``), aponta a API para esse banco e mede os
+endpoints e as queries mais usadas.
+
+Uso::
+
+    python -m benchmarks.api_queries --sizes 1000,10000 --output benchmarks/results/latest.json
+    python -m benchmarks.api_queries --compare benchmarks/results/baseline.json
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterator, List, Tuple
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from backend.database import connection
+from backend.database.connection import DatabaseManager
+from backend.database.models import Base, Route
+from backend.database.queries import ScheduleQueries, StationQueries, TicketQueries
+from backend.database.synthetic import CityGenerator, CityScale
+from benchmarks.harness import (
+    BenchmarkResult, compare, format_comparison, format_results,
+    load_results, measure, save_results
+)
+
+API_ENDPOINTS = [
+    '/api/world/state',
+    '/api/metrics',
+    '/api/agents',
+    '/api/vehicles',
+    '/api/stations',
+    '/api/routes',
+    '/api/operators',
+    '/api/buildings',
+]
+
+
+@contextmanager
+def seeded_world(size: int, seed: int) -> Iterator[DatabaseManager]:
+    """Cria um banco SQLite temporário com a cidade e aponta a API para ele."""
+    with tempfile.TemporaryDirectory(prefix='ferritine-bench-') as tmp:
+        manager = DatabaseManager(use_sqlite=True)
+        manager.engine = create_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+        Base.metadata.create_all(manager.engine)
+        CityGenerator(CityScale(agents=size), seed=seed).generate(manager.engine)
+
+        previous = connection.db_manager
+        connection.db_manager = manager
+        try:
+            yield manager
+        finally:
+            connection.db_manager = previous
+            manager.engine.dispose()
+
+
+def query_cases(manager: DatabaseManager, seed: int) -> List[Tuple[str, Callable[[], object]]]:
+    """Casos da camada de queries (uma sessão nova por chamada)."""
+    engine = manager.engine
+    rng = random.Random(seed)
+    with Session(engine) as session:
+        route_ids = [r for (r,) in session.query(Route.id).all()]
+    reference = datetime(2025, 1, 6, 8, 0)
+
+    def nearest_station():
+        with Session(engine) as session:
+            StationQueries(session).get_nearest_station(rng.randrange(1000), rng.randrange(1000))
+
+    def next_departures():
+        with Session(engine) as session:
+            ScheduleQueries(session).get_next_departures(rng.choice(route_ids), reference)
+
+    def usage_statistics():
+        with Session(engine) as session:
+            TicketQueries(session).get_usage_statistics('all')
+
+    return [
+        ('StationQueries.get_nearest_station', nearest_station),
+        ('ScheduleQueries.get_next_departures', next_departures),
+        ('TicketQueries.get_usage_statistics', usage_statistics),
+    ]
+
+
+def api_cases() -> List[Tuple[str, Callable[[], object]]]:
+    """Casos dos endpoints HTTP via TestClient (inclui serialização)."""
+    from fastapi.testclient import TestClient
+    from backend.api.main import app
+
+    client = TestClient(app)
+
+    def call(path):
+        def run():
+            response = client.get(path)
+            response.raise_for_status()
+        return run
+
+    return [(f"GET {path}", call(path)) for path in API_ENDPOINTS]
+
+
+def run(sizes: List[int], rounds: int, seed: int) -> List[BenchmarkResult]:
+    """Executa todos os casos para cada tamanho de mundo."""
+    results = []
+    for size in sizes:
+        with seeded_world(size, seed) as manager:
+            for name, fn in api_cases() + query_cases(manager, seed):
+                results.append(measure(name, fn, size=size, rounds=rounds))
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks da API e das queries")
+    parser.add_argument('--sizes', default='1000,10000',
+                        help='Tamanhos de mundo (número de agentes), separados por vírgula')
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='benchmarks/results/latest.json')
+    parser.add_argument('--compare', default=None,
+                        help='JSON de referência para detectar regressões')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='Aumento relativo da mediana considerado regressão')
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+    results = run(sizes, args.rounds, args.seed)
+    save_results(args.output, results, {'sizes': sizes, 'rounds': args.rounds, 'seed': args.seed})
+
+    print(format_results(results))
+    print(f"\n📄 Resultados salvos em {args.output}")
+
+    if args.compare:
+        rows = compare(load_results(args.compare), results, args.threshold)
+        print()
+        print(format_comparison(rows))
+        if any(row['regressed'] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""
+Utilitários de medição, persistência e comparação de benchmarks.
+"""
+
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+
+@dataclass
+class BenchmarkResult:
+    """Estatísticas de um benchmark (tempos em milissegundos)."""
+    name: str
+    size: int
+    rounds: int
+    min_ms: float
+    median_ms: float
+    mean_ms: float
+    p95_ms: float
+    max_ms: float
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}@{self.size}"
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def measure(name: str, fn: Callable[[], Any], size: int = 0,
+            rounds: int = 20, warmup: int = 2) -> BenchmarkResult:
+    """
+    Executa ``fn`` ``warmup + rounds`` vezes e retorna as estatísticas.
+
+    Args:
+        name: Nome do benchmark
+        fn: Função sem argumentos a medir
+        size: Tamanho do mundo (agentes) usado na medição
+        rounds: Execuções medidas
+        warmup: Execuções descartadas (caches, compilação de queries)
+    """
+    for _ in range(warmup):
+        fn()
+
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000.0)
+
+    return BenchmarkResult(
+        name=name,
+        size=size,
+        rounds=rounds,
+        min_ms=min(timings),
+        median_ms=statistics.median(timings),
+        mean_ms=statistics.fmean(timings),
+        p95_ms=_percentile(timings, 95),
+        max_ms=max(timings),
+    )
+
+
+def git_commit() -> Optional[str]:
+    """Commit atual (curto) ou None fora de um repositório git."""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            stderr=subprocess.DEVNULL, text=True
+        ).strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment_info() -> Dict[str, Any]:
+    """Metadados do ambiente gravados junto com os resultados."""
+    try:
+        import sqlalchemy
+        sqlalchemy_version = sqlalchemy.__version__
+    except ImportError:
+        sqlalchemy_version = None
+    return {
+        'commit': git_commit(),
+        'timestamp': datetime.utcnow().isoformat(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'sqlalchemy': sqlalchemy_version,
+    }
+
+
+def save_results(path: str, results: List[BenchmarkResult],
+                 meta: Optional[Dict[str, Any]] = None) -> None:
+    """Grava resultados e metadados em JSON."""
+    payload = {
+        'meta': {**environment_info(), **(meta or {})},
+        'results': [asdict(r) for r in results],
+    }
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_text(json.dumps(payload, indent=2, ensure_ascii=False))
+
+
+def load_results(path: str) -> List[BenchmarkResult]:
+    """Lê resultados gravados por ``save_results``."""
+    payload = json.loads(Path(path).read_text())
+    return [BenchmarkResult(**r) for r in payload['results']]
+
+
+def compare(baseline: List[BenchmarkResult], current: List[BenchmarkResult],
+            threshold: float = 0.10) -> List[Dict[str, Any]]:
+    """
+    Compara medianas com uma execução de referência.
+
+    Args:
+        baseline: Resultados de referência
+        current: Resultados atuais
+        threshold: Aumento relativo da mediana considerado regressão
+
+    Returns:
+        Uma linha por benchmark presente em ambos, com ``ratio`` e ``regressed``
+    """
+    reference = {r.key: r for r in baseline}
+    rows = []
+    for result in current:
+        base = reference.get(result.key)
+        if base is None or base.median_ms <= 0:
+            continue
+        ratio = result.median_ms / base.median_ms
+        rows.append({
+            'benchmark': result.key,
+            'baseline_ms': base.median_ms,
+            'current_ms': result.median_ms,
+            'ratio': ratio,
+            'regressed': ratio > 1.0 + threshold,
+        })
+    return rows
+
+
+def format_results(results: List[BenchmarkResult]) -> str:
+    """Tabela de texto com as estatísticas."""
+    lines = [f"{'benchmark':45s} {'median':>10s} {'p95':>10s} {'min':>10s}"]
+    for r in results:
+        lines.append(
+            f"{r.key:45s} {r.median_ms:9.2f}ms {r.p95_ms:9.2f}ms {r.min_ms:9.2f}ms"
+        )
+    return "\n".join(lines)
+
+
+def format_comparison(rows: List[Dict[str, Any]]) -> str:
+    """Tabela de texto da comparação com a referência."""
+    lines = [f"{'benchmark':45s} {'baseline':>10s} {'current':>10s} {'ratio':>7s}"]
+    for row in rows:
+        flag = '  REGRESSÃO' if row['regressed'] else ''
+        lines.append(
+            f"{row['benchmark']:45s} {row['baseline_ms']:9.2f}ms "
+            f"{row['current_ms']:9.2f}ms {row['ratio']:6.2f}x{flag}"
+        )
+    return "\n".join(lines)
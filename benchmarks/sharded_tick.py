@@ -0,0 +1,108 @@
+"""
+Benchmark da simulação particionada por região.
+
+Compara ``Cidade.step`` em um processo com ``ShardedSimulation`` (N
+processos) sobre os mesmos agentes e confere que o snapshot final é
+igual. Os agentes moram em ``Casa{i % 997}`` e trabalham em
+``Trabalho{i % 113}``; com ``--local-ratio`` a fração dada trabalha na
+mesma região onde mora (menos transferências entre shards).
+
+Uso::
+
+    python -m benchmarks.sharded_tick --agents 200000 --shards 4 --ticks 48
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Any, Dict, List
+
+from backend.simulation.models.agente import Agente
+from backend.simulation.models.cidade import Cidade
+from backend.simulation.sharding import ShardedSimulation, ShardRouter
+from benchmarks.harness import environment_info
+from benchmarks.simulation_tick import _summary
+
+HOMES = 997
+WORKPLACES = 113
+
+
+def build_agents(agents: int, shards: int, local_ratio: float = 0.0):
+    """
+    Agentes e roteador: casa e trabalho de índice k ficam na região k % shards.
+
+    Returns:
+        (fábrica de agentes, ShardRouter)
+    """
+    local_every = int(1 / local_ratio) if local_ratio > 0 else 0
+
+    def workplace(i: int) -> int:
+        if local_every and i % local_every == 0:
+            home_region = (i % HOMES) % shards
+            return home_region + shards * ((i // shards) % max(1, WORKPLACES // shards))
+        return i % WORKPLACES
+
+    def make() -> List[Agente]:
+        return [Agente(f"Agente {i}", f"Casa{i % HOMES}", f"Trabalho{workplace(i)}") for i in range(agents)]
+
+    locations = {f"Casa{k}": k % shards for k in range(HOMES)}
+    locations.update({f"Trabalho{k}": k % shards for k in range(WORKPLACES)})
+    return make, ShardRouter(shards, locations)
+
+
+def run_sharded_benchmark(agents: int = 10000, shards: int = 2, ticks: int = 24,
+                          local_ratio: float = 0.0, processes: bool = True) -> Dict[str, Any]:
+    """Executa o benchmark e retorna o relatório."""
+    make, router = build_agents(agents, shards, local_ratio)
+    perf = time.perf_counter
+
+    cidade = Cidade(make())
+    single: List[float] = []
+    for tick in range(ticks):
+        started = perf()
+        cidade.step(tick % 24)
+        single.append(perf() - started)
+
+    sharded: List[float] = []
+    slowest_shard: List[float] = []
+    with ShardedSimulation(make(), router, processes=processes) as simulation:
+        for tick in range(ticks):
+            started = perf()
+            result = simulation.step(tick % 24)
+            sharded.append(perf() - started)
+            slowest_shard.append(max(result['shard_seconds']))
+        consistent = simulation.snapshot() == cidade.snapshot()
+        transfers = simulation.transfers
+        shard_agents = list(simulation.shard_agents)
+
+    return {
+        'meta': environment_info(),
+        'config': {'agents': agents, 'shards': shards, 'ticks': ticks,
+                   'local_ratio': local_ratio, 'processes': processes},
+        'single': _summary(single),
+        'sharded': _summary(sharded),
+        'slowest_shard': _summary(slowest_shard),
+        'transfers': transfers,
+        'shard_agents': shard_agents,
+        'consistent': consistent,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark da simulação particionada")
+    parser.add_argument('--agents', type=int, default=10000, help='Número de agentes')
+    parser.add_argument('--shards', type=int, default=2, help='Processos (shards)')
+    parser.add_argument('--ticks', type=int, default=24, help='Ticks simulados')
+    parser.add_argument('--local-ratio', type=float, default=0.0,
+                        help='Fração dos agentes que trabalha na própria região')
+    parser.add_argument('--inline', action='store_true', help='Shards no próprio processo')
+    args = parser.parse_args(argv)
+    report = run_sharded_benchmark(args.agents, args.shards, args.ticks, args.local_ratio,
+                                   processes=not args.inline)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    return 0 if report['consistent'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,338 @@
+"""
+Benchmark do tick da simulação.
+
+Monta uma ``Cidade`` com N agentes e uma frota de M veículos, executa T
+ticks e mede separadamente cada fase:
+
+- ``agent_update``: ``Cidade.step``
+- ``vehicle_movement``: ``Vehicle.move`` de toda a frota (com reabastecimento
+  e manutenção quando necessário, para a frota não parar)
+- ``persistence``: gravação do estado dos agentes em SQLite
+  (``AgentQueries.update_states`` a cada ``persist_every`` ticks)
+- ``snapshot``: ``Cidade.snapshot``
+
+Opcionalmente roda sob cProfile (ou pyinstrument, se instalado), mede o
+pico de memória com tracemalloc e liga a telemetria de tick
+(``backend.utils.telemetry``) para incluir contadores no relatório.
+
+Uso::
+
+    python main.py --bench --agents 10000 --vehicles 500 --ticks 48
+    python -m benchmarks.simulation_tick --agents 10000 --profile cprofile
+"""
+
+import argparse
+import cProfile
+import io
+import json
+import pstats
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from backend.database.models import Agent, AgentStatus, Base
+from backend.database.queries import AgentQueries
+from backend.database.synthetic import CityGenerator, CityScale
+from backend.database.vehicle_db import VehicleDatabase
+from backend.simulation.models.agente import Agente
+from backend.simulation.models.cidade import Cidade
+from backend.simulation.models.vehicle import BRT, Bus, Train, Tram, VehicleStatus
+from backend.utils.telemetry import telemetry
+from benchmarks.harness import environment_info
+
+PHASES = ('agent_update', 'vehicle_movement', 'persistence', 'snapshot')
+FLEET_TYPES = (Bus, Train, Tram, BRT)
+
+
+class BenchRouteDatabase(VehicleDatabase):
+    """VehicleDatabase com rotas em memória (o original ainda não persiste rotas)."""
+
+    def __init__(self, routes: Dict[int, Dict[str, Any]]):
+        super().__init__(conn=None)
+        self.routes = routes
+
+    def get_route(self, route_id: int) -> Optional[Dict[str, Any]]:
+        return self.routes.get(route_id)
+
+
+def build_world(agents: int, vehicles: int, routes: int = 20, seed: int = 42):
+    """
+    Cria o mundo do benchmark.
+
+    Returns:
+        (cidade, frota, engine, ids dos agentes no banco)
+    """
+    engine = create_engine('sqlite:///:memory:')
+    Base.metadata.create_all(engine)
+    CityGenerator(CityScale(agents=agents, tickets=0), seed=seed).generate(engine)
+    with Session(engine) as session:
+        agent_ids = [agent_id for (agent_id,) in session.query(Agent.id).order_by(Agent.id)]
+
+    cidade = Cidade()
+    for i, agent_id in enumerate(agent_ids):
+        cidade.add_agente(Agente(f"Agente {i}", f"Casa{i % 997}", f"Trabalho{i % 113}"))
+
+    route_table = {
+        r: {'id': r, 'total_distance_km': 10.0 + (r % 7) * 5.0}
+        for r in range(1, routes + 1)
+    }
+    db = BenchRouteDatabase(route_table)
+    fleet = []
+    for i in range(vehicles):
+        vehicle_cls = FLEET_TYPES[i % len(FLEET_TYPES)]
+        vehicle = vehicle_cls(db, id=i + 1, name=f"Veículo {i + 1}", speed_kmh=20.0 + i % 40)
+        vehicle.current_route_id = (i % routes) + 1
+        vehicle.status = VehicleStatus.MOVING
+        fleet.append(vehicle)
+
+    return cidade, fleet, engine, agent_ids
+
+
+def _move_fleet(fleet, delta_hours: float) -> None:
+    with telemetry.phase('vehicle_movement', len(fleet)):
+        for vehicle in fleet:
+            if vehicle.current_fuel < 25:
+                vehicle.refuel()
+            if vehicle.condition_percent < 55:
+                vehicle.perform_maintenance()
+                vehicle.status = VehicleStatus.MOVING
+            vehicle.move(delta_hours)
+            if vehicle.position_on_route >= 1.0:
+                vehicle.position_on_route = 0.0
+
+
+def _persist(session: Session, cidade: Cidade, agent_ids: List) -> int:
+    states = [
+        {
+            'id': agent_id,
+            'current_status': AgentStatus.AT_HOME if agente.local == agente.casa else AgentStatus.AT_WORK,
+            'current_location_type': 'building',
+        }
+        for agente, agent_id in zip(cidade.agentes, agent_ids)
+    ]
+    count = AgentQueries(session).update_states(states)
+    session.commit()
+    return count
+
+
+@contextmanager
+def _profiler(kind: Optional[str], output: Optional[str]):
+    """Envolve o loop de ticks com o profiler escolhido."""
+    if kind is None:
+        yield None
+        return
+
+    if kind == 'pyinstrument':
+        from pyinstrument import Profiler
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield profiler
+        finally:
+            profiler.stop()
+            if output:
+                Path(output).write_text(profiler.output_html())
+            else:
+                print(profiler.output_text(unicode=True, color=False))
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if output:
+            profiler.dump_stats(output)
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(20)
+        print(stream.getvalue())
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        'total_s': sum(samples),
+        'mean_ms': statistics.fmean(samples) * 1000.0 if samples else 0.0,
+        'median_ms': statistics.median(samples) * 1000.0 if samples else 0.0,
+        'p95_ms': ordered[int(0.95 * (len(ordered) - 1))] * 1000.0 if samples else 0.0,
+        'max_ms': ordered[-1] * 1000.0 if samples else 0.0,
+    }
+
+
+def run_tick_benchmark(agents: int = 1000, vehicles: int = 100, ticks: int = 24,
+                       persist_every: int = 1, delta_hours: float = 0.25,
+                       profile: Optional[str] = None, profile_output: Optional[str] = None,
+                       track_memory: bool = False, seed: int = 42,
+                       with_telemetry: bool = False) -> Dict[str, Any]:
+    """
+    Executa o benchmark e retorna o relatório.
+
+    Args:
+        agents: Número de agentes na cidade
+        vehicles: Tamanho da frota
+        ticks: Ticks simulados (cada tick é uma hora para ``Cidade.step``)
+        persist_every: Persistir estado a cada N ticks (0 desativa)
+        delta_hours: Tempo de movimento dos veículos por tick
+        profile: None, 'cprofile' ou 'pyinstrument'
+        profile_output: Arquivo de saída do profiler (.prof ou .html)
+        track_memory: Mede pico de memória com tracemalloc
+        seed: Semente da cidade sintética
+        with_telemetry: Liga a telemetria de tick e inclui resumo e contadores
+    """
+    if track_memory:
+        tracemalloc.start()
+
+    build_started = time.perf_counter()
+    cidade, fleet, engine, agent_ids = build_world(agents, vehicles, seed=seed)
+    build_seconds = time.perf_counter() - build_started
+
+    samples: Dict[str, List[float]] = {phase: [] for phase in PHASES}
+    tick_samples: List[float] = []
+    perf = time.perf_counter
+
+    telemetry_state = (telemetry.enabled, telemetry.capacity)
+    if with_telemetry:
+        telemetry.reset()
+        telemetry.configure(enabled=True, capacity=max(ticks, 1))
+
+    with Session(engine) as session, _profiler(profile, profile_output):
+        for tick in range(ticks):
+            with telemetry.tick(tick):
+                tick_started = perf()
+
+                started = perf()
+                cidade.step(tick % 24)
+                samples['agent_update'].append(perf() - started)
+
+                started = perf()
+                _move_fleet(fleet, delta_hours)
+                samples['vehicle_movement'].append(perf() - started)
+
+                started = perf()
+                if persist_every and tick % persist_every == 0:
+                    _persist(session, cidade, agent_ids)
+                samples['persistence'].append(perf() - started)
+
+                started = perf()
+                with telemetry.phase('snapshot', len(cidade.agentes)):
+                    cidade.snapshot()
+                samples['snapshot'].append(perf() - started)
+
+                tick_samples.append(perf() - tick_started)
+
+    telemetry_report = None
+    if with_telemetry:
+        telemetry_report = {'summary': telemetry.summary(), 'counters': telemetry.totals()['counters']}
+        telemetry.configure(enabled=telemetry_state[0], capacity=telemetry_state[1])
+
+    memory = None
+    if track_memory:
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        memory = {'current_mb': current / 2 ** 20, 'peak_mb': peak / 2 ** 20}
+
+    engine.dispose()
+    total = sum(tick_samples)
+    return {
+        'meta': environment_info(),
+        'config': {
+            'agents': agents, 'vehicles': vehicles, 'ticks': ticks,
+            'persist_every': persist_every, 'delta_hours': delta_hours,
+            'profile': profile, 'seed': seed, 'telemetry': with_telemetry,
+        },
+        'build_s': build_seconds,
+        'tick': _summary(tick_samples),
+        'phases': {phase: _summary(values) for phase, values in samples.items()},
+        'throughput': {
+            'ticks_per_s': ticks / total if total else 0.0,
+            'agent_steps_per_s': agents * ticks / total if total else 0.0,
+            'vehicle_moves_per_s': vehicles * ticks / total if total else 0.0,
+        },
+        'memory': memory,
+        'telemetry': telemetry_report,
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Resumo legível do relatório."""
+    config = report['config']
+    lines = [
+        f"⏱️  {config['agents']} agentes, {config['vehicles']} veículos, {config['ticks']} ticks "
+        f"(mundo criado em {report['build_s']:.2f}s)",
+        f"{'fase':20s} {'total':>9s} {'média':>10s} {'p95':>10s}",
+    ]
+    for phase, stats in list(report['phases'].items()) + [('tick', report['tick'])]:
+        lines.append(
+            f"{phase:20s} {stats['total_s']:8.3f}s {stats['mean_ms']:8.2f}ms {stats['p95_ms']:8.2f}ms"
+        )
+    throughput = report['throughput']
+    lines.append(
+        f"🚀 {throughput['ticks_per_s']:.1f} ticks/s · "
+        f"{throughput['agent_steps_per_s']:,.0f} agentes/s · "
+        f"{throughput['vehicle_moves_per_s']:,.0f} veículos/s"
+    )
+    if report['memory']:
+        lines.append(f"🧠 pico de memória: {report['memory']['peak_mb']:.1f} MB")
+    if report.get('telemetry'):
+        counters = report['telemetry']['counters']
+        lines.append("📈 " + " · ".join(f"{k}={v:,.0f}" for k, v in sorted(counters.items())))
+    return "\n".join(lines)
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Argumentos do benchmark (compartilhados com ``main.py --bench``)."""
+    group = parser.add_argument_group('benchmark do tick')
+    group.add_argument('--agents', type=int, default=1000, help='Número de agentes')
+    group.add_argument('--vehicles', type=int, default=100, help='Tamanho da frota')
+    group.add_argument('--ticks', type=int, default=24, help='Ticks simulados')
+    group.add_argument('--persist-every', type=int, default=1,
+                       help='Persistir estado a cada N ticks (0 desativa)')
+    group.add_argument('--profile', choices=['cprofile', 'pyinstrument'], default=None,
+                       help='Roda sob um profiler')
+    group.add_argument('--profile-output', default=None,
+                       help='Arquivo do profiler (.prof para cProfile, .html para pyinstrument)')
+    group.add_argument('--memory', action='store_true', help='Mede pico de memória (tracemalloc)')
+    group.add_argument('--telemetry', action='store_true',
+                       help='Liga a telemetria de tick e mostra os contadores')
+    group.add_argument('--bench-output', default=None, help='Salva o relatório em JSON')
+    group.add_argument('--bench-seed', type=int, default=42, help='Semente da cidade sintética')
+
+
+def run_from_args(args: argparse.Namespace) -> Dict[str, Any]:
+    """Executa o benchmark a partir dos argumentos de ``add_arguments``."""
+    report = run_tick_benchmark(
+        agents=args.agents,
+        vehicles=args.vehicles,
+        ticks=args.ticks,
+        persist_every=args.persist_every,
+        profile=args.profile,
+        profile_output=args.profile_output,
+        track_memory=args.memory,
+        seed=args.bench_seed,
+        with_telemetry=args.telemetry,
+    )
+    print(format_report(report))
+    if args.bench_output:
+        Path(args.bench_output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.bench_output).write_text(json.dumps(report, indent=2, ensure_ascii=False))
+        print(f"📄 Relatório salvo em {args.bench_output}")
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark do tick da simulação")
+    add_arguments(parser)
+    run_from_args(parser.parse_args(argv))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
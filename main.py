@@ -42,20 +42,94 @@ def run_seed():
 def run_demo():
     """Roda demo antiga (backward compatibility)."""
     from time import sleep
+    from backend.database.connection import get_session
+    from backend.simulation.checkpoint import CheckpointScheduler, load_checkpoint, restore_cidade
+    from backend.simulation.event_log import open_from_config
     from backend.simulation.models.agente import Agente
     from backend.simulation.models.cidade import Cidade
+    from backend.utils.rng import configure_from_config as configure_rng
+    from backend.simulation.sharding import ShardedSimulation
+    from backend.utils.telemetry import configure_from_config, telemetry
+    from backend.simulation.world_snapshot import WorldSnapshotPublisher
+    from backend.utils.config_loader import get_config
+
+    configure_from_config(get_config().simulation)
+    configure_rng(get_config().simulation)
+    checkpoints = CheckpointScheduler.from_config(get_config().simulation)
+    # Com sessão, a API serve agentes, veículos, estações e métricas do
+    # estado publicado sem consultar o banco
+    world = WorldSnapshotPublisher.from_config(get_config().simulation, get_session)
 
     print("🎮 Rodando demo antiga...")
-    cidade = Cidade()
-    cidade.add_agente(Agente("Ana", "CasaA", "Fábrica"))
-    cidade.add_agente(Agente("Beto", "CasaB", "Loja"))
-    cidade.add_agente(Agente("Clara", "CasaC", "Escola"))
-
-    for hora in range(24):
-        cidade.step(hora)
-        print(f"{hora:02d}h -> {cidade.snapshot()}")
+    cidade = None
+    event_log = None
+    inicio = 0
+    if checkpoints is not None and checkpoints.path.exists():
+        # Retoma a execução anterior a partir do último auto-save, continuando
+        # o log de eventos dela a partir do tick salvo
+        try:
+            with load_checkpoint(checkpoints.path) as checkpoint:
+                if checkpoint.rows('cidade'):
+                    event_log = open_from_config(get_config().simulation,
+                                                 resume_tick=checkpoint.clock.get('tick', 0))
+                    cidade = restore_cidade(checkpoint, event_log)
+                    inicio = (checkpoint.clock.get('hora', -1) + 1) % 24
+        except ValueError as e:
+            print(f"⚠️  Checkpoint {checkpoints.path} ignorado: {e}")
+    if cidade is not None:
+        print(f"💾 Retomando do checkpoint {checkpoints.path} (tick {cidade.tick}, {inicio:02d}h)")
+    else:
+        if event_log is not None:
+            event_log.close()
+        # Execução nova: um log anterior é rotacionado, não sobrescrito
+        event_log = open_from_config(get_config().simulation)
+        cidade = Cidade(event_log=event_log)
+        cidade.add_agente(Agente("Ana", "CasaA", "Fábrica"))
+        cidade.add_agente(Agente("Beto", "CasaB", "Loja"))
+        cidade.add_agente(Agente("Clara", "CasaC", "Escola"))
+
+    # simulation.shards > 1: os agentes rodam em processos por região e o
+    # coordenador faz o papel da Cidade (step, snapshot e agentes para
+    # checkpoint e estado do mundo); o log de eventos fica só no modo simples
+    simulacao = cidade
+    if get_config().simulation.shards > 1:
+        simulacao = ShardedSimulation.from_config(cidade.agentes, get_config().simulation).start()
+        simulacao.tick = cidade.tick
+
+    for passo in range(24):
+        hora = (inicio + passo) % 24
+        with telemetry.tick(hora):
+            simulacao.step(hora)
+            with telemetry.phase('snapshot', len(cidade.agentes)):
+                snapshot = simulacao.snapshot()
+        print(f"{hora:02d}h -> {snapshot}")
+        if world is not None:
+            world.publish(cidade=simulacao, hora=hora)
+        if checkpoints is not None:
+            checkpoints.maybe_save(simulacao, hora=hora)
         sleep(0.1)
 
+    if telemetry.enabled and telemetry.dump_path:
+        print(f"⏱️  Telemetria dos ticks em {telemetry.dump(telemetry.dump_path)}")
+    if checkpoints is not None:
+        checkpoints.save(simulacao, background=False, hora=hora)
+        print(f"💾 Checkpoint em {checkpoints.path}")
+    if simulacao is not cidade:
+        simulacao.close()
+    if world is not None:
+        world.close()
+    if event_log is not None:
+        event_log.close()
+        print(f"🎞️  Log de eventos em {event_log.path} ({event_log.records_written} registros)")
+
+def run_bench(argv):
+    """Roda benchmark do tick da simulação."""
+    from benchmarks.simulation_tick import add_arguments, run_from_args
+
+    parser = argparse.ArgumentParser(prog="main.py --bench")
+    add_arguments(parser)
+    run_from_args(parser.parse_args(argv))
+
 def main():
     """Entry point com argumentos."""
     parser = argparse.ArgumentParser(
@@ -66,6 +140,8 @@ Exemplos de uso:
   python main.py                  # Roda API (padrão)
   python main.py --seed           # Popula banco de dados
   python main.py --demo           # Roda demo antiga
+  python main.py --bench --agents 10000 --vehicles 500 --ticks 48 --memory
+                                  # Benchmark do tick (ver --bench --help)
   python main.py --help           # Mostra esta ajuda
         """
     )
@@ -82,7 +158,19 @@ Exemplos de uso:
         help="Roda demo antiga de simulação"
     )
 
-    args = parser.parse_args()
+    parser.add_argument(
+        "--bench",
+        action="store_true",
+        help="Roda benchmark do tick da simulação (opções: --bench --help)"
+    )
+
+    args, remaining = parser.parse_known_args()
+
+    if args.bench:
+        run_bench(remaining)
+        return
+    if remaining:
+        parser.error(f"argumentos não reconhecidos: {' '.join(remaining)}")
 
     if args.seed:
         run_seed()
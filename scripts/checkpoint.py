@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Checkpoint colunar do estado da simulação (``simulation.checkpoint_path``).
+
+Exemplos:
+    python scripts/checkpoint.py save                 # banco -> checkpoint
+    python scripts/checkpoint.py info
+    python scripts/checkpoint.py restore              # checkpoint -> banco
+    python scripts/checkpoint.py save --path /tmp/sim.ckpt --postgres
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.database.connection import DatabaseManager
+from backend.simulation.checkpoint import load_checkpoint, restore_database, save_checkpoint
+from backend.utils.config_loader import get_config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Checkpoint do estado da simulação")
+    parser.add_argument('action', choices=['save', 'info', 'restore'])
+    parser.add_argument('--path', default=None, help='Arquivo (padrão: simulation.checkpoint_path)')
+    parser.add_argument('--postgres', action='store_true',
+                        help='Usa PostgreSQL (variáveis DB_*) em vez de SQLite')
+    args = parser.parse_args()
+
+    path = args.path or get_config().simulation.checkpoint_path
+    if not path:
+        parser.error("simulation.checkpoint_path vazio; informe --path")
+
+    started = time.perf_counter()
+    if args.action == 'info':
+        with load_checkpoint(path) as checkpoint:
+            report = {
+                'created_at': checkpoint.header['created_at'],
+                'clock': checkpoint.clock,
+                'rows': {table: checkpoint.rows(table) for table in checkpoint.tables},
+            }
+    else:
+        manager = DatabaseManager(use_sqlite=not args.postgres)
+        manager.init_database()
+        with manager.session_scope() as session:
+            if args.action == 'save':
+                save_checkpoint(path, session)
+                report = {'path': str(path)}
+            else:
+                with load_checkpoint(path) as checkpoint:
+                    report = {'restored': restore_database(checkpoint, session)}
+        manager.close()
+    report['seconds'] = round(time.perf_counter() - started, 3)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Gera uma cidade sintética em massa para testes de carga.
+
+Exemplos:
+    python scripts/generate_city.py --agents 100000 --seed 7
+    python scripts/generate_city.py --agents 1000000 --postgres --json report.json
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.database.connection import DatabaseManager
+from backend.database.synthetic import CityScale, generate_city
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gerador de cidade sintética")
+    parser.add_argument('--agents', type=int, default=1000)
+    parser.add_argument('--buildings', type=int, default=None)
+    parser.add_argument('--stations', type=int, default=None)
+    parser.add_argument('--routes', type=int, default=None)
+    parser.add_argument('--operators', type=int, default=None)
+    parser.add_argument('--tickets', type=int, default=None)
+    parser.add_argument('--stops-per-route', type=int, default=8)
+    parser.add_argument('--vehicles-per-route', type=int, default=3)
+    parser.add_argument('--schedules-per-vehicle', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunk-size', type=int, default=10_000)
+    parser.add_argument('--postgres', action='store_true',
+                        help='Usa PostgreSQL (variáveis DB_*) em vez de SQLite')
+    parser.add_argument('--json', type=str, default=None,
+                        help='Salva o relatório de geração em JSON')
+    args = parser.parse_args()
+
+    scale = CityScale(
+        agents=args.agents,
+        buildings=args.buildings,
+        stations=args.stations,
+        routes=args.routes,
+        operators=args.operators,
+        tickets=args.tickets,
+        stops_per_route=args.stops_per_route,
+        vehicles_per_route=args.vehicles_per_route,
+        schedules_per_vehicle=args.schedules_per_vehicle,
+    )
+
+    db_manager = DatabaseManager(use_sqlite=not args.postgres)
+    db_manager.init_database()
+
+    report = generate_city(db_manager.engine, scale, seed=args.seed, chunk_size=args.chunk_size)
+
+    print(f"🏙️  Cidade gerada (seed={report.seed}): {report.total_rows} linhas")
+    for table, rows in report.rows.items():
+        seconds = report.seconds[table]
+        rate = rows / seconds if seconds else 0.0
+        print(f"   - {table:20s} {rows:>10d} linhas  {seconds:8.2f}s  ({rate:,.0f}/s)")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(report.to_dict(), indent=2))
+        print(f"📄 Relatório salvo em {args.json}")
+
+
+if __name__ == "__main__":
+    main()
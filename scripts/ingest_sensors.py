@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Ingestão de leituras dos sensores da maquete.
+
+Lê da fonte configurada em ``iot:`` (data/config.yaml) e grava em lote na
+tabela sensor_events.
+
+Exemplos:
+    python scripts/ingest_sensors.py                       # fonte do config
+    python scripts/ingest_sensors.py --source mqtt
+    python scripts/ingest_sensors.py --replay captura.txt  # reproduz arquivo
+    python scripts/ingest_sensors.py --dispatch            # + veículos e LEDs
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.database.connection import DatabaseManager
+from backend.iot.dispatcher import SensorDispatcher
+from backend.iot.ingestion import SensorIngestionService
+from backend.iot.led_frames import LedFrameScheduler
+from backend.iot.sources import LineSource, create_source
+from backend.utils.config_loader import get_config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingestão de sensores")
+    parser.add_argument('--source', choices=['serial', 'mqtt'], default=None,
+                        help='Sobrescreve iot.ingest_source')
+    parser.add_argument('--replay', type=str, default=None,
+                        help='Reproduz um arquivo no protocolo serial e sai')
+    parser.add_argument('--stats-every', type=float, default=10.0,
+                        help='Intervalo (s) entre relatórios de contadores')
+    parser.add_argument('--dispatch', action='store_true',
+                        help='Aplica as leituras aos veículos e envia comandos de LED')
+    parser.add_argument('--postgres', action='store_true',
+                        help='Usa PostgreSQL (variáveis DB_*) em vez de SQLite')
+    args = parser.parse_args()
+
+    iot = get_config().iot
+    if args.source:
+        iot.ingest_source = args.source
+
+    manager = DatabaseManager(use_sqlite=not args.postgres)
+    manager.init_database()
+    service = SensorIngestionService.from_config(iot, manager.get_session)
+
+    if args.replay:
+        with open(args.replay, 'rb') as f:
+            lines = LineSource(service, f.readline).pump()
+        service.stop()  # fim da captura: libera bordas pendentes e grava
+        print(f"📥 {lines} linhas lidas: {service.stats()}")
+        return
+
+    source = create_source(iot, service)
+    dispatcher = None
+    if args.dispatch:
+        session = manager.get_session()
+        dispatcher = SensorDispatcher.from_session(
+            session, leds=LedFrameScheduler.from_config(iot, source.write)
+        )
+        service.add_listener(dispatcher.enqueue)
+    service.start()
+    source.start()
+    print(f"📡 Ingestão iniciada ({iot.ingest_source}); Ctrl+C para parar")
+    try:
+        if dispatcher is None:
+            while True:
+                time.sleep(args.stats_every)
+                print(f"📊 {service.stats()}")
+        dispatcher.sync_leds()
+        ticks, last_stats = 0, time.monotonic()
+        while True:
+            time.sleep(iot.dispatch_interval)
+            dispatcher.tick()
+            ticks += 1
+            if ticks % iot.dispatch_persist_every == 0 and dispatcher.persist(session):
+                session.commit()
+            if time.monotonic() - last_stats >= args.stats_every:
+                last_stats = time.monotonic()
+                print(f"📊 {service.stats()} | 🚦 {dispatcher.stats()} | 💡 {dispatcher.leds.stats()}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        source.stop()
+        service.stop()
+        if dispatcher is not None:
+            dispatcher.tick()
+            dispatcher.persist(session)
+            session.commit()
+            session.close()
+        print(f"✅ Ingestão encerrada: {service.stats()}")
+
+
+if __name__ == '__main__':
+    main()
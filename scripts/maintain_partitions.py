@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Manutenção das partições por tempo (rodar diariamente, ex: cron).
+
+Cria as próximas partições (PostgreSQL), move linhas antigas para tabelas
+de período (SQLite) e arquiva/remove partições fora da retenção configurada
+em ``database.retention_days`` (data/config.yaml).
+
+Exemplos:
+    python scripts/maintain_partitions.py
+    python scripts/maintain_partitions.py --postgres --ahead 3
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.database.connection import DatabaseManager
+from backend.database.partitioning import PartitionManager, specs_from_config
+from backend.utils.config_loader import get_config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manutenção de partições por tempo")
+    parser.add_argument('--ahead', type=int, default=2,
+                        help='Partições futuras a criar (PostgreSQL)')
+    parser.add_argument('--postgres', action='store_true',
+                        help='Usa PostgreSQL (variáveis DB_*) em vez de SQLite')
+    args = parser.parse_args()
+
+    database = get_config().database
+    manager = DatabaseManager(use_sqlite=not args.postgres)
+    manager.init_database()
+
+    partitions = PartitionManager(
+        manager.engine, specs_from_config(database), archive_dir=database.archive_dir
+    )
+    report = partitions.maintain(ahead=args.ahead)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    manager.close()
+
+
+if __name__ == '__main__':
+    main()
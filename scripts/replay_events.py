@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Replay do log de eventos da simulação (``simulation.event_log_path``).
+
+Reconstrói o estado dos agentes em qualquer tick sem reexecutar a
+simulação, para depuração ("viagem no tempo").
+
+Exemplos:
+    python scripts/replay_events.py data/logs/events.bin --tick 30
+    python scripts/replay_events.py data/logs/events.bin --events --from 10 --to 20
+    python scripts/replay_events.py data/logs/events.bin --info
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.simulation.event_log import EventLogReplayer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay do log de eventos da simulação")
+    parser.add_argument('path', help='Arquivo do log de eventos')
+    parser.add_argument('--tick', type=int, help='Tick a reconstruir (padrão: o último)')
+    parser.add_argument('--events', action='store_true', help='Lista os eventos livres')
+    parser.add_argument('--from', dest='start', type=int, default=0, help='Primeiro tick (--events)')
+    parser.add_argument('--to', dest='end', type=int, help='Último tick (--events)')
+    parser.add_argument('--kind', help='Filtra eventos pelo tipo (--events)')
+    parser.add_argument('--info', action='store_true', help='Mostra apenas o resumo do log')
+    args = parser.parse_args()
+
+    replayer = EventLogReplayer(args.path)
+    reader = replayer.reader
+    if args.info:
+        print(json.dumps({
+            'first_tick': replayer.first_tick,
+            'last_tick': replayer.last_tick,
+            'snapshots': [tick for tick, _ in reader.snapshots],
+            'strings': len(reader.strings),
+            'bytes': reader.end_offset,
+        }, indent=2, ensure_ascii=False))
+    elif args.events:
+        for event in replayer.events(args.start, args.end, args.kind):
+            print(json.dumps(event, ensure_ascii=False))
+    else:
+        tick = replayer.last_tick if args.tick is None else args.tick
+        state = replayer.state_at(tick)
+        print(json.dumps({'tick': state.tick, 'hora': state.hora, 'agentes': state.snapshot()},
+                         indent=2, ensure_ascii=False))
+    reader.close()
+
+
+if __name__ == '__main__':
+    main()
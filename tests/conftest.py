@@ -2,7 +2,8 @@
 Configuração de fixtures para testes do Ferritine.
 """
 import pytest
-from sqlalchemy import create_engine
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from backend.database.models import Base
 
@@ -27,6 +28,41 @@ def db_session():
     Base.metadata.drop_all(engine)
 
 
+@pytest.fixture
+def assert_num_queries(db_session):
+    """
+    Verifica quantos comandos SQL um bloco emite.
+
+    Uso::
+
+        with assert_num_queries(2):
+            queries.transport_operators.get_most_profitable()
+
+    Falha listando os comandos emitidos quando a contagem diverge, para que
+    regressões N+1 (lazy loads dentro de loops) quebrem a suíte.
+    """
+    engine = db_session.get_bind()
+
+    @contextmanager
+    def _assert(expected: int):
+        statements = []
+
+        def capture(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine, 'before_cursor_execute', capture)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, 'before_cursor_execute', capture)
+        assert len(statements) == expected, (
+            f"Esperado {expected} comandos SQL, emitidos {len(statements)}:\n"
+            + "\n".join(statements)
+        )
+
+    return _assert
+
+
 @pytest.fixture(scope='function')
 def db_session_postgresql():
     """
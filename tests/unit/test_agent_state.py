@@ -0,0 +1,138 @@
+"""
+Testes para a separação quente/fria do modelo Agent.
+
+Valida que as colunas JSON de perfil são deferidas e que o estado
+"quente" pode ser atualizado em lote sem carregar os agentes.
+"""
+import pytest
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import event
+
+from backend.database.models import (
+    Agent, AgentStatus, CreatedBy, Gender, HealthStatus
+)
+from backend.database.queries import DatabaseQueries
+
+
+@pytest.fixture
+def db(db_session):
+    return DatabaseQueries(db_session)
+
+
+@pytest.fixture
+def agents(db_session):
+    created = []
+    for i in range(3):
+        agent = Agent(
+            name=f"Agente {i}",
+            birth_date=datetime(1990, 1, 1),
+            gender=Gender.CIS_FEMALE,
+            health_status=HealthStatus.HEALTHY,
+            current_status=AgentStatus.IDLE,
+            created_by=CreatedBy.IA,
+            version="1.0",
+            wallet=Decimal('50.00'),
+            genetics={'eye_color': 'brown'},
+            history=[{'event': 'born'}],
+        )
+        db_session.add(agent)
+        created.append(agent)
+    db_session.commit()
+    ids = [a.id for a in created]
+    db_session.expunge_all()
+    return ids
+
+
+class TestAgentProfileDeferred:
+    """Colunas de perfil não são carregadas em leituras rotineiras."""
+
+    def test_profile_columns_not_loaded_by_default(self, db, agents):
+        agent = db.agents.get_by_id(agents[0])
+        assert 'genetics' not in agent.__dict__
+        assert 'history' not in agent.__dict__
+        assert 'current_status' in agent.__dict__
+
+    def test_profile_columns_load_on_access(self, db, agents):
+        agent = db.agents.get_by_id(agents[0])
+        assert agent.genetics == {'eye_color': 'brown'}
+        # O grupo inteiro é carregado junto
+        assert 'history' in agent.__dict__
+
+    def test_with_details_loads_profile_eagerly(self, db, agents):
+        agent = db.agents.get_by_id(agents[0], with_details=True)
+        assert 'genetics' in agent.__dict__
+        assert agent.history == [{'event': 'born'}]
+
+    def test_list_select_excludes_json(self, db, db_session, agents):
+        statements = []
+
+        def capture(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engine = db_session.get_bind()
+        event.listen(engine, 'before_cursor_execute', capture)
+        try:
+            db.agents.get_all()
+        finally:
+            event.remove(engine, 'before_cursor_execute', capture)
+
+        select = statements[0]
+        assert 'genetics' not in select
+        assert 'mood_data' not in select
+
+
+class TestAgentStateBulkUpdate:
+    """Atualização em lote das colunas quentes."""
+
+    def test_update_states(self, db, db_session, agents):
+        station_id = agents[2]
+        count = db.agents.update_states([
+            {'id': agents[0], 'current_status': AgentStatus.MOVING, 'energy_level': 70},
+            {'id': agents[1], 'current_location_type': 'station',
+             'current_location_id': station_id},
+        ])
+        db_session.commit()
+
+        assert count == 2
+        first = db.agents.get_by_id(agents[0])
+        second = db.agents.get_by_id(agents[1])
+        assert first.current_status == AgentStatus.MOVING
+        assert first.energy_level == 70
+        assert second.current_location_type == 'station'
+        assert second.current_location_id == station_id
+
+    def test_update_states_does_not_touch_profile(self, db, db_session, agents):
+        statements = []
+
+        def capture(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engine = db_session.get_bind()
+        event.listen(engine, 'before_cursor_execute', capture)
+        try:
+            db.agents.update_states([{'id': agents[0], 'energy_level': 10}])
+        finally:
+            event.remove(engine, 'before_cursor_execute', capture)
+
+        assert len(statements) == 1
+        assert statements[0].startswith('UPDATE agents')
+        assert 'genetics' not in statements[0]
+
+    def test_update_states_rejects_cold_columns(self, db, agents):
+        with pytest.raises(ValueError):
+            db.agents.update_states([{'id': agents[0], 'genetics': {}}])
+
+    def test_update_states_requires_id(self, db, agents):
+        with pytest.raises(ValueError):
+            db.agents.update_states([{'energy_level': 10}])
+
+    def test_update_states_empty(self, db):
+        assert db.agents.update_states([]) == 0
+
+    def test_get_states(self, db, agents):
+        states = db.agents.get_states()
+        assert len(states) == 3
+        assert set(states[0]) >= {'id', 'current_status', 'energy_level', 'wallet'}
+        assert 'genetics' not in states[0]
@@ -0,0 +1,93 @@
+"""
+Testes da instrumentação de requisições da API (latência, SQL, Server-Timing).
+"""
+import pytest
+from sqlalchemy import create_engine
+
+from backend.database import connection
+from backend.database.connection import DatabaseManager
+from backend.database.models import Base
+from backend.database.synthetic import CityGenerator, CityScale
+
+
+@pytest.fixture
+def client(tmp_path):
+    from fastapi.testclient import TestClient
+    from backend.api.instrumentation import api_metrics
+    from backend.api.main import app
+
+    manager = DatabaseManager(use_sqlite=True)
+    manager.engine = create_engine(f"sqlite:///{tmp_path / 'api.db'}")
+    Base.metadata.create_all(manager.engine)
+    CityGenerator(CityScale(agents=30, tickets=0), seed=1).generate(manager.engine)
+
+    previous = connection.db_manager
+    connection.db_manager = manager
+    api_metrics.reset()
+    try:
+        yield TestClient(app)
+    finally:
+        connection.db_manager = previous
+        manager.engine.dispose()
+
+
+class TestRequestMetrics:
+
+    def test_server_timing_header(self, client):
+        response = client.get('/api/operators')
+        assert response.status_code == 200
+        header = response.headers['server-timing']
+        assert header.startswith('app;dur=')
+        assert 'db;dur=' in header
+        assert 'queries"' in header
+
+    def test_sql_counted_per_route(self, client):
+        from backend.api.instrumentation import api_metrics
+        client.get('/api/stations')
+        client.get('/api/stations')
+        metrics = api_metrics.snapshot()[('GET', '/api/stations')]
+        assert metrics.count == 2
+        assert metrics.sql_count >= 2
+        assert metrics.sql_seconds > 0
+        assert metrics.status_counts == {200: 2}
+
+    def test_unmatched_routes_aggregated(self, client):
+        from backend.api.instrumentation import api_metrics
+        client.get('/nao/existe/1')
+        client.get('/nao/existe/2')
+        assert api_metrics.snapshot()[('GET', 'unmatched')].count == 2
+
+    def test_prometheus_endpoint(self, client):
+        client.get('/api/routes')
+        body = client.get('/metrics/internal').text
+        assert '# TYPE ferritine_http_request_duration_seconds histogram' in body
+        assert 'ferritine_http_request_duration_seconds_count{method="GET",route="/api/routes"} 1' in body
+        assert 'ferritine_http_sql_statements_total{method="GET",route="/api/routes"}' in body
+        assert 'le="+Inf"' in body
+
+    def test_no_sql_accounting_outside_requests(self, client):
+        from backend.api.instrumentation import current_request_stats
+        assert current_request_stats() is None
+
+
+def test_failed_statements_do_not_leak_start_times(tmp_path):
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+    from backend.api.instrumentation import RequestStats, _current_request, install_sql_instrumentation
+
+    install_sql_instrumentation()
+    engine = create_engine(f"sqlite:///{tmp_path / 'err.db'}")
+    stats = RequestStats()
+    token = _current_request.set(stats)
+    try:
+        with engine.connect() as conn:
+            for _ in range(3):
+                with pytest.raises(OperationalError):
+                    conn.execute(text("SELECT * FROM nao_existe"))
+            conn.execute(text("SELECT 1"))
+            assert conn.info.get('_ferritine_query_start') == {}
+    finally:
+        _current_request.reset(token)
+        engine.dispose()
+    # O tempo dos comandos que falharam também é tempo de banco
+    assert stats.sql_count == 4
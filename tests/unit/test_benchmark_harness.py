@@ -0,0 +1,48 @@
+"""
+Testes do harness de benchmarks (medição, JSON e comparação).
+"""
+from benchmarks.harness import (
+    BenchmarkResult, compare, load_results, measure, save_results
+)
+
+
+def _result(name, median, size=100):
+    return BenchmarkResult(name=name, size=size, rounds=1, min_ms=median,
+                           median_ms=median, mean_ms=median, p95_ms=median,
+                           max_ms=median)
+
+
+class TestHarness:
+
+    def test_measure_counts_rounds(self):
+        calls = []
+        result = measure('noop', lambda: calls.append(1), size=10, rounds=5, warmup=2)
+        assert len(calls) == 7
+        assert result.rounds == 5
+        assert result.key == 'noop@10'
+        assert result.min_ms <= result.median_ms <= result.max_ms
+
+    def test_json_round_trip(self, tmp_path):
+        path = tmp_path / 'results.json'
+        save_results(str(path), [_result('a', 1.5)], {'sizes': [100]})
+        [loaded] = load_results(str(path))
+        assert loaded.key == 'a@100'
+        assert loaded.median_ms == 1.5
+
+    def test_compare_flags_regressions(self):
+        baseline = [_result('a', 10.0), _result('b', 10.0), _result('gone', 1.0)]
+        current = [_result('a', 10.5), _result('b', 13.0), _result('new', 1.0)]
+        rows = {row['benchmark']: row for row in compare(baseline, current, threshold=0.1)}
+        assert set(rows) == {'a@100', 'b@100'}
+        assert not rows['a@100']['regressed']
+        assert rows['b@100']['regressed']
+
+
+class TestApiQueriesSmoke:
+
+    def test_run_tiny_world(self):
+        from benchmarks.api_queries import run
+        results = run([50], rounds=1, seed=1)
+        names = {r.name for r in results}
+        assert 'GET /api/world/state' in names
+        assert 'TicketQueries.get_usage_statistics' in names
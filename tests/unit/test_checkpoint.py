@@ -0,0 +1,197 @@
+"""
+Testes do checkpoint colunar da simulação.
+"""
+import threading
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+
+from backend.database.models import Agent, AgentStatus, Base, Station, StationStatus, Vehicle
+from backend.database.synthetic import CityGenerator, CityScale
+from backend.simulation.checkpoint import (
+    CheckpointScheduler, capture_database, load_checkpoint, restore_cidade,
+    restore_database, restore_fatigue, save_checkpoint, write_checkpoint,
+)
+from backend.simulation.driver_fatigue import DriverFatigueSystem
+from backend.simulation.models.agente import Agente
+from backend.simulation.models.cidade import Cidade
+from backend.utils.config_loader import SimulationConfig
+
+
+@pytest.fixture
+def city_session():
+    engine = create_engine('sqlite:///:memory:')
+    Base.metadata.create_all(engine)
+    CityGenerator(CityScale(agents=50, stations=6, routes=2, operators=1, stops_per_route=3, tickets=0),
+                  seed=3).generate(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _states(session):
+    return {
+        'agents': sorted(session.query(Agent.id, Agent.current_status, Agent.energy_level, Agent.wallet,
+                                       Agent.current_location_id, Agent.destination_type).all()),
+        'vehicles': sorted(session.query(Vehicle.id, Vehicle.is_docked, Vehicle.current_station_id,
+                                         Vehicle.current_x, Vehicle.speed, Vehicle.status).all()),
+        'stations': sorted(session.query(Station.id, Station.current_queue_length, Station.status).all()),
+    }
+
+
+class TestCheckpoint:
+
+    def test_database_round_trip(self, city_session, tmp_path):
+        session = city_session
+        station_id = session.query(Station.id).first()[0]
+        agent_id = session.query(Agent.id).first()[0]
+        session.execute(update(Agent).where(Agent.id == agent_id).values(
+            wallet=Decimal('-1234.56'), current_location_id=station_id, destination_type=None))
+        session.execute(update(Vehicle).values(is_docked=True, current_station_id=station_id, current_x=None))
+        session.commit()
+        before = _states(session)
+
+        path = save_checkpoint(tmp_path / "sim.ckpt", session, tick=42)
+
+        session.execute(update(Agent).values(current_status=AgentStatus.SLEEPING, energy_level=1, wallet=0))
+        session.execute(update(Vehicle).values(is_docked=False, current_station_id=None, current_x=7, speed=9.5))
+        session.execute(update(Station).values(current_queue_length=99, status=StationStatus.MAINTENANCE))
+        session.commit()
+        assert _states(session) != before
+
+        with load_checkpoint(path) as checkpoint:
+            assert checkpoint.clock == {'tick': 42}
+            assert checkpoint.rows('agents') == 50
+            counts = restore_database(checkpoint, session)
+        session.commit()
+        assert counts == {'agents': 50, 'vehicles': session.query(Vehicle).count(), 'stations': 6}
+        assert _states(session) == before
+        assert session.get(Agent, agent_id).wallet == Decimal('-1234.56')
+
+    def test_restore_skips_rows_deleted_since_the_checkpoint(self, city_session, tmp_path):
+        path = save_checkpoint(tmp_path / "sim.ckpt", city_session)
+        removed = city_session.query(Station).first()
+        city_session.execute(update(Vehicle).values(current_station_id=None))
+        city_session.delete(removed)
+        city_session.commit()
+
+        with load_checkpoint(path) as checkpoint:
+            counts = restore_database(checkpoint, city_session)
+        city_session.commit()
+        assert counts['stations'] == 5
+
+    def test_columns_are_zero_copy_views(self, city_session, tmp_path):
+        path = save_checkpoint(tmp_path / "sim.ckpt", city_session)
+        with load_checkpoint(path) as checkpoint:
+            energy = checkpoint.column('agents', 'energy_level')
+            assert isinstance(energy, memoryview) and energy.format == 'q'
+            assert sorted(energy.tolist()) == sorted(e for (e,) in city_session.query(Agent.energy_level))
+            assert len(checkpoint.column('agents', 'id')) == 50 * 16
+            statuses = set(checkpoint.values('agents', 'current_status'))
+            assert statuses <= {s.value for s in AgentStatus}
+
+    def test_cidade_fatigue_and_clock(self, tmp_path):
+        cidade = Cidade([Agente(f"A{i}", f"Casa{i}", "Fábrica") for i in range(4)])
+        for hora in range(9):
+            cidade.step(hora)
+        fatigue = DriverFatigueSystem(db=None)
+        fatigue.update_many({1: 2.0, 7: 20.0, 12: 0.5})
+
+        path = save_checkpoint(tmp_path / "sim.ckpt", cidade=cidade, fatigue=fatigue, hora=8)
+
+        with load_checkpoint(path) as checkpoint:
+            assert checkpoint.clock == {'hora': 8, 'tick': 9}
+            restored = restore_cidade(checkpoint)
+            other = DriverFatigueSystem(db=None)
+            assert restore_fatigue(checkpoint, other) == 3
+        assert restored.tick == 9
+        assert restored.snapshot() == cidade.snapshot()
+        assert [a.casa for a in restored.agentes] == [a.casa for a in cidade.agentes]
+        assert other.fatigue_levels == fatigue.fatigue_levels
+
+    def test_write_is_atomic_and_rejects_ragged_tables(self, tmp_path):
+        path = tmp_path / "sim.ckpt"
+        write_checkpoint(path, {'fatigue': {'driver_id': ('int', [1], 0), 'level': ('float', [5.0], 0)}})
+        with pytest.raises(ValueError):
+            write_checkpoint(path, {'fatigue': {'driver_id': ('int', [1, 2], 0), 'level': ('float', [5.0], 0)}})
+        with load_checkpoint(path) as checkpoint:
+            assert checkpoint.values('fatigue', 'level') == [5.0]
+
+    def test_rejects_other_files(self, tmp_path):
+        path = tmp_path / "other.ckpt"
+        path.write_bytes(b"definitely not a checkpoint")
+        with pytest.raises(ValueError):
+            load_checkpoint(path)
+
+    def test_capture_database_skips_deleted_agents(self, city_session):
+        agent_id = city_session.query(Agent.id).first()[0]
+        city_session.execute(update(Agent).where(Agent.id == agent_id).values(is_deleted=True))
+        tables = capture_database(city_session)
+        kind, ids, _ = tables['agents']['id']
+        assert kind == 'uuid'
+        assert len(ids) == 49 and agent_id not in ids
+
+
+class TestCheckpointScheduler:
+
+    def test_saves_in_background_when_interval_elapses(self, tmp_path):
+        # Banco em arquivo: o thread de gravação abre a própria conexão
+        engine = create_engine(f"sqlite:///{tmp_path / 'city.db'}")
+        Base.metadata.create_all(engine)
+        CityGenerator(CityScale(agents=50, stations=4, routes=1, operators=1, stops_per_route=2, tickets=0),
+                      seed=3).generate(engine)
+        now = [0.0]
+        scheduler = CheckpointScheduler(tmp_path / "auto.ckpt", interval=60,
+                                        session_factory=sessionmaker(bind=engine), clock=lambda: now[0])
+        cidade = Cidade([Agente("Ana", "CasaA", "Loja")])
+
+        assert scheduler.maybe_save(cidade) is False
+        now[0] = 61
+        assert scheduler.maybe_save(cidade, hora=3) is True
+        scheduler.wait(5)
+        assert scheduler.saves == 1 and scheduler.last_error is None
+        assert scheduler.maybe_save(cidade) is False
+
+        with load_checkpoint(scheduler.path) as checkpoint:
+            assert checkpoint.clock == {'hora': 3, 'tick': 0}
+            assert checkpoint.rows('cidade') == 1
+            assert checkpoint.rows('agents') == 50
+        engine.dispose()
+
+    def test_skips_while_previous_write_is_running(self, tmp_path, monkeypatch):
+        now = [100.0]
+        scheduler = CheckpointScheduler(tmp_path / "auto.ckpt", interval=1, clock=lambda: now[0])
+        release = threading.Event()
+        original = scheduler._write
+        monkeypatch.setattr(scheduler, '_write', lambda *a: (release.wait(5), original(*a)))
+
+        now[0] += 2
+        assert scheduler.maybe_save(Cidade()) is True
+        now[0] += 2
+        assert scheduler.maybe_save(Cidade()) is False
+        assert scheduler.skipped == 1
+        release.set()
+        scheduler.wait(5)
+        assert scheduler.saves == 1
+
+    def test_foreground_save_waits_for_background_write(self, tmp_path, monkeypatch):
+        scheduler = CheckpointScheduler(tmp_path / "auto.ckpt")
+        release = threading.Event()
+        writes = []
+        monkeypatch.setattr(scheduler, '_write', lambda tables, clock: (
+            release.wait(5) if not writes else None, writes.append(clock.get('hora'))))
+
+        scheduler.save(Cidade(), hora=1)
+        threading.Timer(0.2, release.set).start()
+        scheduler.save(Cidade(), background=False, hora=2)
+        # A gravação síncrona só começa depois da que estava em andamento
+        assert writes == [1, 2]
+
+    def test_from_config(self, tmp_path):
+        assert CheckpointScheduler.from_config(SimulationConfig(checkpoint_path="")) is None
+        scheduler = CheckpointScheduler.from_config(
+            SimulationConfig(checkpoint_path=str(tmp_path / "c.ckpt"), auto_save_interval=30))
+        assert scheduler.interval == 30
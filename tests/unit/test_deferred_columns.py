@@ -0,0 +1,103 @@
+"""
+Testes para o carregamento deferido das colunas JSON pesadas.
+
+Route, RouteStation e Building não carregam histórico/estatísticas em
+consultas rotineiras; as queries oferecem ``with_details`` para isso.
+"""
+import pytest
+from decimal import Decimal
+
+from backend.database.models import (
+    Building, BuildingType, Route, RouteStation, StationType
+)
+from backend.database.queries import DatabaseQueries
+
+
+@pytest.fixture
+def db(db_session):
+    return DatabaseQueries(db_session)
+
+
+@pytest.fixture
+def route_with_station(db_session):
+    building = Building(
+        name="Estação Central",
+        building_type=BuildingType.TRANSPORT_TRAIN_STATION_CENTRAL,
+        x=10,
+        y=20,
+        major_events=[{'type': 'fire'}],
+        notes="Construída em 1920",
+    )
+    route = Route(
+        name="Linha 1",
+        code="L1",
+        route_type=StationType.METRO_STATION,
+        fare_base=Decimal('4.40'),
+        incidents=[{'type': 'delay'}],
+        weekly_stats={'monday': {'passengers': 100}},
+    )
+    db_session.add_all([building, route])
+    db_session.flush()
+    db_session.add(RouteStation(
+        route_id=route.id,
+        station_id=building.id,
+        sequence_order=1,
+        hourly_demand={'8': 120},
+    ))
+    db_session.commit()
+    ids = (route.id, building.id)
+    db_session.expunge_all()
+    return ids
+
+
+class TestRouteDeferred:
+
+    def test_route_details_not_loaded_by_default(self, db, route_with_station):
+        route = db.routes.get_by_id(route_with_station[0])
+        for name in ('special_schedules', 'fare_history', 'incidents',
+                     'weekly_stats', 'alternative_routes'):
+            assert name not in route.__dict__
+        assert route.name == "Linha 1"
+
+    def test_route_details_load_on_access(self, db, route_with_station):
+        route = db.routes.get_by_id(route_with_station[0])
+        assert route.incidents == [{'type': 'delay'}]
+
+    def test_route_with_details(self, db, route_with_station):
+        route = db.routes.get_by_id(route_with_station[0], with_details=True)
+        assert 'incidents' in route.__dict__
+        assert route.weekly_stats == {'monday': {'passengers': 100}}
+
+    def test_get_all_and_by_code(self, db, route_with_station):
+        routes = db.routes.get_all(with_details=True)
+        assert len(routes) == 1
+        assert 'fare_history' in routes[0].__dict__
+        assert db.routes.get_by_code("L1").id == route_with_station[0]
+
+
+class TestRouteStationDeferred:
+
+    def test_route_stations_deferred(self, db, route_with_station):
+        stops = db.routes.get_route_stations(route_with_station[0])
+        assert len(stops) == 1
+        assert 'hourly_demand' not in stops[0].__dict__
+        assert 'issues_history' not in stops[0].__dict__
+
+    def test_route_stations_with_details(self, db, route_with_station):
+        stops = db.routes.get_route_stations(route_with_station[0], with_details=True)
+        assert 'hourly_demand' in stops[0].__dict__
+        assert stops[0].hourly_demand == {'8': 120}
+
+
+class TestBuildingDeferred:
+
+    def test_building_history_deferred(self, db, route_with_station):
+        building = db.buildings.get_by_id(route_with_station[1])
+        assert 'major_events' not in building.__dict__
+        assert 'notes' not in building.__dict__
+        assert building.major_events == [{'type': 'fire'}]
+
+    def test_building_with_details(self, db, route_with_station):
+        building = db.buildings.get_by_id(route_with_station[1], with_details=True)
+        assert 'major_events' in building.__dict__
+        assert building.notes == "Construída em 1920"
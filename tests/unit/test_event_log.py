@@ -0,0 +1,200 @@
+"""
+Testes do log de eventos binário e do replay da simulação.
+"""
+import pytest
+
+from backend.simulation.event_log import (
+    EventLogReader, EventLogReplayer, EventLogWriter, EventType, open_from_config,
+)
+from backend.simulation.models.agente import Agente
+from backend.simulation.models.cidade import Cidade
+from backend.utils.config_loader import SimulationConfig
+
+
+def _cidade(n=5):
+    return Cidade([Agente(f"A{i}", f"Casa{i}", f"Trabalho{i % 2}") for i in range(n)])
+
+
+def _run(path, ticks=60, snapshot_every=24, n=5):
+    """Roda a simulação gravando o log; retorna o snapshot de cada tick."""
+    cidade = _cidade(n)
+    expected = {0: cidade.snapshot()}
+    with EventLogWriter(path, snapshot_every=snapshot_every) as log:
+        cidade.attach_event_log(log)
+        for tick in range(1, ticks + 1):
+            cidade.step((tick - 1) % 24)
+            expected[tick] = cidade.snapshot()
+    return expected
+
+
+class TestEventLogReplay:
+
+    @pytest.mark.parametrize("snapshot_every", [0, 1, 24])
+    def test_replay_matches_simulation_at_every_tick(self, tmp_path, snapshot_every):
+        path = tmp_path / "events.bin"
+        expected = _run(path, snapshot_every=snapshot_every)
+
+        replayer = EventLogReplayer(path)
+        assert replayer.first_tick == 1
+        assert replayer.last_tick == 60
+        for tick in (0, 1, 7, 8, 17, 23, 24, 25, 47, 48, 60, 13, 2):
+            assert replayer.state_at(tick).snapshot() == expected[tick]
+
+    def test_snapshots_are_indexed_and_hours_kept(self, tmp_path):
+        path = tmp_path / "events.bin"
+        _run(path, ticks=50, snapshot_every=24)
+
+        reader = EventLogReader(path)
+        assert [tick for tick, _ in reader.snapshots] == [24, 48]
+        assert reader.hours[1] == 0
+        assert reader.hours[32] == 7
+        assert reader.strings[:2] == ["A0", "Casa0"]
+
+    def test_only_changes_are_logged(self, tmp_path):
+        path = tmp_path / "events.bin"
+        _run(path, ticks=24, snapshot_every=0)
+
+        moves = [r for r in EventLogReader(path).records() if r.type == EventType.AGENT_MOVED]
+        # Cada agente vai ao trabalho às 7h e volta às 17h
+        assert len(moves) == 10
+        assert {r.tick for r in moves} == {8, 18}
+
+    def test_added_agents_and_to_cidade(self, tmp_path):
+        path = tmp_path / "events.bin"
+        cidade = _cidade(2)
+        with EventLogWriter(path) as log:
+            cidade.attach_event_log(log)
+            for hora in range(10):
+                cidade.step(hora)
+                if hora == 3:
+                    cidade.add_agente(Agente("Novo", "CasaN", "Loja"))
+
+        replayer = EventLogReplayer(path)
+        assert "Novo" not in replayer.state_at(3).snapshot()
+        restored = replayer.state_at(10).to_cidade()
+        assert restored.tick == 10
+        assert restored.snapshot() == cidade.snapshot()
+        assert [a.trabalho for a in restored.agentes] == ["Trabalho0", "Trabalho1", "Loja"]
+
+    def test_custom_events_between_ticks(self, tmp_path):
+        path = tmp_path / "events.bin"
+        cidade = _cidade(1)
+        with EventLogWriter(path) as log:
+            cidade.attach_event_log(log)
+            for hora in range(6):
+                cidade.step(hora)
+                log.event("acidente" if hora % 2 else "obra", [hora], {"rua": f"R{hora}"})
+
+        replayer = EventLogReplayer(path)
+        events = replayer.events(2, 4)
+        assert [(e["tick"], e["kind"]) for e in events] == [(2, "acidente"), (3, "obra"), (4, "acidente")]
+        assert events[0]["entities"] == [1]
+        assert events[0]["data"] == {"rua": "R1"}
+        assert [e["tick"] for e in replayer.events(kind="obra")] == [1, 3, 5]
+
+    def test_refresh_follows_growing_log_and_ignores_partial_tail(self, tmp_path):
+        path = tmp_path / "events.bin"
+        cidade = _cidade(3)
+        log = EventLogWriter(path)
+        cidade.attach_event_log(log)
+        for hora in range(10):
+            cidade.step(hora)
+        log.flush()
+
+        replayer = EventLogReplayer(path)
+        assert replayer.last_tick == 10
+        for hora in range(10, 20):
+            cidade.step(hora)
+        log.close()
+        with open(path, "ab") as f:
+            f.write(b"\x04\x15\x00")  # registro cortado no meio
+
+        assert replayer.refresh() > 0
+        assert replayer.last_tick == 20
+        assert replayer.state_at(20).snapshot() == cidade.snapshot()
+
+    def test_each_tick_reaches_disk_without_flush(self, tmp_path):
+        path = tmp_path / "events.bin"
+        cidade = _cidade(3)
+        with EventLogWriter(path) as log:
+            assert EventLogReplayer(path).last_tick == 0  # cabeçalho já gravado
+            cidade.attach_event_log(log)
+            cidade.step(8)
+            replayer = EventLogReplayer(path)
+            assert replayer.last_tick == 1
+            assert replayer.state_at(1).snapshot() == cidade.snapshot()
+
+    def test_api_maps_unreadable_log_to_409(self, tmp_path, monkeypatch):
+        from fastapi.testclient import TestClient
+        from backend.api import main as api
+        from backend.utils.config_loader import get_config
+
+        path = tmp_path / "events.bin"
+        path.write_bytes(b"")  # execução começando
+        monkeypatch.setattr(get_config().simulation, "event_log_path", str(path))
+        monkeypatch.setattr(api, "_replayer", None)
+        client = TestClient(api.app)
+        assert client.get("/api/replay/state", params={"tick": 0}).status_code == 409
+
+        _run(path, ticks=5)
+        assert client.get("/api/replay/state", params={"tick": 5}).json()["last_tick"] == 5
+        # Nova execução recria o arquivo, menor que o já indexado
+        _run(path, ticks=2)
+        assert client.get("/api/replay/state", params={"tick": 2}).status_code == 409
+        assert client.get("/api/replay/state", params={"tick": 2}).json()["last_tick"] == 2
+
+    def test_resume_continues_log_after_checkpoint_tick(self, tmp_path):
+        path = tmp_path / "events.bin"
+        expected = _run(path, ticks=30, snapshot_every=24)
+        with open(path, "ab") as f:
+            f.write(b"\x04\x15\x00")  # processo interrompido no meio de um registro
+
+        # Checkpoint do tick 20: os ticks 21-30 do log são regravados
+        cidade = _cidade()
+        for agente, (nome, local) in zip(cidade.agentes, expected[20].items()):
+            agente.local = local
+        cidade.tick = 20
+        with EventLogWriter(path, snapshot_every=24, resume_tick=20) as log:
+            assert log.current_tick == 20
+            cidade.attach_event_log(log)
+            assert log.records_written == 5  # textos já conhecidos não são regravados
+            for tick in range(21, 41):
+                cidade.step((tick - 1) % 24)
+                expected[tick] = cidade.snapshot()
+
+        replayer = EventLogReplayer(path)
+        assert (replayer.first_tick, replayer.last_tick) == (1, 40)
+        assert [tick for tick, _ in replayer.reader.snapshots] == [24]
+        for tick in (0, 5, 20, 21, 24, 30, 40):
+            assert replayer.state_at(tick).snapshot() == expected[tick]
+        assert not (tmp_path / "events.bin.1").exists()
+
+    def test_new_run_rotates_previous_log(self, tmp_path):
+        path = tmp_path / "events.bin"
+        _run(path, ticks=5)
+        _run(path, ticks=3)
+        _run(path, ticks=2)
+        assert EventLogReader(path).last_tick == 2
+        assert EventLogReader(tmp_path / "events.bin.1").last_tick == 3
+        assert EventLogReader(tmp_path / "events.bin.2").last_tick == 5
+
+    def test_resume_of_invalid_file_rotates_and_restarts(self, tmp_path):
+        path = tmp_path / "events.bin"
+        path.write_bytes(b"not an event log")
+        with EventLogWriter(path, resume_tick=7) as log:
+            assert log.current_tick == 0
+        assert EventLogReader(path).last_tick == 0
+        assert (tmp_path / "events.bin.1").read_bytes() == b"not an event log"
+
+    def test_rejects_other_files(self, tmp_path):
+        path = tmp_path / "other.bin"
+        path.write_bytes(b"not an event log")
+        with pytest.raises(ValueError):
+            EventLogReader(path)
+
+    def test_open_from_config(self, tmp_path):
+        assert open_from_config(SimulationConfig()) is None
+        config = SimulationConfig(event_log_path=str(tmp_path / "logs" / "ev.bin"), event_log_snapshot_every=6)
+        with open_from_config(config) as log:
+            assert log.snapshot_every == 6
+        assert (tmp_path / "logs" / "ev.bin").exists()
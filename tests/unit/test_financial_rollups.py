@@ -0,0 +1,178 @@
+"""
+Testes dos agregados financeiros diários por rota e operadora.
+
+Os agregados são mantidos pelas escritas de bilhetes e manutenções e
+devem coincidir com a reconstrução completa a partir das tabelas base.
+"""
+import pytest
+from datetime import datetime
+from decimal import Decimal
+
+from backend.database.models import (
+    Agent, AgentStatus, CreatedBy, FinancialRollup, Gender, HealthStatus,
+    Route, StationType, TransportOperator, Vehicle
+)
+from backend.database.queries import DatabaseQueries
+
+
+@pytest.fixture
+def db(db_session):
+    return DatabaseQueries(db_session)
+
+
+@pytest.fixture
+def setup(db_session):
+    operator = TransportOperator(
+        name="Metrô", operator_type=StationType.METRO_STATION
+    )
+    db_session.add(operator)
+    db_session.flush()
+    route = Route(
+        name="Linha 1", code="L1", route_type=StationType.METRO_STATION,
+        operator_id=operator.id, fare_base=Decimal('4.40')
+    )
+    agent = Agent(
+        name="Passageira", birth_date=datetime(1990, 1, 1),
+        gender=Gender.CIS_FEMALE, health_status=HealthStatus.HEALTHY,
+        current_status=AgentStatus.IDLE, created_by=CreatedBy.IA, version="1.0"
+    )
+    db_session.add_all([route, agent])
+    db_session.flush()
+    vehicle = Vehicle(
+        name="Trem 1", vehicle_type="train",
+        operator_id=operator.id, assigned_route_id=route.id
+    )
+    db_session.add(vehicle)
+    db_session.commit()
+    return {'operator': operator.id, 'route': route.id,
+            'agent': agent.id, 'vehicle': vehicle.id}
+
+
+class TestIncrementalRollups:
+
+    def test_ticket_sales_accumulate(self, db, setup):
+        today = datetime.utcnow()
+        db.tickets.create_ticket(setup['agent'], route_id=setup['route'])
+        db.tickets.create_ticket(setup['agent'], route_id=setup['route'], price=10.0)
+        db.commit()
+
+        route_day = db.financial_rollups.get_route_day(setup['route'], today)
+        operator_day = db.financial_rollups.get_operator_day(setup['operator'], today)
+        assert route_day.tickets_sold == 2
+        assert route_day.revenue == Decimal('14.40')
+        assert operator_day.revenue == Decimal('14.40')
+
+    def test_validation_counts_passengers(self, db, setup):
+        ticket = db.tickets.create_ticket(setup['agent'], route_id=setup['route'])
+        assert db.tickets.validate_ticket(ticket.id)
+        db.commit()
+        rollup = db.financial_rollups.get_route_day(setup['route'], datetime.utcnow())
+        assert rollup.passengers == 1
+
+    def test_cancel_refunds_revenue(self, db, setup):
+        ticket = db.tickets.create_ticket(setup['agent'], route_id=setup['route'])
+        assert db.tickets.cancel_ticket(ticket.id)
+        assert not db.tickets.cancel_ticket(ticket.id)
+        db.commit()
+        rollup = db.financial_rollups.get_operator_day(setup['operator'], datetime.utcnow())
+        assert rollup.revenue == Decimal('0.00')
+        assert rollup.tickets_sold == 0
+
+    def test_maintenance_costs(self, db, setup):
+        record = db.vehicles.record_maintenance(setup['vehicle'], 250.0)
+        db.commit()
+        assert record.cost == Decimal('250.00')
+        today = datetime.utcnow()
+        assert db.financial_rollups.get_route_day(setup['route'], today).maintenance_costs == Decimal('250.00')
+        operator_day = db.financial_rollups.get_operator_day(setup['operator'], today)
+        assert operator_day.profit == pytest.approx(-250.0)
+
+    def test_record_maintenance_unknown_vehicle(self, db):
+        import uuid
+        assert db.vehicles.record_maintenance(uuid.uuid4(), 10.0) is None
+
+    def test_daily_revenue_reads_rollup(self, db, setup):
+        db.tickets.create_ticket(setup['agent'], route_id=setup['route'], price=7.0)
+        db.commit()
+        revenue = db.transport_operators.calculate_daily_revenue(
+            setup['operator'], datetime.utcnow()
+        )
+        assert revenue == pytest.approx(7.0)
+
+    def test_statistics_read_rollups(self, db, setup):
+        db.tickets.create_ticket(setup['agent'], route_id=setup['route'], price=7.0)
+        db.vehicles.record_maintenance(setup['vehicle'], 2.0)
+        db.commit()
+        totals = db.transport_operators.get_statistics(setup['operator'])['last_30_days']
+        assert totals['revenue'] == pytest.approx(7.0)
+        assert totals['profit'] == pytest.approx(5.0)
+        assert (totals['tickets_sold'], totals['days_with_activity']) == (1, 1)
+
+    def test_model_revenue_is_deprecated_estimate(self, db_session, setup):
+        operator = db_session.get(TransportOperator, setup['operator'])
+        today = datetime.utcnow()
+        with pytest.deprecated_call():
+            assert operator.calculate_daily_revenue(today) == operator.estimate_daily_revenue(today)
+
+    def test_one_row_per_scope_and_day(self, db, db_session, setup):
+        for _ in range(3):
+            db.tickets.create_ticket(setup['agent'], route_id=setup['route'])
+        db.commit()
+        assert db_session.query(FinancialRollup).count() == 2
+
+
+class TestRebuild:
+
+    def test_rebuild_matches_incremental(self, db, db_session, setup):
+        for price in (3.0, 5.0):
+            ticket = db.tickets.create_ticket(setup['agent'], route_id=setup['route'], price=price)
+            db.tickets.validate_ticket(ticket.id)
+        db.vehicles.record_maintenance(setup['vehicle'], 40.0)
+        db.commit()
+
+        def snapshot():
+            return sorted(
+                (r.scope, r.day, float(r.revenue), float(r.maintenance_costs),
+                 r.tickets_sold, r.passengers)
+                for r in db_session.query(FinancialRollup).all()
+            )
+
+        incremental = snapshot()
+        assert db.financial_rollups.rebuild() == 2
+        db.commit()
+        db_session.expire_all()
+        assert snapshot() == incremental
+
+    def test_rebuild_matches_incremental_for_cancelled_and_reused_tickets(self, db, db_session, setup):
+        from datetime import timedelta
+        from backend.database.models import TicketType
+
+        used = db.tickets.create_ticket(setup['agent'], route_id=setup['route'], price=4.0)
+        db.tickets.validate_ticket(used.id)
+        db.tickets.cancel_ticket(used.id)
+
+        # Primeiro uso "ontem", segunda validação hoje: as duas contam ontem
+        pass_ticket = db.tickets.create_ticket(setup['agent'], route_id=setup['route'],
+                                               ticket_type=TicketType.RETURN, price=6.0)
+        pass_ticket.used_at = datetime.utcnow() - timedelta(days=1)
+        pass_ticket.validation_count = 1
+        db.financial_rollups.record_passengers(setup['route'], 1, pass_ticket.used_at)
+        db.tickets.validate_ticket(pass_ticket.id)
+        db.commit()
+
+        def snapshot():
+            return sorted(
+                (r.scope, r.day, float(r.revenue), r.tickets_sold, r.passengers)
+                for r in db_session.query(FinancialRollup).all()
+            )
+
+        incremental = snapshot()
+        yesterday = (datetime.utcnow() - timedelta(days=1)).date()
+        assert [(day == yesterday, revenue, sold, passengers)
+                for _, day, revenue, sold, passengers in incremental] == [
+            (True, 0.0, 0, 2), (False, 6.0, 1, 1),
+        ] * 2
+        db.financial_rollups.rebuild()
+        db.commit()
+        db_session.expire_all()
+        assert snapshot() == incremental
@@ -0,0 +1,123 @@
+"""
+Testes dos quadros binários de LED e do agendador de saída.
+"""
+import sys
+
+import pytest
+
+from backend.iot.led_frames import (
+    FrameDecoder, LedFrameScheduler, decode_frame, encode_frame, frame_size,
+)
+from backend.iot.serial_sim import FakeLedDevice
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestFrames:
+
+    def test_round_trip_and_size(self):
+        changes = {0: True, 7: False, 12: True, 63: True}
+        frame = encode_frame(changes, seq=9)
+        assert len(frame) == frame_size(changes) == 4 + 2 * 8 + 1
+        assert decode_frame(frame) == (9, changes)
+
+    def test_frame_is_smaller_than_text_commands(self):
+        changes = {pin: pin % 2 == 0 for pin in range(32)}
+        text = ' '.join(f"{p}={int(on)}" for p, on in changes.items())
+        assert len(encode_frame(changes)) < len(text) / 5
+
+    def test_corruption_is_detected(self):
+        frame = bytearray(encode_frame({3: True}))
+        frame[-2] ^= 0x01
+        with pytest.raises(ValueError):
+            decode_frame(bytes(frame))
+        with pytest.raises(ValueError):
+            encode_frame({})
+
+    def test_stream_decoder_resyncs(self):
+        a, b = encode_frame({1: True}, 1), encode_frame({200: False}, 2)
+        decoder = FrameDecoder()
+        assert decoder.feed(b'lixo' + a + b[:3]) == [(1, {1: True})]
+        assert decoder.feed(b[3:]) == [(2, {200: False})]
+
+
+class TestScheduler:
+
+    def test_changes_coalesce_per_tick(self):
+        frames = []
+        leds = LedFrameScheduler(frames.append)
+        leds.set(5, True)
+        leds.set(5, False)
+        leds.set(9, True)
+        leds.flush()
+        assert [decode_frame(f)[1] for f in frames] == [{5: False, 9: True}]
+        leds.set(9, True)  # igual ao enviado: nada a fazer
+        assert leds.flush() is None
+
+    def test_rate_limit_defers_and_prioritizes(self):
+        clock = FakeClock()
+        # 1200 bauds * 0.5 = 60 bytes/s; quadro máximo de 7 bytes (um byte de pinos)
+        leds = LedFrameScheduler(baud_rate=1200, bandwidth_share=0.5, max_frame_bytes=7,
+                                 burst_seconds=0, clock=clock)
+        leds.set(0, True, priority=0)
+        leds.set(40, True, priority=5)
+        leds.set(41, True, priority=5)
+
+        frame = leds.flush()
+        assert decode_frame(frame)[1] == {40: True, 41: True}
+        assert leds.pending() == {0: True}
+
+        # Sem tokens até o relógio andar o suficiente para mais um quadro
+        assert leds.flush() is None
+        clock.now += 7 / 60
+        assert decode_frame(leds.flush())[1] == {0: True}
+        assert leds.stats()['deferred_ticks'] == 2
+
+    def test_aging_prevents_starvation(self):
+        clock = FakeClock()
+        leds = LedFrameScheduler(baud_rate=1200, max_frame_bytes=7, burst_seconds=0,
+                                 aging_ticks=2, clock=clock)
+        leds.set(0, True, priority=0)
+        sent = []
+        for tick in range(8):
+            # Pino 100 muda a cada tick com prioridade maior
+            leds.set(100, tick % 2 == 0, priority=2)
+            clock.now += 1
+            frame = leds.flush()
+            if frame:
+                sent.append(decode_frame(frame)[1])
+        assert {0: True} in sent
+        assert sent[0] == {100: True}
+
+    def test_throughput_stays_within_budget(self):
+        clock = FakeClock()
+        leds = LedFrameScheduler(baud_rate=115200, bandwidth_share=0.5, clock=clock)
+        for tick in range(200):
+            for pin in range(0, 256, 3):
+                leds.set(pin, (pin + tick) % 2 == 0)
+            clock.now += 0.01
+            leds.flush()
+        assert leds.bytes_sent <= leds.capacity + leds.bytes_per_second * clock.now
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason="pseudo-terminal requer POSIX")
+def test_frames_reach_pty_device():
+    with FakeLedDevice() as device:
+        port = device.connect()
+        leds = LedFrameScheduler(port.write)
+        leds.set(7, True)
+        leds.set(12, True)
+        leds.flush()
+        leds.set(12, False)
+        leds.flush()
+        assert device.wait_for_frames(2)
+        port.close()
+    assert device.leds == {7: True, 12: False}
+    assert [seq for _, seq, _ in device.frames] == [0, 1]
+    assert device.decoder.errors == 0
@@ -0,0 +1,101 @@
+"""
+Testes do formato JSON-lines e do arquivamento comprimido dos logs.
+"""
+import gzip
+import json
+import logging
+import queue
+
+import pytest
+
+from backend.utils import logger as logger_module
+from backend.utils.logger import (
+    BoundedQueueHandler,
+    JsonFormatter,
+    SimulationContextFilter,
+    _rotating_file_handler,
+    iter_json_logs,
+    set_simulation_time,
+)
+
+
+def _record(msg="agente %s movido", args=("Ana",), **extra):
+    record = logging.LogRecord("ferritine.teste", logging.INFO, __file__, 42, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+@pytest.fixture(autouse=True)
+def reset_simulation_time():
+    yield
+    set_simulation_time(None)
+
+
+class TestJsonFormatter:
+
+    def test_standard_fields_and_extra(self):
+        line = JsonFormatter().format(_record(agent_id="a-1", vehicle_id=7))
+        entry = json.loads(line)
+        assert entry["level"] == "INFO"
+        assert entry["logger"] == "ferritine.teste"
+        assert entry["module"] == "test_logging_json"
+        assert entry["line"] == 42
+        assert entry["msg"] == "agente Ana movido"
+        assert entry["agent_id"] == "a-1"
+        assert entry["vehicle_id"] == 7
+        assert entry["ts"].endswith("+00:00")
+        assert "sim_time" not in entry
+
+    def test_simulation_time_captured_when_logged(self):
+        record = _record()
+        set_simulation_time(8)
+        SimulationContextFilter().filter(record)
+        set_simulation_time(9)
+        assert json.loads(JsonFormatter().format(record))["sim_time"] == 8
+
+    def test_exception_survives_queue(self):
+        handler = BoundedQueueHandler(queue.Queue())
+        try:
+            raise RuntimeError("falhou")
+        except RuntimeError:
+            record = logging.LogRecord("ferritine.teste", logging.ERROR, __file__, 1,
+                                       "erro", None, __import__("sys").exc_info())
+        handler.handle(record)
+        entry = json.loads(JsonFormatter().format(handler.queue.get_nowait()))
+        assert entry["msg"] == "erro"
+        assert "RuntimeError: falhou" in entry["exc"]
+
+
+class TestArchive:
+
+    def test_gzip_rotation_and_reader(self, tmp_path):
+        path = tmp_path / "ferritine.log"
+        handler = _rotating_file_handler(path, logging.DEBUG, JsonFormatter(), "gzip")
+        handler.maxBytes = 300
+        for i in range(20):
+            handler.handle(_record("evento %d", (i,), tick=i))
+        handler.close()
+
+        archives = sorted(tmp_path.glob("ferritine.log.*.gz"))
+        assert archives
+        with gzip.open(archives[0], "rt", encoding="utf-8") as f:
+            assert json.loads(f.readline())["msg"].startswith("evento")
+
+        entries = list(iter_json_logs(path))
+        ticks = [e["tick"] for e in entries]
+        assert ticks == sorted(ticks)
+        assert ticks[-1] == 19
+
+    def test_reader_skips_rotated_when_asked(self, tmp_path):
+        path = tmp_path / "errors.log"
+        path.write_text(json.dumps({"msg": "atual"}) + "\n", encoding="utf-8")
+        (tmp_path / "errors.log.1").write_text(json.dumps({"msg": "antigo"}) + "\n", encoding="utf-8")
+        assert [e["msg"] for e in iter_json_logs(path)] == ["antigo", "atual"]
+        assert [e["msg"] for e in iter_json_logs(path, include_rotated=False)] == ["atual"]
+
+
+def test_city_step_sets_simulation_time():
+    from backend.simulation.models.cidade import Cidade
+
+    Cidade().step(14)
+    assert logger_module._simulation_time == 14
@@ -0,0 +1,168 @@
+"""
+Testes do logging com nível, amostragem e resumos por tick.
+"""
+import inspect
+import logging
+
+import pytest
+
+from backend.simulation.models.agente import Agente
+from backend.simulation.models.cidade import Cidade
+from backend.utils.logger import LogAggregator, get_logger
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.DEBUG)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def captured():
+    """Captura os registros de um logger filho de 'ferritine'."""
+    def _capture(name, level=logging.DEBUG):
+        log = get_logger(name)
+        handler = _ListHandler()
+        log._logger.addHandler(handler)
+        log._logger.setLevel(level)
+        attached.append((log._logger, handler))
+        return log, handler.records
+
+    attached = []
+    yield _capture
+    for std_logger, handler in attached:
+        std_logger.removeHandler(handler)
+        std_logger.setLevel(logging.NOTSET)
+
+
+class TestLevelGating:
+
+    def test_disabled_level_skips_record(self, captured):
+        log, records = captured("teste_nivel", logging.INFO)
+        assert not log.isEnabledFor(logging.DEBUG)
+        log.debug("não aparece %s", "x")
+        log.info("aparece")
+        assert [r.getMessage() for r in records] == ["aparece"]
+
+    def test_records_point_to_caller_line(self, captured):
+        log, records = captured("teste_linha")
+        line = inspect.currentframe().f_lineno + 1
+        log.info("linha")
+        assert records[0].lineno == line
+        assert records[0].pathname == __file__
+
+    def test_wrappers_point_to_caller_line(self, captured):
+        log, records = captured("teste_linha_wrappers")
+        sampled = log.sampled()
+        summary = LogAggregator(log)
+        summary.count("x")
+        line = inspect.currentframe().f_lineno + 1
+        sampled.info("amostrado")
+        summary.flush("resumo")
+        log.log(logging.WARNING, "genérico")
+        assert [r.lineno for r in records] == [line, line + 1, line + 2]
+
+    def test_invalid_log_level_falls_back_to_debug(self, tmp_path, monkeypatch):
+        from backend.utils import logger as logger_module
+
+        base = logging.getLogger("ferritine")
+        handlers, level = list(base.handlers), base.level
+        monkeypatch.setattr(logger_module, "_configured", False)
+        monkeypatch.setenv("LOG_LEVEL", "verboso")
+        monkeypatch.setenv("LOG_ASYNC", "False")
+        records = _ListHandler()
+        base.addHandler(records)
+        try:
+            logger_module.FerritineLogger("teste_nivel_env", log_dir=str(tmp_path))
+            assert base.level == logging.DEBUG
+            assert [r.getMessage() for r in records.records] == ["LOG_LEVEL inválido ('VERBOSO'); usando DEBUG"]
+        finally:
+            for handler in base.handlers[:]:
+                if handler not in handlers:
+                    base.removeHandler(handler)
+                    handler.close()
+            base.setLevel(level)
+
+
+class TestSampledLogger:
+
+    def test_one_in_n_per_call_site(self, captured):
+        log, records = captured("teste_amostra")
+        sampled = log.sampled(every_n=10)
+        for i in range(25):
+            sampled.debug("evento %d", i)
+        for i in range(3):
+            sampled.debug("outro ponto %d", i)
+
+        messages = [r.getMessage() for r in records]
+        assert messages == [
+            "evento 0",
+            "evento 10 (+9 suprimidos)",
+            "evento 20 (+9 suprimidos)",
+            "outro ponto 0",
+        ]
+
+    def test_rate_limit_per_second(self, captured):
+        log, records = captured("teste_taxa")
+        sampled = log.sampled(per_second=5)
+        for i in range(100):
+            sampled.info("evento %d", i)
+        assert len(records) == 5
+
+    def test_disabled_level_is_not_tracked(self, captured):
+        log, records = captured("teste_amostra_nivel", logging.INFO)
+        sampled = log.sampled(every_n=2)
+        for _ in range(10):
+            sampled.debug("x")
+        assert records == []
+        assert sampled._sites == {}
+
+    def test_rejects_invalid_every_n(self):
+        with pytest.raises(ValueError):
+            get_logger("teste_invalido").sampled(every_n=0)
+
+
+class TestLogAggregator:
+
+    def test_flush_emits_single_summary(self, captured):
+        log, records = captured("teste_resumo")
+        summary = LogAggregator(log)
+        for _ in range(1000):
+            summary.count("veiculos")
+        summary.count("km", 12.5)
+
+        assert summary.flush("Tick %d", 3) == {"veiculos": 1000, "km": 12.5}
+        assert [r.getMessage() for r in records] == ["Tick 3 | veiculos=1000 km=12.5"]
+        assert summary.flush("Tick %d", 4) == {}
+
+    def test_disabled_aggregator_counts_nothing(self, captured):
+        log, records = captured("teste_resumo_nivel", logging.INFO)
+        summary = LogAggregator(log)
+        summary.count("veiculos")
+        assert summary.flush("Tick") == {}
+        assert records == []
+
+
+class TestCityLogging:
+
+    def test_city_step_logs_one_line_per_tick(self, captured):
+        _, records = captured("backend.simulation.models.cidade")
+        cidade = Cidade()
+        for i in range(50):
+            cidade.add_agente(Agente(f"Agente{i}", "Casa", "Trabalho"))
+        records.clear()
+
+        cidade.step(8)
+        assert len(records) == 1
+        assert "hora=8 com 50 agentes" in records[0].getMessage()
+        assert "mudaram_de_local=50" in records[0].getMessage()
+        assert "agentes_adicionados=50" in records[0].getMessage()
+
+    def test_agent_step_reports_moves(self):
+        agente = Agente("Ana", "Casa", "Fábrica")
+        assert agente.step(8) is True
+        assert agente.step(9) is False
+        assert agente.local == "Fábrica"
@@ -0,0 +1,87 @@
+"""
+Testes do sorteio ponderado de nomes (método de alias).
+"""
+import random
+from collections import Counter
+
+import pytest
+
+from backend.database.models import Gender, NamePool
+from backend.database.queries import DatabaseQueries
+from backend.utils.sampling import AliasSampler
+
+
+@pytest.fixture
+def db(db_session):
+    return DatabaseQueries(db_session)
+
+
+@pytest.fixture
+def pool(db_session):
+    db_session.add_all([
+        NamePool(name="Maria", name_type="first", gender=Gender.CIS_FEMALE, rarity=1.0),
+        NamePool(name="Joana", name_type="first", gender=Gender.CIS_FEMALE, rarity=0.1),
+        NamePool(name="João", name_type="first", gender=Gender.CIS_MALE, rarity=1.0),
+        NamePool(name="Alex", name_type="first", gender=None, rarity=0.5),
+        NamePool(name="Silva", name_type="last", rarity=1.0),
+    ])
+    db_session.commit()
+
+
+class TestAliasSampler:
+
+    def test_distribution_follows_weights(self):
+        sampler = AliasSampler(['a', 'b', 'c'], [6.0, 3.0, 1.0])
+        counts = Counter(sampler.sample_many(20000, random.Random(1)))
+        assert counts['a'] / 20000 == pytest.approx(0.6, abs=0.02)
+        assert counts['b'] / 20000 == pytest.approx(0.3, abs=0.02)
+        assert counts['c'] / 20000 == pytest.approx(0.1, abs=0.02)
+
+    def test_zero_weight_never_sampled(self):
+        sampler = AliasSampler(['a', 'b'], [1.0, 0.0])
+        assert set(sampler.sample_many(1000, random.Random(2))) == {'a'}
+
+    def test_all_zero_is_uniform(self):
+        sampler = AliasSampler(['a', 'b'], [0.0, None])
+        assert set(sampler.sample_many(1000, random.Random(3))) == {'a', 'b'}
+
+    def test_invalid_input(self):
+        with pytest.raises(ValueError):
+            AliasSampler([], [])
+        with pytest.raises(ValueError):
+            AliasSampler(['a'], [1.0, 2.0])
+
+
+class TestNamePoolSampling:
+
+    def test_sample_names_respects_gender(self, db, pool):
+        names = db.names.sample_names(500, "first", Gender.CIS_FEMALE, random.Random(4))
+        assert len(names) == 500
+        assert set(names) <= {"Maria", "Joana", "Alex"}
+        counts = Counter(names)
+        assert counts["Maria"] > counts["Alex"] > counts["Joana"]
+
+    def test_sample_names_is_reproducible(self, db, pool):
+        first = db.names.sample_names(50, "first", rng=random.Random(5))
+        second = db.names.sample_names(50, "first", rng=random.Random(5))
+        assert first == second
+
+    def test_no_queries_after_first_build(self, db, pool, assert_num_queries):
+        db.names.sample_names(1, "last")
+        with assert_num_queries(0):
+            db.names.sample_names(1000, "last")
+
+    def test_refreshes_when_pool_changes(self, db, pool):
+        assert set(db.names.sample_names(100, "last", rng=random.Random(6))) == {"Silva"}
+        db.names.create(name="Souza", name_type="last", rarity=1.0)
+        db.commit()
+        assert "Souza" in db.names.sample_names(200, "last", rng=random.Random(6))
+
+    def test_empty_pool(self, db):
+        assert db.names.sample_names(10, "middle") == []
+        assert db.names.get_random_name("middle") is None
+
+    def test_get_random_name_returns_model(self, db, pool):
+        name = db.names.get_random_name("first", Gender.CIS_MALE, random.Random(7))
+        assert isinstance(name, NamePool)
+        assert name.name in {"João", "Alex"}
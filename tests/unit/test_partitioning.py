@@ -0,0 +1,173 @@
+"""
+Testes do particionamento por tempo e retenção (modo emulado, SQLite).
+"""
+import gzip
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import sessionmaker
+
+from backend.database.models import Base, Event
+from backend.database.partitioning import (
+    PartitionManager, PartitionSpec, next_period, period_start, specs_from_config,
+)
+from backend.database.queries import EventQueries, SensorEventQueries
+from backend.iot.ingestion import SensorReading
+
+NOW = datetime(2025, 3, 10, 12, 0, 0)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'partitions.db'}")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def manager(engine, tmp_path):
+    return PartitionManager(engine, archive_dir=str(tmp_path / 'archive'))
+
+
+def insert_readings(engine, days_ago, sensor_id='reed_01', processed=True):
+    session = sessionmaker(bind=engine)()
+    SensorEventQueries(session).insert_batch([
+        {**SensorReading(sensor_id, 'reed_switch', 'state', str(d % 2),
+                         timestamp=NOW - timedelta(days=d)).to_row(), 'processed': processed}
+        for d in days_ago
+    ])
+    session.commit()
+    session.close()
+
+
+class TestPeriods:
+
+    def test_period_start_and_next(self):
+        t = datetime(2024, 12, 18, 15, 30)
+        assert period_start(t, 'day') == datetime(2024, 12, 18)
+        assert period_start(t, 'week') == datetime(2024, 12, 16)
+        assert period_start(t, 'month') == datetime(2024, 12, 1)
+        assert next_period(datetime(2024, 12, 1), 'month') == datetime(2025, 1, 1)
+        with pytest.raises(ValueError):
+            period_start(t, 'year')
+
+    def test_partition_names_round_trip(self):
+        daily = PartitionSpec('sensor_events', 'timestamp', 'day')
+        monthly = PartitionSpec('events', 'occurred_at', 'month')
+        assert daily.partition_name(datetime(2025, 3, 9)) == 'sensor_events_p20250309'
+        assert monthly.partition_name(datetime(2025, 3, 1)) == 'events_p202503'
+        assert monthly.parse_partition('events_p202512') == (datetime(2025, 12, 1), datetime(2026, 1, 1))
+        assert daily.parse_partition('sensor_events_p202503') is None
+        assert monthly.parse_partition('events_default') is None
+
+    def test_retention_from_config(self):
+        class Cfg:
+            retention_days = {'sensor_events': 7, 'events': None, 'desconhecida': 1}
+        specs = specs_from_config(Cfg())
+        assert specs['sensor_events'].retention_days == 7
+        assert specs['events'].retention_days is None
+        assert specs['log_entries'].retention_days == 90
+
+
+class TestEmulatedPartitions:
+
+    def test_roll_moves_old_rows_to_period_tables(self, engine, manager):
+        insert_readings(engine, [0, 0, 1, 2, 2, 2])
+        assert manager.roll('sensor_events', NOW) == 4
+
+        names = [p.name for p in manager.partitions('sensor_events')]
+        assert names == ['sensor_events_p20250308', 'sensor_events_p20250309']
+        assert manager.roll('sensor_events', NOW) == 0
+
+    def test_roll_keeps_unprocessed_rows_in_parent(self, engine, manager):
+        insert_readings(engine, [0, 1, 2], processed=False)
+        assert manager.roll('sensor_events', NOW) == 0
+
+        session = sessionmaker(bind=engine)()
+        queries = SensorEventQueries(session)
+        pending = queries.get_pending()
+        assert len(pending) == 3
+        queries.mark_processed([e.id for e in pending if e.timestamp < NOW - timedelta(days=1)])
+        session.commit()
+
+        # Só a leitura processada sai; as pendentes continuam na fila
+        assert manager.roll('sensor_events', NOW) == 1
+        assert queries.count_pending() == 2
+        session.close()
+
+    def test_query_range_reads_only_overlapping_partitions(self, engine, manager):
+        insert_readings(engine, [0, 1, 2, 3])
+        insert_readings(engine, [1], sensor_id='reed_02')
+        manager.roll('sensor_events', NOW)
+
+        rows = manager.query_range('sensor_events', NOW - timedelta(days=1, hours=1), NOW + timedelta(hours=1))
+        assert [r['timestamp'].date() for r in rows] == [NOW.date(), NOW.date() - timedelta(days=1),
+                                                         NOW.date() - timedelta(days=1)]
+
+        filtered = manager.query_range('sensor_events', NOW - timedelta(days=10), NOW,
+                                       where=lambda t: t.c.sensor_id == 'reed_02')
+        assert len(filtered) == 1 and filtered[0]['sensor_id'] == 'reed_02'
+
+        oldest_first = manager.query_range('sensor_events', NOW - timedelta(days=10),
+                                           NOW + timedelta(hours=1), limit=2, newest_first=False)
+        assert [r['timestamp'] for r in oldest_first] == [NOW - timedelta(days=3), NOW - timedelta(days=2)]
+
+    def test_retention_archives_and_drops(self, engine, manager, tmp_path):
+        insert_readings(engine, [0, 5, 40, 41])
+        archived = manager.apply_retention('sensor_events', NOW)
+
+        assert sorted(p.name for p in archived) == ['sensor_events_p20250128.jsonl.gz',
+                                                    'sensor_events_p20250129.jsonl.gz']
+        with gzip.open(archived[0], 'rt', encoding='utf-8') as f:
+            rows = [json.loads(line) for line in f]
+        assert len(rows) == 1 and rows[0]['sensor_id'] == 'reed_01'
+
+        tables = inspect(engine).get_table_names()
+        assert 'sensor_events_p20250128' not in tables
+        assert 'sensor_events_p20250305' in tables
+
+    def test_maintain_report(self, engine, manager):
+        insert_readings(engine, [0, 60])
+        report = manager.maintain(NOW)
+        assert set(report) == {'sensor_events', 'events', 'log_entries'}
+        assert report['sensor_events']['native'] is False
+        assert report['sensor_events']['moved'] == 1
+        assert len(report['sensor_events']['archived']) == 1
+        assert report['events']['archived'] == []
+
+
+def test_event_queries_time_range(engine):
+    session = sessionmaker(bind=engine)()
+    for hours, event_type in [(1, 'accident'), (30, 'accident'), (2, 'fire')]:
+        session.add(Event(event_type=event_type, occurred_at=NOW - timedelta(hours=hours)))
+    session.commit()
+
+    queries = EventQueries(session)
+    assert len(queries.get_in_range(NOW - timedelta(hours=3), NOW)) == 2
+    assert [e.event_type for e in queries.get_in_range(NOW - timedelta(days=2), NOW, event_type='accident')] \
+        == ['accident', 'accident']
+    assert len(queries.get_recent(since=NOW - timedelta(hours=3))) == 2
+    session.close()
+
+
+def test_event_queries_read_rolled_partitions(engine, manager):
+    session = sessionmaker(bind=engine)()
+    old = Event(event_type='fire', occurred_at=NOW - timedelta(days=40))
+    session.add_all([old, Event(event_type='accident', occurred_at=NOW - timedelta(hours=1))])
+    session.commit()
+    old_id = old.id
+    session.close()
+    assert manager.roll('events', NOW) == 1
+
+    session = sessionmaker(bind=engine)()
+    queries = EventQueries(session)
+    assert [e.event_type for e in queries.get_recent()] == ['accident', 'fire']
+    assert [e.event_type for e in queries.get_recent(limit=1)] == ['accident']
+    assert len(queries.get_recent(since=NOW - timedelta(days=2))) == 1
+    assert queries.get_by_id(old_id).event_type == 'fire'
+    assert [e.event_type for e in queries.get_by_type('fire')] == ['fire']
+    assert len(queries.get_in_range(NOW - timedelta(days=50), NOW, event_type='fire')) == 1
+    session.close()
@@ -799,12 +799,17 @@ class TestTransportOperatorQueries:
         sample_route.operator_id = sample_operator.id
         sample_route.monthly_revenue = Decimal('900000.00')
         db.session.commit()
-        daily_revenue = db.transport_operators.calculate_daily_revenue(
+        # No rollup for the day: no sales
+        assert db.transport_operators.calculate_daily_revenue(
             sample_operator.id,
             datetime.utcnow()
+        ) == 0.0
+        daily_revenue = db.transport_operators.calculate_daily_revenue(
+            sample_operator.id,
+            datetime.utcnow(),
+            estimate=True
         )
-        # Should be approximately monthly_revenue / 30
-        assert daily_revenue > 0
+        # Estimate is monthly_revenue / 30
         assert daily_revenue == 900000.0 / 30.0
     def test_get_employees(self, db, sample_operator, sample_agent):
         """Test getting operator employees."""
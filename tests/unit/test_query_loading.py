@@ -0,0 +1,166 @@
+"""
+Testes de estratégia de carregamento de relacionamentos.
+
+As consultas quentes usam selectinload/joinedload; o número de comandos SQL
+não pode crescer com a quantidade de operadoras, rotas ou veículos.
+"""
+import pytest
+from decimal import Decimal
+
+from backend.database.models import (
+    Building, BuildingType, Route, RouteStation, Station, StationType,
+    TransportOperator, Vehicle
+)
+from backend.database.queries import DatabaseQueries
+
+
+@pytest.fixture
+def db(db_session):
+    return DatabaseQueries(db_session)
+
+
+@pytest.fixture
+def network(db_session):
+    """5 operadoras com 3 rotas e 2 veículos cada."""
+    station = Station(name="Central", station_type=StationType.METRO_STATION, x=0, y=0)
+    building = Building(
+        name="Edifício Central",
+        building_type=BuildingType.TRANSPORT_TRAIN_STATION_CENTRAL,
+        x=0,
+        y=0,
+    )
+    db_session.add_all([station, building])
+    db_session.flush()
+
+    for i in range(5):
+        operator = TransportOperator(
+            name=f"Operadora {i}",
+            operator_type=StationType.METRO_STATION,
+            revenue=Decimal(1000 * (i + 1)),
+            operational_costs=Decimal(100),
+        )
+        db_session.add(operator)
+        db_session.flush()
+        for j in range(3):
+            route = Route(
+                name=f"Linha {i}-{j}",
+                code=f"L{i}{j}",
+                route_type=StationType.METRO_STATION,
+                operator_id=operator.id,
+                monthly_revenue=Decimal(300),
+                monthly_operational_cost=Decimal(10 * j),
+                monthly_maintenance_cost=Decimal(5),
+            )
+            db_session.add(route)
+            db_session.flush()
+            db_session.add(RouteStation(
+                route_id=route.id, station_id=building.id, sequence_order=1
+            ))
+        for k in range(2):
+            db_session.add(Vehicle(
+                name=f"Trem {i}-{k}",
+                vehicle_type="train",
+                operator_id=operator.id,
+                current_station_id=station.id,
+            ))
+    db_session.commit()
+    db_session.expunge_all()
+
+
+class TestOperatorLoading:
+
+    def test_most_profitable_single_query(self, db, network, assert_num_queries):
+        with assert_num_queries(1):
+            operators = db.transport_operators.get_most_profitable(limit=3)
+        assert [op.name for op in operators] == [
+            "Operadora 4", "Operadora 3", "Operadora 2"
+        ]
+
+    def test_get_all_with_routes(self, db, network, assert_num_queries):
+        with assert_num_queries(2):
+            operators = db.transport_operators.get_all(with_routes=True)
+            total = sum(op.active_routes_count for op in operators)
+        assert total == 15
+
+    def test_statistics_constant_queries(self, db, network, assert_num_queries):
+        operator_id = db.transport_operators.get_all()[0].id
+        db.session.expunge_all()
+        with assert_num_queries(5):
+            stats = db.transport_operators.get_statistics(operator_id)
+        assert stats['total_routes'] == 3
+        assert stats['total_vehicles'] == 2
+
+    def test_lazy_default_still_works(self, db, network):
+        operator = db.transport_operators.get_all()[0]
+        assert len(operator.routes) == 3
+
+
+class TestRouteStationVehicleLoading:
+
+    def test_route_with_stations(self, db, network, assert_num_queries):
+        route_id = db.routes.get_by_code("L00").id
+        db.session.expunge_all()
+        with assert_num_queries(2):
+            route = db.routes.get_by_id(route_id, with_stations=True)
+            names = [stop.station.name for stop in route.stations]
+        assert names == ["Edifício Central"]
+
+    def test_routes_with_operator(self, db, network, assert_num_queries):
+        with assert_num_queries(2):
+            routes = db.routes.get_all(with_operator=True)
+            operators = {r.operator.name for r in routes}
+            vehicles = sum(len(r.vehicles) for r in routes)
+        assert len(operators) == 5
+        assert vehicles == 0
+
+    def test_stations_with_vehicles(self, db, network, assert_num_queries):
+        with assert_num_queries(2):
+            stations = db.stations.get_all(with_vehicles=True)
+            docked = sum(len(s.docked_vehicles) for s in stations)
+        assert docked == 10
+
+    def test_vehicles_with_relations(self, db, network, assert_num_queries):
+        with assert_num_queries(1):
+            vehicles = db.vehicles.get_all(with_relations=True)
+            names = {v.current_station.name for v in vehicles}
+            operators = {v.operator.name for v in vehicles}
+        assert names == {"Central"}
+        assert len(operators) == 5
+
+
+class TestOperatorProfitRanking:
+
+    def test_sql_profit_matches_python(self, db, network):
+        ranking = db.transport_operators.get_profit_ranking()
+        assert len(ranking) == 5
+        for operator, profit in ranking:
+            assert profit == pytest.approx(operator.get_profit_margin())
+            assert operator.profit == pytest.approx(profit)
+
+    def test_ranking_ordered_desc(self, db, network):
+        profits = [p for _, p in db.transport_operators.get_profit_ranking()]
+        assert profits == sorted(profits, reverse=True)
+        # Operadora 0: 1000 - 100 - (0 + 10 + 20 + 3 * 5)
+        assert profits[-1] == pytest.approx(855.0)
+
+    def test_min_profit_filter(self, db, network):
+        operators = db.transport_operators.get_most_profitable(min_profit=3000)
+        assert [op.name for op in operators] == ["Operadora 4", "Operadora 3"]
+
+    def test_operator_without_routes(self, db, db_session):
+        db_session.add(TransportOperator(
+            name="Sem Rotas",
+            operator_type=StationType.METRO_STATION,
+            revenue=Decimal(50),
+            operational_costs=Decimal(80),
+        ))
+        db_session.commit()
+        [(operator, profit)] = db.transport_operators.get_profit_ranking()
+        assert profit == pytest.approx(-30.0)
+
+    def test_inactive_excluded_by_default(self, db, db_session, network):
+        operator = db.transport_operators.get_all()[0]
+        operator.is_active = False
+        db_session.commit()
+        assert len(db.transport_operators.get_profit_ranking()) == 4
+        assert len(db.transport_operators.get_profit_ranking(include_inactive=True)) == 5
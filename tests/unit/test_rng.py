@@ -0,0 +1,129 @@
+"""
+Testes dos fluxos aleatórios determinísticos da simulação.
+"""
+import threading
+
+from backend.simulation.models.vehicle import Vehicle
+from backend.utils.rng import RandomStreams, configure_from_config, rng_streams
+from backend.utils.config_loader import SimulationConfig
+
+
+class _IncidentDB:
+    def __init__(self):
+        self.incidents = []
+
+    def create_incident(self, **kwargs):
+        self.incidents.append(kwargs)
+
+
+def _accidents(seed, vehicle_ids, order):
+    """Dano de 3 acidentes por veículo, sorteando na ordem dada."""
+    streams = RandomStreams(seed)
+    damage = {vid: [] for vid in vehicle_ids}
+    for vid in order:
+        db = _IncidentDB()
+        Vehicle(db, id=vid, current_passengers=30).trigger_accident(
+            'severe', rng=streams.stream('accidents', vid))
+        damage[vid].append(db.incidents[0]['vehicle_damage_percent'])
+    return damage
+
+
+class TestRandomStreams:
+
+    def test_same_seed_same_streams(self):
+        a, b = RandomStreams(123), RandomStreams(123)
+        assert [a.stream('x', 1).random() for _ in range(5)] == [b.stream('x', 1).random() for _ in range(5)]
+        assert RandomStreams(124).stream('x', 1).random() != RandomStreams(123).stream('x', 1).random()
+
+    def test_streams_are_independent_of_creation_order(self):
+        a, b = RandomStreams(7), RandomStreams(7)
+        a.stream('accidents', 'v1').random()
+        first = a.stream('accidents', 'v2').random()
+        assert b.stream('accidents', 'v2').random() == first
+
+    def test_keys_are_typed(self):
+        streams = RandomStreams(1)
+        assert streams.seed_for('names', 1) != streams.seed_for('names', '1')
+        assert streams.seed_for('names', 1) != streams.seed_for('accidents', 1)
+
+    def test_counter_based_draws_are_pure(self):
+        streams = RandomStreams(99)
+        values = [streams.uniform('breakdown', 'v1', counter=t) for t in range(1000)]
+        assert all(0.0 <= v < 1.0 for v in values)
+        assert values == [RandomStreams(99).uniform('breakdown', 'v1', counter=t) for t in range(1000)]
+        assert 0.45 < sum(values) / len(values) < 0.55
+        assert streams.at('x', 5, counter=3).random() == streams.at('x', 5, counter=3).random()
+
+    def test_stream_is_cached_and_reset(self):
+        streams = RandomStreams(5)
+        rng = streams.stream('names', 'first')
+        first = rng.random()
+        assert streams.stream('names', 'first') is rng
+        streams.reset()
+        assert streams.stream('names', 'first').random() == first
+
+    def test_stream_cache_is_bounded(self):
+        streams = RandomStreams(5, max_streams=2)
+        a = streams.stream('names', 'a')
+        first = a.random()
+        streams.stream('names', 'b')
+        assert streams.stream('names', 'a') is a  # usado por último
+        streams.stream('names', 'c')
+        assert len(streams) == 2
+        assert streams.stream('names', 'a') is a
+        # 'b' foi despejado: recomeça do início
+        assert streams.stream('names', 'b').random() == RandomStreams(5).stream('names', 'b').random()
+        assert first == RandomStreams(5).stream('names', 'a').random()
+
+    def test_default_accident_draw_is_per_vehicle_and_count(self):
+        original = rng_streams.seed
+        try:
+            rng_streams.configure(11)
+            damages = []
+            for count in (0, 1, 0):
+                db = _IncidentDB()
+                Vehicle(db, id='v1', accidents_count=count, current_passengers=30).trigger_accident('severe')
+                damages.append(db.incidents[0]['vehicle_damage_percent'])
+            assert damages[0] == damages[2]
+            assert damages[0] == RandomStreams(11).at('accidents', 'v1', counter=0).randint(40, 70)
+            assert len(rng_streams) == 0  # sorteios por veículo não ficam em cache
+        finally:
+            rng_streams.configure(original)
+
+    def test_accidents_reproducible_regardless_of_order_and_threads(self):
+        ids = list(range(20))
+        sequential = _accidents(11, ids, ids * 3)
+        assert _accidents(11, ids, list(reversed(ids)) * 3) == sequential
+        assert _accidents(12, ids, ids * 3) != sequential
+
+        streams = RandomStreams(11)
+        results = {}
+
+        def worker(chunk):
+            for vid in chunk:
+                rng = streams.stream('accidents', vid)
+                damages = []
+                for _ in range(3):
+                    db = _IncidentDB()
+                    Vehicle(db, id=vid, current_passengers=30).trigger_accident('severe', rng=rng)
+                    damages.append(db.incidents[0]['vehicle_damage_percent'])
+                results[vid] = damages
+
+        threads = [threading.Thread(target=worker, args=(ids[i::4],)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert results == sequential
+
+    def test_configure_from_config(self):
+        original = rng_streams.seed
+        try:
+            configure_from_config(SimulationConfig(random_seed=2025))
+            assert rng_streams.seed == 2025
+            assert rng_streams.stream('a').random() == RandomStreams(2025).stream('a').random()
+        finally:
+            rng_streams.configure(original)
+
+    def test_random_seed_when_unset(self):
+        assert isinstance(RandomStreams(None).seed, int)
@@ -0,0 +1,152 @@
+"""
+Testes da ponte sensores -> veículos -> LEDs da maquete.
+"""
+from datetime import datetime
+
+import pytest
+
+from backend.database.models import Route, Station, StationType, Vehicle
+from backend.iot.dispatcher import LedFrameWriter, SensorDispatcher, SensorIndex
+from backend.iot.ingestion import SensorIngestionService, SensorReading
+from backend.iot.led_frames import decode_frame
+from backend.iot.serial_sim import SimulatedSerialPort, open_serial_port
+from backend.iot.sources import SerialSource
+
+
+def reed(sensor_id, value):
+    return SensorReading(sensor_id, 'reed_switch', 'state', str(value), timestamp=datetime(2025, 1, 1))
+
+
+@pytest.fixture
+def layout(db_session):
+    central = Station(name="Central", station_type=StationType.METRO_STATION, x=0, y=0,
+                      has_led=True, led_pin=7)
+    norte = Station(name="Norte", station_type=StationType.METRO_STATION, x=10, y=0)
+    db_session.add_all([central, norte])
+    db_session.flush()
+    route = Route(name="Linha Circular", route_type=StationType.METRO_STATION, sensor_ids=[
+        {"sensor_id": "plat_central", "position": 0.0, "station_id": str(central.id)},
+        "reed_a",
+        {"sensor_id": "plat_norte", "position": 0.5, "station_id": str(norte.id), "x": 10, "y": 0},
+        "reed_b",
+    ])
+    db_session.add(route)
+    db_session.flush()
+    t1 = Vehicle(name="Trem 1", vehicle_type="train", assigned_route_id=route.id,
+                 has_led=True, led_pin=12, is_docked=True, current_station_id=central.id)
+    t2 = Vehicle(name="Trem 2", vehicle_type="train", assigned_route_id=route.id)
+    sem_rota = Vehicle(name="Reserva", vehicle_type="train")
+    db_session.add_all([t1, t2, sem_rota])
+    db_session.commit()
+    return {'central': central.id, 'norte': norte.id, 'route': route.id, 't1': t1.id, 't2': t2.id}
+
+
+@pytest.fixture
+def port():
+    return SimulatedSerialPort(timeout=0.01)
+
+
+@pytest.fixture
+def dispatcher(db_session, layout, port):
+    return SensorDispatcher.from_session(db_session, leds=LedFrameWriter(port.write))
+
+
+class TestSensorIndex:
+
+    def test_index_resolves_sensors_and_vehicles(self, db_session, layout):
+        index = SensorIndex.build(db_session)
+        (binding,) = index.resolve('reed_a')
+        assert binding.route_id == layout['route'] and binding.position == 0.25
+        assert index.resolve('plat_norte')[0].station_id == layout['norte']
+        assert index.resolve('desconhecido') == ()
+        assert set(index.vehicles) == {layout['t1'], layout['t2']}
+        assert index.station_leds == {layout['central']: 7}
+
+    def test_invalid_items_are_skipped(self):
+        bindings = SensorIndex.parse_route_sensors('r', ['a', 42, {'position': 1}, {'sensor_id': 'b', 'position': 'x'}])
+        assert [b.sensor_id for b in bindings] == ['a']
+
+
+class TestSensorDispatcher:
+
+    def test_departure_and_arrival_update_state_and_leds(self, dispatcher, layout, port):
+        assert dispatcher.sync_leds() == b"L 7=1 12=0\n"
+
+        # Trem 1 deixa a plataforma central e passa pelo reed_a
+        dispatcher.enqueue(reed('plat_central', 0))
+        dispatcher.enqueue(reed('reed_a', 1))
+        assert dispatcher.tick() == 2
+        t1 = dispatcher.vehicle(layout['t1'])
+        assert not t1.is_docked and t1.is_moving and t1.position == 0.25
+        assert port.take_written() == b"L 7=1 12=0\nL 7=0 12=1\n"
+
+        # Chega na plataforma norte
+        dispatcher.dispatch(reed('plat_norte', 1))
+        assert (t1.is_docked, t1.current_station_id, t1.current_x) == (True, layout['norte'], 10)
+        assert dispatcher.docked_count(layout['norte']) == 1
+        dispatcher.tick()
+        assert port.take_written() == b"L 12=0\n"
+
+    def test_leds_coalesce_within_tick(self, dispatcher, port):
+        dispatcher.sync_leds()
+        port.take_written()
+        # Sai e volta na mesma janela: nenhum comando
+        dispatcher.enqueue(reed('plat_central', 0))
+        dispatcher.enqueue(reed('plat_central', 1))
+        dispatcher.tick()
+        assert port.take_written() == b""
+
+    def test_unmapped_and_non_trigger_readings(self, dispatcher):
+        assert not dispatcher.dispatch(reed('fantasma', 1))
+        assert not dispatcher.dispatch(SensorReading('reed_a', 'light', 'lux', '300'))
+        assert not dispatcher.dispatch(reed('reed_b', 0))
+        stats = dispatcher.stats()
+        assert (stats['unmapped'], stats['ignored'], stats['unmatched']) == (1, 1, 1)
+
+    def test_persist_writes_dirty_vehicles(self, db_session, dispatcher, layout):
+        dispatcher.dispatch(reed('plat_central', 0))
+        assert dispatcher.persist(db_session) == 1
+        db_session.commit()
+        db_session.expire_all()
+        t1 = db_session.get(Vehicle, layout['t1'])
+        assert (t1.is_docked, t1.current_station_id, t1.is_moving) == (False, None, True)
+        assert dispatcher.persist(db_session) == 0
+
+    def test_persist_skips_deleted_vehicles(self, db_session, dispatcher, layout):
+        dispatcher.dispatch(reed('plat_central', 0))
+        db_session.delete(db_session.get(Vehicle, layout['t1']))
+        db_session.commit()
+        # Veículo removido com estado pendente em memória: sem StaleDataError
+        assert dispatcher.persist(db_session) == 0
+        db_session.commit()
+
+    def test_serial_loop_end_to_end(self, db_session, layout, port):
+        service = SensorIngestionService(lambda: db_session)
+        source = SerialSource(service, 'sim://maquete', connection=port)
+        dispatcher = SensorDispatcher.from_session(db_session, write=source.write)
+        service.add_listener(dispatcher.enqueue)
+
+        port.feed_reading('plat_central', 'reed_switch', 0)
+        port.feed_reading('reed_a', 'reed_switch', 1)
+        source.pump(max_lines=2)
+        assert dispatcher.tick() == 2
+        assert decode_frame(port.written) == (0, {7: False, 12: True})
+
+
+def test_led_writer_only_sends_changes():
+    frames = []
+    leds = LedFrameWriter(frames.append)
+    leds.set(3, True)
+    leds.set(3, False)
+    leds.set(5, True)
+    assert leds.flush() == b"L 3=0 5=1\n"
+    leds.set(5, True)
+    assert leds.flush() is None
+    assert frames == [b"L 3=0 5=1\n"]
+
+
+def test_open_serial_port_simulated():
+    port = open_serial_port('sim://teste', 9600, timeout=0.01)
+    port.feed("a,b,c,1")
+    assert port.readline() == b"a,b,c,1\n"
+    assert port.readline() == b""
@@ -0,0 +1,264 @@
+"""
+Testes da ingestão em lote de leituras de sensores.
+"""
+import io
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.database.models import Base, SensorEvent
+from backend.database.queries import SensorEventQueries
+from backend.iot.ingestion import ReadingFilter, SensorIngestionService, SensorReading
+from backend.iot.sources import LineSource, MqttSource, parse_mqtt_message, parse_serial_line
+
+T0 = datetime(2025, 1, 1, 8, 0, 0)
+
+
+def reed(value, ms, sensor_id='reed_01'):
+    return SensorReading(sensor_id, 'reed_switch', 'state', str(value),
+                         timestamp=T0 + timedelta(milliseconds=ms))
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'sensors.db'}")
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+class TestReadingFilter:
+
+    def test_reed_switch_chatter_is_debounced(self):
+        f = ReadingFilter(debounce_ms=30)
+        # Ímã chegando: 1,0,1,0,1 em 8ms, depois estável; saída em 200ms
+        accepted = [f.accept(reed(v, ms)) for v, ms in
+                    [(1, 0), (0, 2), (1, 4), (0, 6), (1, 8), (1, 100), (0, 200), (1, 205)]]
+        assert accepted == [True, False, False, False, False, False, True, False]
+
+    def test_edge_inside_window_is_settled_after_it(self):
+        f = ReadingFilter(debounce_ms=30)
+        assert f.accept(reed(1, 0))
+        # Borda real 10ms depois, sem outra leitura (sensor só envia bordas)
+        assert not f.accept(reed(0, 10))
+        assert f.settle(T0 + timedelta(milliseconds=20)) == []
+        settled = f.settle(T0 + timedelta(milliseconds=40))
+        assert [r.value for r in settled] == ['0']
+        # A próxima borda real (1) não é tratada como repetição
+        assert f.accept(reed(1, 500))
+
+    def test_chatter_back_to_accepted_state_is_not_settled(self):
+        f = ReadingFilter(debounce_ms=30)
+        assert f.accept(reed(1, 0))
+        assert not f.accept(reed(0, 2))
+        assert not f.accept(reed(1, 4))
+        assert f.settle(T0 + timedelta(milliseconds=100)) == []
+
+    def test_device_clock_keeps_edges_of_a_burst(self):
+        f = ReadingFilter(debounce_ms=30)
+        # Rajada do buffer serial: tudo chega no mesmo instante do host,
+        # mas as bordas foram capturadas com 200ms de intervalo
+        burst = [SensorReading('reed_01', 'reed_switch', 'state', str(v), timestamp=T0, device_ms=ms)
+                 for v, ms in [(1, 5000), (0, 5002), (0, 5200), (1, 5400)]]
+        assert [f.accept(r) for r in burst] == [True, False, True, True]
+        # Placa reiniciada: o relógio volta e é reancorado
+        assert f.accept(SensorReading('reed_01', 'reed_switch', 'state', '0',
+                                      timestamp=T0 + timedelta(seconds=1), device_ms=10))
+
+    def test_other_sensors_only_drop_exact_duplicates(self):
+        f = ReadingFilter()
+        light = SensorReading('lux_01', 'light', 'lux', '300', timestamp=T0)
+        assert f.accept(light)
+        assert not f.accept(SensorReading('lux_01', 'light', 'lux', '300', timestamp=T0))
+        assert f.accept(SensorReading('lux_01', 'light', 'lux', '300', timestamp=T0 + timedelta(seconds=1)))
+
+    def test_sensors_are_independent(self):
+        f = ReadingFilter(debounce_ms=30)
+        assert f.accept(reed(1, 0, 'reed_a'))
+        assert f.accept(reed(1, 1, 'reed_b'))
+
+
+class TestSensorIngestionService:
+
+    def test_flush_settles_debounced_edges(self, session_factory):
+        service = SensorIngestionService(session_factory, debounce_ms=30)
+        assert service.submit(reed(1, 0))
+        assert not service.submit(reed(0, 10))
+        assert service.flush() == 2
+        assert service.stats()['settled'] == 1
+
+    def test_flush_inserts_in_batches(self, session_factory):
+        service = SensorIngestionService(session_factory, batch_size=100)
+        for i in range(250):
+            service.submit(SensorReading(f'lux_{i % 5}', 'light', 'lux', str(i),
+                                         timestamp=T0 + timedelta(milliseconds=i)))
+        assert service.flush() == 250
+
+        stats = service.stats()
+        assert stats['inserted'] == 250
+        assert stats['batches'] == 3
+        assert stats['buffered'] == 0
+
+        session = session_factory()
+        assert SensorEventQueries(session).count_pending() == 250
+        session.close()
+
+    def test_rejected_rows_are_isolated_in_dead_letter(self, session_factory, monkeypatch):
+        from sqlalchemy.exc import IntegrityError
+
+        original = SensorEventQueries.insert_batch
+
+        def insert_batch(self, rows, rollup=True):
+            if any(r['value'] == 'bad' for r in rows):
+                raise IntegrityError('INSERT', {}, Exception('linha ruim'))
+            return original(self, rows, rollup)
+
+        monkeypatch.setattr(SensorEventQueries, 'insert_batch', insert_batch)
+        service = SensorIngestionService(session_factory, batch_size=8)
+        for i in range(10):
+            service.submit(SensorReading(f'lux_{i}', 'light', 'lux', 'bad' if i == 5 else str(i),
+                                         timestamp=T0))
+        assert service.flush() == 9
+        assert [r.sensor_id for r in service.dead_letter] == ['lux_5']
+        assert service.stats()['dead_lettered'] == 1 and service.pending == 0
+
+        # A ingestão segue normalmente depois
+        service.submit(SensorReading('lux_0', 'light', 'lux', '42', timestamp=T0))
+        assert service.flush() == 1
+
+    def test_transient_failures_retry_then_dead_letter(self, session_factory, monkeypatch):
+        from sqlalchemy.exc import OperationalError
+
+        calls = []
+
+        def insert_batch(self, rows, rollup=True):
+            calls.append(len(rows))
+            raise OperationalError('INSERT', {}, Exception('banco ocupado'))
+
+        monkeypatch.setattr(SensorEventQueries, 'insert_batch', insert_batch)
+        service = SensorIngestionService(session_factory, max_retries=2)
+        service.submit(SensorReading('lux_1', 'light', 'lux', '1', timestamp=T0))
+        assert service.flush() == 0
+        assert service.pending == 1  # primeira falha: volta ao buffer
+        assert service.flush() == 0
+        assert service.pending == 0 and len(service.dead_letter) == 1
+        assert calls == [1, 1]
+
+    def test_buffer_capacity_drops_and_counts(self, session_factory):
+        service = SensorIngestionService(session_factory, queue_size=3)
+        notified = []
+        service.add_listener(notified.append)
+        results = [service.submit(SensorReading('p', 'presence', 'state', str(i),
+                                                timestamp=T0 + timedelta(seconds=i)))
+                   for i in range(5)]
+        assert results == [True, True, True, False, False]
+        assert service.stats()['dropped'] == 2
+        # Leituras descartadas por capacidade não chegam aos listeners
+        assert [r.value for r in notified] == ['0', '1', '2']
+
+    def test_processed_flag_pipeline(self, session_factory):
+        service = SensorIngestionService(session_factory)
+        service.submit_many(reed(v, ms) for v, ms in [(1, 0), (0, 100), (1, 200)])
+        service.flush()
+
+        seen = []
+        assert service.process_pending(lambda events: seen.extend(e.value for e in events), limit=2) == 2
+        assert seen == ['1', '0']
+        assert service.process_pending(lambda events: seen.extend(e.value for e in events)) == 1
+        assert service.process_pending(lambda events: None) == 0
+
+        session = session_factory()
+        assert SensorEventQueries(session).count_pending() == 0
+        assert all(e.processed_at is not None for e in session.query(SensorEvent))
+        session.close()
+
+    def test_failed_handler_keeps_events_pending(self, session_factory):
+        service = SensorIngestionService(session_factory)
+        service.submit(reed(1, 0))
+        service.flush()
+
+        def boom(events):
+            raise RuntimeError("falha")
+
+        with pytest.raises(RuntimeError):
+            service.process_pending(boom)
+        session = session_factory()
+        assert SensorEventQueries(session).count_pending() == 1
+        session.close()
+
+    def test_background_thread_flushes_on_stop(self, session_factory):
+        service = SensorIngestionService(session_factory, batch_size=1000, flush_interval=10)
+        service.start()
+        service.submit(reed(1, 0))
+        service.stop()
+        assert service.stats()['inserted'] == 1
+
+
+class TestSources:
+
+    def test_parse_serial_csv_and_json(self):
+        csv = parse_serial_line(b"reed_07,reed_switch,state,1\r\n")
+        assert (csv.sensor_id, csv.sensor_type, csv.value, csv.unit) == ('reed_07', 'reed_switch', '1', None)
+
+        js = parse_serial_line('{"sensor_id": "lux_02", "sensor_type": "light", '
+                               '"reading_type": "lux", "value": 312, "unit": "lx"}')
+        assert (js.value, js.unit) == ('312', 'lx')
+
+        timed = parse_serial_line("reed_07,reed_switch,state,0,,183422")
+        assert (timed.unit, timed.device_ms) == (None, 183422)
+        iso = parse_serial_line('{"sensor_id": "r1", "sensor_type": "reed_switch", "value": 1, '
+                                '"ts": "2025-01-01T08:00:00.250Z"}')
+        assert iso.timestamp == T0 + timedelta(milliseconds=250) and iso.device_ms is None
+        assert iso.to_row()['context'] == {}
+        assert timed.to_row()['context'] == {'device_ms': 183422}
+        assert parse_serial_line("reed_07,reed_switch,state,0,,ontem") is None
+
+        assert parse_serial_line("# boot") is None
+        assert parse_serial_line("lixo") is None
+        assert parse_serial_line("{quebrado") is None
+
+    def test_parse_mqtt(self):
+        r = parse_mqtt_message('ferritine/sensors/presence/pir_3', b'1')
+        assert (r.sensor_id, r.sensor_type, r.reading_type, r.value) == ('pir_3', 'presence', 'state', '1')
+
+        r = parse_mqtt_message('ferritine/sensors/temperature/t1', '{"reading_type": "celsius", "value": 21.5}')
+        assert (r.reading_type, r.value) == ('celsius', '21.5')
+
+        r = parse_mqtt_message('ferritine/sensors/reed_switch/r1', '{"value": 1, "ts": 9000}')
+        assert (r.value, r.device_ms) == ('1', 9000)
+
+        assert parse_mqtt_message('outro/sensors/presence/pir_3', b'1') is None
+        assert parse_mqtt_message('ferritine/leds/l1', b'1') is None
+
+    def test_replay_keeps_real_edges_with_device_clock(self, session_factory):
+        service = SensorIngestionService(session_factory, debounce_ms=30)
+        capture = io.BytesIO(b"reed_01,reed_switch,state,1,,1000\n"
+                             b"reed_01,reed_switch,state,0,,1003\n"   # trepidação
+                             b"reed_01,reed_switch,state,1,,1005\n"
+                             b"reed_01,reed_switch,state,0,,1500\n"   # saída do trem
+                             b"reed_01,reed_switch,state,1,,2500\n"
+                             b"reed_01,reed_switch,state,0,,2510\n")  # borda final na janela
+        LineSource(service, capture.readline).pump()
+        service.stop()
+        session = session_factory()
+        values = [e.value for e in session.query(SensorEvent).order_by(SensorEvent.timestamp)]
+        session.close()
+        assert sorted(values) == ['0', '0', '1', '1']
+        assert service.stats()['settled'] == 1
+
+    def test_line_source_replay(self, session_factory):
+        service = SensorIngestionService(session_factory)
+        capture = io.BytesIO(b"reed_01,reed_switch,state,1\ninvalida\n\nlux_01,light,lux,250,lx\n")
+        source = LineSource(service, capture.readline)
+        assert source.pump() == 4
+        assert source.invalid_lines == 1
+        assert service.flush() == 2
+
+    def test_mqtt_source_handles_messages_without_broker(self, session_factory):
+        service = SensorIngestionService(session_factory)
+        source = MqttSource(service, topic_prefix='maquete')
+        assert source.handle_message('maquete/sensors/light/lux_9', b'{"value": 10}')
+        assert not source.handle_message('maquete/other', b'1')
+        assert service.pending == 1
@@ -0,0 +1,129 @@
+"""
+Testes da simulação particionada por região.
+"""
+import uuid
+
+import pytest
+
+from backend.database.models import Building, BuildingType, Tile
+from backend.simulation.models.agente import Agente
+from backend.simulation.models.cidade import Cidade
+from backend.simulation.sharding import Shard, ShardedSimulation, ShardRouter, region_map
+from backend.utils.config_loader import SimulationConfig
+from benchmarks.sharded_tick import run_sharded_benchmark
+
+
+def _agentes(n=60):
+    return [Agente(f"A{i}", f"Casa{i % 7}", f"Trabalho{i % 5}") for i in range(n)]
+
+
+def _expected(ticks):
+    cidade = Cidade(_agentes())
+    snapshots = []
+    for tick in range(ticks):
+        cidade.step(tick % 24)
+        snapshots.append(cidade.snapshot())
+    return snapshots
+
+
+class TestShardRouter:
+
+    def test_hash_fallback_is_stable(self):
+        router = ShardRouter(4)
+        assert router.shard_for("Casa1") == ShardRouter(4).shard_for("Casa1")
+        assert {router.shard_for(f"L{i}") for i in range(100)} == {0, 1, 2, 3}
+
+    def test_from_regions_keeps_regions_together_and_balances(self):
+        region_of = {"Casa1": "norte", "Casa2": "norte", "Loja": "sul", "Escola": "leste", "Fábrica": "oeste"}
+        router = ShardRouter.from_regions(region_of, 2, loads={"norte": 10, "sul": 6, "leste": 3, "oeste": 2})
+        assert router.shard_for("Casa1") == router.shard_for("Casa2")
+        loads = [0, 0]
+        for region, load in {"norte": 10, "sul": 6, "leste": 3, "oeste": 2}.items():
+            location = next(loc for loc, r in region_of.items() if r == region)
+            loads[router.shard_for(location)] += load
+        assert sorted(loads) == [10, 11]
+
+    def test_rejects_zero_shards(self):
+        with pytest.raises(ValueError):
+            ShardRouter(0)
+
+
+class TestShardedSimulation:
+
+    @pytest.mark.parametrize("shards", [1, 2, 3])
+    def test_inline_matches_single_process(self, shards):
+        expected = _expected(50)
+        with ShardedSimulation(_agentes(), ShardRouter(shards), processes=False) as simulation:
+            for tick in range(50):
+                result = simulation.step(tick % 24)
+                assert simulation.snapshot() == expected[tick]
+                assert sum(result['shard_agents']) == 60
+        if shards > 1:
+            assert simulation.transfers > 0
+
+    def test_processes_match_single_process(self):
+        expected = _expected(30)
+        with ShardedSimulation(_agentes(), ShardRouter(2)) as simulation:
+            for tick in range(30):
+                simulation.step(tick % 24)
+            assert simulation.snapshot() == expected[-1]
+
+    def test_agents_follow_their_location(self):
+        router = ShardRouter(2, {"CasaA": 0, "Fábrica": 1})
+        with ShardedSimulation([Agente("Ana", "CasaA", "Fábrica")], router, processes=False) as simulation:
+            assert simulation.shard_agents == [1, 0]
+            result = simulation.step(8)
+            assert result == {**result, 'moved': 1, 'transfers': 1, 'shard_agents': [0, 1]}
+            simulation.step(17)
+            assert simulation.shard_agents == [1, 0]
+            assert simulation.snapshot() == {"Ana": "CasaA"}
+
+    def test_returning_agents_travel_as_codes(self):
+        router = ShardRouter(2, {"CasaA": 0, "Fábrica": 1})
+        home = Shard(0, router)
+        home.add([(0, "Ana", "CasaA", "Fábrica", "CasaA")])
+        work = Shard(1, router)
+
+        first = home.step(8)['outgoing'][1]
+        assert len(first['records']) == 1 and not first['codes']
+        back = work.step(17, [first])['outgoing'][0]
+        assert not back['records'] and list(back['codes']) == [~0]
+        again = home.step(8, [back])['outgoing'][1]
+        assert not again['records'] and list(again['codes']) == [0]
+        work.step(9, [again])
+        assert work.agents[0].local == "Fábrica" and 0 in home.parked
+
+    def test_publishes_consolidated_state(self):
+        from backend.simulation.checkpoint import capture_memory
+        from backend.simulation.world_snapshot import WorldSnapshotPublisher, WorldSnapshotReader
+
+        with ShardedSimulation(_agentes(), ShardRouter(2), processes=False) as simulation, \
+                WorldSnapshotPublisher(f"ferritine_test_{uuid.uuid4().hex[:12]}", 1 << 16) as publisher, \
+                WorldSnapshotReader(publisher.name) as reader:
+            simulation.step(8)
+            assert publisher.publish(cidade=simulation, hora=8)
+            locais, clock = reader.read(lambda s: (s.values('cidade', 'local'), s.clock))
+            assert clock == {'hora': 8, 'tick': 1}
+            assert dict(zip(simulation.names, locais)) == simulation.snapshot()
+            assert capture_memory(simulation)['cidade']['casa'][1] == [a.casa for a in _agentes()]
+
+    def test_from_config_uses_database_regions(self, db_session):
+        db_session.add_all([
+            Tile(id=uuid.uuid4(), x=1, y=1, region_id=uuid.UUID(int=1)),
+            Building(name="CasaA", building_type=BuildingType.RESIDENTIAL_HOUSE_SMALL, x=1, y=1, neighborhood="Centro"),
+            Building(name="Fábrica", building_type=BuildingType.RESIDENTIAL_HOUSE_SMALL, x=9, y=9, neighborhood="Porto"),
+            Building(name="Loja", building_type=BuildingType.RESIDENTIAL_HOUSE_SMALL, x=5, y=5, neighborhood=""),
+        ])
+        db_session.flush()
+        assert region_map(db_session) == {"CasaA": str(uuid.UUID(int=1)), "Fábrica": "Porto"}
+
+        simulation = ShardedSimulation.from_config(
+            [Agente("Ana", "CasaA", "Fábrica")], SimulationConfig(shards=2, random_seed=5), db_session)
+        assert simulation.seed == 5
+        assert simulation.router.shard_for("CasaA") != simulation.router.shard_for("Fábrica")
+
+    def test_benchmark_report(self):
+        report = run_sharded_benchmark(agents=300, shards=3, ticks=26, local_ratio=0.5, processes=False)
+        assert report['consistent'] is True
+        assert sum(report['shard_agents']) == 300
+        assert report['transfers'] > 0
@@ -0,0 +1,33 @@
+"""
+Testes do benchmark do tick da simulação.
+"""
+import pstats
+
+from benchmarks.simulation_tick import PHASES, build_world, run_tick_benchmark
+
+
+class TestTickBenchmark:
+
+    def test_report_has_all_phases(self):
+        report = run_tick_benchmark(agents=50, vehicles=8, ticks=3)
+        assert set(report['phases']) == set(PHASES)
+        assert report['config']['agents'] == 50
+        assert report['throughput']['ticks_per_s'] > 0
+        assert report['memory'] is None
+
+    def test_memory_and_cprofile(self, tmp_path):
+        output = tmp_path / 'tick.prof'
+        report = run_tick_benchmark(agents=20, vehicles=4, ticks=2, track_memory=True,
+                                    profile='cprofile', profile_output=str(output))
+        assert report['memory']['peak_mb'] > 0
+        assert pstats.Stats(str(output)).total_calls > 0
+
+    def test_fleet_keeps_moving(self):
+        cidade, fleet, engine, agent_ids = build_world(agents=10, vehicles=4)
+        from benchmarks.simulation_tick import _move_fleet
+        for _ in range(200):
+            _move_fleet(fleet, 0.25)
+        assert all(v.total_km_traveled > 0 for v in fleet)
+        assert all(v.is_operational() for v in fleet)
+        assert len(cidade.agentes) == len(agent_ids) == 10
+        engine.dispose()
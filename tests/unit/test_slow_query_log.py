@@ -0,0 +1,156 @@
+"""
+Testes do registro de consultas lentas.
+"""
+import json
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from backend.database.models import Base
+from backend.database.queries import AgentQueries
+from backend.database.slow_query import SlowQueryLog
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine('sqlite:///:memory:')
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+class TestSlowQueryLog:
+
+    def test_fast_queries_are_ignored(self, engine):
+        log = SlowQueryLog(threshold_ms=10_000)
+        log.install(engine)
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        assert log.recent() == []
+
+    def test_records_caller_parameters_and_plan(self, engine, tmp_path):
+        path = tmp_path / 'slow.log'
+        log = SlowQueryLog(threshold_ms=1e-6, log_path=str(path))
+        log.install(engine)
+
+        session = sessionmaker(bind=engine)()
+        AgentQueries(session).get_by_name('Ana')
+        session.close()
+
+        records = [r for r in log.recent() if 'FROM agents' in r['statement']]
+        assert records
+        record = records[0]
+        assert record['caller'] == 'AgentQueries.get_by_name'
+        assert 'Ana' in record['parameters']
+        assert record['dialect'] == 'sqlite'
+        assert any('agents' in line for line in record['plan'])
+
+        lines = [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+        assert any(line['caller'] == 'AgentQueries.get_by_name' for line in lines)
+
+    def test_caller_fallback_and_grouping(self, engine):
+        log = SlowQueryLog(threshold_ms=1e-6, explain=False)
+        log.install(engine)
+        with engine.connect() as conn:
+            for _ in range(3):
+                conn.execute(text("SELECT count(*) FROM agents"))
+
+        groups = log.summary()
+        group = next(g for g in groups if g['statement'] == "SELECT count(*) FROM agents")
+        assert group['count'] == 3
+        assert group['plan'] == []
+        assert group['callers'][0].startswith(__name__ + ':test_caller_fallback_and_grouping')
+
+    def test_uninstall_and_clear(self, engine):
+        log = SlowQueryLog(threshold_ms=1e-6)
+        log.install(engine)
+        log.install(engine)
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        assert len(log.recent()) == 1
+
+        log.uninstall(engine)
+        log.clear()
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        assert log.recent() == []
+
+    def test_failed_explain_is_isolated_in_savepoint(self):
+        executed = []
+
+        class Cursor:
+            def execute(self, sql, params=()):
+                executed.append(sql)
+                if sql.startswith('EXPLAIN'):
+                    raise RuntimeError('syntax error')
+
+            def fetchall(self):
+                return []
+
+            def close(self):
+                pass
+
+        class Conn:
+            class dialect:
+                name = 'postgresql'
+
+            class connection:
+                class dbapi_connection:
+                    autocommit = False
+
+                    @staticmethod
+                    def cursor():
+                        return Cursor()
+
+        plan = SlowQueryLog(threshold_ms=1e-6)._plan(Conn, 'SELECT * FROM agents', (), False)
+        assert plan[0].startswith('EXPLAIN falhou')
+        assert executed == [
+            'SAVEPOINT ferritine_explain',
+            'EXPLAIN SELECT * FROM agents',
+            'ROLLBACK TO SAVEPOINT ferritine_explain',
+            'RELEASE SAVEPOINT ferritine_explain',
+        ]
+
+
+def test_internal_endpoint_lists_slow_queries(tmp_path):
+    from fastapi.testclient import TestClient
+    from backend.api.main import app
+    from backend.database.slow_query import SlowQuery, slow_query_log
+
+    previous_path = slow_query_log.log_path
+    slow_query_log.set_log_path(str(tmp_path / 'slow.log'))
+    slow_query_log.clear()
+    slow_query_log.record(SlowQuery(
+        timestamp='2025-01-01T00:00:00', duration_ms=900.0, statement='SELECT * FROM agents',
+        parameters='()', caller='AgentQueries.get_all', dialect='sqlite', plan=['SCAN agents'],
+    ))
+    try:
+        client = TestClient(app)
+        body = client.get('/internal/slow-queries').json()
+        assert body['queries'][0]['caller'] == 'AgentQueries.get_all'
+
+        grouped = client.get('/internal/slow-queries', params={'grouped': True}).json()
+        assert grouped['queries'][0]['plan'] == ['SCAN agents']
+    finally:
+        slow_query_log.clear()
+        slow_query_log.set_log_path(str(previous_path) if previous_path else None)
+
+
+def test_log_install_failure_keeps_primary_engine(tmp_path, monkeypatch):
+    from backend.database.connection import DatabaseConfig, DatabaseManager
+
+    class Config(DatabaseConfig):
+        url = f"sqlite:///{tmp_path / 'primary.db'}"  # no lugar do PostgreSQL
+
+    manager = DatabaseManager(Config(), use_sqlite=False)
+
+    def broken():
+        raise PermissionError("data/logs não gravável")
+
+    monkeypatch.setattr(manager, '_install_slow_query_log', broken)
+    engine = manager.create_engine()
+    # Sem fallback: o engine continua sendo o principal
+    assert manager.use_sqlite is False
+    assert str(engine.url).endswith('primary.db')
+    engine.dispose()
@@ -0,0 +1,130 @@
+"""
+Testes do gerador de cidades sintéticas.
+"""
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from backend.database.models import (
+    Agent, Base, Route, Schedule, Station, Ticket, Vehicle
+)
+from backend.database.queries import DatabaseQueries
+from backend.database.bulk import bulk_insert
+from backend.database.synthetic import CityGenerator, CityScale
+
+
+SCALE = CityScale(agents=200, stations=12, routes=4, operators=2,
+                  stops_per_route=5, tickets=300)
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine('sqlite:///:memory:')
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+def _generate(seed=7, chunk_size=64):
+    engine = create_engine('sqlite:///:memory:')
+    Base.metadata.create_all(engine)
+    report = CityGenerator(SCALE, seed=seed, chunk_size=chunk_size).generate(engine)
+    return engine, report
+
+
+class TestCityGenerator:
+
+    def test_row_counts(self):
+        engine, report = _generate()
+        assert report.rows['agents'] == 200
+        assert report.rows['stations'] == 12
+        assert report.rows['routes'] == 4
+        assert report.rows['route_stations'] == 4 * 5
+        assert report.rows['vehicles'] == 4 * 3
+        assert report.rows['schedules'] == 4 * 3 * 4
+        assert report.rows['tickets'] == 300
+        with engine.connect() as conn:
+            assert conn.execute(select(func.count()).select_from(Agent.__table__)).scalar() == 200
+
+    def test_deterministic_for_seed(self):
+        first, _ = _generate(seed=7, chunk_size=64)
+        second, _ = _generate(seed=7, chunk_size=1000)
+        other, _ = _generate(seed=8)
+
+        def agents(engine):
+            with engine.connect() as conn:
+                return conn.execute(
+                    select(Agent.__table__.c.id, Agent.__table__.c.name).order_by('id')
+                ).all()
+
+        assert agents(first) == agents(second)
+        assert agents(first) != agents(other)
+
+    def test_orm_can_load_generated_world(self):
+        engine, _ = _generate()
+        with Session(engine) as session:
+            db = DatabaseQueries(session)
+            route = db.routes.get_all(with_operator=True)[0]
+            assert route.operator is not None
+            stops = db.routes.get_route_stations(route.id)
+            assert [s.sequence_order for s in stops] == [1, 2, 3, 4, 5]
+            assert session.query(Station).first().building_id is not None
+            vehicle = session.query(Vehicle).first()
+            assert vehicle.current_passengers <= vehicle.passenger_capacity
+            assert session.query(Ticket).filter(Ticket.route_id.isnot(None)).count() == 300
+
+    def test_derived_scale(self):
+        scale = CityScale(agents=5000).resolved()
+        assert scale.buildings == 1250
+        assert scale.stations == 100
+        assert scale.routes == 20
+        assert scale.operators == 2
+        assert scale.tickets == 10000
+
+
+class TestBulkInsert:
+
+    def test_empty_rows(self, engine):
+        with engine.begin() as conn:
+            assert bulk_insert(conn, Schedule.__table__, []) == 0
+
+    def test_applies_column_defaults(self, engine):
+        import uuid
+        route_id = uuid.uuid4()
+        with engine.begin() as conn:
+            bulk_insert(conn, Route.__table__, [
+                {'id': route_id, 'name': 'Linha', 'route_type': 'METRO_STATION'}
+            ])
+        with Session(engine) as session:
+            route = session.get(Route, route_id)
+            assert route.created_at is not None
+            assert route.is_active is True
+
+    def test_copy_quotes_schema_qualified_table(self):
+        from sqlalchemy import Column, Integer, MetaData, String, Table
+        from sqlalchemy.dialects import postgresql
+
+        executed = []
+
+        class Cursor:
+            def copy_expert(self, sql, buffer):
+                executed.append((sql, buffer.getvalue()))
+
+            def close(self):
+                pass
+
+        class Conn:
+            dialect = postgresql.dialect()
+
+            class connection:
+                @staticmethod
+                def cursor():
+                    return Cursor()
+
+        table = Table('Order', MetaData(), Column('id', Integer), Column('user', String),
+                      schema='archive')
+        assert bulk_insert(Conn, table, [{'id': 1, 'user': None}]) == 1
+        assert executed == [(
+            'COPY archive."Order" (id, "user") FROM STDIN WITH (FORMAT csv, NULL \'\\N\')',
+            '1,\\N\r\n',
+        )]
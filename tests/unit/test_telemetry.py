@@ -0,0 +1,153 @@
+"""
+Testes da telemetria por fase do tick.
+"""
+import json
+
+import pytest
+
+from backend.simulation.driver_fatigue import DriverFatigueSystem
+from backend.simulation.models.agente import Agente
+from backend.simulation.models.cidade import Cidade
+from backend.utils.telemetry import TickTelemetry, telemetry
+
+
+@pytest.fixture
+def registry():
+    """Liga o registro global e restaura o estado ao final."""
+    telemetry.reset()
+    telemetry.configure(enabled=True)
+    yield telemetry
+    telemetry.configure(enabled=False)
+    telemetry.reset()
+
+
+class TestTickTelemetry:
+
+    def test_disabled_is_noop(self):
+        t = TickTelemetry()
+        with t.tick(1) as record:
+            with t.phase('agent_update', 10):
+                pass
+            t.count('events')
+        assert record is None
+        assert t.recent() == []
+        assert t.totals()['phases'] == {}
+        assert t.phase('a') is t.phase('b')
+
+    def test_records_phases_and_counters_per_tick(self):
+        t = TickTelemetry(enabled=True)
+        for tick in range(3):
+            with t.tick(tick):
+                with t.phase('agent_update', 5):
+                    pass
+                with t.phase('agent_update', 5):
+                    pass
+                t.count('vehicle.accidents', 2)
+
+        ticks = t.recent()
+        assert [r['tick'] for r in ticks] == [0, 1, 2]
+        assert ticks[0]['phases']['agent_update']['entities'] == 10
+        assert ticks[0]['phases']['agent_update']['calls'] == 2
+        assert ticks[0]['counters'] == {'vehicle.accidents': 2}
+        assert t.totals()['counters']['vehicle.accidents'] == 6
+
+        summary = t.summary()
+        assert summary['ticks'] == 3
+        assert summary['phases']['agent_update']['samples'] == 3
+        assert summary['phases']['agent_update']['entities'] == 30
+
+    def test_ring_buffer_keeps_latest(self):
+        t = TickTelemetry(capacity=4, enabled=True)
+        for tick in range(10):
+            with t.tick(tick):
+                pass
+        assert [r['tick'] for r in t.recent()] == [6, 7, 8, 9]
+        assert [r['tick'] for r in t.recent(2)] == [8, 9]
+
+        t.configure(capacity=2)
+        assert [r['tick'] for r in t.recent()] == [8, 9]
+
+    def test_phase_outside_tick_only_in_totals(self):
+        t = TickTelemetry(enabled=True)
+        with t.phase('persistence', 3):
+            pass
+        assert t.recent() == []
+        assert t.totals()['phases']['persistence']['entities'] == 3
+
+    def test_dump_writes_json_lines(self, tmp_path):
+        path = tmp_path / 'ticks.jsonl'
+        t = TickTelemetry(capacity=3, enabled=True, dump_path=str(path), dump_every=2)
+        for tick in range(5):
+            with t.tick(tick):
+                t.count('x')
+        # Último dump automático ocorreu no 4º tick
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [r['tick'] for r in lines] == [1, 2, 3]
+
+        t.dump()
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [r['tick'] for r in lines] == [2, 3, 4]
+
+
+class TestSimulationReporting:
+
+    def test_city_and_fatigue_report_phases(self, registry):
+        cidade = Cidade([Agente("Ana", "CasaA", "Fábrica"), Agente("Beto", "CasaB", "Loja")])
+        fatigue = DriverFatigueSystem(db=None)
+
+        with registry.tick(8):
+            cidade.step(8)
+            fatigue.update_many({1: 10.0, 2: 20.0})
+
+        record = registry.recent()[-1]
+        assert record['phases']['agent_update']['entities'] == 2
+        assert record['phases']['driver_fatigue']['entities'] == 2
+        assert record['counters']['fatigue.updates'] == 2
+        # Só o motorista 2 cruza o limiar de 80%
+        assert record['counters']['fatigue.too_tired'] == 1
+        assert fatigue.is_too_tired(2) and not fatigue.is_too_tired(1)
+
+    def test_benchmark_includes_vehicle_counters(self):
+        from benchmarks.simulation_tick import run_tick_benchmark
+
+        report = run_tick_benchmark(agents=10, vehicles=4, ticks=2, with_telemetry=True)
+        counters = report['telemetry']['counters']
+        assert counters['vehicle.moves'] == 8
+        assert counters['vehicle.km'] > 0
+        phases = report['telemetry']['summary']['phases']
+        assert {'agent_update', 'vehicle_movement', 'persistence', 'snapshot'} <= set(phases)
+        assert not telemetry.enabled
+
+    def test_api_exposes_recent_ticks(self, registry):
+        from fastapi.testclient import TestClient
+        from backend.api.main import app
+
+        for tick in range(3):
+            with registry.tick(tick):
+                with registry.phase('agent_update', 1):
+                    pass
+
+        response = TestClient(app).get('/api/telemetry/ticks', params={'limit': 2})
+        assert response.status_code == 200
+        body = response.json()
+        assert [r['tick'] for r in body['ticks']] == [1, 2]
+        assert body['summary']['phases']['agent_update']['samples'] == 3
+
+    def test_api_reads_dump_of_simulation_process(self, registry, tmp_path, monkeypatch):
+        from fastapi.testclient import TestClient
+        from backend.api.main import app
+        from backend.utils.config_loader import get_config
+
+        # "Simulação" em outro registro, gravando o buffer em arquivo
+        simulation = TickTelemetry(capacity=10, enabled=True,
+                                   dump_path=str(tmp_path / 'ticks.jsonl'), dump_every=2)
+        for tick in range(4):
+            with simulation.tick(tick):
+                with simulation.phase('agent_update', 5):
+                    pass
+        monkeypatch.setattr(get_config().simulation, 'telemetry_dump_path', simulation.dump_path)
+
+        body = TestClient(app).get('/api/telemetry/ticks', params={'limit': 3}).json()
+        assert body['source'] == 'dump'
+        assert [r['tick'] for r in body['ticks']] == [1, 2, 3]
+        assert body['summary']['phases']['agent_update']['samples'] == 4
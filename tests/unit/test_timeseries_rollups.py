@@ -0,0 +1,117 @@
+"""
+Testes dos agregados de séries temporais (hora/dia/semana).
+
+Os agregados são mantidos pelas escritas de EconomicStat e SensorEvent e
+devem coincidir com a reconstrução completa a partir das tabelas base.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.database.models import TimeSeriesRollup
+from backend.database.queries import DatabaseQueries, TimeSeriesRollupQueries
+from backend.iot.ingestion import SensorReading
+
+
+@pytest.fixture
+def db(db_session):
+    return DatabaseQueries(db_session)
+
+
+def snapshot(session):
+    return sorted(
+        (r.series, r.resolution, r.bucket_start, r.count, r.sum, r.min, r.max)
+        for r in session.query(TimeSeriesRollup)
+    )
+
+
+class TestEconomicRollups:
+
+    @pytest.fixture
+    def stats(self, db, db_session):
+        # 3 semanas de simulação, uma linha por hora
+        for hour in range(24 * 21):
+            db.economic_stats.create(simulation_time=hour, total_transactions=hour % 24,
+                                     average_agent_money=100 + hour)
+        db_session.commit()
+
+    def test_rollups_track_min_max_avg(self, db, stats):
+        day = db.economic_stats.get_series('total_transactions', 24, 47, resolution='day')
+        assert day['points'] == [{'start': 24, 'count': 24, 'min': 0, 'max': 23, 'avg': 11.5}]
+
+        week = db.economic_stats.get_series('average_agent_money', 0, 24 * 21, resolution='week')
+        assert [p['start'] for p in week['points']] == [0, 168, 336]
+        assert week['points'][1]['min'] == 268 and week['points'][1]['max'] == 435
+
+    def test_resolution_follows_point_budget(self, db, stats):
+        assert db.economic_stats.get_series('total_transactions', 0, 47, max_points=48)['resolution'] == 'hour'
+        assert db.economic_stats.get_series('total_transactions', 0, 48, max_points=48)['resolution'] == 'day'
+        series = db.economic_stats.get_series('total_transactions', 0, 24 * 21 - 1, max_points=5)
+        assert series['resolution'] == 'week'
+        assert len(series['points']) == 3
+
+    def test_incremental_matches_rebuild(self, db, db_session, stats):
+        incremental = snapshot(db_session)
+        assert db.timeseries_rollups.rebuild() == len(incremental)
+        assert snapshot(db_session) == incremental
+
+    def test_unknown_metric_and_resolution(self, db):
+        with pytest.raises(ValueError):
+            db.economic_stats.get_series('inexistente', 0, 10)
+        with pytest.raises(ValueError):
+            db.economic_stats.get_series('total_transactions', 0, 10, resolution='minute')
+
+
+class TestSensorRollups:
+
+    def test_batches_update_rollups(self, db, db_session):
+        start = datetime(2025, 3, 10, 8, 0)  # segunda-feira
+        rows = [SensorReading('lux_01', 'light', 'lux', str(v), timestamp=start + timedelta(minutes=20 * i)).to_row()
+                for i, v in enumerate([100, 300, 200, 50])]
+        rows.append(SensorReading('door', 'reed_switch', 'state', 'aberta', timestamp=start).to_row())
+        db.sensor_events.insert_batch(rows[:2])
+        db.sensor_events.insert_batch(rows[2:])
+        db_session.commit()
+
+        hourly = db.sensor_events.get_series('lux_01', 'lux', start, start + timedelta(hours=2), resolution='hour')
+        assert [(p['start'], p['count'], p['min'], p['max'], p['avg']) for p in hourly['points']] == [
+            (start, 3, 100, 300, 200),
+            (start + timedelta(hours=1), 1, 50, 50, 50),
+        ]
+
+        weekly = db.sensor_events.get_series('lux_01', 'lux', start, start, resolution='week')
+        assert weekly['points'][0]['start'] == datetime(2025, 3, 10)
+        assert weekly['points'][0]['count'] == 4
+
+        # Valores não numéricos não geram série
+        assert db.sensor_events.get_series('door', 'state', start, start)['points'] == []
+
+        incremental = snapshot(db_session)
+        db.timeseries_rollups.rebuild(sources=['sensor'])
+        assert snapshot(db_session) == incremental
+
+    def test_bucket_alignment(self):
+        q = TimeSeriesRollupQueries
+        h = q.hours_since_epoch(datetime(2025, 3, 12, 15, 45))  # quarta-feira
+        assert q.datetime_at(q.bucket(h, 'day')) == datetime(2025, 3, 12)
+        assert q.datetime_at(q.bucket(h, 'week')) == datetime(2025, 3, 10)
+
+    def test_concurrent_insert_becomes_update(self, db, db_session, monkeypatch):
+        from sqlalchemy.sql import Select
+
+        db.timeseries_rollups.record('sensor:lux_01:lux', 100, 10.0)
+        db_session.flush()
+
+        # Outra transação criou os intervalos depois do SELECT desta
+        execute = db_session.execute
+        monkeypatch.setattr(db_session, 'execute', lambda stmt, *a, **kw: (
+            iter(()) if isinstance(stmt, Select) else execute(stmt, *a, **kw)))
+        assert db.timeseries_rollups.record_many([('sensor:lux_01:lux', 100, 30.0),
+                                                  ('sensor:lux_01:lux', 101, 5.0)]) == 4
+        monkeypatch.undo()
+
+        hourly = {(r.bucket_start, r.count, r.min, r.max) for r in db_session.query(TimeSeriesRollup)
+                  .filter_by(resolution='hour').populate_existing()}
+        assert hourly == {(100, 2, 10.0, 30.0), (101, 1, 5.0, 5.0)}
+        week = db_session.query(TimeSeriesRollup).filter_by(resolution='week').populate_existing().one()
+        assert (week.count, week.sum) == (3, 45.0)
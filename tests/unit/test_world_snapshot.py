@@ -0,0 +1,233 @@
+"""
+Testes do estado do mundo em memória compartilhada (simulação -> API).
+"""
+import multiprocessing
+import os
+import struct
+import threading
+import uuid
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from backend.database import connection
+from backend.database.connection import DatabaseManager
+from backend.database.models import Base, Station
+from backend.database.synthetic import CityGenerator, CityScale
+from backend.simulation.models.agente import Agente
+from backend.simulation.models.cidade import Cidade
+from backend.simulation.world_snapshot import (
+    SnapshotBusyError, WorldSnapshotPublisher, WorldSnapshotReader, attach_from_config,
+)
+from backend.utils.config_loader import SimulationConfig, get_config
+
+
+def _name() -> str:
+    return f"ferritine_test_{uuid.uuid4().hex[:12]}"
+
+
+def _child_read(name, queue):
+    with WorldSnapshotReader(name) as reader:
+        queue.put((reader.version, reader.read(lambda s: (s.metadata['metrics'], s.clock))))
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'world.db'}")
+    Base.metadata.create_all(engine)
+    CityGenerator(CityScale(agents=30, tickets=0), seed=1).generate(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def client(engine, monkeypatch):
+    from fastapi.testclient import TestClient
+    from backend.api.main import app
+
+    manager = DatabaseManager(use_sqlite=True)
+    manager.engine = engine
+    monkeypatch.setattr(connection, 'db_manager', manager)
+    monkeypatch.setattr(get_config().simulation, 'world_snapshot_name', _name())
+    return TestClient(app)
+
+
+class TestWorldSnapshot:
+
+    def test_publish_and_read(self, engine):
+        with Session(engine) as session, WorldSnapshotPublisher(_name(), 1 << 20) as publisher:
+            assert publisher.publish(session, hora=7)
+            with WorldSnapshotReader(publisher.name) as reader:
+                assert reader.live and reader.version == 1
+                rows, clock, metrics = reader.read(lambda s: (s.rows('agents'), s.clock, s.metadata['metrics']))
+                assert rows == 30 and clock == {'hora': 7}
+                assert metrics['total_stations'] == session.query(Station).count()
+
+                publisher.publish(session, hora=8)
+                assert reader.version == 2
+                assert reader.read(lambda s: s.clock) == {'hora': 8}
+
+    def test_memory_only_and_other_process(self):
+        cidade = Cidade([Agente("Ana", "CasaA", "Fábrica")])
+        cidade.step(8)
+        with WorldSnapshotPublisher(_name(), 1 << 16) as publisher:
+            publisher.publish(cidade=cidade, hora=8)
+            queue = multiprocessing.Queue()
+            child = multiprocessing.Process(target=_child_read, args=(publisher.name, queue))
+            child.start()
+            version, (metrics, clock) = queue.get(timeout=30)
+            child.join(30)
+            assert version == 1 and clock == {'hora': 8, 'tick': 1}
+            assert metrics['total_vehicles'] == 0
+            # O leitor que terminou não pode ter removido o segmento
+            with WorldSnapshotReader(publisher.name) as reader:
+                assert reader.read(lambda s: s.values('cidade', 'local')) == ["Fábrica"]
+
+    def test_rewritten_buffer_is_read_again(self):
+        cidade = Cidade([Agente("Ana", "CasaA", "Fábrica")])
+        with WorldSnapshotPublisher(_name(), 1 << 16) as publisher, \
+                WorldSnapshotReader(publisher.name) as reader:
+            publisher.publish(cidade=cidade, hora=1)
+            calls = []
+
+            def slow(snapshot):
+                # Dois ticks durante a leitura: o buffer lido é reescrito
+                if not calls:
+                    publisher.publish(cidade=cidade, hora=2)
+                    publisher.publish(cidade=cidade, hora=3)
+                calls.append(snapshot.clock['hora'])
+                return snapshot.clock['hora']
+
+            assert reader.read(slow) == 3
+            assert calls == [1, 3]
+
+            def always_rewritten(snapshot):
+                publisher.publish(cidade=cidade, hora=4)
+                publisher.publish(cidade=cidade, hora=5)
+
+            with pytest.raises(SnapshotBusyError):
+                reader.read(always_rewritten, retries=3)
+
+    def test_oversized_state_keeps_previous_version(self):
+        with WorldSnapshotPublisher(_name(), 4096) as publisher, \
+                WorldSnapshotReader(publisher.name) as reader:
+            assert publisher.publish(cidade=Cidade([Agente("Ana", "CasaA", "Fábrica")]), hora=1)
+            big = Cidade([Agente(f"Agente {i}", f"Casa {i}", f"Trabalho {i}") for i in range(500)])
+            assert not publisher.publish(cidade=big, hora=2)
+            assert publisher.dropped == 1
+            assert reader.read(lambda s: s.rows('cidade')) == 1
+
+    def test_closed_or_missing_simulation(self):
+        assert attach_from_config(SimulationConfig(world_snapshot_name="")) is None
+        assert attach_from_config(SimulationConfig(world_snapshot_name=_name())) is None
+
+        publisher = WorldSnapshotPublisher(_name(), 4096)
+        with WorldSnapshotReader(publisher.name) as reader:
+            assert not reader.live  # nada publicado ainda
+            publisher.publish(hora=0)
+            assert reader.live
+            publisher.close()
+            assert not reader.live
+
+    def test_session_factory_publishes_world_tables(self, engine, tmp_path):
+        from sqlalchemy.orm import sessionmaker
+
+        with WorldSnapshotPublisher(_name(), 1 << 20, session_factory=sessionmaker(bind=engine)) as publisher, \
+                WorldSnapshotReader(publisher.name) as reader:
+            publisher.publish(cidade=Cidade([Agente("Ana", "CasaA", "Fábrica")]), hora=6)
+            assert reader.read(lambda s: (s.metadata['world'], s.rows('agents'), s.rows('cidade'))) == (True, 30, 1)
+
+    def test_database_failure_backs_off_and_recovers(self, engine, tmp_path, monkeypatch):
+        import time
+        from types import SimpleNamespace
+        from sqlalchemy.orm import sessionmaker
+        from backend.simulation import world_snapshot
+
+        now = [1000.0]
+        monkeypatch.setattr(world_snapshot, 'time', SimpleNamespace(monotonic=lambda: now[0], time=time.time))
+        empty = create_engine(f"sqlite:///{tmp_path / 'empty.db'}")
+        bind = [empty]
+        calls = []
+
+        def session_factory():
+            calls.append(now[0])
+            return sessionmaker(bind=bind[0])()
+
+        # Banco sem tabelas: publica só a memória e espera para tentar de novo
+        with WorldSnapshotPublisher(_name(), 1 << 20, session_factory=session_factory,
+                                    db_retry_interval=5) as publisher, \
+                WorldSnapshotReader(publisher.name) as reader:
+            assert publisher.publish(hora=1)
+            assert reader.read(lambda s: s.metadata['world']) is False
+            assert publisher.publish(hora=2) and len(calls) == 1  # dentro da espera
+            now[0] += 5
+            assert publisher.publish(hora=3) and len(calls) == 2
+            assert publisher.db_retry_at == now[0] + 10  # espera dobra
+
+            bind[0] = engine  # banco de volta
+            now[0] += 10
+            assert publisher.publish(hora=4)
+            assert reader.read(lambda s: s.metadata['world']) is True
+            assert publisher.db_failures == 0 and publisher.session_factory is session_factory
+        empty.dispose()
+
+    def test_existing_segment_is_replaced_only_if_owner_is_dead(self):
+        child = multiprocessing.Process(target=int)
+        child.start()
+        child.join(30)
+
+        publisher = WorldSnapshotPublisher(_name(), 4096)
+        try:
+            struct.pack_into('<I', publisher._shm.buf, 20, os.getppid())  # dono vivo
+            with pytest.raises(FileExistsError):
+                WorldSnapshotPublisher(publisher.name, 4096)
+
+            struct.pack_into('<I', publisher._shm.buf, 20, child.pid)  # dono encerrado
+            with WorldSnapshotPublisher(publisher.name, 4096) as replacement:
+                replacement.publish(hora=3)
+                with WorldSnapshotReader(publisher.name) as reader:
+                    assert reader.read(lambda s: s.clock) == {'hora': 3}
+        finally:
+            publisher._shm.close()
+            publisher._shm = None
+
+    def test_api_readers_are_per_thread(self, client):
+        from backend.api import main as api
+
+        with WorldSnapshotPublisher(get_config().simulation.world_snapshot_name, 4096) as publisher:
+            publisher.publish(hora=1)
+            reader = api._get_world_reader()
+            assert reader is not None and reader is api._get_world_reader()
+            other = []
+            thread = threading.Thread(target=lambda: other.append(api._get_world_reader()))
+            thread.start()
+            thread.join(30)
+            assert other[0] is not None and other[0] is not reader
+            other[0].close()
+            # O leitor deste thread continua utilizável
+            assert reader.read(lambda s: s.clock) == {'hora': 1}
+
+    def test_api_reads_shared_memory_and_falls_back_to_database(self, client, engine):
+        from backend.api.instrumentation import api_metrics
+
+        from_db = client.get('/api/world/state').json()
+        metrics_db = client.get('/api/metrics').json()
+        assert from_db['simulation_time'] is None
+
+        api_metrics.reset()
+        with Session(engine) as session, \
+                WorldSnapshotPublisher(get_config().simulation.world_snapshot_name, 1 << 20) as publisher:
+            publisher.publish(session, hora=9)
+            from_shm = client.get('/api/world/state').json()
+            assert client.get('/api/metrics').json() == metrics_db
+
+        stats = api_metrics.snapshot()
+        assert stats[('GET', '/api/world/state')].sql_count == 0
+        assert stats[('GET', '/api/metrics')].sql_count == 0
+        assert from_shm['simulation_time'] == "09:00"
+        for key in ('agents', 'vehicles', 'stations', 'routes', 'operators', 'metrics'):
+            assert from_shm[key] == from_db[key]
+
+        # Simulação encerrada: volta ao banco
+        assert client.get('/api/world/state').json()['simulation_time'] is None